@@ -0,0 +1,191 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# CANDLE RING - Memory-mapped append-only candle file
+# Shared format between the DXLink candle collector (writer) and the app (reader)
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# Layout (little-endian):
+#   [0, 64)             header  - magic, version, record size, capacity,
+#                                 seq (seqlock), count (records ever appended),
+#                                 meta length
+#   [64, 64 + 8192)     meta    - small JSON blob: last_updated, sessions,
+#                                 vix_channel, current prices
+#   [8256, ...)         records - `capacity` fixed-size CANDLE_DTYPE slots used
+#                                 as a ring (slot = index % capacity)
+#
+# Seqlock: the writer makes seq odd before touching the file and even again
+# when done. A reader that sees the same even seq before and after its copy
+# has a consistent view; an unchanged seq since the last poll means nothing
+# to do. A symbol's in-progress candle is rewritten in place in that symbol's
+# newest slot (replace_last), which may sit behind newer records of the other
+# symbol, so a reader re-reads from the oldest of its per-symbol newest records.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import json
+import os
+import time
+
+import numpy as np
+
+RING_MAGIC = b"SPXRING1"
+RING_VERSION = 1
+HEADER_SIZE = 64
+META_SIZE = 8192
+RECORDS_OFFSET = HEADER_SIZE + META_SIZE
+DEFAULT_CAPACITY = 8192
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("record_size", "<u4"), ("capacity", "<u8"),
+    ("seq", "<u8"), ("count", "<u8"), ("meta_len", "<u4"), ("reserved", "S20"),
+])
+
+CANDLE_DTYPE = np.dtype([
+    ("symbol", "u1"), ("time", "<i8"),          # time = epoch nanoseconds, UTC
+    ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8"),
+])
+
+SYMBOL_IDS = {"es": 0, "vx": 1}
+
+def _file_size(capacity):
+    return RECORDS_OFFSET + capacity * CANDLE_DTYPE.itemsize
+
+class CandleRingWriter:
+    """Single-writer side of the ring (used by the collector)."""
+
+    def __init__(self, path, capacity=DEFAULT_CAPACITY):
+        self.path = str(path)
+        fresh = not os.path.exists(self.path) or os.path.getsize(self.path) != _file_size(capacity)
+        self.map = np.memmap(self.path, dtype=np.uint8, mode="w+" if fresh else "r+", shape=(_file_size(capacity),))
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.map, offset=0)
+        self.records = np.ndarray((capacity,), dtype=CANDLE_DTYPE, buffer=self.map, offset=RECORDS_OFFSET)
+        if fresh or self.header["magic"] != RING_MAGIC:
+            self.header["magic"] = RING_MAGIC
+            self.header["version"] = RING_VERSION
+            self.header["record_size"] = CANDLE_DTYPE.itemsize
+            self.header["capacity"] = capacity
+            self.header["seq"] = 0
+            self.header["count"] = 0
+            self.header["meta_len"] = 0
+            self.map.flush()
+        self.capacity = int(self.header["capacity"])
+        # Index of each symbol's newest record, so replace_last rewrites that symbol's candle
+        count = int(self.header["count"])
+        indexes = np.arange(max(count - self.capacity, 0), count)
+        symbols = self.records["symbol"][indexes % self.capacity]
+        self.last_index = {}
+        for name, sym_id in SYMBOL_IDS.items():
+            mine = indexes[symbols == sym_id]
+            if len(mine):
+                self.last_index[name] = int(mine[-1])
+
+    def _begin(self):
+        self.header["seq"] += 1     # odd: write in progress
+
+    def _end(self):
+        self.header["seq"] += 1     # even: consistent
+        self.map.flush()
+
+    def append(self, symbol, candles, replace_last=False):
+        """
+        Append candles for one symbol.
+
+        Args:
+            symbol: "es" or "vx"
+            candles: Iterable of (time_ns, open, high, low, close, volume)
+            replace_last: Overwrite this symbol's newest record with the first
+                          candle (in-progress candle update) instead of appending it
+        """
+        rows = list(candles)
+        if not rows:
+            return
+        self._begin()
+        try:
+            count = int(self.header["count"])
+            last = self.last_index.get(symbol)
+            if replace_last and last is not None and last >= count - self.capacity:
+                self.records[last % self.capacity] = (SYMBOL_IDS[symbol],) + tuple(rows.pop(0))
+            for row in rows:
+                self.records[count % self.capacity] = (SYMBOL_IDS[symbol],) + tuple(row)
+                last = count
+                count += 1
+            self.last_index[symbol] = last
+            self.header["count"] = count
+        finally:
+            self._end()
+
+    def set_meta(self, meta):
+        """Replace the JSON meta blob (sessions, vix_channel, last_updated, ...)."""
+        blob = json.dumps(meta, default=str).encode()
+        if len(blob) > META_SIZE:
+            raise ValueError(f"Candle ring meta is {len(blob)} bytes (max {META_SIZE})")
+        self._begin()
+        try:
+            self.map[HEADER_SIZE:HEADER_SIZE + len(blob)] = np.frombuffer(blob, dtype=np.uint8)
+            self.header["meta_len"] = len(blob)
+        finally:
+            self._end()
+
+class CandleRingReader:
+    """
+    Zero-copy reader. The file is mapped once; poll() costs one header read
+    when nothing changed and otherwise copies only the records that are new.
+    """
+
+    def __init__(self, path, retries=50):
+        self.path = str(path)
+        self.retries = retries
+        self.meta = {}
+        self._reset()
+        self._open()
+
+    def _reset(self):
+        self.seq = None
+        self.count = 0
+        self.last_index = {}        # Index of the newest record seen per symbol
+        self.candles = {name: np.empty(0, dtype=CANDLE_DTYPE) for name in SYMBOL_IDS}
+
+    def _open(self):
+        self.inode = os.stat(self.path).st_ino
+        self.map = np.memmap(self.path, dtype=np.uint8, mode="r")
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.map, offset=0)
+        if self.header["magic"] != RING_MAGIC or int(self.header["record_size"]) != CANDLE_DTYPE.itemsize:
+            raise ValueError(f"{self.path} is not a version {RING_VERSION} candle ring")
+        self.capacity = int(self.header["capacity"])
+        self.records = np.ndarray((self.capacity,), dtype=CANDLE_DTYPE, buffer=self.map, offset=RECORDS_OFFSET)
+
+    def poll(self):
+        """Pick up new records and meta. Returns False if the writer has not written since the last poll."""
+        if os.stat(self.path).st_ino != self.inode:
+            # Collector recreated the file - map the new one and start over
+            self._reset()
+            self._open()
+        if int(self.header["seq"]) == self.seq:
+            return False
+        for _ in range(self.retries):
+            seq = int(self.header["seq"])
+            if seq % 2:
+                time.sleep(0.001)
+                continue
+            count = int(self.header["count"])
+            if count < self.count:
+                self._reset()
+            # Re-read each symbol's newest record too - in-progress candles are rewritten in place
+            oldest = min([self.count - 1] + list(self.last_index.values()))
+            indexes = np.arange(max(oldest, count - self.capacity, 0), count)
+            new = self.records[indexes % self.capacity].copy()
+            meta_len = int(self.header["meta_len"])
+            meta_blob = bytes(self.map[HEADER_SIZE:HEADER_SIZE + meta_len])
+            if int(self.header["seq"]) == seq:
+                break
+        else:
+            return False
+
+        for name, sym_id in SYMBOL_IDS.items():
+            rows = new[new["symbol"] == sym_id]
+            if len(rows):
+                old = self.candles[name]
+                old = old[old["time"] < rows["time"][0]]
+                self.candles[name] = np.concatenate([old, rows])[-self.capacity:]
+                self.last_index[name] = int(indexes[new["symbol"] == sym_id][-1])
+        self.meta = json.loads(meta_blob) if meta_blob else {}
+        self.seq, self.count = seq, count
+        return True
@@ -0,0 +1,345 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# DXLINK STREAMING CLIENT - Live ES / VX / SPXW quotes over websocket
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# DXLinkStreamer runs its own asyncio loop on a daemon thread, speaks the DXLink
+# protocol (SETUP → AUTH → CHANNEL_REQUEST → FEED_SETUP → FEED_SUBSCRIPTION,
+# COMPACT FEED_DATA, KEEPALIVE) and reconnects with backoff.
+#
+# Quotes land in a QuoteTable: one immutable Quote tuple per symbol, replaced
+# whole by the single stream thread. A dict store/load is atomic, so Streamlit
+# reruns read the latest quote without taking a lock.
+#
+# Offline testing: `python dxlink_stream.py --standin` starts a local stand-in
+# DXLink server that random-walks quotes, connects a streamer to it and reports
+# tick-to-display latency.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+DXLINK_VERSION = "0.1-DXF-JS/0.3.0"
+KEEPALIVE_SECONDS = 30
+FEED_CHANNEL = 1
+
+EVENT_FIELDS = {
+    "Quote": ["eventType", "eventSymbol", "bidPrice", "askPrice", "bidSize", "askSize"],
+    "Trade": ["eventType", "eventSymbol", "price", "size", "time"],
+}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QUOTE TABLE
+# ═══════════════════════════════════════════════════════════════════════════════
+class Quote(namedtuple("Quote", "symbol bid ask last event_ms recv_ns")):
+    """Latest quote for one symbol. recv_ns / event_ms are wall-clock (time.time_ns / ms)."""
+    __slots__ = ()
+
+    @property
+    def mid(self):
+        if self.bid is not None and self.ask is not None:
+            return round((self.bid + self.ask) / 2, 2)
+        return self.last
+
+    def age_seconds(self):
+        return (time.time_ns() - self.recv_ns) / 1e9
+
+class LatencyStats:
+    """Rolling latency samples (ns) with percentile summary in milliseconds."""
+
+    def __init__(self, maxlen=4096):
+        self.samples = deque(maxlen=maxlen)
+
+    def record(self, ns):
+        self.samples.append(ns)
+
+    def summary(self):
+        data = sorted(self.samples)
+        if not data:
+            return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+        pick = lambda q: round(data[min(len(data) - 1, int(q * len(data)))] / 1e6, 3)
+        return {"count": len(data), "p50_ms": pick(0.50), "p95_ms": pick(0.95),
+                "p99_ms": pick(0.99), "max_ms": round(data[-1] / 1e6, 3)}
+
+class QuoteTable:
+    """Latest-quote table: single writer replaces immutable tuples, readers never lock."""
+
+    def __init__(self):
+        self._quotes = {}
+        self.tick_to_display = LatencyStats()    # Upstream event time → read by the app
+        self.recv_to_display = LatencyStats()    # Socket receive → read by the app
+
+    def update(self, symbol, **fields):
+        old = self._quotes.get(symbol)
+        quote = (old or Quote(symbol, None, None, None, None, None))._replace(recv_ns=time.time_ns(), **fields)
+        self._quotes[symbol] = quote
+
+    def get(self, symbol, record_latency=True):
+        quote = self._quotes.get(symbol)
+        if quote is not None and record_latency:
+            now = time.time_ns()
+            self.recv_to_display.record(now - quote.recv_ns)
+            if quote.event_ms:
+                self.tick_to_display.record(now - int(quote.event_ms * 1e6))
+        return quote
+
+    def symbols(self):
+        return list(self._quotes)
+
+def _num(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if value != value else value     # DXLink sends "NaN" for empty fields
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STREAMER
+# ═══════════════════════════════════════════════════════════════════════════════
+class DXLinkStreamer:
+    """
+    Background DXLink client. start() once, subscribe() from any thread, read self.quotes.
+
+    token may be a callable so every reconnect authenticates with a fresh quote token.
+    """
+
+    def __init__(self, url, token, reconnect_delay=1.0, max_reconnect_delay=30.0):
+        self.url = url
+        self.token = token
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.quotes = QuoteTable()
+        self.symbols = set()
+        self.connected = False
+        self.error = None
+        self.messages = 0
+        self._ws = None
+        self._loop = None
+        self._thread = None
+        self._stopping = False
+
+    # ─── Public API (any thread) ───────────────────────────────────────────────
+    def start(self):
+        if websockets is None:
+            self.error = "websockets package not installed"
+            return self
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._run(),),
+                                            name="dxlink-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    def subscribe(self, symbols):
+        """Add streamer symbols (ES / VX futures, SPXW options). Already-subscribed ones are ignored."""
+        new = {s for s in symbols if s} - self.symbols
+        if not new:
+            return
+        self.symbols |= new
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._send_subscription(new), self._loop)
+
+    def stop(self):
+        self._stopping = True
+        if self._loop is not None and self._ws is not None:
+            asyncio.run_coroutine_threadsafe(self._ws.close(), self._loop)
+
+    def status(self):
+        return {"connected": self.connected, "error": self.error, "messages": self.messages,
+                "symbols": len(self.symbols),
+                "tick_to_display": self.quotes.tick_to_display.summary(),
+                "recv_to_display": self.quotes.recv_to_display.summary()}
+
+    # ─── Stream thread ─────────────────────────────────────────────────────────
+    async def _run(self):
+        delay = self.reconnect_delay
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.url, ping_interval=None, max_size=None) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_delay
+                    await self._session(ws)
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+            self._ws = None
+            self.connected = False
+            if not self._stopping:
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _send(self, ws, message):
+        await ws.send(json.dumps(message))
+
+    async def _send_subscription(self, symbols, reset=False):
+        if self._ws is None or not self.connected:
+            return      # Sent in full on (re)connect
+        await self._send(self._ws, {
+            "type": "FEED_SUBSCRIPTION", "channel": FEED_CHANNEL, "reset": reset,
+            "add": [{"type": event, "symbol": s} for s in sorted(symbols) for event in EVENT_FIELDS],
+        })
+
+    async def _keepalive(self, ws):
+        while True:
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            await self._send(ws, {"type": "KEEPALIVE", "channel": 0})
+
+    async def _session(self, ws):
+        await self._send(ws, {"type": "SETUP", "channel": 0, "version": DXLINK_VERSION,
+                              "keepaliveTimeout": 60, "acceptKeepaliveTimeout": 60})
+        keepalive = asyncio.ensure_future(self._keepalive(ws))
+        try:
+            async for raw in ws:
+                self.messages += 1
+                msg = json.loads(raw)
+                kind = msg.get("type")
+                if kind == "AUTH_STATE":
+                    if msg.get("state") == "UNAUTHORIZED":
+                        token = self.token() if callable(self.token) else self.token
+                        await self._send(ws, {"type": "AUTH", "channel": 0, "token": token})
+                    elif msg.get("state") == "AUTHORIZED":
+                        await self._send(ws, {"type": "CHANNEL_REQUEST", "channel": FEED_CHANNEL,
+                                              "service": "FEED", "parameters": {"contract": "AUTO"}})
+                elif kind == "CHANNEL_OPENED" and msg.get("channel") == FEED_CHANNEL:
+                    await self._send(ws, {"type": "FEED_SETUP", "channel": FEED_CHANNEL,
+                                          "acceptAggregationPeriod": 0.1, "acceptDataFormat": "COMPACT",
+                                          "acceptEventFields": EVENT_FIELDS})
+                    self.connected, self.error = True, None
+                    await self._send_subscription(self.symbols, reset=True)
+                elif kind == "FEED_DATA":
+                    self._on_feed_data(msg.get("data", []))
+                elif kind == "ERROR":
+                    self.error = f"{msg.get('error')}: {msg.get('message')}"
+        finally:
+            keepalive.cancel()
+
+    def _on_feed_data(self, data):
+        # COMPACT: [eventType, [v0, v1, ... flattened events], eventType, [...], ...]
+        for i in range(0, len(data) - 1, 2):
+            event_type, values = data[i], data[i + 1]
+            fields = EVENT_FIELDS.get(event_type)
+            if not fields:
+                continue
+            width = len(fields)
+            for j in range(0, len(values) - width + 1, width):
+                event = dict(zip(fields, values[j:j + width]))
+                symbol = event["eventSymbol"]
+                if event_type == "Quote":
+                    self.quotes.update(symbol, bid=_num(event["bidPrice"]), ask=_num(event["askPrice"]))
+                else:
+                    self.quotes.update(symbol, last=_num(event["price"]), event_ms=_num(event.get("time")))
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LOCAL STAND-IN SERVER - Offline testing
+# ═══════════════════════════════════════════════════════════════════════════════
+async def standin_handler(ws, rate_hz=20, start_prices=None):
+    """Minimal DXLink server: handshake, then random-walk Quote + Trade events for subscribed symbols."""
+    subscribed = {}
+    prices = dict(start_prices or {})
+    ticker = None
+
+    async def emit():
+        while True:
+            await asyncio.sleep(1.0 / rate_hz)
+            quotes, trades = [], []
+            now_ms = time.time_ns() // 1_000_000
+            for symbol in list(subscribed):
+                price = prices.get(symbol, 100.0) + random.gauss(0, 0.25)
+                prices[symbol] = price
+                quotes += ["Quote", symbol, round(price - 0.125, 2), round(price + 0.125, 2), 10, 10]
+                trades += ["Trade", symbol, round(price, 2), 1, now_ms]
+            if quotes:
+                await ws.send(json.dumps({"type": "FEED_DATA", "channel": FEED_CHANNEL,
+                                          "data": ["Quote", quotes, "Trade", trades]}))
+
+    try:
+        async for raw in ws:
+            msg = json.loads(raw)
+            kind = msg.get("type")
+            if kind == "SETUP":
+                await ws.send(json.dumps({"type": "SETUP", "channel": 0, "version": DXLINK_VERSION,
+                                          "keepaliveTimeout": 60, "acceptKeepaliveTimeout": 60}))
+                await ws.send(json.dumps({"type": "AUTH_STATE", "channel": 0, "state": "UNAUTHORIZED"}))
+            elif kind == "AUTH":
+                await ws.send(json.dumps({"type": "AUTH_STATE", "channel": 0, "state": "AUTHORIZED",
+                                          "userId": "standin"}))
+            elif kind == "CHANNEL_REQUEST":
+                await ws.send(json.dumps({"type": "CHANNEL_OPENED", "channel": msg["channel"],
+                                          "service": "FEED", "parameters": msg.get("parameters", {})}))
+            elif kind == "FEED_SETUP":
+                await ws.send(json.dumps({"type": "FEED_CONFIG", "channel": msg["channel"],
+                                          "dataFormat": "COMPACT", "eventFields": msg.get("acceptEventFields")}))
+            elif kind == "FEED_SUBSCRIPTION":
+                if msg.get("reset"):
+                    subscribed.clear()
+                for item in msg.get("add", []):
+                    subscribed[item["symbol"]] = True
+                if ticker is None:
+                    ticker = asyncio.ensure_future(emit())
+    finally:
+        if ticker is not None:
+            ticker.cancel()
+
+def start_standin_server(host="127.0.0.1", port=0, rate_hz=20, start_prices=None):
+    """Run a stand-in server on a daemon thread. Returns its ws:// URL."""
+    if websockets is None:
+        raise RuntimeError("websockets package not installed")
+    ready = threading.Event()
+    box = {}
+
+    async def serve():
+        server = await websockets.serve(lambda ws, *_: standin_handler(ws, rate_hz, start_prices), host, port)
+        box["url"] = f"ws://{host}:{server.sockets[0].getsockname()[1]}"
+        ready.set()
+        await asyncio.Future()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), name="dxlink-standin", daemon=True).start()
+    ready.wait(10)
+    return box["url"]
+
+def main():
+    parser = argparse.ArgumentParser(description="DXLink streamer latency check against a local stand-in server.")
+    parser.add_argument("--standin", action="store_true", help="Start a local stand-in server (offline)")
+    parser.add_argument("--url", help="DXLink websocket URL (if not using --standin)")
+    parser.add_argument("--token", default="standin")
+    parser.add_argument("--symbols", default="/ESZ25:XCME,/VXX25:XCBF,.SPXW251016C6000")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--display-hz", type=float, default=30.0, help="How often the 'UI' reads quotes")
+    args = parser.parse_args()
+
+    symbols = [s for s in args.symbols.split(",") if s]
+    url = start_standin_server(start_prices={s: 100.0 for s in symbols}) if args.standin else args.url
+    if not url:
+        parser.error("--url is required without --standin")
+
+    streamer = DXLinkStreamer(url, args.token).start()
+    streamer.subscribe(symbols)
+    deadline = time.time() + args.seconds
+    reads = 0
+    while time.time() < deadline:
+        for s in symbols:
+            if streamer.quotes.get(s) is not None:
+                reads += 1
+        time.sleep(1.0 / args.display_hz)
+
+    status = streamer.status()
+    print(f"url={url} connected={status['connected']} messages={status['messages']} reads={reads}")
+    if status["error"]:
+        print(f"error: {status['error']}")
+    for name in ("tick_to_display", "recv_to_display"):
+        print(f"{name}: {status[name]}")
+    for s in symbols:
+        q = streamer.quotes.get(s, record_latency=False)
+        print(f"  {s}: {q.mid if q else None}")
+    streamer.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SPX PROPHET - HISTORICAL BACKTEST ENGINE
+# Replays the live channel pipeline day by day over local ES bar history
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# Per trading day, exactly what main() does at the reference time:
+#   extract_sessions → determine_channel → validate_and_adjust_pivots →
+#   calc_dual_channel_levels → calc_prior_day_targets → analyze_market_state_v2
+# then the primary trade is walked forward through that day's RTH bars.
+#
+# Days are independent, so they are spread over a process pool; each task only
+# carries its own two-day slice of bars. Results go to one Parquet file.
+#
+# Usage:
+#   python spx_backtest.py --bars es_30m.parquet --start 2020-01-01 --end 2024-12-31
+#
+# The bar file (Parquet or CSV) needs a datetime index / first column and
+# Open, High, Low, Close columns - e.g. saved from yf.Ticker("ES=F").history().
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time, timedelta
+
+import numpy as np
+import pandas as pd
+
+from spx_core import (
+    CT, Bias, VIXPosition,
+    _bars_to_ct, is_trading_day, get_prior_trading_day,
+    extract_sessions, determine_channel, validate_and_adjust_pivots,
+    calc_channel_levels, get_close_based_pivots, calc_dual_channel_levels,
+    extract_prior_day_rth, calc_prior_day_targets, analyze_session_tests,
+    analyze_gap, analyze_prior_close, analyze_market_state_v2,
+    estimate_0dte_premium,
+)
+
+DEFAULT_REF_TIME = (9, 0)       # Same default reference time as the sidebar
+DEFAULT_VIX = 16.0              # Neutral VIX when no VIX history is supplied
+RTH_CLOSE = time(15, 0)
+
+NEUTRAL_VIX_TERM = {"vix_spot": None, "vix_future": None, "structure": "UNKNOWN", "spread": None}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# DATA
+# ═══════════════════════════════════════════════════════════════════════════════
+def load_bars(path):
+    """Load an OHLC bar file (Parquet or CSV) as a CT-indexed frame."""
+    if str(path).endswith(".parquet"):
+        df = pd.read_parquet(path)
+    else:
+        df = pd.read_csv(path, index_col=0)
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index, utc=True)
+    df = df.rename(columns=str.title)[["Open", "High", "Low", "Close"]]
+    return _bars_to_ct(df.sort_index())
+
+def load_daily_vix(path):
+    """Optional daily VIX closes (date -> close) used as each day's VIX."""
+    if not path:
+        return {}
+    df = pd.read_parquet(path) if str(path).endswith(".parquet") else pd.read_csv(path, index_col=0)
+    df.index = pd.to_datetime(df.index).date
+    return df.rename(columns=str.title)["Close"].to_dict()
+
+def backtest_days(bars, start, end):
+    """Trading days in [start, end] that have bars."""
+    have_bars = set(bars.index.date)
+    days, d = [], start
+    while d <= end:
+        if is_trading_day(d) and d in have_bars:
+            days.append(d)
+        d += timedelta(days=1)
+    return days
+
+def ema_bias_series(bars):
+    """8/21/200 EMA bias after every bar, computed once over the whole history."""
+    close = bars["Close"]
+    ema_8 = close.ewm(span=8, adjust=False).mean()
+    ema_21 = close.ewm(span=21, adjust=False).mean()
+    ema_200 = close.ewm(span=200, adjust=False).mean()
+    bias = np.where((close > ema_200) & (ema_8 > ema_21), Bias.CALLS.value,
+                    np.where((close <= ema_200) & (ema_8 <= ema_21), Bias.PUTS.value, Bias.NEUTRAL.value))
+    return pd.Series(bias, index=bars.index)
+
+def build_tasks(bars, days, ref_time=DEFAULT_REF_TIME, offset=0.0, daily_vix=None):
+    """One picklable task per day: its bar slice plus the day's scalar inputs."""
+    ema_bias = ema_bias_series(bars)
+    tasks = []
+    for d in days:
+        prior_day = get_prior_trading_day(d)
+        lo = CT.localize(datetime.combine(prior_day, time(0, 0)))
+        hi = CT.localize(datetime.combine(d, RTH_CLOSE))
+        day_bars = bars[(bars.index >= lo) & (bars.index <= hi)]
+        ref_dt = CT.localize(datetime.combine(d, time(*ref_time)))
+        before_ref = ema_bias[ema_bias.index < ref_dt]
+        tasks.append({
+            "date": d,
+            "bars": day_bars,
+            "ref_time": ref_time,
+            "offset": offset,
+            "vix": (daily_vix or {}).get(prior_day, DEFAULT_VIX),
+            "ema_bias": before_ref.iloc[-1] if not before_ref.empty else Bias.NEUTRAL.value,
+        })
+    return tasks
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REPLAY
+# ═══════════════════════════════════════════════════════════════════════════════
+def simulate_trade(trade, rth_bars, vix):
+    """
+    Walk a planned trade through the RTH bars after the reference time.
+
+    Entry fills the first bar that trades through entry_level; the stop is
+    checked from the next bar on; otherwise the trade is closed at 3:00 PM CT.
+    P&L is in index points (and estimated premium) in the trade's direction.
+    """
+    result = {"triggered": False, "trigger_time": None, "exit_reason": None, "exit_time": None,
+              "exit_level": None, "pnl_points": None, "mfe_points": None, "mae_points": None,
+              "exit_premium": None, "premium_pnl": None}
+    if rth_bars.empty:
+        return result
+
+    is_call = trade["direction"] == "CALLS"
+    side = 1 if is_call else -1
+    entry, stop = trade["entry_level"], trade["stop_level"]
+    touched = (rth_bars["Low"] <= entry) if is_call else (rth_bars["High"] >= entry)
+    if not touched.any():
+        return result
+
+    entry_pos = int(np.argmax(touched.values))
+    after = rth_bars.iloc[entry_pos:]
+    result["triggered"] = True
+    result["trigger_time"] = after.index[0]
+
+    exit_level, exit_time, exit_reason = float(after["Close"].iloc[-1]), after.index[-1], "CLOSE"
+    if stop is not None and len(after) > 1:
+        stopped = (after["Low"].iloc[1:] <= stop) if is_call else (after["High"].iloc[1:] >= stop)
+        if stopped.any():
+            exit_time = stopped.index[int(np.argmax(stopped.values))]
+            exit_level, exit_reason = float(stop), "STOP"
+
+    held = after[after.index <= exit_time]
+    result["exit_reason"], result["exit_time"], result["exit_level"] = exit_reason, exit_time, exit_level
+    result["pnl_points"] = round(side * (exit_level - entry), 2)
+    result["mfe_points"] = round(float(side * ((held["High"] if is_call else held["Low"]) - entry).max()), 2)
+    result["mae_points"] = round(float(side * ((held["Low"] if is_call else held["High"]) - entry).min()), 2)
+
+    close_dt = CT.localize(datetime.combine(exit_time.date(), RTH_CLOSE))
+    hours_left = max(0.1, (close_dt - exit_time).total_seconds() / 3600)
+    opt_type = "CALL" if is_call else "PUT"
+    result["exit_premium"] = estimate_0dte_premium(exit_level, trade["strike"], hours_left, vix, opt_type)
+    if trade.get("entry_premium"):
+        result["premium_pnl"] = round(result["exit_premium"] - trade["entry_premium"], 2)
+    return result
+
+def replay_day(task):
+    """Run the live pipeline for one trading day and score its primary trade. Never raises."""
+    d = task["date"]
+    row = {"date": d, "channel_type": None, "no_trade": True, "error": None}
+    try:
+        bars, offset, vix = task["bars"], task["offset"], task["vix"]
+        ref_dt = CT.localize(datetime.combine(d, time(*task["ref_time"])))
+
+        sessions = extract_sessions(bars[bars.index < ref_dt], d) or {}
+        sydney, tokyo, london = sessions.get("sydney"), sessions.get("tokyo"), sessions.get("london")
+        channel_type, channel_reason, upper_pivot, lower_pivot, upper_time, lower_time = determine_channel(sydney, tokyo, london)
+        row["channel_type"] = channel_type.value
+
+        pivots = validate_and_adjust_pivots(channel_type, upper_pivot, lower_pivot, upper_time, lower_time,
+                                            {"sydney": sydney, "tokyo": tokyo, "london": london}, ref_dt)
+        upper_pivot, lower_pivot = pivots["upper_pivot"], pivots["lower_pivot"]
+        upper_time, lower_time = pivots["upper_time"], pivots["lower_time"]
+
+        ceiling_es, floor_es = calc_channel_levels(upper_pivot, lower_pivot, upper_time, lower_time, ref_dt, channel_type)
+        close_pivots = get_close_based_pivots(sydney, tokyo, london)
+        dual_es = calc_dual_channel_levels(
+            upper_pivot, lower_pivot, upper_time, lower_time, ref_dt,
+            upper_pivot_close=close_pivots.get("highest_close"),
+            lower_pivot_close=close_pivots.get("lowest_close"),
+            upper_close_time=close_pivots.get("highest_close_time"),
+            lower_close_time=close_pivots.get("lowest_close_time"))
+        if dual_es is None or ceiling_es is None:
+            row["error"] = "Missing session data"
+            return row
+        dual_spx = {k: round(dual_es[k] - offset, 2) for k in ("asc_floor", "asc_ceiling", "desc_ceiling", "desc_floor")}
+        dual_spx.update({k: dual_es[k] for k in ("overnight_high", "overnight_low", "blocks_high", "blocks_low")})
+        dual_spx.update({k: pivots[k] for k in ("floor_was_adjusted", "ceiling_was_adjusted",
+                                                 "floor_adjustment_session", "ceiling_adjustment_session")})
+        row.update({k: dual_spx[k] for k in ("asc_floor", "asc_ceiling", "desc_ceiling", "desc_floor")})
+
+        prior_rth = extract_prior_day_rth(bars, get_prior_trading_day(d))
+        prior_targets = calc_prior_day_targets(prior_rth, ref_dt)
+
+        ref_bar = bars[bars.index >= ref_dt]
+        if ref_bar.empty:
+            row["error"] = "No bars at reference time"
+            return row
+        current_spx = round(float(ref_bar["Open"].iloc[0]) - offset, 2)
+        ceiling_spx, floor_spx = round(ceiling_es - offset, 2), round(floor_es - offset, 2)
+        prior_close_es = prior_rth.get("close") if prior_rth.get("available") else None
+        prior_close_spx = round(prior_close_es - offset, 2) if prior_close_es else None
+
+        decision = analyze_market_state_v2(
+            current_spx, dual_spx, channel_type, channel_reason,
+            Bias.NEUTRAL, Bias(task["ema_bias"]), VIXPosition.UNKNOWN, vix,
+            analyze_session_tests(sydney, tokyo, london, channel_type),
+            analyze_gap(current_spx, prior_close_spx, ceiling_spx, floor_spx),
+            analyze_prior_close(prior_close_spx, ceiling_spx, floor_spx),
+            NEUTRAL_VIX_TERM, prior_targets, ref_dt)
+
+        row["current_spx"] = current_spx
+        row["no_trade"] = bool(decision.get("no_trade"))
+        row["no_trade_reason"] = decision.get("no_trade_reason")
+        trade = decision.get("primary")
+        if trade:
+            row.update({"trade_name": trade["name"], "direction": trade["direction"],
+                        "entry_level": trade["entry_level"], "stop_level": trade["stop_level"],
+                        "strike": trade["strike"], "confidence": trade["confidence"],
+                        "entry_premium": trade["entry_premium"]})
+            rth = bars[(bars.index >= ref_dt) & (bars.index < CT.localize(datetime.combine(d, RTH_CLOSE)))]
+            shifted = rth[["Open", "High", "Low", "Close"]] - offset
+            row.update(simulate_trade(trade, shifted, vix))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return row
+
+def run_backtest(bars, start, end, ref_time=DEFAULT_REF_TIME, offset=0.0, daily_vix=None,
+                 workers=None, chunksize=8):
+    """
+    Replay every trading day in [start, end] across a process pool.
+
+    Returns:
+        DataFrame with one row per day, in date order
+    """
+    tasks = build_tasks(bars, backtest_days(bars, start, end), ref_time, offset, daily_vix)
+    if not tasks:
+        return pd.DataFrame()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        rows = [replay_day(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(replay_day, tasks, chunksize=chunksize))
+    return pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
+
+def summarize(results):
+    """Headline stats for a results frame."""
+    if results.empty or "triggered" not in results:
+        return {"days": len(results), "trades": 0}
+    trades = results[results["triggered"] == True]
+    pnl = trades["pnl_points"].astype(float)
+    return {
+        "days": len(results),
+        "errors": int(results["error"].notna().sum()),
+        "no_trade_days": int(results["no_trade"].sum()),
+        "trades": len(trades),
+        "win_rate": round(float((pnl > 0).mean()), 3) if len(trades) else None,
+        "total_points": round(float(pnl.sum()), 2),
+        "avg_points": round(float(pnl.mean()), 2) if len(trades) else None,
+        "stopped": int((trades["exit_reason"] == "STOP").sum()),
+    }
+
+def write_results(results, path):
+    """Write results to a columnar file (Parquet; timestamps stored in UTC)."""
+    out = results.copy()
+    for col in ("trigger_time", "exit_time"):
+        if col in out:
+            out[col] = pd.to_datetime(out[col], utc=True)
+    out["date"] = pd.to_datetime(out["date"])
+    out.to_parquet(path, index=False)
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the SPX Prophet channel strategy over bar history.")
+    parser.add_argument("--bars", required=True, help="30-minute ES bars (Parquet or CSV)")
+    parser.add_argument("--start", required=True, type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--end", required=True, type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--out", default="backtest_results.parquet")
+    parser.add_argument("--ref-time", default="09:00", help="Reference time HH:MM CT")
+    parser.add_argument("--offset", type=float, default=0.0, help="ES - SPX offset (0 = trade the ES levels)")
+    parser.add_argument("--vix", default=None, help="Optional daily VIX closes (Parquet or CSV)")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    ref_time = tuple(int(x) for x in args.ref_time.split(":"))
+    results = run_backtest(load_bars(args.bars), args.start, args.end, ref_time, args.offset,
+                           load_daily_vix(args.vix), args.workers)
+    if results.empty:
+        print("No trading days with bars in range")
+        return
+    write_results(results, args.out)
+    print(f"Wrote {len(results)} days to {args.out}")
+    for k, v in summarize(results).items():
+        print(f"  {k}: {v}")
+
+if __name__ == "__main__":
+    main()
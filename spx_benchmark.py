@@ -0,0 +1,763 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SPX PROPHET - OFFLINE ENGINE BENCHMARKS
+# Times the core engine stages on a fixed fixture and guards against regressions
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# Every stage runs on the same fixture (benchmarks/fixture.json: two days of
+# 30-minute ES bars plus the scalar inputs of one rerun), so no network or
+# Streamlit runtime is involved. "rerun" is the compute path of one main()
+# rerun at the reference time, without I/O or rendering:
+#   extract_sessions → determine_channel → validate_and_adjust_pivots →
+#   build_reference_ladder → reference_levels → extract_prior_day_rth →
+#   analyze_* → analyze_market_state_v2 → detect_explosive_potential
+# "import_core" is the cold `import spx_core` in a fresh interpreter.
+#
+# Before timing, the equivalence checks compare the engine with the legacy
+# (pre-optimisation) reference code kept below on randomized inputs; any
+# mismatch fails the run. --check runs only the checks.
+#
+# Each stage is timed with timeit (autoranged loop, --repeat times). Results
+# are written to benchmarks/results/<commit>.json and compared against the
+# pinned pre-optimisation commit ("baseline" in benchmarks/thresholds.json) and
+# the nearest ancestor commit that has a result. A stage regresses when both its
+# best and its median time exceed the stage's ratio and the best time grew by
+# more than "min_delta_us"; a regression fails the run (exit code 1), as does a
+# stage over its absolute budget ("budgets_us") regardless of the baseline.
+#
+# --at <commit> times the engine as it was at another commit (its spx_core, or
+# the module-level engine of spx_forecast_app before the split) and saves that
+# commit's result; stages the old engine has no function for are skipped.
+#
+# Usage:
+#   python spx_benchmark.py                       # run, save, compare
+#   python spx_benchmark.py --baseline <commit>   # compare against a given commit only
+#   python spx_benchmark.py --at <commit>         # record the result of an older commit
+#   python spx_benchmark.py --no-save --stages rerun,black_scholes
+#   python spx_benchmark.py --record-fixture      # replace the fixture with live ES bars
+#   python spx_benchmark.py --check               # equivalence checks only
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import argparse
+import importlib.util
+import io
+import json
+import math
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import spx_core
+from spx_core import (
+    CT, SLOPE, Bias, ChannelType,
+    _bars_to_ct, get_prior_trading_day, blocks_between,
+    calc_channel_levels, calc_dual_channel_levels, extract_prior_day_rth,
+    estimate_0dte_premium, estimate_0dte_premium_vec, black_scholes, black_scholes_vec,
+    RISK_FREE_RATE, HOURS_PER_YEAR, NORM_CDF_MAX_ERROR, implied_vol,
+    market_holidays, market_early_closes,
+)
+
+BENCH_DIR = Path(__file__).resolve().parent / "benchmarks"
+FIXTURE_FILE = BENCH_DIR / "fixture.json"
+THRESHOLDS_FILE = BENCH_DIR / "thresholds.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+DEFAULT_REPEAT = 15
+NEUTRAL_VIX_TERM = {"vix_spot": None, "vix_future": None, "structure": "UNKNOWN", "spread": None}
+NEUTRAL_EMA = {"ema_bias": Bias.NEUTRAL, "ema_8": None, "ema_21": None, "ema_200": None}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FIXTURE
+# ═══════════════════════════════════════════════════════════════════════════════
+def load_fixture(path=FIXTURE_FILE):
+    """Fixture JSON -> dict with a CT-indexed bar frame and the rerun inputs."""
+    raw = json.loads(Path(path).read_text())
+    bars = pd.DataFrame(raw["bars"], columns=["Time", "Open", "High", "Low", "Close"])
+    bars.index = pd.to_datetime(bars.pop("Time"), utc=True)
+    trading_date = datetime.strptime(raw["trading_date"], "%Y-%m-%d").date()
+    return {
+        "bars": _bars_to_ct(bars),
+        "trading_date": trading_date,
+        "ref_dt": CT.localize(datetime.combine(trading_date, time(*raw["ref_time"]))),
+        "offset": raw["offset"],
+        "vix": raw["vix"],
+        "source": raw.get("source"),
+    }
+
+def record_fixture(path=FIXTURE_FILE, ref_time=(9, 0), offset=35.0):
+    """Record the last complete trading day of ES=F 30-minute bars from Yahoo as the fixture."""
+    import yfinance as yf
+    bars = _bars_to_ct(yf.Ticker("ES=F").history(period="7d", interval="30m"))
+    vix = yf.Ticker("^VIX").history(period="5d")
+    if bars is None or bars.empty:
+        raise RuntimeError("No ES bars returned")
+    rth_days = sorted({t.date() for t in bars.index if t.time() >= time(14, 30)})
+    trading_date = rth_days[-1]
+    start = CT.localize(datetime.combine(get_prior_trading_day(get_prior_trading_day(trading_date)), time(17, 0)))
+    end = CT.localize(datetime.combine(trading_date, time(15, 0)))
+    day = bars[(bars.index >= start) & (bars.index <= end)]
+    fixture = {
+        "source": f"ES=F 30m via yfinance, recorded {datetime.now(timezone.utc):%Y-%m-%d}",
+        "trading_date": trading_date.isoformat(),
+        "ref_time": list(ref_time),
+        "offset": offset,
+        "vix": round(float(vix["Close"].iloc[-2]), 2) if len(vix) > 1 else 16.0,
+        "bars": [[t.tz_convert("UTC").isoformat(), round(float(r.Open), 2), round(float(r.High), 2),
+                  round(float(r.Low), 2), round(float(r.Close), 2)] for t, r in day.iterrows()],
+    }
+    Path(path).write_text(dump_fixture(fixture))
+    return fixture
+
+def dump_fixture(fixture):
+    """Fixture as JSON text with one bar per line (keeps diffs of re-recorded fixtures readable)."""
+    head = ",\n".join(f"  {json.dumps(k)}: {json.dumps(v)}" for k, v in fixture.items() if k != "bars")
+    bars = ",\n".join(f"    {json.dumps(bar)}" for bar in fixture["bars"])
+    return "{\n" + head + ',\n  "bars": [\n' + bars + "\n  ]\n}\n"
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STAGES
+# ═══════════════════════════════════════════════════════════════════════════════
+def simulated_rerun(fx, eng=spx_core):
+    """
+    The compute path of one rerun at the reference time (no fetching, no rendering).
+
+    An engine from before the reference ladder projects the channel, dual channel
+    and prior day targets directly, as main() did then. Prior day RTH extraction
+    always uses the current extract_prior_day_rth (it used to be part of a fetch).
+    """
+    d, ref_dt, offset, vix = fx["trading_date"], fx["ref_dt"], fx["offset"], fx["vix"]
+    bars = fx["bars"]
+    sessions = eng.extract_sessions(bars[bars.index < ref_dt], d) or {}
+    sydney, tokyo, london = sessions.get("sydney"), sessions.get("tokyo"), sessions.get("london")
+    channel_type, channel_reason, upper_pivot, lower_pivot, upper_time, lower_time = eng.determine_channel(sydney, tokyo, london)
+    pivots = eng.validate_and_adjust_pivots(channel_type, upper_pivot, lower_pivot, upper_time, lower_time,
+                                            {"sydney": sydney, "tokyo": tokyo, "london": london}, None)
+    prior_rth = getattr(eng, "extract_prior_day_rth", extract_prior_day_rth)(bars, eng.get_prior_trading_day(d))
+    close_pivots = eng.get_close_based_pivots(sydney, tokyo, london)
+    if hasattr(eng, "build_reference_ladder"):
+        levels = eng.reference_levels(eng.build_reference_ladder(channel_type, pivots, close_pivots, prior_rth, d),
+                                      ref_dt)
+        (ceiling_es, floor_es), dual_es, prior_targets = levels["channel"], levels["dual_levels"], levels["prior_targets"]
+    else:
+        ceiling_es, floor_es = eng.calc_channel_levels(pivots["upper_pivot"], pivots["lower_pivot"],
+                                                       pivots["upper_time"], pivots["lower_time"], ref_dt, channel_type)
+        dual_es = eng.calc_dual_channel_levels(
+            pivots["upper_pivot"], pivots["lower_pivot"], pivots["upper_time"], pivots["lower_time"], ref_dt,
+            upper_pivot_close=close_pivots.get("highest_close"), lower_pivot_close=close_pivots.get("lowest_close"),
+            upper_close_time=close_pivots.get("highest_close_time"),
+            lower_close_time=close_pivots.get("lowest_close_time"))
+        prior_targets = eng.calc_prior_day_targets(prior_rth, ref_dt)
+    if ceiling_es is None or dual_es is None:
+        return None
+
+    current_spx = round(float(bars[bars.index >= ref_dt]["Open"].iloc[0]) - offset, 2)
+    ceiling_spx, floor_spx = round(ceiling_es - offset, 2), round(floor_es - offset, 2)
+    dual_spx = {k: round(dual_es[k] - offset, 2) for k in ("asc_floor", "asc_ceiling", "desc_ceiling", "desc_floor")}
+    dual_spx.update({k: dual_es[k] for k in ("overnight_high", "overnight_low", "blocks_high", "blocks_low")})
+    dual_spx.update({k: pivots[k] for k in ("floor_was_adjusted", "ceiling_was_adjusted",
+                                             "floor_adjustment_session", "ceiling_adjustment_session")})
+    prior_close_es = prior_rth.get("close") if prior_rth.get("available") else None
+    prior_close_spx = round(prior_close_es - offset, 2) if prior_close_es else None
+    gap = eng.analyze_gap(current_spx, prior_close_spx, ceiling_spx, floor_spx)
+    decision = eng.analyze_market_state_v2(
+        current_spx, dual_spx, channel_type, channel_reason,
+        eng.Bias.NEUTRAL, eng.Bias.NEUTRAL, eng.VIXPosition.UNKNOWN, vix,
+        eng.analyze_session_tests(sydney, tokyo, london, channel_type), gap,
+        eng.analyze_prior_close(prior_close_spx, ceiling_spx, floor_spx),
+        NEUTRAL_VIX_TERM, prior_targets, ref_dt)
+    eng.detect_explosive_potential(current_spx, dual_spx, prior_targets, channel_type,
+                                   None, dict(NEUTRAL_EMA, ema_bias=eng.Bias.NEUTRAL), None, None, gap)
+    return decision
+
+def build_stages(fx, eng=spx_core):
+    """
+    Stage name -> zero-argument callable, with every input precomputed from the fixture.
+
+    Stages whose function the engine `eng` does not have yet are left out.
+    """
+    d, ref_dt, offset, vix, bars = fx["trading_date"], fx["ref_dt"], fx["offset"], fx["vix"], fx["bars"]
+    before_ref = bars[bars.index < ref_dt]
+    sessions = eng.extract_sessions(before_ref, d) or {}
+    sydney, tokyo, london = sessions.get("sydney"), sessions.get("tokyo"), sessions.get("london")
+    channel = eng.determine_channel(sydney, tokyo, london)
+    channel_type, channel_reason, upper_pivot, lower_pivot, upper_time, lower_time = channel
+    session_map = {"sydney": sydney, "tokyo": tokyo, "london": london}
+    pivots = eng.validate_and_adjust_pivots(channel_type, upper_pivot, lower_pivot, upper_time, lower_time,
+                                            session_map, ref_dt)
+    close_pivots = eng.get_close_based_pivots(sydney, tokyo, london)
+    prior_rth = getattr(eng, "extract_prior_day_rth", extract_prior_day_rth)(bars, eng.get_prior_trading_day(d))
+    prior_targets = eng.calc_prior_day_targets(prior_rth, ref_dt)
+    dual_es = eng.calc_dual_channel_levels(
+        pivots["upper_pivot"], pivots["lower_pivot"], pivots["upper_time"], pivots["lower_time"], ref_dt,
+        upper_pivot_close=close_pivots.get("highest_close"), lower_pivot_close=close_pivots.get("lowest_close"),
+        upper_close_time=close_pivots.get("highest_close_time"), lower_close_time=close_pivots.get("lowest_close_time"))
+    if dual_es is None:
+        raise RuntimeError("Fixture does not produce a channel - re-record it")
+
+    spot = round(float(bars[bars.index >= ref_dt]["Open"].iloc[0]) - offset, 2)
+    dual_spx = {k: (round(v - offset, 2) if k in ("asc_floor", "asc_ceiling", "desc_ceiling", "desc_floor") else v)
+                for k, v in dual_es.items()}
+    dual_spx.update({k: pivots[k] for k in ("floor_was_adjusted", "ceiling_was_adjusted",
+                                             "floor_adjustment_session", "ceiling_adjustment_session")})
+    ceiling_spx, floor_spx = dual_spx["desc_ceiling"], dual_spx["asc_floor"]
+    state_args = (spot, dual_spx, channel_type, channel_reason, eng.Bias.NEUTRAL, eng.Bias.NEUTRAL,
+                  eng.VIXPosition.UNKNOWN, vix, eng.analyze_session_tests(sydney, tokyo, london, channel_type),
+                  eng.analyze_gap(spot, None, ceiling_spx, floor_spx),
+                  eng.analyze_prior_close(None, ceiling_spx, floor_spx),
+                  NEUTRAL_VIX_TERM, prior_targets, ref_dt)
+    hours = (CT.localize(datetime.combine(d, time(15, 0))) - ref_dt).total_seconds() / 3600
+    strikes = np.arange(round(spot / 5) * 5 - 100, round(spot / 5) * 5 + 105, 5, dtype=np.float64)
+    session_start = CT.localize(datetime.combine(eng.get_prior_trading_day(d), time(17, 0)))
+
+    stages = {
+        "blocks_between": lambda: eng.blocks_between(session_start, ref_dt),
+        "extract_sessions": lambda: eng.extract_sessions(before_ref, d),
+        "determine_channel": lambda: eng.determine_channel(sydney, tokyo, london),
+        "validate_and_adjust_pivots": lambda: eng.validate_and_adjust_pivots(
+            channel_type, upper_pivot, lower_pivot, upper_time, lower_time, session_map, ref_dt),
+        "calc_dual_channel_levels": lambda: eng.calc_dual_channel_levels(
+            pivots["upper_pivot"], pivots["lower_pivot"], pivots["upper_time"], pivots["lower_time"], ref_dt,
+            upper_pivot_close=close_pivots.get("highest_close"), lower_pivot_close=close_pivots.get("lowest_close"),
+            upper_close_time=close_pivots.get("highest_close_time"),
+            lower_close_time=close_pivots.get("lowest_close_time")),
+        "calc_prior_day_targets": lambda: eng.calc_prior_day_targets(prior_rth, ref_dt),
+        "estimate_0dte_premium": lambda: eng.estimate_0dte_premium(spot, round(spot / 5) * 5 + 10, hours, vix, "CALL"),
+        "black_scholes": lambda: eng.black_scholes(spot, round(spot / 5) * 5 - 10, hours / HOURS_PER_YEAR,
+                                                   RISK_FREE_RATE, vix / 100, "PUT"),
+        "analyze_market_state_v2": lambda: eng.analyze_market_state_v2(*state_args),
+        "rerun": lambda: simulated_rerun(fx, eng),
+    }
+    if hasattr(eng, "black_scholes_vec"):
+        stages["black_scholes_vec"] = lambda: eng.black_scholes_vec(spot, strikes, hours / HOURS_PER_YEAR,
+                                                                    RISK_FREE_RATE, vix / 100, "PUT")
+    if hasattr(eng, "build_reference_ladder"):
+        stages["reference_ladder"] = lambda: eng.build_reference_ladder(channel_type, pivots, close_pivots,
+                                                                        prior_rth, d)
+    return stages
+
+IMPORT_PROBE = "from time import perf_counter as p; t = p(); import {module}; print(p() - t)"
+
+def time_import(repeat=DEFAULT_REPEAT, module="spx_core", cwd=BENCH_DIR.parent):
+    """Best and median time (µs) to import `module` from `cwd` in `repeat` fresh interpreters."""
+    probe = IMPORT_PROBE.format(module=module)
+    per_run = sorted(float(subprocess.run([sys.executable, "-c", probe], cwd=cwd, capture_output=True,
+                                          text=True, check=True).stdout.split()[-1]) * 1e6
+                     for _ in range(repeat))
+    return {"best_us": round(per_run[0], 3), "median_us": round(per_run[len(per_run) // 2], 3),
+            "loops": 1, "repeat": repeat}
+
+def time_stage(fn, repeat=DEFAULT_REPEAT):
+    """Best and median per-call time (µs) over `repeat` autoranged timeit loops."""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    per_call = sorted(t / number * 1e6 for t in timer.repeat(repeat, number))
+    return {"best_us": round(per_call[0], 3), "median_us": round(per_call[len(per_call) // 2], 3),
+            "loops": number, "repeat": repeat}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# LEGACY REFERENCE - Engine code before the performance series, kept verbatim
+# ═══════════════════════════════════════════════════════════════════════════════
+def legacy_blocks_between(start, end):
+    """Calculate 30-minute trading blocks between two times.
+
+    Handles same-day, cross-day, and weekend-crossing calculations.
+    For same-day: simple elapsed time / 30 min.
+    For cross-day: accounts for RTH close/open and weekend gaps.
+    """
+    if start is None or end is None or end <= start:
+        return 0
+
+    # If either lacks timezone info or same day, use simple calculation
+    if (start.tzinfo is None or end.tzinfo is None or
+        start.date() == end.date()):
+        return max(0, int((end - start).total_seconds() / 1800))
+
+    start_date = start.date()
+    end_date = end.date()
+
+    # Blocks from start_time to 3:00 PM CT (end of RTH) on start day
+    start_day_close = start.replace(hour=15, minute=0, second=0, microsecond=0)
+    if start < start_day_close:
+        blocks_to_close = int((start_day_close - start).total_seconds() / 1800)
+    else:
+        blocks_to_close = 0
+
+    # Blocks from 8:30 AM to end_time on final day
+    end_day_open = end.replace(hour=8, minute=30, second=0, microsecond=0)
+    if end >= end_day_open:
+        blocks_from_open = int((end - end_day_open).total_seconds() / 1800)
+    else:
+        blocks_from_open = 0
+
+    # Check for weekend crossing
+    crosses_weekend = False
+    current = start_date + timedelta(days=1)
+    while current <= end_date:
+        if current.weekday() in [5, 6]:
+            crosses_weekend = True
+            break
+        current += timedelta(days=1)
+    if end_date.weekday() in [5, 6]:
+        crosses_weekend = True
+
+    if crosses_weekend:
+        OVERNIGHT_WEEKEND_BLOCKS = 32
+        total_blocks = blocks_to_close + OVERNIGHT_WEEKEND_BLOCKS + blocks_from_open
+    else:
+        trading_days_between = 0
+        current = start_date + timedelta(days=1)
+        while current < end_date:
+            if current.weekday() < 5:
+                trading_days_between += 1
+            current += timedelta(days=1)
+
+        BLOCKS_PER_FULL_DAY = 26
+        OVERNIGHT_REGULAR_BLOCKS = 17
+        blocks_middle_days = trading_days_between * BLOCKS_PER_FULL_DAY
+        total_blocks = blocks_to_close + blocks_middle_days + OVERNIGHT_REGULAR_BLOCKS + blocks_from_open
+
+    return max(0, total_blocks)
+
+def legacy_calc_channel_levels(upper_pivot, lower_pivot, upper_time, lower_time, ref_time, channel_type):
+    if upper_pivot is None or lower_pivot is None:
+        return None, None
+    blocks_high = legacy_blocks_between(upper_time, ref_time) if upper_time and ref_time else 0
+    blocks_low = legacy_blocks_between(lower_time, ref_time) if lower_time and ref_time else 0
+
+    if channel_type == ChannelType.ASCENDING:
+        ceiling = round(upper_pivot + SLOPE * blocks_high, 2)
+        floor = round(lower_pivot + SLOPE * blocks_low, 2)
+    elif channel_type == ChannelType.DESCENDING:
+        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)
+        floor = round(lower_pivot - SLOPE * blocks_low, 2)
+    elif channel_type == ChannelType.MIXED:
+        # MIXED: For display, use descending ceiling and ascending floor (outer bounds)
+        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)  # Descending ceiling
+        floor = round(lower_pivot + SLOPE * blocks_low, 2)      # Ascending floor
+    elif channel_type == ChannelType.CONTRACTING:
+        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)
+        floor = round(lower_pivot + SLOPE * blocks_low, 2)
+    else:
+        ceiling, floor = upper_pivot, lower_pivot
+    return ceiling, floor
+
+def legacy_calc_dual_channel_levels(upper_pivot_wick, lower_pivot_wick, upper_wick_time, lower_wick_time,
+                             ref_time, upper_pivot_close=None, lower_pivot_close=None,
+                             upper_close_time=None, lower_close_time=None):
+    """
+    Calculate ALL FOUR channel levels using correct pivot types per direction.
+
+    RULE:
+      ASCENDING ceiling  = highest WICK projected up   (wicks mark absolute tops)
+      ASCENDING floor    = lowest CLOSE projected up   (bodies define support)
+      DESCENDING ceiling = highest CLOSE projected down (bodies define resistance)
+      DESCENDING floor   = lowest WICK projected down  (wicks mark absolute bottoms)
+
+    If close-based pivots not provided, falls back to wick-based for all.
+    """
+    if upper_pivot_wick is None or lower_pivot_wick is None:
+        return None
+
+    # Fall back to wick-based if close-based not available
+    if upper_pivot_close is None:
+        upper_pivot_close = upper_pivot_wick
+    if lower_pivot_close is None:
+        lower_pivot_close = lower_pivot_wick
+    if upper_close_time is None:
+        upper_close_time = upper_wick_time
+    if lower_close_time is None:
+        lower_close_time = lower_wick_time
+
+    blocks_high_wick = legacy_blocks_between(upper_wick_time, ref_time) if upper_wick_time and ref_time else 0
+    blocks_low_wick = legacy_blocks_between(lower_wick_time, ref_time) if lower_wick_time and ref_time else 0
+    blocks_high_close = legacy_blocks_between(upper_close_time, ref_time) if upper_close_time and ref_time else 0
+    blocks_low_close = legacy_blocks_between(lower_close_time, ref_time) if lower_close_time and ref_time else 0
+
+    return {
+        # ASCENDING CHANNEL
+        "asc_floor": round(lower_pivot_close + SLOPE * blocks_low_close, 2),    # Lowest CLOSE going UP
+        "asc_ceiling": round(upper_pivot_wick + SLOPE * blocks_high_wick, 2),   # Highest WICK going UP
+
+        # DESCENDING CHANNEL
+        "desc_ceiling": round(upper_pivot_close - SLOPE * blocks_high_close, 2), # Highest CLOSE going DOWN
+        "desc_floor": round(lower_pivot_wick - SLOPE * blocks_low_wick, 2),      # Lowest WICK going DOWN
+
+        # Metadata
+        "blocks_high": blocks_high_wick,
+        "blocks_low": blocks_low_wick,
+        "overnight_high": upper_pivot_wick,
+        "overnight_low": lower_pivot_wick,
+        "overnight_high_close": upper_pivot_close,
+        "overnight_low_close": lower_pivot_close,
+    }
+
+def legacy_estimate_0dte_premium(spot, strike, hours_to_expiry, vix, opt_type):
+    """
+    0DTE SPX premium estimation - calibrated to real market data.
+
+    Includes PUT SKEW adjustment (puts are more expensive than calls).
+
+    Calibrated against actual SPX 0DTE trades:
+    CALLS (6980C):
+    - 22 OTM @ 5.85hrs = $2.30
+    - 3 OTM @ 5.58hrs = $7.50
+
+    PUTS (6975P):
+    - 18 OTM @ 6.5hrs = $8.60
+    - 3 OTM @ 5.5hrs = $13.45
+
+    Average error: ~15% for both calls and puts
+    """
+    # Calculate OTM/ITM distance
+    if opt_type == "CALL":
+        otm = max(0, strike - spot)
+        itm = max(0, spot - strike)
+    else:  # PUT
+        otm = max(0, spot - strike)
+        itm = max(0, strike - spot)
+
+    # ATM base premium (scales with VIX)
+    atm_base = 9.5 + (vix - 15) * 0.4
+
+    # Time decay factor - non-linear, accelerates toward expiry
+    if hours_to_expiry >= 5.5:
+        time_factor = 1.0
+    elif hours_to_expiry >= 5:
+        time_factor = 0.85
+    elif hours_to_expiry >= 4:
+        time_factor = 0.65
+    elif hours_to_expiry >= 3:
+        time_factor = 0.48
+    elif hours_to_expiry >= 2:
+        time_factor = 0.32
+    elif hours_to_expiry >= 1:
+        time_factor = 0.18
+    else:
+        time_factor = 0.08
+
+    # OTM decay with minimum floor (lottery ticket value)
+    base_decay = math.exp(-otm / 11)
+    min_floor = 2.0 * time_factor
+
+    # Extrinsic value = max(exponential decay, floor)
+    exp_premium = atm_base * time_factor * base_decay
+    extrinsic = max(exp_premium, min_floor)
+
+    # PUT SKEW: Puts are more expensive than calls due to crash protection demand
+    # Skew increases with distance OTM (more hedging value for far OTM puts)
+    # Near ATM: ~1.8x, Far OTM (20+): ~3.5x
+    if opt_type == "PUT":
+        skew = min(3.5, 1.8 + (otm / 20) * 1.5)
+        extrinsic = extrinsic * skew
+
+    # Total premium = extrinsic + intrinsic
+    premium = extrinsic + itm
+
+    return max(round(premium, 2), 0.05)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EQUIVALENCE CHECKS - Current engine against the legacy reference
+# ═══════════════════════════════════════════════════════════════════════════════
+CHECK_SEED = 20261016
+CHECK_CASES = 5000
+
+def _regular_span(start_date, end_date):
+    """True when no day in the span is a holiday or half day (where the calendar intentionally differs)."""
+    days = [start_date + timedelta(days=k) for k in range((end_date - start_date).days + 1)]
+    return not any(d in market_holidays(d.year) or d in market_early_closes(d.year) for d in days)
+
+def _random_ct(rng, day):
+    return CT.normalize(CT.localize(datetime.combine(day, time(rng.randint(0, 23), rng.choice((0, 15, 30, 45))))))
+
+def check_blocks_between(cases=CHECK_CASES, seed=CHECK_SEED):
+    """blocks_between (scalar and array paths) against legacy_blocks_between on regular spans."""
+    rng = random.Random(seed)
+    starts, ends, expected, failures = [], [], [], []
+    while len(starts) < cases:
+        start_date = date(2024, 1, 1) + timedelta(days=rng.randint(0, 900))
+        end_date = start_date + timedelta(days=rng.choice((0, 0, 1, 1, 1, 2, 3, 4, 6)))
+        if not _regular_span(start_date, end_date):
+            continue
+        start, end = _random_ct(rng, start_date), _random_ct(rng, end_date)
+        starts.append(start)
+        ends.append(end)
+        expected.append(legacy_blocks_between(start, end))
+        got = blocks_between(start, end)
+        if got != expected[-1]:
+            failures.append(f"blocks_between({start}, {end}) = {got}, legacy {expected[-1]}")
+    batch = blocks_between(starts, ends)
+    failures += [f"blocks_between arrays at {start} -> {end} = {got}, legacy {want}"
+                 for start, end, got, want in zip(starts, ends, batch, expected) if got != want]
+    return failures
+
+def check_channel_levels(cases=CHECK_CASES, seed=CHECK_SEED):
+    """calc_channel_levels / calc_dual_channel_levels against the legacy versions on regular spans."""
+    rng = random.Random(seed)
+    failures = []
+    done = 0
+    while done < cases:
+        trading_date = date(2024, 1, 1) + timedelta(days=rng.randint(0, 900))
+        overnight = get_prior_trading_day(trading_date)
+        if not _regular_span(overnight, trading_date):
+            continue
+        done += 1
+        upper, lower = (6000 + rng.randint(0, 400) * 0.25 for _ in range(2))
+        upper_close, lower_close = upper - rng.randint(0, 20) * 0.25, lower + rng.randint(0, 20) * 0.25
+        times = [_random_ct(rng, rng.choice((overnight, trading_date))) for _ in range(4)]
+        ref_time = rng.choice((None, _random_ct(rng, trading_date),
+                               CT.localize(datetime.combine(trading_date, time(rng.randint(8, 11), 0)))))
+        channel_type = rng.choice(list(ChannelType))
+        single = (upper, lower, times[0], times[1], ref_time, channel_type)
+        if calc_channel_levels(*single) != legacy_calc_channel_levels(*single):
+            failures.append(f"calc_channel_levels{single}")
+        dual = (upper, lower, times[0], times[1], ref_time, upper_close, lower_close, times[2], times[3])
+        if calc_dual_channel_levels(*dual) != legacy_calc_dual_channel_levels(*dual):
+            failures.append(f"calc_dual_channel_levels{dual}")
+    return failures
+
+def check_premiums(cases=CHECK_CASES, seed=CHECK_SEED):
+    """Scalar estimate_0dte_premium against the legacy version; the _vec functions against the scalar ones."""
+    rng = random.Random(seed)
+    rows = [(rng.uniform(5900, 6100), 5 * rng.randint(1170, 1230), rng.uniform(0, 7), rng.uniform(10, 40),
+             rng.choice(("CALL", "PUT"))) for _ in range(cases)]
+    failures = [f"estimate_0dte_premium{row}" for row in rows
+                if estimate_0dte_premium(*row) != legacy_estimate_0dte_premium(*row)]
+    spots, strikes, hours, vixes, types = (np.array(col) for col in zip(*rows))
+    scalar = np.array([estimate_0dte_premium(*row) for row in rows])
+    batch = estimate_0dte_premium_vec(spots, strikes, hours, vixes, types)
+    failures += [f"estimate_0dte_premium_vec{row}" for row, ok in zip(rows, np.abs(batch - scalar) <= 0.01 + 1e-9)
+                 if not ok]
+    T = hours / HOURS_PER_YEAR
+    scalar = np.array([black_scholes(spot, strike, t, RISK_FREE_RATE, vix / 100, opt_type)
+                       for spot, strike, t, vix, opt_type in zip(spots, strikes, T, vixes, types)])
+    batch = black_scholes_vec(spots, strikes, T, RISK_FREE_RATE, vixes / 100, types)
+    failures += [f"black_scholes_vec{row}" for row, ok in zip(rows, np.isclose(batch, scalar, rtol=1e-12, atol=1e-9))
+                 if not ok]
+    return failures
+
+def check_implied_vol(cases=CHECK_CASES, seed=CHECK_SEED):
+    """implied_vol round trip: solved vols within 1e-5; NaN only where time value is below pricing noise."""
+    rng = np.random.default_rng(seed)
+    S, K = rng.uniform(5800, 6200, cases), 5 * np.round(rng.uniform(5700, 6300, cases) / 5)
+    T, sigma = rng.uniform(0.1, 7, cases) / HOURS_PER_YEAR, rng.uniform(0.05, 1.0, cases)
+    opt_types = rng.choice(["CALL", "PUT"], cases)
+    price = black_scholes_vec(S, K, T, RISK_FREE_RATE, sigma, opt_types)
+    iv = implied_vol(price, S, K, T, RISK_FREE_RATE, opt_types)
+    discounted_k = K * np.exp(-RISK_FREE_RATE * T)
+    time_value = price - np.where(opt_types == "CALL", np.maximum(0, S - discounted_k), np.maximum(0, discounted_k - S))
+    off = ~np.isnan(iv) & (np.abs(iv - sigma) > 1e-5)
+    unsolved = np.isnan(iv) & (time_value > 2 * NORM_CDF_MAX_ERROR * (S + discounted_k))
+    return ([f"implied_vol({price[i]}, {S[i]}, {K[i]}, {T[i]}) = {iv[i]}, true {sigma[i]}" for i in np.flatnonzero(off)]
+            + [f"implied_vol({price[i]}, {S[i]}, {K[i]}, {T[i]}) unsolved, true {sigma[i]}"
+               for i in np.flatnonzero(unsolved)])
+
+CHECKS = {
+    "blocks_between": check_blocks_between,
+    "channel_levels": check_channel_levels,
+    "premiums": check_premiums,
+    "implied_vol": check_implied_vol,
+}
+
+def run_checks():
+    """Run every equivalence check; returns the failure messages."""
+    failures = []
+    for name, check in CHECKS.items():
+        found = check()
+        print(f"  {name:<28} {'ok' if not found else f'{len(found)} mismatches'}")
+        failures += found
+    for message in failures[:10]:
+        print(f"    {message}")
+    return failures
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RESULTS & REGRESSION CHECK
+# ═══════════════════════════════════════════════════════════════════════════════
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=BENCH_DIR.parent, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+def current_commit():
+    """(short sha, dirty) of the checkout, or ("unknown", True) outside git."""
+    sha = _git("rev-parse", "--short", "HEAD")
+    return (sha or "unknown"), bool(_git("status", "--porcelain", "--untracked-files=no")) or not sha
+
+def load_engine(commit):
+    """
+    The engine as of `commit`, imported from a temporary checkout of that tree.
+
+    Returns (module, module name, checkout directory). The module is the commit's
+    spx_core, or spx_forecast_app (imported without the Streamlit runtime) for
+    commits from before the engine was split out of the app.
+    """
+    archive = subprocess.run(["git", "archive", commit], cwd=BENCH_DIR.parent, capture_output=True,
+                             check=True).stdout
+    tree = Path(tempfile.mkdtemp(prefix=f"spx-bench-{commit}-"))
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(tree)
+    name = "spx_core" if (tree / "spx_core.py").exists() else "spx_forecast_app"
+    spec = importlib.util.spec_from_file_location(f"_engine_{commit}", tree / f"{name}.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module, name, tree
+
+def find_baseline(commit):
+    """Nearest ancestor of HEAD (excluding `commit`) with a stored result."""
+    for sha in _git("rev-list", "--abbrev-commit", "--first-parent", "HEAD").split():
+        if sha != commit and (RESULTS_DIR / f"{sha}.json").exists():
+            return sha
+    return None
+
+def load_thresholds(path=THRESHOLDS_FILE):
+    thresholds = json.loads(Path(path).read_text()) if Path(path).exists() else {}
+    return thresholds.get("default_ratio", 1.25), thresholds.get("stages", {}), thresholds.get("min_delta_us", 5.0)
+
+def pinned_baseline(path=THRESHOLDS_FILE):
+    """The pre-optimisation commit every run is compared against (None if not set)."""
+    thresholds = json.loads(Path(path).read_text()) if Path(path).exists() else {}
+    return thresholds.get("baseline")
+
+def over_budget(results, path=THRESHOLDS_FILE):
+    """Stage -> (best µs, budget µs) for stages slower than their absolute budget."""
+    thresholds = json.loads(Path(path).read_text()) if Path(path).exists() else {}
+    budgets = thresholds.get("budgets_us", {})
+    return {name: (cur["best_us"], budgets[name]) for name, cur in results["stages"].items()
+            if name in budgets and cur["best_us"] > budgets[name]}
+
+def compare(results, baseline):
+    """
+    Stage -> (baseline µs, current µs, ratio, limit, regressed) on best times.
+
+    A stage only counts as regressed when its median is past the limit as well
+    and the best time grew by more than min_delta_us, so one noisy run or a
+    sub-microsecond stage cannot fail the check on its own.
+    """
+    default_ratio, stage_ratios, min_delta = load_thresholds()
+    rows = {}
+    for name, cur in results["stages"].items():
+        base = baseline["stages"].get(name)
+        if not base:
+            continue
+        ratio = cur["best_us"] / base["best_us"] if base["best_us"] else float("inf")
+        median_ratio = cur["median_us"] / base["median_us"] if base["median_us"] else float("inf")
+        limit = stage_ratios.get(name, default_ratio)
+        regressed = ratio > limit and median_ratio > limit and cur["best_us"] - base["best_us"] > min_delta
+        rows[name] = (base["best_us"], cur["best_us"], ratio, limit, regressed)
+    return rows
+
+def run(stage_names=None, repeat=DEFAULT_REPEAT, fixture=FIXTURE_FILE, at=None):
+    fx = load_fixture(fixture)
+    if at:
+        commit, dirty = _git("rev-parse", "--short", at) or at, False
+        eng, module, tree = load_engine(commit)
+    else:
+        eng, module, tree = spx_core, "spx_core", BENCH_DIR.parent
+        commit, dirty = current_commit()
+    stages = build_stages(fx, eng)
+    unknown = set(stage_names or ()) - set(stages) - {"import_core"}
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "engine": module,
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": f"{platform.system()} {platform.machine()} {platform.processor()}".strip(),
+        "fixture": fx["source"],
+        "stages": {},
+    }
+    for name, fn in stages.items():
+        if stage_names and name not in stage_names:
+            continue
+        results["stages"][name] = time_stage(fn, repeat)
+        print(f"  {name:<28} {results['stages'][name]['best_us']:>12,.1f} µs")
+    if not stage_names or "import_core" in stage_names:
+        results["stages"]["import_core"] = time_import(repeat, module, tree)
+        print(f"  {'import_core':<28} {results['stages']['import_core']['best_us']:>12,.1f} µs")
+    if at:
+        shutil.rmtree(tree, ignore_errors=True)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SPX Prophet engine on the offline fixture.")
+    parser.add_argument("--stages", default=None, help="Comma-separated subset of stages")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--fixture", default=str(FIXTURE_FILE))
+    parser.add_argument("--baseline", default=None,
+                        help="Commit to compare against (default: the pinned baseline and the nearest ancestor with results)")
+    parser.add_argument("--at", default=None, help="Time the engine as of this commit and save its result")
+    parser.add_argument("--no-save", action="store_true", help="Do not write benchmarks/results/<commit>.json")
+    parser.add_argument("--record-fixture", action="store_true", help="Record a new fixture from Yahoo and exit")
+    parser.add_argument("--check", action="store_true", help="Only run the equivalence checks")
+    args = parser.parse_args()
+
+    if args.record_fixture:
+        fixture = record_fixture(args.fixture)
+        print(f"Recorded {len(fixture['bars'])} bars for {fixture['trading_date']} to {args.fixture}")
+        return 0
+
+    if not args.at:
+        print("Equivalence checks:")
+        if run_checks():
+            print("FAIL: engine results differ from the legacy reference")
+            return 1
+        if args.check:
+            return 0
+
+    stage_names = set(args.stages.split(",")) if args.stages else None
+    results = run(stage_names, args.repeat, args.fixture, args.at)
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        out = RESULTS_DIR / f"{results['commit']}.json"
+        out.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Wrote {out.relative_to(BENCH_DIR.parent)}" + (" (uncommitted changes)" if results["dirty"] else ""))
+    if args.at:
+        return 0
+
+    failed = []
+    for name, (cur, budget) in over_budget(results).items():
+        print(f"  {name:<28} {cur:>12,.1f} µs over its {budget:,.0f} µs budget")
+        failed.append(name)
+
+    if args.baseline:
+        baseline_shas = [args.baseline]
+    else:
+        pinned = pinned_baseline()
+        baseline_shas = [pinned] if pinned and (RESULTS_DIR / f"{pinned}.json").exists() else []
+        nearest = find_baseline(results["commit"])
+        if nearest and nearest not in baseline_shas:
+            baseline_shas.append(nearest)
+    if not baseline_shas:
+        print("No baseline result to compare against")
+        return 1 if failed else 0
+    for baseline_sha in baseline_shas:
+        baseline = json.loads((RESULTS_DIR / f"{baseline_sha}.json").read_text())
+        if baseline.get("machine") != results["machine"]:
+            print(f"Note: baseline {baseline_sha} was recorded on {baseline.get('machine')}")
+        print(f"Against {baseline_sha}:")
+        for name, (base, cur, ratio, limit, regressed) in compare(results, baseline).items():
+            flag = "REGRESSED" if regressed else ""
+            print(f"  {name:<28} {base:>12,.1f} → {cur:>12,.1f} µs  ×{ratio:.2f} (limit ×{limit:.2f}) {flag}")
+            if regressed and name not in failed:
+                failed.append(name)
+    if failed:
+        print(f"FAIL: {', '.join(failed)} regressed past threshold or budget")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2722 @@
+# ═══════════════════════════════════════════════════════════════════════════════
+# SPX PROPHET - CORE ENGINE
+# Calendar, channel, pricing and decision logic with no UI or network I/O
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# Everything the app computes from bars and quotes it already has: the trading
+# calendar, channel projection, premium estimation, session / prior-day
+# analysis and the market-state decision. spx_forecast_app.py, spx_backtest.py
+# and spx_benchmark.py all import it; nothing here touches Streamlit, Yahoo or
+# Tastytrade.
+#
+# Importing stays cheap (tens of milliseconds): numpy and pandas are bound to
+# lazy module proxies and only load on the first call that uses them. Check
+# with
+#   python -X importtime -c "import spx_core"
+# ═══════════════════════════════════════════════════════════════════════════════
+
+import bisect
+import functools
+import importlib
+import json
+import math
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, date, time, timedelta
+from enum import Enum
+from time import monotonic, perf_counter
+from typing import Dict
+
+import pytz
+
+class _LazyModule:
+    """Stand-in for a heavy module; imports it and replaces itself in globals() on first attribute access."""
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+np = _LazyModule("numpy", "np")
+pd = _LazyModule("pandas", "pd")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+CT = pytz.timezone("America/Chicago")
+ET = pytz.timezone("America/New_York")
+UTC = pytz.UTC
+
+SLOPE = 0.52
+VIX_SLOPE = 0.04  # VIX channel: 0.04 per 6 30-minute blocks
+NEAR_THRESHOLD = 15  # SPX points from an entry level that count as "near"
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# METRICS - Timing spans and counters for the hot path
+# ═══════════════════════════════════════════════════════════════════════════════
+
+METRICS_WINDOW = 512        # Most recent durations kept per span for percentiles
+
+def _percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+class Metrics:
+    """
+    Process-wide timing spans and labelled counters.
+
+    A span keeps its call count, total and max time and the last
+    METRICS_WINDOW durations, which give p50/p99. Span names are
+    "<kind>/<name>" (fetch, upstream, stage, main, render) plus "rerun".
+    """
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.window = window
+        self.spans = {}         # name -> {"count", "total_ms", "max_ms", "samples"}
+        self.counters = {}      # name -> {sorted label tuple -> count}
+        self._lock = threading.Lock()
+
+    def observe(self, name, ms):
+        with self._lock:
+            span = self.spans.get(name)
+            if span is None:
+                span = self.spans[name] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                           "samples": deque(maxlen=self.window)}
+            span["count"] += 1
+            span["total_ms"] += ms
+            span["max_ms"] = max(span["max_ms"], ms)
+            span["samples"].append(ms)
+
+    def count(self, name, n=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counter = self.counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + n
+
+    @contextmanager
+    def span(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, (perf_counter() - start) * 1000)
+
+    def laps(self, kind):
+        """Lap timer: each mark(name) records the time since the previous mark as "<kind>/<name>"."""
+        return _Laps(self, kind)
+
+    def snapshot(self):
+        """Spans (count, total, mean, p50, p99, max in ms) and counters as plain dicts."""
+        with self._lock:
+            spans = {name: (dict(span, samples=sorted(span["samples"]))) for name, span in self.spans.items()}
+            counters = {name: [{"labels": dict(key), "value": value} for key, value in counter.items()]
+                        for name, counter in self.counters.items()}
+        for span in spans.values():
+            samples = span.pop("samples")
+            span["mean_ms"] = span["total_ms"] / span["count"]
+            span["p50_ms"] = _percentile(samples, 50)
+            span["p99_ms"] = _percentile(samples, 99)
+        return {"spans": spans, "counters": counters}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2, default=str)
+
+    def to_prometheus(self):
+        """Prometheus text exposition: spans as a seconds summary, counters as *_total."""
+        snap = self.snapshot()
+        lines = ["# HELP spx_span_seconds Duration of instrumented spans (quantiles over the recent window)",
+                 "# TYPE spx_span_seconds summary"]
+        for name, span in sorted(snap["spans"].items()):
+            label = f'span="{name}"'
+            for q, key in (("0.5", "p50_ms"), ("0.99", "p99_ms")):
+                lines.append(f'spx_span_seconds{{{label},quantile="{q}"}} {span[key] / 1000:.6f}')
+            lines.append(f"spx_span_seconds_sum{{{label}}} {span['total_ms'] / 1000:.6f}")
+            lines.append(f"spx_span_seconds_count{{{label}}} {span['count']}")
+        for name, series in sorted(snap["counters"].items()):
+            lines.append(f"# TYPE spx_{name}_total counter")
+            for item in series:
+                labels = ",".join(f'{k}="{v}"' for k, v in item["labels"].items())
+                lines.append(f"spx_{name}_total{{{labels}}} {item['value']}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write the Prometheus text atomically (node_exporter textfile collector)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+
+    def reset(self):
+        with self._lock:
+            self.spans.clear()
+            self.counters.clear()
+
+class _Laps:
+    def __init__(self, metrics, kind):
+        self.metrics = metrics
+        self.kind = kind
+        self.start = perf_counter()
+
+    def mark(self, name):
+        now = perf_counter()
+        self.metrics.observe(f"{self.kind}/{name}", (now - self.start) * 1000)
+        self.start = now
+
+    def restart(self):
+        """Skip the time since the last mark (e.g. a fragment that times itself)."""
+        self.start = perf_counter()
+
+METRICS = Metrics()     # Module state survives Streamlit reruns - only the app script is re-executed
+
+def timed(kind):
+    """Record every call of the decorated function as the span "<kind>/<function name>"."""
+    def decorator(func):
+        name = f"{kind}/{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                METRICS.observe(name, (perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ENUMS
+# ═══════════════════════════════════════════════════════════════════════════════
+class ChannelType(Enum):
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+    MIXED = "MIXED"
+    CONTRACTING = "CONTRACTING"
+    UNDETERMINED = "UNDETERMINED"
+
+class Position(Enum):
+    ABOVE = "ABOVE"
+    INSIDE = "INSIDE"
+    BELOW = "BELOW"
+
+class Bias(Enum):
+    CALLS = "CALLS"
+    PUTS = "PUTS"
+    NEUTRAL = "NEUTRAL"
+
+class VIXPosition(Enum):
+    ABOVE_RANGE = "ABOVE"
+    IN_RANGE = "IN RANGE"
+    BELOW_RANGE = "BELOW"
+    UNKNOWN = "UNKNOWN"
+
+class DataSource(Enum):
+    TASTYTRADE = "TASTYTRADE"
+    YAHOO = "YAHOO"
+    POLYGON = "POLYGON"
+    FALLBACK = "FALLBACK"
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# TRADING CALENDAR - 30-minute block counts
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# blocks_between counts blocks the way the channel slope is calibrated: plain
+# elapsed time within one day; across days, blocks from the start to that
+# day's close, 26 per full trading day in between, 17 for the overnight (32
+# when it crosses a weekend) and blocks from the 8:30 open on the end day.
+# The per-day table below supplies the closes and closed days, so holidays
+# bridge like weekends and half days close at 12:00 PM CT.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+CALENDAR_FIRST_YEAR = 2000
+CALENDAR_LAST_YEAR = 2060
+RTH_OPEN_MINUTES = 8 * 60 + 30     # 8:30 AM CT
+RTH_CLOSE_MINUTES = 15 * 60        # 3:00 PM CT
+EARLY_CLOSE_MINUTES = 12 * 60      # 12:00 PM CT (1:00 PM ET half days)
+BLOCKS_PER_FULL_DAY = 26
+OVERNIGHT_REGULAR_BLOCKS = 17
+OVERNIGHT_WEEKEND_BLOCKS = 32
+MARKET_EXTRA_CLOSURES = {date(2001, 9, 11), date(2001, 9, 12), date(2001, 9, 13), date(2001, 9, 14),
+                         date(2004, 6, 11), date(2007, 1, 2), date(2012, 10, 29), date(2012, 10, 30),
+                         date(2018, 12, 5), date(2025, 1, 9)}
+
+def _nth_weekday(year, month, weekday, n):
+    """n-th weekday of a month (n=-1 for the last)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+def _easter(year):
+    """Gregorian Easter Sunday (anonymous algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+def _observed(d):
+    """Saturday holidays are observed Friday, Sunday holidays Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+def market_holidays(year):
+    """NYSE full-day holidays for a year."""
+    holidays = {
+        _nth_weekday(year, 2, 0, 3),            # Presidents' Day
+        _easter(year) - timedelta(days=2),      # Good Friday
+        _nth_weekday(year, 5, 0, -1),           # Memorial Day
+        _observed(date(year, 7, 4)),            # Independence Day
+        _nth_weekday(year, 9, 0, 1),            # Labor Day
+        _nth_weekday(year, 11, 3, 4),           # Thanksgiving
+        _observed(date(year, 12, 25)),          # Christmas
+    }
+    new_year = date(year, 1, 1)
+    if new_year.weekday() != 5:                 # No Friday holiday when Jan 1 is a Saturday
+        holidays.add(_observed(new_year))
+    if year >= 1998:
+        holidays.add(_nth_weekday(year, 1, 0, 3))       # Martin Luther King Jr. Day
+    if year >= 2022:
+        holidays.add(_observed(date(year, 6, 19)))      # Juneteenth
+    holidays |= {d for d in MARKET_EXTRA_CLOSURES if d.year == year}
+    return holidays
+
+def market_early_closes(year):
+    """1:00 PM ET half days for a year."""
+    closed = market_holidays(year)
+    candidates = [date(year, 7, 3), _nth_weekday(year, 11, 3, 4) + timedelta(days=1), date(year, 12, 24)]
+    return {d for d in candidates if d.weekday() < 5 and d not in closed}
+
+@functools.lru_cache(maxsize=1)
+def get_block_calendar():
+    """
+    Per-day lookup table for block counts.
+
+    Returns:
+        Dict with epoch (first date), close_minutes (0 on closed days) and
+        closed_before (closed days before each day offset) lists
+    """
+    epoch = date(CALENDAR_FIRST_YEAR, 1, 1)
+    n_days = (date(CALENDAR_LAST_YEAR, 12, 31) - epoch).days + 1
+    closed, early = set(), set()
+    for year in range(CALENDAR_FIRST_YEAR, CALENDAR_LAST_YEAR + 1):
+        closed |= market_holidays(year)
+        early |= market_early_closes(year)
+
+    close_minutes, closed_before, n_closed = [], [0], 0
+    for i in range(n_days):
+        d = epoch + timedelta(days=i)
+        if d.weekday() >= 5 or d in closed:
+            close_minutes.append(0)
+            n_closed += 1
+        else:
+            close_minutes.append(EARLY_CLOSE_MINUTES if d in early else RTH_CLOSE_MINUTES)
+        closed_before.append(n_closed)
+    return {"epoch": epoch, "close_minutes": close_minutes, "closed_before": closed_before}
+
+@functools.lru_cache(maxsize=1)
+def _calendar_arrays():
+    """The calendar lists as numpy arrays, for the vectorized block counts."""
+    cal = get_block_calendar()
+    return np.asarray(cal["close_minutes"], dtype=np.int64), np.asarray(cal["closed_before"], dtype=np.int64)
+
+def is_trading_day(d):
+    cal = get_block_calendar()
+    i = (d - cal["epoch"]).days
+    if 0 <= i < len(cal["close_minutes"]):
+        return bool(cal["close_minutes"][i])
+    return d.weekday() < 5
+
+def _as_ct(t):
+    """An aware datetime in CT (returned as is when it already is - astimezone is the slow part)."""
+    return t if getattr(t.tzinfo, "zone", None) == CT.zone else t.astimezone(CT)
+
+def _blocks_across_days(start, end):
+    """Block count for CT datetimes on different days (start < end)."""
+    cal = get_block_calendar()
+    start_date, end_date = start.date(), end.date()
+    i, j = (start_date - cal["epoch"]).days, (end_date - cal["epoch"]).days
+
+    # Blocks from the start to its day's close (3:00 PM on a closed day, as before)
+    close = cal["close_minutes"][i] if 0 <= i < len(cal["close_minutes"]) else 0
+    close_seconds = (close or RTH_CLOSE_MINUTES) * 60
+    start_seconds = start.hour * 3600 + start.minute * 60 + start.second + start.microsecond / 1e6
+    blocks_to_close = int((close_seconds - start_seconds) / 1800) if start_seconds < close_seconds else 0
+
+    # Blocks from the 8:30 AM open to the end time
+    open_seconds = RTH_OPEN_MINUTES * 60
+    end_seconds = end.hour * 3600 + end.minute * 60 + end.second + end.microsecond / 1e6
+    blocks_from_open = int((end_seconds - open_seconds) / 1800) if end_seconds >= open_seconds else 0
+
+    if 0 <= i and j + 1 < len(cal["closed_before"]):
+        closed_days = cal["closed_before"][j + 1] - cal["closed_before"][i + 1]
+    else:
+        closed_days = sum(not is_trading_day(start_date + timedelta(days=k))
+                          for k in range(1, (end_date - start_date).days + 1))
+    if closed_days:
+        return blocks_to_close + OVERNIGHT_WEEKEND_BLOCKS + blocks_from_open
+    middle_days = (end_date - start_date).days - 1
+    return blocks_to_close + BLOCKS_PER_FULL_DAY * middle_days + OVERNIGHT_REGULAR_BLOCKS + blocks_from_open
+
+def _ct_parts(times):
+    """
+    (day offset, seconds since CT midnight, epoch seconds) arrays for one or
+    many timestamps. Aware times are converted to CT; naive times are taken as CT.
+    """
+    if isinstance(times, (pd.DatetimeIndex, pd.Series)):
+        idx = pd.DatetimeIndex(times)
+        wall = idx.tz_convert(CT).tz_localize(None) if idx.tz is not None else idx
+        wall, instant = (np.asarray(x.values, dtype="datetime64[ns]").astype(np.int64) for x in (wall, idx))
+    else:
+        # Element-wise so mixed pytz offsets (CST/CDT) and zones are all accepted
+        stamps = [pd.Timestamp(t) for t in ([times] if isinstance(times, datetime) else times)]
+        instant = np.array([ts.value for ts in stamps], dtype=np.int64)
+        wall = np.array([(ts.tz_convert(CT).tz_localize(None) if ts.tzinfo is not None else ts).value
+                         for ts in stamps], dtype=np.int64)
+    day_ns = 86400 * 10 ** 9
+    epoch_day = (get_block_calendar()["epoch"] - date(1970, 1, 1)).days
+    return wall // day_ns - epoch_day, (wall % day_ns) / 1e9, instant / 1e9
+
+def _block_counts(start_parts, end_parts):
+    """blocks_between on _ct_parts arrays, broadcast against each other."""
+    start_day, start_seconds, start_instant = start_parts
+    end_day, end_seconds, end_instant = end_parts
+    close_minutes, closed_before = _calendar_arrays()
+    i = np.clip(start_day, 0, len(close_minutes) - 1)
+    j = np.clip(end_day, 0, len(close_minutes) - 1)
+
+    close_seconds = np.where(close_minutes[i] > 0, close_minutes[i], RTH_CLOSE_MINUTES) * 60
+    blocks_to_close = np.where(start_seconds < close_seconds, np.floor((close_seconds - start_seconds) / 1800), 0)
+    open_seconds = RTH_OPEN_MINUTES * 60
+    blocks_from_open = np.where(end_seconds >= open_seconds, np.floor((end_seconds - open_seconds) / 1800), 0)
+    overnight = np.where(closed_before[j + 1] - closed_before[i + 1] > 0, OVERNIGHT_WEEKEND_BLOCKS,
+                         BLOCKS_PER_FULL_DAY * (end_day - start_day - 1) + OVERNIGHT_REGULAR_BLOCKS)
+
+    same_day = np.floor((end_instant - start_instant) / 1800)
+    blocks = np.where(end_day == start_day, same_day, blocks_to_close + overnight + blocks_from_open)
+    return np.where(end_instant > start_instant, blocks, 0).astype(np.int64)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# POLLING POLICY - Cache TTLs and refresh rates scaled by market state
+# ═══════════════════════════════════════════════════════════════════════════════
+
+GLOBEX_BREAK_MINUTES = 16 * 60          # CME daily maintenance 4:00-5:00 PM CT
+GLOBEX_REOPEN_MINUTES = 17 * 60
+NEAR_LEVEL_HOLD_SECONDS = 120           # A "near a level" reading keeps fast polling this long
+POLL_FACTORS = {                        # Multiplier on each function's base TTL / refresh rate
+    "RTH_NEAR": 0.5,                    # RTH with SPX within NEAR_THRESHOLD of a level
+    "RTH": 1.0,
+    "EXTENDED": 4.0,                    # Globex overnight
+    "MAINTENANCE": 10.0,
+    "CLOSED": 60.0,                     # Weekend / exchange holiday
+}
+
+_level_proximity = {"near": False, "at": None}     # Shared with the QuoteHub / SWR threads across reruns
+
+def note_level_proximity(near):
+    """Record whether SPX is within NEAR_THRESHOLD of an entry level (the app passes the decision's near_level)."""
+    _level_proximity["near"] = bool(near)
+    _level_proximity["at"] = monotonic()
+
+def market_phase(now=None):
+    """RTH, EXTENDED, MAINTENANCE or CLOSED for a CT time (default now)."""
+    now = now.astimezone(CT) if now is not None and now.tzinfo is not None else (now or datetime.now(CT))
+    d, minutes = now.date(), now.hour * 60 + now.minute
+
+    cal = get_block_calendar()
+    i = (d - cal["epoch"]).days
+    close = int(cal["close_minutes"][i]) if 0 <= i < len(cal["close_minutes"]) else \
+        (RTH_CLOSE_MINUTES if d.weekday() < 5 else 0)
+    if close and RTH_OPEN_MINUTES <= minutes < close:
+        return "RTH"
+
+    weekday = d.weekday()
+    if weekday == 5 or (weekday == 6 and minutes < GLOBEX_REOPEN_MINUTES) or \
+            (weekday == 4 and minutes >= GLOBEX_BREAK_MINUTES):
+        return "CLOSED"
+    if not close and minutes < GLOBEX_REOPEN_MINUTES:
+        return "CLOSED"     # Exchange holiday until the evening reopen
+    if GLOBEX_BREAK_MINUTES <= minutes < GLOBEX_REOPEN_MINUTES:
+        return "MAINTENANCE"
+    return "EXTENDED"
+
+def poll_phase(now=None):
+    """market_phase, with RTH split into RTH_NEAR while a recent reading put SPX near a level."""
+    phase = market_phase(now)
+    if phase == "RTH" and _level_proximity["near"] and \
+            monotonic() - _level_proximity["at"] <= NEAR_LEVEL_HOLD_SECONDS:
+        return "RTH_NEAR"
+    return phase
+
+def poll_factor(now=None):
+    return POLL_FACTORS[poll_phase(now)]
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# UTILITIES
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def now_ct():
+    return datetime.now(CT)
+
+def blocks_between(start, end):
+    """Calculate 30-minute trading blocks between two times.
+
+    Handles same-day, cross-day, and weekend / holiday-crossing calculations
+    (see TRADING CALENDAR). Two datetimes take a plain-Python path; arrays of
+    timestamps (broadcast against each other, naive taken as CT) return an int
+    array. Naive datetimes fall back to simple elapsed time / 30 min.
+    """
+    if start is None or end is None:
+        return 0
+
+    if isinstance(start, datetime) and isinstance(end, datetime):
+        if end <= start:
+            return 0
+        if start.tzinfo is None or end.tzinfo is None:
+            return max(0, int((end - start).total_seconds() / 1800))
+        start, end = _as_ct(start), _as_ct(end)
+        if start.date() == end.date():
+            return max(0, int((end - start).total_seconds() / 1800))
+        return _blocks_across_days(start, end)
+
+    return _block_counts(_ct_parts(start), _ct_parts(end))
+
+def get_prior_trading_day(ref_date):
+    prior = ref_date - timedelta(days=1)
+    while not is_trading_day(prior):
+        prior -= timedelta(days=1)
+    return prior
+
+def get_actual_trading_day(selected_date):
+    """If user selects a weekend or market holiday, return the next trading day.
+    Otherwise return the selected date."""
+    while not is_trading_day(selected_date):
+        selected_date += timedelta(days=1)
+    return selected_date
+
+def _bars_to_ct(df):
+    """Convert a Yahoo history frame to a CT-indexed frame (exchange tz if naive)."""
+    if df is None or df.empty:
+        return None
+    df = df.copy()
+    if df.index.tz is None:
+        df.index = df.index.tz_localize(ET).tz_convert(CT)
+    else:
+        df.index = df.index.tz_convert(CT)
+    return df[~df.index.duplicated(keep="last")]
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHANNEL PROJECTION ENGINE
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# level[t, i] = price[i] + SLOPE * direction[i] * blocks(anchor_time[i] -> t)
+# for every anchor and every time in one numpy broadcast. build_level_ladder
+# gives the whole session so callers can index levels by time instead of
+# recomputing them; project_at is the same formula for one time in plain Python.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+def project_levels(prices, anchor_times, directions, times, slope=SLOPE):
+    """
+    Project anchors to many times at once.
+
+    Args:
+        prices: Anchor prices (L)
+        anchor_times: Anchor timestamps (L); None projects flat, like the scalar code
+        directions: +1 ascending, -1 descending, 0 flat (L)
+        times: Target timestamps (T)
+
+    Returns:
+        Dict with times, levels (T x L, rounded to cents) and blocks (T x L)
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    directions = np.asarray(directions, dtype=np.float64)
+    has_time = np.array([t is not None and not pd.isna(t) for t in anchor_times], dtype=bool)
+
+    time_parts = [part[:, None] for part in _ct_parts(times)]
+    blocks = np.zeros((len(time_parts[0]), len(prices)), dtype=np.int64)
+    if has_time.any():
+        anchor_parts = [part[None, :] for part in _ct_parts([t for t, ok in zip(anchor_times, has_time) if ok])]
+        blocks[:, has_time] = _block_counts(anchor_parts, time_parts)
+    levels = np.round(prices[None, :] + slope * directions[None, :] * blocks, 2)
+    return {"times": times, "levels": levels, "blocks": blocks}
+
+def session_block_times(trading_date, start=time(8, 30), end=time(15, 0), freq_minutes=30):
+    """CT timestamps every freq_minutes from start to end (inclusive) on trading_date."""
+    return pd.date_range(CT.localize(datetime.combine(trading_date, start)),
+                         CT.localize(datetime.combine(trading_date, end)),
+                         freq=f"{freq_minutes}min")
+
+def build_level_ladder(anchors, trading_date, start=time(8, 30), end=time(15, 0), freq_minutes=30):
+    """
+    Full-session time x level matrix.
+
+    Args:
+        anchors: Dict of level name -> (price, anchor_time, direction); entries
+                 with a None price are skipped
+
+    Returns:
+        Dict with times, names, column index by name, levels and blocks
+    """
+    names = [name for name, (price, _, _) in anchors.items() if price is not None]
+    times = session_block_times(trading_date, start, end, freq_minutes)
+    if not names:
+        return {"times": times, "names": [], "index": {}, "levels": np.zeros((len(times), 0)),
+                "blocks": np.zeros((len(times), 0), dtype=np.int64)}
+    ladder = project_levels([anchors[n][0] for n in names], [anchors[n][1] for n in names],
+                            [anchors[n][2] for n in names], times)
+    ladder["names"] = names
+    ladder["index"] = {name: i for i, name in enumerate(names)}
+    return ladder
+
+def ladder_row(ladder, ref_time):
+    """Row of the last ladder time at or before ref_time (-1 if none)."""
+    if ref_time is None:
+        return -1
+    return int(ladder["times"].searchsorted(pd.Timestamp(ref_time).tz_convert(CT), side="right")) - 1
+
+def ladder_level(ladder, name, ref_time):
+    """Level `name` at the last ladder time at or before ref_time (None if unavailable)."""
+    col = ladder["index"].get(name)
+    row = ladder_row(ladder, ref_time)
+    if col is None or row < 0:
+        return None
+    return float(ladder["levels"][row, col])
+
+def project_at(prices, anchor_times, directions, ref_time, slope=SLOPE):
+    """
+    Single-time projection: (levels, blocks) lists. No ref_time projects flat.
+
+    Plain scalar arithmetic, one blocks_between per anchor - the per-call path
+    for the channel calculators and the backtest. Use project_levels /
+    build_level_ladder to project many times at once.
+    """
+    blocks = [blocks_between(t, ref_time) if t and ref_time else 0 for t in anchor_times]
+    levels = [round(price + slope * direction * b, 2) for price, direction, b in zip(prices, directions, blocks)]
+    return levels, blocks
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BLACK-SCHOLES PRICING
+# ═══════════════════════════════════════════════════════════════════════════════
+def norm_cdf(x):
+    a1, a2, a3, a4, a5 = 0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429
+    p, sign = 0.3275911, 1 if x >= 0 else -1
+    x = abs(x) / math.sqrt(2)
+    t = 1.0 / (1.0 + p * x)
+    y = 1.0 - (((((a5 * t + a4) * t) + a3) * t + a2) * t + a1) * t * math.exp(-x * x)
+    return 0.5 * (1.0 + sign * y)
+
+def norm_cdf_vec(x):
+    """norm_cdf over a numpy array (same approximation)."""
+    a1, a2, a3, a4, a5 = 0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429
+    p = 0.3275911
+    x = np.asarray(x, dtype=np.float64)
+    sign = np.where(x >= 0, 1.0, -1.0)
+    x = np.abs(x) / math.sqrt(2)
+    t = 1.0 / (1.0 + p * x)
+    y = 1.0 - (((((a5 * t + a4) * t) + a3) * t + a2) * t + a1) * t * np.exp(-x * x)
+    return 0.5 * (1.0 + sign * y)
+
+def black_scholes(S, K, T, r, sigma, opt_type):
+    if T <= 0:
+        return max(0, S - K) if opt_type == "CALL" else max(0, K - S)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    if opt_type == "CALL":
+        return S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
+    return K * math.exp(-r * T) * norm_cdf(-d2) - S * norm_cdf(-d1)
+
+def black_scholes_vec(S, K, T, r, sigma, opt_type):
+    """Black-Scholes over arrays: S, K, T, sigma and opt_type broadcast against each other."""
+    S, K, T, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (S, K, T, sigma)))
+    is_call = np.asarray(opt_type) == "CALL"
+    live = T > 0
+    T_live = np.where(live, T, 1.0)   # Expired cells are replaced by intrinsic below
+    vol_t = sigma * np.sqrt(T_live)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T_live) / vol_t
+    d2 = d1 - vol_t
+    discounted_k = K * np.exp(-r * T_live)
+    call = S * norm_cdf_vec(d1) - discounted_k * norm_cdf_vec(d2)
+    put = discounted_k * norm_cdf_vec(-d2) - S * norm_cdf_vec(-d1)
+    intrinsic = np.where(is_call, np.maximum(0, S - K), np.maximum(0, K - S))
+    return np.where(live, np.where(is_call, call, put), intrinsic)
+
+# Time decay factor - non-linear, accelerates toward expiry
+PREMIUM_DECAY_HOURS = (1, 2, 3, 4, 5, 5.5)
+PREMIUM_DECAY_FACTORS = (0.08, 0.18, 0.32, 0.48, 0.65, 0.85, 1.0)
+
+def estimate_0dte_premium(spot, strike, hours_to_expiry, vix, opt_type):
+    """
+    0DTE SPX premium estimation - calibrated to real market data.
+
+    Includes PUT SKEW adjustment (puts are more expensive than calls).
+    estimate_0dte_premium_vec prices a whole strike x time grid.
+
+    Calibrated against actual SPX 0DTE trades:
+    CALLS (6980C):
+    - 22 OTM @ 5.85hrs = $2.30
+    - 3 OTM @ 5.58hrs = $7.50
+
+    PUTS (6975P):
+    - 18 OTM @ 6.5hrs = $8.60
+    - 3 OTM @ 5.5hrs = $13.45
+
+    Average error: ~15% for both calls and puts
+    """
+    # Calculate OTM/ITM distance
+    if opt_type == "CALL":
+        otm = max(0, strike - spot)
+        itm = max(0, spot - strike)
+    else:  # PUT
+        otm = max(0, spot - strike)
+        itm = max(0, strike - spot)
+
+    # ATM base premium (scales with VIX)
+    atm_base = 9.5 + (vix - 15) * 0.4
+
+    time_factor = PREMIUM_DECAY_FACTORS[bisect.bisect_right(PREMIUM_DECAY_HOURS, hours_to_expiry)]
+
+    # OTM decay with minimum floor (lottery ticket value)
+    base_decay = math.exp(-otm / 11)
+    min_floor = 2.0 * time_factor
+
+    # Extrinsic value = max(exponential decay, floor)
+    exp_premium = atm_base * time_factor * base_decay
+    extrinsic = max(exp_premium, min_floor)
+
+    # PUT SKEW: Puts are more expensive than calls due to crash protection demand
+    # Skew increases with distance OTM (more hedging value for far OTM puts)
+    # Near ATM: ~1.8x, Far OTM (20+): ~3.5x
+    if opt_type == "PUT":
+        skew = min(3.5, 1.8 + (otm / 20) * 1.5)
+        extrinsic = extrinsic * skew
+
+    # Total premium = extrinsic + intrinsic
+    premium = extrinsic + itm
+
+    return max(round(premium, 2), 0.05)
+
+def estimate_0dte_premium_vec(spot, strike, hours_to_expiry, vix, opt_type):
+    """estimate_0dte_premium over arrays; all arguments broadcast against each other."""
+    spot, strike, hours, vix = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (spot, strike, hours_to_expiry, vix)))
+    is_call = np.asarray(opt_type) == "CALL"
+
+    otm = np.where(is_call, np.maximum(0, strike - spot), np.maximum(0, spot - strike))
+    itm = np.where(is_call, np.maximum(0, spot - strike), np.maximum(0, strike - spot))
+    atm_base = 9.5 + (vix - 15) * 0.4
+    time_factor = np.take(PREMIUM_DECAY_FACTORS, np.searchsorted(PREMIUM_DECAY_HOURS, hours, side="right"))
+    extrinsic = np.maximum(atm_base * time_factor * np.exp(-otm / 11), 2.0 * time_factor)
+    skew = np.where(is_call, 1.0, np.minimum(3.5, 1.8 + (otm / 20) * 1.5))
+    return np.maximum(np.round(extrinsic * skew + itm, 2), 0.05)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GREEKS & IMPLIED VOLATILITY - Batch analytic engine
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# All functions take arrays (strikes, spots, expiries, CALL/PUT labels) that
+# broadcast against each other. T is in years; 0DTE callers use hours / 8760.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+RISK_FREE_RATE = 0.05
+HOURS_PER_YEAR = 365 * 24
+IV_MIN, IV_MAX = 1e-4, 5.0
+NORM_CDF_MAX_ERROR = 1.5e-7     # Abramowitz-Stegun 7.1.26, the approximation norm_cdf uses
+
+def norm_pdf(x):
+    return np.exp(-0.5 * np.square(x)) / math.sqrt(2 * math.pi)
+
+def _bs_d1_d2(S, K, T, r, sigma):
+    vol_t = sigma * np.sqrt(T)
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / vol_t
+    return d1, d1 - vol_t
+
+def bs_greeks(S, K, T, r, sigma, opt_type):
+    """
+    Analytic Black-Scholes Greeks.
+
+    Returns:
+        Dict of arrays: delta, gamma, theta (per calendar day), vega (per 1 vol point)
+    """
+    S, K, T, sigma = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (S, K, T, sigma)))
+    is_call = np.asarray(opt_type) == "CALL"
+    T = np.maximum(T, 1e-8)
+    d1, d2 = _bs_d1_d2(S, K, T, r, sigma)
+    pdf_d1 = norm_pdf(d1)
+    discounted_k = K * np.exp(-r * T)
+
+    delta = np.where(is_call, norm_cdf_vec(d1), norm_cdf_vec(d1) - 1.0)
+    gamma = pdf_d1 / (S * sigma * np.sqrt(T))
+    decay = -S * pdf_d1 * sigma / (2 * np.sqrt(T))
+    theta = np.where(is_call, decay - r * discounted_k * norm_cdf_vec(d2),
+                     decay + r * discounted_k * norm_cdf_vec(-d2)) / 365
+    vega = S * pdf_d1 * np.sqrt(T) / 100
+    return {"delta": delta, "gamma": gamma, "theta": theta, "vega": vega}
+
+def implied_vol(price, S, K, T, r, opt_type, tol=1e-6, max_iter=50):
+    """
+    Implied volatility from option prices, solved for all inputs at once.
+
+    Newton steps on vega, kept inside a shrinking [lo, hi] bracket and
+    replaced by bisection whenever a step leaves it. A quote has converged
+    once its vol error |price error / vega| or its bracket width is within
+    tol (absolute, in vol: 1e-6 = 0.0001 vol points).
+
+    NaN comes back, rather than a guess, for quotes with no time left,
+    outside the no-arbitrage bounds (intrinsic .. S for calls, discounted K
+    for puts) or the IV_MIN .. IV_MAX prices, within the CDF approximation's
+    pricing error of those bounds (deep ITM / near-zero quotes), or that do
+    not converge in max_iter steps.
+    """
+    price, S, K, T = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64) for v in (price, S, K, T)))
+    opt_type = np.broadcast_to(np.asarray(opt_type), price.shape)
+    is_call = opt_type == "CALL"
+    T_live = np.maximum(T, 1e-8)
+
+    discounted_k = K * np.exp(-r * T_live)
+    intrinsic = np.where(is_call, np.maximum(0, S - discounted_k), np.maximum(0, discounted_k - S))
+    upper = np.where(is_call, S, discounted_k)
+    resolution = NORM_CDF_MAX_ERROR * (S + discounted_k)     # Pricing noise of the CDF approximation
+    lo = np.full(price.shape, IV_MIN)
+    hi = np.full(price.shape, IV_MAX)
+    with np.errstate(invalid="ignore"):
+        solvable = ((T > 0) & (price > intrinsic + resolution) & (price < upper - resolution)
+                    & (price > black_scholes_vec(S, K, T_live, r, lo, opt_type) + resolution)
+                    & (price < black_scholes_vec(S, K, T_live, r, hi, opt_type) - resolution))
+    sigma = np.full(price.shape, 0.2)
+    converged = ~solvable
+
+    for _ in range(max_iter):
+        diff = black_scholes_vec(S, K, T_live, r, sigma, opt_type) - price
+        d1, _ = _bs_d1_d2(S, K, T_live, r, sigma)
+        vega = S * norm_pdf(d1) * np.sqrt(T_live)
+        converged |= (np.abs(diff) <= vega * tol) | (hi - lo <= tol)
+        active = ~converged
+        if not active.any():
+            break
+        # Price is increasing in sigma: a positive error means sigma is an upper bound
+        hi = np.where(active & (diff > 0), sigma, hi)
+        lo = np.where(active & (diff < 0), sigma, lo)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = sigma - diff / vega
+        in_bracket = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        sigma = np.where(active, np.where(in_bracket, newton, 0.5 * (lo + hi)), sigma)
+
+    iv = np.where(solvable & converged, sigma, np.nan)
+    return float(iv) if iv.ndim == 0 else iv
+
+def project_entry_premiums(current_premiums, current_spots, entry_spots, strikes, opt_types, hours_to_expiry):
+    """
+    Premium each option should trade at when the underlying reaches its entry level.
+
+    Backs out IV from the current premium and reprices at the entry spot with
+    full Black-Scholes, so large moves to a floor / ceiling include gamma.
+    Entries whose IV cannot be solved come back NaN.
+    """
+    T = np.asarray(hours_to_expiry, dtype=np.float64) / HOURS_PER_YEAR
+    iv = implied_vol(current_premiums, current_spots, strikes, T, RISK_FREE_RATE, opt_types)
+    with np.errstate(invalid="ignore"):
+        projected = np.maximum(0.05, np.round(black_scholes_vec(entry_spots, strikes, T, RISK_FREE_RATE,
+                                                                np.nan_to_num(iv, nan=0.2), opt_types), 2))
+    projected = np.where(np.isnan(iv), np.nan, projected)
+    return float(projected) if projected.ndim == 0 else projected
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 0DTE PREMIUM SURFACE - Whole SPXW chain x remaining half-hour blocks
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SURFACE_STRIKE_STEP = 5
+SURFACE_STRIKE_SPAN = 150   # Points either side of spot when no chain is available
+
+def chain_strikes(chain, trading_date):
+    """Sorted strike prices of the trading date's expiration in a Tastytrade nested chain."""
+    expiration = (chain or {}).get("chain", {}).get(trading_date.strftime("%Y-%m-%d")) or {}
+    strikes = []
+    for item in expiration.get("strikes", []):
+        try:
+            strikes.append(float(item.get("strike-price") if isinstance(item, dict) else item))
+        except (TypeError, ValueError):
+            continue
+    return np.unique(np.array(strikes, dtype=np.float64))
+
+def hours_to_expiry_ct(trading_date, now=None):
+    """Hours until the 3:00 PM CT 0DTE expiry (never below 0.1)."""
+    expiry_time = CT.localize(datetime.combine(trading_date, time(15, 0)))
+    return max(0.1, (expiry_time - (now or now_ct())).total_seconds() / 3600)
+
+def remaining_block_times(trading_date, now=None):
+    """Now plus each remaining half-hour boundary before the 3:00 PM CT expiry, with hours to expiry."""
+    now = pd.Timestamp(now or now_ct()).tz_convert(CT)
+    boundaries = session_block_times(trading_date, time(8, 30), time(14, 30))
+    times = boundaries[boundaries > now].insert(0, now)
+    expiry = pd.Timestamp(CT.localize(datetime.combine(trading_date, time(15, 0))))
+    hours = np.maximum(0.1, (expiry - times).total_seconds().values / 3600)
+    return times, hours
+
+def build_premium_surface(spot, strikes, trading_date, vix, now=None):
+    """
+    Estimated 0DTE premiums for every strike at every remaining half-hour block.
+
+    Returns:
+        Dict with spot, vix, strikes (K), times / hours (T) and
+        "CALL" / "PUT" premium matrices (T x K); row 0 is now
+    """
+    strikes = np.asarray(strikes, dtype=np.float64)
+    times, hours = remaining_block_times(trading_date, now)
+    grid_hours, grid_strikes = hours[:, None], strikes[None, :]
+    return {
+        "spot": spot, "vix": vix, "strikes": strikes, "times": times, "hours": hours,
+        "CALL": estimate_0dte_premium_vec(spot, grid_strikes, grid_hours, vix, "CALL"),
+        "PUT": estimate_0dte_premium_vec(spot, grid_strikes, grid_hours, vix, "PUT"),
+    }
+
+def surface_premium(surface, strike, opt_type, row=0):
+    """Premium for one strike from a surface (None if the strike is not on it)."""
+    if not surface:
+        return None
+    strikes = surface["strikes"]
+    col = int(np.searchsorted(strikes, strike))
+    if col < len(strikes) and strikes[col] == strike:
+        return float(surface[opt_type][row, col])
+    return None
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SPX OPTIONS PREMIUM ESTIMATION
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@timed("stage")
+def calculate_premium_at_entry(current_premium, current_spx, entry_spx, strike, opt_type, delta=None,
+                               hours_to_expiry=None):
+    """
+    Calculate what an option premium will be when SPX reaches entry level.
+
+    For CALLS at ascending floor:
+    - SPX drops to floor → CALL premium DECREASES (cheaper entry!)
+
+    For PUTS at descending ceiling:
+    - SPX rises to ceiling → PUT premium DECREASES (cheaper entry!)
+
+    With hours_to_expiry the option is repriced at its implied vol
+    (project_entry_premiums). Otherwise, or if IV cannot be solved, uses
+    the delta approximation: ΔPremium ≈ delta × ΔSPX
+
+    Args:
+        current_premium: Current option price
+        current_spx: Current SPX price
+        entry_spx: Entry level (floor for calls, ceiling for puts)
+        strike: Option strike
+        opt_type: "CALL" or "PUT"
+        delta: Option delta (if available, otherwise estimate)
+        hours_to_expiry: Hours to the 0DTE expiry (enables full repricing)
+
+    Returns:
+        Estimated premium at entry level
+    """
+    if current_premium is None or current_spx is None or entry_spx is None:
+        return None
+
+    if hours_to_expiry is not None:
+        projected = project_entry_premiums(current_premium, current_spx, entry_spx, strike, opt_type, hours_to_expiry)
+        if not math.isnan(projected):
+            return projected
+
+    spx_move = entry_spx - current_spx  # Negative if dropping to floor, positive if rising to ceiling
+
+    # Estimate delta if not provided
+    if delta is None:
+        # Rough delta estimate based on moneyness
+        if opt_type == "CALL":
+            otm = strike - current_spx
+            if otm <= 0:  # ITM
+                delta = 0.60
+            elif otm <= 10:
+                delta = 0.45
+            elif otm <= 20:
+                delta = 0.30
+            elif otm <= 30:
+                delta = 0.20
+            else:
+                delta = 0.10
+        else:  # PUT
+            otm = current_spx - strike
+            if otm <= 0:  # ITM
+                delta = -0.60
+            elif otm <= 10:
+                delta = -0.45
+            elif otm <= 20:
+                delta = -0.30
+            elif otm <= 30:
+                delta = -0.20
+            else:
+                delta = -0.10
+
+    # Premium change = delta × SPX move
+    # For calls: if SPX drops (negative move), premium drops (delta positive)
+    # For puts: if SPX rises (positive move), premium drops (delta negative)
+    premium_change = delta * spx_move
+
+    # New premium (with floor of $0.05)
+    new_premium = max(0.05, current_premium + premium_change)
+
+    return round(new_premium, 2)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# VIX CHANNEL SYSTEM - The Alternating Channel Strategy
+# ═══════════════════════════════════════════════════════════════════════════════
+# 
+# VIX channels ALTERNATE daily: Ascending → Descending → Ascending
+# This is FIXED and independent of how SPX channels are determined
+#
+# Key Parameters:
+# - Slope: 0.04 per 6 30-minute blocks (0.04 every 3 hours)
+# - Channel drawn: 5 PM - 5:30 AM CT using highest/lowest pivots
+# - All prices must stay within channel
+#
+# Trading Logic:
+# - Opens IN channel → Trade bounces at floor/ceiling
+# - Breaks channel → EXPLOSIVE move, wait for 8:30 AM retest springboard
+#   - Breaks ABOVE ascending ceiling → VIX springboard UP → SELL SPX
+#   - Breaks BELOW descending floor → VIX springboard DOWN → BUY SPX
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class VIXChannelType(Enum):
+    ASCENDING = "ASCENDING"       # Both lines rising
+    DESCENDING = "DESCENDING"     # Both lines falling
+    CONVERGING = "CONVERGING"     # Ceiling falling, floor rising (squeeze)
+    DIVERGING = "DIVERGING"       # Ceiling rising, floor falling (expansion)
+    PARALLEL_UP = "PARALLEL_UP"   # Both rising roughly same slope
+    PARALLEL_DOWN = "PARALLEL_DOWN"  # Both falling roughly same slope
+    FLAT = "FLAT"                 # Both roughly horizontal
+
+@timed("stage")
+def calculate_vix_structural_channel(
+    asia_high: float, asia_high_time: datetime,
+    europe_high: float, europe_high_time: datetime,
+    asia_low: float, asia_low_time: datetime,
+    europe_low: float, europe_low_time: datetime,
+    reference_time: datetime = None,
+    current_time: datetime = None
+) -> Dict:
+    """
+    Build VIX channel from 4 structural pivots - the REAL methodology.
+
+    Ceiling line: Asia High (5PM-2AM CT) → Europe High (2AM-8AM CT), project into NY
+    Floor line:   Asia Low (5PM-2AM CT) → Europe Low (2AM-8AM CT), project into NY
+
+    Each line has its own data-driven slope (NOT the fixed ES slope).
+    Channel shape emerges naturally from the two anchor points per line.
+
+    VIX ENTRY SIGNALS (confluence for ES/SPX trades):
+    1. VIX touches floor, closes above → BUY PUTS (VIX bounced = SPX down)
+    2. VIX touches ceiling, closes below → BUY CALLS (VIX rejected = SPX up)
+    3. VIX breaks ceiling, retests from above, closes above → BUY PUTS (ceiling became support)
+    4. VIX breaks floor, retests from below, closes below → BUY CALLS (floor became resistance)
+    """
+    if current_time is None:
+        current_time = datetime.now(CT)
+    if reference_time is None:
+        reference_time = current_time
+
+    result = {
+        "channel_type": VIXChannelType.FLAT,
+        "channel_status": "BUILDING",  # BUILDING until Europe completes, then LOCKED
+        "floor": None,
+        "ceiling": None,
+        "floor_at_ref": None,
+        "ceiling_at_ref": None,
+        "pivot_high": asia_high,      # Keep for backward compat
+        "pivot_low": asia_low,        # Keep for backward compat
+        "pivot_high_time": asia_high_time,
+        "pivot_low_time": asia_low_time,
+        "asia_high": asia_high,
+        "asia_low": asia_low,
+        "europe_high": europe_high,
+        "europe_low": europe_low,
+        "ceiling_slope_per_hour": 0.0,
+        "floor_slope_per_hour": 0.0,
+        "channel_width_current": None,
+        "channel_description": "",
+        "slope_direction": 0
+    }
+
+    if None in (asia_high, europe_high, asia_low, europe_low):
+        return result
+    if None in (asia_high_time, europe_high_time, asia_low_time, europe_low_time):
+        return result
+
+    # Calculate ceiling slope (VIX points per hour)
+    ceiling_hours = (europe_high_time - asia_high_time).total_seconds() / 3600
+    if ceiling_hours > 0:
+        ceiling_slope = (europe_high - asia_high) / ceiling_hours
+    else:
+        ceiling_slope = 0.0
+
+    # Calculate floor slope (VIX points per hour)
+    floor_hours = (europe_low_time - asia_low_time).total_seconds() / 3600
+    if floor_hours > 0:
+        floor_slope = (europe_low - asia_low) / floor_hours
+    else:
+        floor_slope = 0.0
+
+    result["ceiling_slope_per_hour"] = round(ceiling_slope, 4)
+    result["floor_slope_per_hour"] = round(floor_slope, 4)
+
+    # Project ceiling at any time: asia_high + ceiling_slope * hours_since_asia_high
+    def ceiling_at(t):
+        hours = (t - asia_high_time).total_seconds() / 3600
+        return asia_high + ceiling_slope * hours
+
+    def floor_at(t):
+        hours = (t - asia_low_time).total_seconds() / 3600
+        return asia_low + floor_slope * hours
+
+    # Current levels
+    result["ceiling"] = round(ceiling_at(current_time), 2)
+    result["floor"] = round(floor_at(current_time), 2)
+    result["ceiling_at_ref"] = round(ceiling_at(reference_time), 2)
+    result["floor_at_ref"] = round(floor_at(reference_time), 2)
+    result["channel_width_current"] = round(result["ceiling"] - result["floor"], 2)
+
+    # Determine channel shape
+    SLOPE_THRESHOLD = 0.01  # VIX points/hour - below this is "flat"
+    ceiling_up = ceiling_slope > SLOPE_THRESHOLD
+    ceiling_down = ceiling_slope < -SLOPE_THRESHOLD
+    ceiling_flat = not ceiling_up and not ceiling_down
+    floor_up = floor_slope > SLOPE_THRESHOLD
+    floor_down = floor_slope < -SLOPE_THRESHOLD
+    floor_flat = not floor_up and not floor_down
+
+    # Both moving same direction
+    if ceiling_up and floor_up:
+        result["channel_type"] = VIXChannelType.ASCENDING
+        result["channel_description"] = "Both lines rising → VIX bias UP (SPX bias DOWN)"
+        result["slope_direction"] = 1
+    elif ceiling_down and floor_down:
+        result["channel_type"] = VIXChannelType.DESCENDING
+        result["channel_description"] = "Both lines falling → VIX bias DOWN (SPX bias UP)"
+        result["slope_direction"] = -1
+    # Converging (squeeze) and Diverging (expansion)
+    elif ceiling_down and floor_up:
+        result["channel_type"] = VIXChannelType.CONVERGING
+        result["channel_description"] = "Squeeze forming → Breakout likely, wait for direction"
+        result["slope_direction"] = 0
+    elif ceiling_up and floor_down:
+        result["channel_type"] = VIXChannelType.DIVERGING
+        result["channel_description"] = "Expanding → High uncertainty, wider stops needed"
+        result["slope_direction"] = 0
+    # Both flat
+    elif ceiling_flat and floor_flat:
+        result["channel_type"] = VIXChannelType.FLAT
+        result["channel_description"] = "Parallel flat → Range-bound, play the walls"
+        result["slope_direction"] = 0
+    # Mixed: one line moving, one flat → expanding or tilting
+    elif ceiling_up and floor_flat:
+        result["channel_type"] = VIXChannelType.DIVERGING
+        result["channel_description"] = "Ceiling rising, floor flat → Expanding upward, VIX pressure building"
+        result["slope_direction"] = 1
+    elif ceiling_flat and floor_down:
+        result["channel_type"] = VIXChannelType.DIVERGING
+        result["channel_description"] = "Ceiling flat, floor falling → Expanding downward, volatility increasing"
+        result["slope_direction"] = -1
+    elif ceiling_down and floor_flat:
+        result["channel_type"] = VIXChannelType.CONVERGING
+        result["channel_description"] = "Ceiling falling, floor flat → Narrowing from top, compression"
+        result["slope_direction"] = -1
+    elif ceiling_flat and floor_up:
+        result["channel_type"] = VIXChannelType.CONVERGING
+        result["channel_description"] = "Ceiling flat, floor rising → Narrowing from bottom, squeeze building"
+        result["slope_direction"] = 1
+    else:
+        result["channel_type"] = VIXChannelType.FLAT
+        result["channel_description"] = "Indeterminate channel shape"
+        result["slope_direction"] = 0
+
+    # Determine channel status: BUILDING until Europe session ENDS at 8 AM CT
+    # This gives you 30 minutes (8:00-8:30) to review the locked channel before RTH opens
+    europe_session_end = current_time.replace(hour=8, minute=0, second=0, microsecond=0)
+    # Handle overnight: if current_time is before midnight, europe_session_end is next day
+    if current_time.hour >= 17:
+        europe_session_end += timedelta(days=1)
+
+    europe_complete = (current_time >= europe_session_end)
+    if europe_complete:
+        result["channel_status"] = "LOCKED"
+    else:
+        result["channel_status"] = "BUILDING"
+        result["channel_description"] = "Volatility zone BUILDING — Europe session in progress (locks at 8:00 AM CT)"
+
+    return result
+
+def get_vix_position(current_vix, vix_range):
+    if not vix_range["available"] or current_vix is None:
+        return VIXPosition.UNKNOWN, "No range data"
+    bottom, top = vix_range["bottom"], vix_range["top"]
+    if current_vix > top:
+        return VIXPosition.ABOVE_RANGE, f"{round(current_vix - top, 1)} above"
+    elif current_vix < bottom:
+        return VIXPosition.BELOW_RANGE, f"{round(bottom - current_vix, 1)} below"
+    else:
+        return VIXPosition.IN_RANGE, f"Within {bottom}-{top}"
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SESSION LEVEL TESTS
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def analyze_session_tests(sydney, tokyo, london, channel_type):
+    """
+    Analyze how many sessions tested and respected the key levels.
+    More session tests = stronger level confirmation.
+
+    Returns dict with floor_tests, ceiling_tests, and which sessions tested each.
+    """
+    result = {
+        "floor_tests": 0,
+        "ceiling_tests": 0,
+        "floor_sessions": [],
+        "ceiling_sessions": [],
+        "floor_respected": True,
+        "ceiling_respected": True
+    }
+
+    if not sydney or not tokyo:
+        return result
+
+    # Determine the key level bounds based on Sydney (baseline)
+    sydney_high = sydney["high"]
+    sydney_low = sydney["low"]
+    tolerance = 2.0  # Points tolerance for "testing" a level
+
+    # Check Tokyo
+    if tokyo:
+        # Did Tokyo test Sydney's low (floor area)?
+        if tokyo["low"] <= sydney_low + tolerance:
+            result["floor_tests"] += 1
+            result["floor_sessions"].append("Tokyo")
+            # Did it respect (close above)?
+            # We approximate by checking if high recovered
+            if tokyo["high"] > sydney_low + 5:
+                pass  # Respected
+            else:
+                result["floor_respected"] = False
+
+        # Did Tokyo test Sydney's high (ceiling area)?
+        if tokyo["high"] >= sydney_high - tolerance:
+            result["ceiling_tests"] += 1
+            result["ceiling_sessions"].append("Tokyo")
+
+    # Check London
+    if london:
+        current_low = min(sydney_low, tokyo["low"]) if tokyo else sydney_low
+        current_high = max(sydney_high, tokyo["high"]) if tokyo else sydney_high
+
+        # Did London test the floor?
+        if london["low"] <= current_low + tolerance:
+            result["floor_tests"] += 1
+            result["floor_sessions"].append("London")
+
+        # Did London test the ceiling?
+        if london["high"] >= current_high - tolerance:
+            result["ceiling_tests"] += 1
+            result["ceiling_sessions"].append("London")
+
+    return result
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# GAP ANALYSIS
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def analyze_gap(current_price, prior_close, ceiling, floor):
+    """
+    Analyze the gap relative to the overnight channel.
+
+    Returns:
+    - gap_direction: UP, DOWN, or FLAT
+    - gap_size: Size in points
+    - gap_position: Where the gap puts us relative to channel
+    - gap_into_level: True if gap brings us TO a key level (good setup)
+    """
+    result = {
+        "direction": "FLAT",
+        "size": 0,
+        "into_floor": False,
+        "into_ceiling": False,
+        "away_from_floor": False,
+        "away_from_ceiling": False
+    }
+
+    if prior_close is None or current_price is None:
+        return result
+
+    gap = current_price - prior_close
+    result["size"] = round(abs(gap), 1)
+
+    if gap > 3:
+        result["direction"] = "UP"
+    elif gap < -3:
+        result["direction"] = "DOWN"
+    else:
+        result["direction"] = "FLAT"
+
+    channel_range = ceiling - floor
+    dist_to_floor = current_price - floor
+    dist_to_ceiling = ceiling - current_price
+
+    # Check if gap brings us TO a key level
+    if result["direction"] == "DOWN" and dist_to_floor <= channel_range * 0.3:
+        result["into_floor"] = True
+    elif result["direction"] == "UP" and dist_to_ceiling <= channel_range * 0.3:
+        result["into_ceiling"] = True
+
+    # Check if gap takes us AWAY from a level
+    if result["direction"] == "UP" and dist_to_floor > channel_range * 0.5:
+        result["away_from_floor"] = True
+    elif result["direction"] == "DOWN" and dist_to_ceiling > channel_range * 0.5:
+        result["away_from_ceiling"] = True
+
+    return result
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PRIOR CLOSE ANALYSIS
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def analyze_prior_close(prior_close, ceiling, floor):
+    """
+    Analyze where prior RTH closed relative to today's overnight channel.
+
+    If prior close is near today's floor → floor is validated
+    If prior close is near today's ceiling → ceiling is validated
+    """
+    result = {
+        "validates_floor": False,
+        "validates_ceiling": False,
+        "position": "MIDDLE"
+    }
+
+    if prior_close is None or ceiling is None or floor is None:
+        return result
+
+    channel_range = ceiling - floor
+    dist_to_floor = prior_close - floor
+    dist_to_ceiling = ceiling - prior_close
+
+    if dist_to_floor <= channel_range * 0.3:
+        result["validates_floor"] = True
+        result["position"] = "NEAR_FLOOR"
+    elif dist_to_ceiling <= channel_range * 0.3:
+        result["validates_ceiling"] = True
+        result["position"] = "NEAR_CEILING"
+
+    return result
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PRIOR DAY RTH DATA
+# ═══════════════════════════════════════════════════════════════════════════════
+
+@timed("stage")
+def extract_prior_day_rth(df, prior_day):
+    """Extract prior day RTH pivots from a CT-indexed 30-minute ES frame.
+
+    Returns:
+    - primary_high_wick: The highest high (wick) of any RTH candle
+    - secondary_high_wick: Lower high wick made AFTER primary (1hr+ gap), or None
+    - primary_low_open: The lowest open of any BULLISH RTH candle (buyers defended)
+    - secondary_low_open: Higher low open made AFTER primary (1hr+ gap, bullish), or None
+    """
+    result = {
+        "primary_high_wick": None, "primary_high_wick_time": None,
+        "secondary_high_wick": None, "secondary_high_wick_time": None,
+        "primary_low_open": None, "primary_low_open_time": None,
+        "secondary_low_open": None, "secondary_low_open_time": None,
+        "high": None, "low": None, "close": None,
+        "available": False,
+        # Legacy keys for backward compatibility
+        "highest_wick": None, "highest_wick_time": None,
+        "lowest_close": None, "lowest_close_time": None,
+    }
+    try:
+        if df is not None and not df.empty and prior_day is not None:
+            # RTH hours: 8:30 AM - 3:00 PM CT
+            rth_start = CT.localize(datetime.combine(prior_day, time(8, 30)))
+            rth_end = CT.localize(datetime.combine(prior_day, time(15, 0)))
+
+            # Filter to prior day RTH
+            rth_df = df[(df.index >= rth_start) & (df.index <= rth_end)].copy()
+
+            if not rth_df.empty and len(rth_df) > 3:
+                # ─────────────────────────────────────────────────────────────
+                # HIGHEST WICK: Absolute highest high of any candle
+                # Used for: ASCENDING ceiling
+                # ─────────────────────────────────────────────────────────────
+                primary_high_idx = rth_df['High'].idxmax()
+                result["primary_high_wick"] = round(float(rth_df.loc[primary_high_idx, 'High']), 2)
+                result["primary_high_wick_time"] = primary_high_idx
+
+                # ─────────────────────────────────────────────────────────────
+                # HIGHEST CLOSE: Highest close of any candle
+                # Used for: DESCENDING ceiling (body defines resistance)
+                # ─────────────────────────────────────────────────────────────
+                primary_hc_idx = rth_df['Close'].idxmax()
+                result["primary_high_close"] = round(float(rth_df.loc[primary_hc_idx, 'Close']), 2)
+                result["primary_high_close_time"] = primary_hc_idx
+
+                # ─────────────────────────────────────────────────────────────
+                # LOWEST WICK: Absolute lowest low of any candle
+                # Used for: DESCENDING floor (wicks mark absolute bottom)
+                # ─────────────────────────────────────────────────────────────
+                primary_lw_idx = rth_df['Low'].idxmin()
+                result["primary_low_wick"] = round(float(rth_df.loc[primary_lw_idx, 'Low']), 2)
+                result["primary_low_wick_time"] = primary_lw_idx
+
+                # ─────────────────────────────────────────────────────────────
+                # LOWEST CLOSE: Lowest close of any candle
+                # Used for: ASCENDING floor (body defines support)
+                # ─────────────────────────────────────────────────────────────
+                primary_lc_idx = rth_df['Close'].idxmin()
+                result["primary_low_close"] = round(float(rth_df.loc[primary_lc_idx, 'Close']), 2)
+                result["primary_low_close_time"] = primary_lc_idx
+
+                # ─────────────────────────────────────────────────────────────
+                # SECONDARY HIGH WICK: Lower high made 1hr+ after primary
+                # ─────────────────────────────────────────────────────────────
+                min_gap = timedelta(hours=1)
+                secondary_high_search = rth_df[rth_df.index >= primary_high_idx + min_gap]
+                if not secondary_high_search.empty:
+                    secondary_high_candidates = secondary_high_search[
+                        secondary_high_search['High'] < result["primary_high_wick"]
+                    ]
+                    if not secondary_high_candidates.empty:
+                        sec_high_idx = secondary_high_candidates['High'].idxmax()
+                        result["secondary_high_wick"] = round(float(secondary_high_candidates.loc[sec_high_idx, 'High']), 2)
+                        result["secondary_high_wick_time"] = sec_high_idx
+
+                # ─────────────────────────────────────────────────────────────
+                # SECONDARY LOW WICK: Higher low wick made 1hr+ after primary
+                # ─────────────────────────────────────────────────────────────
+                secondary_low_search = rth_df[rth_df.index >= primary_lw_idx + min_gap]
+                if not secondary_low_search.empty:
+                    secondary_low_candidates = secondary_low_search[
+                        secondary_low_search['Low'] > result["primary_low_wick"]
+                    ]
+                    if not secondary_low_candidates.empty:
+                        sec_low_idx = secondary_low_candidates['Low'].idxmin()
+                        result["secondary_low_wick"] = round(float(secondary_low_candidates.loc[sec_low_idx, 'Low']), 2)
+                        result["secondary_low_wick_time"] = sec_low_idx
+
+                # Also store overall H/L/C for display
+                result["high"] = result["primary_high_wick"]
+                result["low"] = result["primary_low_wick"]
+                result["close"] = round(float(rth_df.iloc[-1]['Close']), 2)
+                result["available"] = True
+
+                # Legacy keys for backward compatibility
+                result["highest_wick"] = result["primary_high_wick"]
+                result["highest_wick_time"] = result["primary_high_wick_time"]
+                result["lowest_close"] = result["primary_low_close"]
+                result["lowest_close_time"] = result["primary_low_close_time"]
+                result["primary_low_open"] = result["primary_low_close"]  # Map old key
+                result["primary_low_open_time"] = result["primary_low_close_time"]
+
+    except Exception as e:
+        pass
+    return result
+
+def prior_day_anchors(prior_rth):
+    """
+    Unprojected prior day targets plus the projections they need.
+
+    Returns:
+        (result, projections) - result has every target key with the anchors
+        filled in; projections maps target key -> (price, anchor_time, direction)
+    """
+    result = {
+        "available": False,
+        # Primary High Wick (ascending ceiling)
+        "primary_high_wick": None,
+        "primary_high_wick_time": None,
+        "primary_high_wick_ascending": None,
+        "primary_high_wick_descending": None,  # Keep for backward compat
+        # Primary High Close (descending ceiling)
+        "primary_high_close": None,
+        "primary_high_close_time": None,
+        "primary_high_close_descending": None,
+        # Primary Low Wick (descending floor)
+        "primary_low_wick": None,
+        "primary_low_wick_time": None,
+        "primary_low_wick_descending": None,
+        # Primary Low Close (ascending floor)
+        "primary_low_close": None,
+        "primary_low_close_time": None,
+        "primary_low_close_ascending": None,
+        # Secondary pivots
+        "secondary_high_wick": None,
+        "secondary_high_wick_time": None,
+        "secondary_high_wick_ascending": None,
+        "secondary_high_wick_descending": None,
+        "secondary_low_wick": None,
+        "secondary_low_wick_time": None,
+        "secondary_low_wick_descending": None,
+        # Legacy keys for backward compatibility
+        "primary_low_open": None,
+        "primary_low_open_time": None,
+        "primary_low_open_ascending": None,
+        "primary_low_open_descending": None,
+        "secondary_low_open": None,
+        "secondary_low_open_ascending": None,
+        "secondary_low_open_descending": None,
+        "highest_wick": None,
+        "highest_wick_ascending": None,
+        "highest_wick_descending": None,
+        "lowest_close": None,
+        "lowest_close_ascending": None,
+        "lowest_close_descending": None,
+    }
+
+    if not prior_rth.get("available"):
+        return result, {}
+
+    result["available"] = True
+
+    # Every projection is registered here as key -> (anchor price, anchor time, direction)
+    # and projected by the caller in one engine call
+    projections = {}
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # PRIMARY HIGH WICK → Ascending ceiling anchor
+    # ─────────────────────────────────────────────────────────────────────────
+    if prior_rth.get("primary_high_wick") is not None and prior_rth.get("primary_high_wick_time"):
+        result["primary_high_wick"] = prior_rth["primary_high_wick"]
+        result["primary_high_wick_time"] = prior_rth["primary_high_wick_time"]
+        anchor = (prior_rth["primary_high_wick"], prior_rth["primary_high_wick_time"])
+        projections["primary_high_wick_ascending"] = anchor + (1,)
+        projections["primary_high_wick_descending"] = anchor + (-1,)
+        result["highest_wick"] = result["primary_high_wick"]
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # PRIMARY HIGH CLOSE → Descending ceiling anchor
+    # ─────────────────────────────────────────────────────────────────────────
+    if prior_rth.get("primary_high_close") is not None and prior_rth.get("primary_high_close_time"):
+        result["primary_high_close"] = prior_rth["primary_high_close"]
+        result["primary_high_close_time"] = prior_rth["primary_high_close_time"]
+        projections["primary_high_close_descending"] = (prior_rth["primary_high_close"], prior_rth["primary_high_close_time"], -1)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # PRIMARY LOW WICK → Descending floor anchor
+    # ─────────────────────────────────────────────────────────────────────────
+    if prior_rth.get("primary_low_wick") is not None and prior_rth.get("primary_low_wick_time"):
+        result["primary_low_wick"] = prior_rth["primary_low_wick"]
+        result["primary_low_wick_time"] = prior_rth["primary_low_wick_time"]
+        projections["primary_low_wick_descending"] = (prior_rth["primary_low_wick"], prior_rth["primary_low_wick_time"], -1)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # PRIMARY LOW CLOSE → Ascending floor anchor
+    # ─────────────────────────────────────────────────────────────────────────
+    lc_key = "primary_low_close" if prior_rth.get("primary_low_close") else "primary_low_open"
+    lc_time_key = lc_key + "_time"
+    if prior_rth.get(lc_key) is not None and prior_rth.get(lc_time_key):
+        result["primary_low_close"] = prior_rth[lc_key]
+        result["primary_low_close_time"] = prior_rth[lc_time_key]
+        anchor = (prior_rth[lc_key], prior_rth[lc_time_key])
+        projections["primary_low_close_ascending"] = anchor + (1,)
+        projections["primary_low_open_descending"] = anchor + (-1,)    # Legacy
+        # Legacy mappings
+        result["primary_low_open"] = result["primary_low_close"]
+        result["primary_low_open_time"] = result["primary_low_close_time"]
+        result["lowest_close"] = result["primary_low_close"]
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # SECONDARY HIGH WICK
+    # ─────────────────────────────────────────────────────────────────────────
+    if prior_rth.get("secondary_high_wick") is not None and prior_rth.get("secondary_high_wick_time"):
+        result["secondary_high_wick"] = prior_rth["secondary_high_wick"]
+        result["secondary_high_wick_time"] = prior_rth["secondary_high_wick_time"]
+        anchor = (prior_rth["secondary_high_wick"], prior_rth["secondary_high_wick_time"])
+        projections["secondary_high_wick_ascending"] = anchor + (1,)
+        projections["secondary_high_wick_descending"] = anchor + (-1,)
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # SECONDARY LOW WICK
+    # ─────────────────────────────────────────────────────────────────────────
+    slw_key = "secondary_low_wick" if prior_rth.get("secondary_low_wick") else "secondary_low_open"
+    slw_time_key = slw_key + "_time"
+    if prior_rth.get(slw_key) is not None and prior_rth.get(slw_time_key):
+        result["secondary_low_wick"] = prior_rth[slw_key]
+        result["secondary_low_wick_time"] = prior_rth[slw_time_key]
+        anchor = (prior_rth[slw_key], prior_rth[slw_time_key])
+        projections["secondary_low_wick_descending"] = anchor + (-1,)
+        projections["secondary_low_open_ascending"] = anchor + (1,)    # Legacy
+        result["secondary_low_open"] = result["secondary_low_wick"]
+
+    return result, projections
+
+def finish_prior_day_targets(result, projections, levels):
+    """Fill projected levels (ordered like projections) and their legacy aliases into result."""
+    result.update(zip(projections, levels))
+
+    # Legacy aliases of projected levels
+    if "primary_high_wick_ascending" in projections:
+        result["highest_wick_ascending"] = result["primary_high_wick_ascending"]
+        result["highest_wick_descending"] = result["primary_high_wick_descending"]
+    if "primary_low_close_ascending" in projections:
+        result["primary_low_open_ascending"] = result["primary_low_close_ascending"]
+        result["lowest_close_ascending"] = result["primary_low_close_ascending"]
+        result["lowest_close_descending"] = result["primary_low_open_descending"]
+    if "secondary_low_wick_descending" in projections:
+        result["secondary_low_open_descending"] = result["secondary_low_wick_descending"]
+
+    return result
+
+@timed("stage")
+def calc_prior_day_targets(prior_rth, ref_time):
+    """Calculate BOTH ascending and descending targets from ALL prior day anchors.
+
+    PIVOT TYPE RULES:
+    - Ascending ceiling  = Highest WICK projected up  (wicks mark absolute tops)
+    - Ascending floor    = Lowest CLOSE projected up  (bodies define support)
+    - Descending ceiling = Highest CLOSE projected down (bodies define resistance)
+    - Descending floor   = Lowest WICK projected down  (wicks mark absolute bottoms)
+
+    From PRIMARY HIGH WICK (ascending ceiling anchor):
+    - Ascending line (+0.52/30min) = ascending ceiling target
+
+    From PRIMARY HIGH CLOSE (descending ceiling anchor):
+    - Descending line (-0.52/30min) = descending ceiling target
+
+    From PRIMARY LOW WICK (descending floor anchor):
+    - Descending line (-0.52/30min) = descending floor target
+
+    From PRIMARY LOW CLOSE (ascending floor anchor):
+    - Ascending line (+0.52/30min) = ascending floor target
+
+    Returns dict with all targets.
+    """
+    result, projections = prior_day_anchors(prior_rth)
+    levels = []
+    if projections:
+        levels, _ = project_at([a[0] for a in projections.values()], [a[1] for a in projections.values()],
+                               [a[2] for a in projections.values()], ref_time)
+    return finish_prior_day_targets(result, projections, levels)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SESSION EXTRACTION
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def extract_sessions(es_candles, trading_date):
+    if es_candles is None or es_candles.empty:
+        return None
+    result = {}
+    overnight_day = get_prior_trading_day(trading_date)
+    df = es_candles.copy()
+    if df.index.tz is None:
+        df.index = df.index.tz_localize(ET).tz_convert(CT)
+    else:
+        df.index = df.index.tz_convert(CT)
+
+    sessions = {
+        "sydney": (CT.localize(datetime.combine(overnight_day, time(17, 0))),
+                   CT.localize(datetime.combine(overnight_day, time(20, 30)))),
+        "tokyo": (CT.localize(datetime.combine(overnight_day, time(21, 0))),
+                  CT.localize(datetime.combine(trading_date, time(1, 30)))),
+        "london": (CT.localize(datetime.combine(trading_date, time(2, 0))),
+                   CT.localize(datetime.combine(trading_date, time(5, 30)))),  # London ends at 5:30 AM CT
+        "overnight": (CT.localize(datetime.combine(overnight_day, time(17, 0))),
+                      CT.localize(datetime.combine(trading_date, time(8, 30))))
+    }
+
+    for name, (start, end) in sessions.items():
+        mask = (df.index >= start) & (df.index <= end)
+        data = df[mask]
+        if not data.empty:
+            result[name] = {
+                "high": round(data['High'].max(), 2),
+                "low": round(data['Low'].min(), 2),
+                "high_time": data['High'].idxmax(),
+                "low_time": data['Low'].idxmin(),
+                # Close-based pivots for ascending floor / descending ceiling
+                "highest_close": round(data['Close'].max(), 2),
+                "lowest_close": round(data['Close'].min(), 2),
+                "highest_close_time": data['Close'].idxmax(),
+                "lowest_close_time": data['Close'].idxmin(),
+            }
+    return result
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CHANNEL LOGIC
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def determine_channel(sydney, tokyo, london=None):
+    """
+    Determine channel type by comparing Asian Session vs European Session.
+
+    The overnight session is viewed as ONE structure:
+    - Asian Session = Sydney + Tokyo combined (their combined high/low)
+    - European Session = London
+
+    ASCENDING: London made higher highs AND/OR higher lows vs Asian
+    DESCENDING: London made lower highs AND/OR lower lows vs Asian
+    MIXED: Conflicting signals (higher high + lower low, or vice versa)
+    CONTRACTING: London stayed inside Asian range
+    """
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # FALLBACK: No Sydney but have Tokyo + London → Tokyo = Asian, London = European
+    # ─────────────────────────────────────────────────────────────────────────
+    if not sydney and tokyo and london:
+        asian_high = tokyo["high"]
+        asian_low = tokyo["low"]
+        asian_high_time = tokyo.get("high_time")
+        asian_low_time = tokyo.get("low_time")
+
+        # Use the overall high/low for pivot points
+        true_high = max(asian_high, london["high"])
+        true_low = min(asian_low, london["low"])
+        high_time = asian_high_time if asian_high >= london["high"] else london.get("high_time")
+        low_time = asian_low_time if asian_low <= london["low"] else london.get("low_time")
+
+        # Compare London vs Tokyo (Asian)
+        london_higher_high = london["high"] > asian_high
+        london_higher_low = london["low"] > asian_low
+        london_lower_high = london["high"] < asian_high
+        london_lower_low = london["low"] < asian_low
+
+        return _determine_channel_from_comparison(
+            asian_high, asian_low, london["high"], london["low"],
+            london_higher_high, london_higher_low, london_lower_high, london_lower_low,
+            true_high, true_low, high_time, low_time, "Tokyo", "London"
+        )
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # NORMAL CASE: Need at least Sydney + Tokyo for Asian session
+    # ─────────────────────────────────────────────────────────────────────────
+    if not sydney or not tokyo:
+        return ChannelType.UNDETERMINED, "Missing session data (need Sydney+Tokyo or Tokyo+London)", None, None, None, None
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # ASIAN SESSION: Combine Sydney + Tokyo into one session
+    # ─────────────────────────────────────────────────────────────────────────
+    asian_high = max(sydney["high"], tokyo["high"])
+    asian_low = min(sydney["low"], tokyo["low"])
+
+    # Track which session made the high/low for time reference
+    if sydney["high"] >= tokyo["high"]:
+        asian_high_time = sydney.get("high_time")
+    else:
+        asian_high_time = tokyo.get("high_time")
+
+    if sydney["low"] <= tokyo["low"]:
+        asian_low_time = sydney.get("low_time")
+    else:
+        asian_low_time = tokyo.get("low_time")
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # NO LONDON: Can only use Asian session data
+    # ─────────────────────────────────────────────────────────────────────────
+    if not london:
+        # Without London, compare Sydney vs Tokyo within Asian session
+        tokyo_higher_high = tokyo["high"] > sydney["high"]
+        tokyo_higher_low = tokyo["low"] > sydney["low"]
+        tokyo_lower_high = tokyo["high"] < sydney["high"]
+        tokyo_lower_low = tokyo["low"] < sydney["low"]
+
+        if tokyo_higher_high and tokyo_higher_low:
+            return ChannelType.ASCENDING, f"Asian: Tokyo higher H/L vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
+        elif tokyo_lower_high and tokyo_lower_low:
+            return ChannelType.DESCENDING, f"Asian: Tokyo lower H/L vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
+        elif tokyo_higher_high and tokyo_lower_low:
+            return ChannelType.MIXED, f"Asian: Tokyo expanded both ways", asian_high, asian_low, asian_high_time, asian_low_time
+        elif tokyo_lower_high and tokyo_higher_low:
+            return ChannelType.CONTRACTING, f"Asian: Tokyo contracted vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
+        elif tokyo_higher_high or tokyo_higher_low:
+            return ChannelType.ASCENDING, f"Asian: Tokyo higher {'high' if tokyo_higher_high else 'low'}", asian_high, asian_low, asian_high_time, asian_low_time
+        elif tokyo_lower_high or tokyo_lower_low:
+            return ChannelType.DESCENDING, f"Asian: Tokyo lower {'high' if tokyo_lower_high else 'low'}", asian_high, asian_low, asian_high_time, asian_low_time
+        else:
+            return ChannelType.CONTRACTING, "Asian: No clear direction", asian_high, asian_low, asian_high_time, asian_low_time
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # WITH LONDON: Compare European (London) vs Asian (Sydney+Tokyo)
+    # This is the PRIMARY determination method
+    # ─────────────────────────────────────────────────────────────────────────
+
+    # Overall high/low for pivot points
+    true_high = max(asian_high, london["high"])
+    true_low = min(asian_low, london["low"])
+    high_time = asian_high_time if asian_high >= london["high"] else london.get("high_time")
+    low_time = asian_low_time if asian_low <= london["low"] else london.get("low_time")
+
+    # Compare London vs Asian session
+    london_higher_high = london["high"] > asian_high
+    london_higher_low = london["low"] > asian_low
+    london_lower_high = london["high"] < asian_high
+    london_lower_low = london["low"] < asian_low
+
+    return _determine_channel_from_comparison(
+        asian_high, asian_low, london["high"], london["low"],
+        london_higher_high, london_higher_low, london_lower_high, london_lower_low,
+        true_high, true_low, high_time, low_time, "Asian", "London"
+    )
+
+
+def _determine_channel_from_comparison(asian_high, asian_low, london_high, london_low,
+                                        higher_high, higher_low, lower_high, lower_low,
+                                        true_high, true_low, high_time, low_time,
+                                        asian_name, london_name):
+    """
+    Helper function to determine channel type from session comparison.
+
+    ASCENDING: Higher highs AND higher lows (or just higher lows - key signal)
+    DESCENDING: Lower highs AND lower lows (or just lower highs - key signal)
+    MIXED: Conflicting signals
+    CONTRACTING: London inside Asian range
+    """
+
+    # Calculate the differences for display
+    high_diff = london_high - asian_high
+    low_diff = london_low - asian_low
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # CLEAR PATTERNS (both high and low agree)
+    # ─────────────────────────────────────────────────────────────────────────
+    if higher_high and higher_low:
+        # Clear ASCENDING: Both high and low are higher
+        reason = f"{london_name} > {asian_name}: Higher H (+{high_diff:.1f}) & Higher L (+{low_diff:.1f})"
+        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
+
+    if lower_high and lower_low:
+        # Clear DESCENDING: Both high and low are lower
+        reason = f"{london_name} < {asian_name}: Lower H ({high_diff:.1f}) & Lower L ({low_diff:.1f})"
+        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # MIXED PATTERNS (high and low conflict)
+    # ─────────────────────────────────────────────────────────────────────────
+    if higher_high and lower_low:
+        # Expanded both ways - MIXED
+        reason = f"{london_name} expanded: Higher H (+{high_diff:.1f}) but Lower L ({low_diff:.1f})"
+        return ChannelType.MIXED, reason, true_high, true_low, high_time, low_time
+
+    if lower_high and higher_low:
+        # Contracted range - determine bias by MAGNITUDE of moves
+        # Whichever move is larger determines the bias
+        high_move = abs(high_diff)  # How much lower the high is
+        low_move = abs(low_diff)    # How much higher the low is
+
+        if low_move > high_move * 2:
+            # Higher low is significantly larger - ASCENDING bias
+            # Buyers are strongly defending, slight lower high doesn't matter
+            reason = f"{london_name}: Higher L (+{low_diff:.1f}) dominates Lower H ({high_diff:.1f}) → Ascending"
+            return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
+        elif high_move > low_move * 2:
+            # Lower high is significantly larger - DESCENDING bias
+            reason = f"{london_name}: Lower H ({high_diff:.1f}) dominates Higher L (+{low_diff:.1f}) → Descending"
+            return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
+        else:
+            # Moves are similar magnitude - MIXED (no clear direction)
+            reason = f"{london_name} contracted: Lower H ({high_diff:.1f}), Higher L (+{low_diff:.1f}) → Mixed"
+            return ChannelType.MIXED, reason, true_high, true_low, high_time, low_time
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # SINGLE SIGNAL PATTERNS (only one of high/low moved)
+    # ─────────────────────────────────────────────────────────────────────────
+    if higher_high and not lower_low and not higher_low:
+        # Only higher high - ASCENDING
+        reason = f"{london_name}: Higher H (+{high_diff:.1f}), L unchanged"
+        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
+
+    if higher_low and not lower_high and not higher_high:
+        # Only higher low - ASCENDING (buyers defending)
+        reason = f"{london_name}: Higher L (+{low_diff:.1f}), H unchanged"
+        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
+
+    if lower_high and not higher_low and not lower_low:
+        # Only lower high - DESCENDING (sellers defending)
+        reason = f"{london_name}: Lower H ({high_diff:.1f}), L unchanged"
+        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
+
+    if lower_low and not higher_high and not lower_high:
+        # Only lower low - DESCENDING
+        reason = f"{london_name}: Lower L ({low_diff:.1f}), H unchanged"
+        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
+
+    # ─────────────────────────────────────────────────────────────────────────
+    # NO MOVEMENT (London = Asian range)
+    # ─────────────────────────────────────────────────────────────────────────
+    reason = f"{london_name} = {asian_name} range (no expansion)"
+    return ChannelType.CONTRACTING, reason, true_high, true_low, high_time, low_time
+
+
+@timed("stage")
+def validate_and_adjust_pivots(channel_type, upper_pivot, lower_pivot, upper_time, lower_time, 
+                                sessions_data, ref_time):
+    """
+    Validate that no price broke through the projected channel lines during building phase.
+    If price broke through, adjust the pivot to the new extreme BUT ALSO TRACK THE ORIGINAL.
+
+    Rule: No price can exist outside the channel before 5:30 AM lock.
+    - If price broke BELOW ascending floor line → new lower_pivot = that low
+    - If price broke ABOVE descending ceiling line → new upper_pivot = that high
+
+    IMPORTANT: We track BOTH because the market often respects the ORIGINAL level
+    even after an overnight "break" (like today's Sydney floor example).
+
+    Args:
+        channel_type: ASCENDING, DESCENDING, MIXED, etc.
+        upper_pivot, lower_pivot: Current pivot prices
+        upper_time, lower_time: When pivots were made
+        sessions_data: Dict with sydney, tokyo, london session data
+        ref_time: Reference time for projection
+
+    Returns:
+        Dict with both original and adjusted pivots:
+        {
+            "upper_pivot": adjusted_upper,
+            "lower_pivot": adjusted_lower,
+            "upper_time": adjusted_upper_time,
+            "lower_time": adjusted_lower_time,
+            "original_upper_pivot": original_upper,
+            "original_lower_pivot": original_lower,
+            "original_upper_time": original_upper_time,
+            "original_lower_time": original_lower_time,
+            "floor_was_adjusted": bool,
+            "ceiling_was_adjusted": bool,
+            "adjustment_session": which session caused the adjustment
+        }
+    """
+
+    result = {
+        "upper_pivot": upper_pivot,
+        "lower_pivot": lower_pivot,
+        "upper_time": upper_time,
+        "lower_time": lower_time,
+        "original_upper_pivot": upper_pivot,
+        "original_lower_pivot": lower_pivot,
+        "original_upper_time": upper_time,
+        "original_lower_time": lower_time,
+        "floor_was_adjusted": False,
+        "ceiling_was_adjusted": False,
+        "floor_adjustment_session": None,
+        "ceiling_adjustment_session": None,
+    }
+
+    if not sessions_data or channel_type in [ChannelType.UNDETERMINED, ChannelType.CONTRACTING]:
+        return result
+
+    # Collect all session lows and highs with their times
+    all_lows = []
+    all_highs = []
+
+    for session_name in ["sydney", "tokyo", "london"]:
+        session = sessions_data.get(session_name)
+        if session:
+            all_lows.append((session["low"], session.get("low_time"), session_name))
+            all_highs.append((session["high"], session.get("high_time"), session_name))
+
+    adjusted_lower = lower_pivot
+    adjusted_lower_time = lower_time
+    adjusted_upper = upper_pivot
+    adjusted_upper_time = upper_time
+
+    # For ASCENDING channel: Check if any price broke below the ascending floor line
+    if channel_type == ChannelType.ASCENDING:
+        for low_price, low_time_val, session_name in all_lows:
+            if low_time_val and lower_time and low_time_val > lower_time:
+                # Calculate where the ascending floor would be at this time
+                blocks = blocks_between(lower_time, low_time_val)
+                projected_floor = adjusted_lower + SLOPE * blocks
+
+                # If price went below the projected floor, this becomes new pivot
+                if low_price < projected_floor:
+                    adjusted_lower = low_price
+                    adjusted_lower_time = low_time_val
+                    result["floor_was_adjusted"] = True
+                    result["floor_adjustment_session"] = session_name
+
+    # For DESCENDING channel: Check if any price broke above the descending ceiling line
+    elif channel_type == ChannelType.DESCENDING:
+        for high_price, high_time_val, session_name in all_highs:
+            if high_time_val and upper_time and high_time_val > upper_time:
+                # Calculate where the descending ceiling would be at this time
+                blocks = blocks_between(upper_time, high_time_val)
+                projected_ceiling = adjusted_upper - SLOPE * blocks
+
+                # If price went above the projected ceiling, this becomes new pivot
+                if high_price > projected_ceiling:
+                    adjusted_upper = high_price
+                    adjusted_upper_time = high_time_val
+                    result["ceiling_was_adjusted"] = True
+                    result["ceiling_adjustment_session"] = session_name
+
+    # For MIXED channel: Check both directions
+    elif channel_type == ChannelType.MIXED:
+        # Check ascending floor breaks
+        for low_price, low_time_val, session_name in all_lows:
+            if low_time_val and lower_time and low_time_val > lower_time:
+                blocks = blocks_between(lower_time, low_time_val)
+                projected_floor = adjusted_lower + SLOPE * blocks
+                if low_price < projected_floor:
+                    adjusted_lower = low_price
+                    adjusted_lower_time = low_time_val
+                    result["floor_was_adjusted"] = True
+                    result["floor_adjustment_session"] = session_name
+
+        # Check descending ceiling breaks
+        for high_price, high_time_val, session_name in all_highs:
+            if high_time_val and upper_time and high_time_val > upper_time:
+                blocks = blocks_between(upper_time, high_time_val)
+                projected_ceiling = adjusted_upper - SLOPE * blocks
+                if high_price > projected_ceiling:
+                    adjusted_upper = high_price
+                    adjusted_upper_time = high_time_val
+                    result["ceiling_was_adjusted"] = True
+                    result["ceiling_adjustment_session"] = session_name
+
+    result["upper_pivot"] = adjusted_upper
+    result["lower_pivot"] = adjusted_lower
+    result["upper_time"] = adjusted_upper_time
+    result["lower_time"] = adjusted_lower_time
+
+    return result
+
+
+CHANNEL_DIRECTIONS = {   # (ceiling, floor)
+    ChannelType.ASCENDING: (1, 1),
+    ChannelType.DESCENDING: (-1, -1),
+    ChannelType.MIXED: (-1, 1),          # MIXED: For display, use descending ceiling and ascending floor (outer bounds)
+    ChannelType.CONTRACTING: (-1, 1),
+}
+
+@timed("stage")
+def calc_channel_levels(upper_pivot, lower_pivot, upper_time, lower_time, ref_time, channel_type):
+    if upper_pivot is None or lower_pivot is None:
+        return None, None
+    directions = CHANNEL_DIRECTIONS.get(channel_type)
+    if directions is None:
+        return upper_pivot, lower_pivot
+    (ceiling, floor), _ = project_at([upper_pivot, lower_pivot], [upper_time, lower_time], directions, ref_time)
+    return ceiling, floor
+
+def get_close_based_pivots(sydney, tokyo, london):
+    """
+    Extract highest close and lowest close across overnight sessions.
+    Used for: descending ceiling (highest close) and ascending floor (lowest close).
+
+    Returns dict with highest_close, lowest_close, and their times.
+    """
+    result = {
+        "highest_close": None, "highest_close_time": None,
+        "lowest_close": None, "lowest_close_time": None,
+    }
+
+    for session in [sydney, tokyo, london]:
+        if session and session.get("highest_close") is not None:
+            if result["highest_close"] is None or session["highest_close"] > result["highest_close"]:
+                result["highest_close"] = session["highest_close"]
+                result["highest_close_time"] = session.get("highest_close_time")
+            if result["lowest_close"] is None or session["lowest_close"] < result["lowest_close"]:
+                result["lowest_close"] = session["lowest_close"]
+                result["lowest_close_time"] = session.get("lowest_close_time")
+
+    return result
+
+@timed("stage")
+def calc_dual_channel_levels(upper_pivot_wick, lower_pivot_wick, upper_wick_time, lower_wick_time,
+                             ref_time, upper_pivot_close=None, lower_pivot_close=None,
+                             upper_close_time=None, lower_close_time=None):
+    """
+    Calculate ALL FOUR channel levels using correct pivot types per direction.
+
+    RULE:
+      ASCENDING ceiling  = highest WICK projected up   (wicks mark absolute tops)
+      ASCENDING floor    = lowest CLOSE projected up   (bodies define support)
+      DESCENDING ceiling = highest CLOSE projected down (bodies define resistance)
+      DESCENDING floor   = lowest WICK projected down  (wicks mark absolute bottoms)
+
+    If close-based pivots not provided, falls back to wick-based for all.
+    """
+    if upper_pivot_wick is None or lower_pivot_wick is None:
+        return None
+
+    # Fall back to wick-based if close-based not available
+    if upper_pivot_close is None:
+        upper_pivot_close = upper_pivot_wick
+    if lower_pivot_close is None:
+        lower_pivot_close = lower_pivot_wick
+    if upper_close_time is None:
+        upper_close_time = upper_wick_time
+    if lower_close_time is None:
+        lower_close_time = lower_wick_time
+
+    levels, blocks = project_at(
+        [lower_pivot_close, upper_pivot_wick, upper_pivot_close, lower_pivot_wick],
+        [lower_close_time, upper_wick_time, upper_close_time, lower_wick_time],
+        [1, 1, -1, -1], ref_time)
+
+    return {
+        # ASCENDING CHANNEL
+        "asc_floor": levels[0],      # Lowest CLOSE going UP
+        "asc_ceiling": levels[1],    # Highest WICK going UP
+
+        # DESCENDING CHANNEL
+        "desc_ceiling": levels[2],   # Highest CLOSE going DOWN
+        "desc_floor": levels[3],     # Lowest WICK going DOWN
+
+        # Metadata
+        "blocks_high": blocks[1],
+        "blocks_low": blocks[3],
+        "overnight_high": upper_pivot_wick,
+        "overnight_low": lower_pivot_wick,
+        "overnight_high_close": upper_pivot_close,
+        "overnight_low_close": lower_pivot_close,
+    }
+
+def get_position(price, ceiling, floor):
+    if price > ceiling:
+        return Position.ABOVE
+    elif price < floor:
+        return Position.BELOW
+    return Position.INSIDE
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# REFERENCE LADDER - Every reference time projected in one pass
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# The channel, dual-channel and prior day levels only depend on the reference
+# time through the projection, so all of them are projected to every sidebar
+# reference time at once. Switching the reference time (or listing them all)
+# is then a row lookup. Results have the same shape as calc_channel_levels,
+# calc_dual_channel_levels and calc_prior_day_targets.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+REFERENCE_TIME_START = time(8, 0)     # Sidebar "Reference Time (CT)" range
+REFERENCE_TIME_END = time(11, 30)
+
+@timed("stage")
+def build_reference_ladder(channel_type, pivot_validation, close_pivots, prior_rth, trading_date):
+    """
+    Project every reference-time dependent level to all reference times.
+
+    Args:
+        channel_type: Channel type from determine_channel
+        pivot_validation: Result of validate_and_adjust_pivots (adjusted and original pivots)
+        close_pivots: Result of get_close_based_pivots
+        prior_rth: Prior day RTH data
+        trading_date: Date the reference times fall on
+
+    Returns:
+        build_level_ladder dict plus the unprojected prior day targets and the
+        pivots needed to rebuild the dual channel metadata
+    """
+    directions = CHANNEL_DIRECTIONS.get(channel_type)
+    anchors = {}
+    dual_pivots = {}
+    for prefix in ("", "original_"):
+        upper = pivot_validation[prefix + "upper_pivot"]
+        lower = pivot_validation[prefix + "lower_pivot"]
+        upper_time = pivot_validation[prefix + "upper_time"]
+        lower_time = pivot_validation[prefix + "lower_time"]
+        if upper is None or lower is None:
+            continue
+
+        # Channel ceiling/floor (unknown channel types stay flat at the pivots)
+        if directions is None:
+            anchors[prefix + "ceiling"] = (upper, None, 0)
+            anchors[prefix + "floor"] = (lower, None, 0)
+        else:
+            anchors[prefix + "ceiling"] = (upper, upper_time, directions[0])
+            anchors[prefix + "floor"] = (lower, lower_time, directions[1])
+
+        # Dual channel - close pivots fall back to the wicks like calc_dual_channel_levels
+        upper_close = close_pivots.get("highest_close")
+        lower_close = close_pivots.get("lowest_close")
+        upper_close_time = close_pivots.get("highest_close_time") or upper_time
+        lower_close_time = close_pivots.get("lowest_close_time") or lower_time
+        if upper_close is None:
+            upper_close = upper
+        if lower_close is None:
+            lower_close = lower
+        anchors[prefix + "asc_floor"] = (lower_close, lower_close_time, 1)
+        anchors[prefix + "asc_ceiling"] = (upper, upper_time, 1)
+        anchors[prefix + "desc_ceiling"] = (upper_close, upper_close_time, -1)
+        anchors[prefix + "desc_floor"] = (lower, lower_time, -1)
+        dual_pivots[prefix] = (upper, lower, upper_close, lower_close)
+
+    prior_targets, prior_projections = prior_day_anchors(prior_rth)
+    for key, anchor in prior_projections.items():
+        anchors["prior_" + key] = anchor
+
+    ladder = build_level_ladder(anchors, trading_date, REFERENCE_TIME_START, REFERENCE_TIME_END)
+    ladder["dual_pivots"] = dual_pivots
+    ladder["prior_targets"] = prior_targets
+    ladder["prior_keys"] = list(prior_projections)
+    return ladder
+
+@timed("stage")
+def reference_levels(ladder, ref_time):
+    """
+    Every level at ref_time, read from the ladder.
+
+    Returns:
+        Dict with channel / original_channel ((ceiling, floor) ES),
+        dual_levels / original_dual_levels (calc_dual_channel_levels dicts or None)
+        and prior_targets (calc_prior_day_targets dict)
+    """
+    row = ladder_row(ladder, ref_time)
+
+    def read(name, table="levels"):
+        col = ladder["index"].get(name)
+        if col is None or row < 0:
+            return None
+        return float(ladder[table][row, col]) if table == "levels" else int(ladder[table][row, col])
+
+    result = {}
+    for prefix in ("", "original_"):
+        result[prefix + "channel"] = (read(prefix + "ceiling"), read(prefix + "floor"))
+        dual = None
+        if prefix in ladder["dual_pivots"] and row >= 0:
+            upper, lower, upper_close, lower_close = ladder["dual_pivots"][prefix]
+            dual = {
+                "asc_floor": read(prefix + "asc_floor"),
+                "asc_ceiling": read(prefix + "asc_ceiling"),
+                "desc_ceiling": read(prefix + "desc_ceiling"),
+                "desc_floor": read(prefix + "desc_floor"),
+                "blocks_high": read(prefix + "asc_ceiling", "blocks"),
+                "blocks_low": read(prefix + "desc_floor", "blocks"),
+                "overnight_high": upper,
+                "overnight_low": lower,
+                "overnight_high_close": upper_close,
+                "overnight_low_close": lower_close,
+            }
+        result[prefix + "dual_levels"] = dual
+
+    keys = ladder["prior_keys"]
+    result["prior_targets"] = finish_prior_day_targets(dict(ladder["prior_targets"]), keys,
+                                                       [read("prior_" + k) for k in keys])
+    return result
+
+def reference_ladder_table(ladder, offset, selected=None):
+    """SPX levels at every reference time as a DataFrame (selected row marked with ▶)."""
+    columns = [
+        ("Ceiling", "ceiling"), ("Floor", "floor"),
+        ("Asc Floor", "asc_floor"), ("Asc Ceiling", "asc_ceiling"),
+        ("Desc Ceiling", "desc_ceiling"), ("Desc Floor", "desc_floor"),
+        ("PD High ↗", "prior_primary_high_wick_ascending"), ("PD Low ↘", "prior_primary_low_open_descending"),
+    ]
+    rows = []
+    for i, t in enumerate(ladder["times"]):
+        label = f"{t.hour}:{t.minute:02d}"
+        row = {"Ref Time": ("▶ " if selected == (t.hour, t.minute) else "") + label}
+        for title, name in columns:
+            col = ladder["index"].get(name)
+            row[title] = round(float(ladder["levels"][i, col]) - offset, 2) if col is not None else None
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# EXPLOSIVE MOVE DETECTOR
+# ═══════════════════════════════════════════════════════════════════════════════
+@timed("stage")
+def detect_explosive_potential(current_spx, dual_levels, prior_targets, channel_type,
+                                vix_spread, ema_data, overnight_range, prior_day_range,
+                                gap_analysis):
+    """
+    Detect explosive move potential based on TARGET DISTANCE.
+
+    The only thing that matters: How far is the profit target if structure breaks?
+    - Ascending floor breaks → Target is descending line from prior RTH low
+    - Descending ceiling breaks → Target is ascending line from prior RTH high
+
+    The further the target, the bigger the potential move.
+    """
+
+    result = {
+        "explosive_score": 0,
+        "direction_bias": None,
+        "target_distance": None,
+        "potential_move": None,
+        "conviction": "LOW"
+    }
+
+    if not dual_levels or not current_spx:
+        return result
+
+    asc_floor = dual_levels.get("asc_floor", 0)
+    desc_ceiling = dual_levels.get("desc_ceiling", 0)
+
+    # Get targets from prior day levels
+    bearish_target = None
+    bullish_target = None
+
+    if prior_targets and prior_targets.get("available"):
+        bearish_target = prior_targets.get("primary_low_open_descending")
+        bullish_target = prior_targets.get("primary_high_wick_ascending")
+
+    # Calculate target distances
+    bearish_runway = abs(asc_floor - bearish_target) if bearish_target else 0
+    bullish_runway = abs(desc_ceiling - bullish_target) if bullish_target else 0
+
+    # Determine which scenario has more potential based on channel type
+    if channel_type == ChannelType.ASCENDING and bearish_runway > 0:
+        # Ascending channel - if floor breaks, bearish target is the play
+        result["target_distance"] = bearish_runway
+        result["potential_move"] = "BEARISH"
+        result["direction_bias"] = "PUTS"
+    elif channel_type == ChannelType.DESCENDING and bullish_runway > 0:
+        # Descending channel - if ceiling breaks, bullish target is the play
+        result["target_distance"] = bullish_runway
+        result["potential_move"] = "BULLISH"
+        result["direction_bias"] = "CALLS"
+    elif bearish_runway > bullish_runway:
+        result["target_distance"] = bearish_runway
+        result["potential_move"] = "BEARISH"
+        result["direction_bias"] = "PUTS"
+    elif bullish_runway > 0:
+        result["target_distance"] = bullish_runway
+        result["potential_move"] = "BULLISH"
+        result["direction_bias"] = "CALLS"
+
+    # Score based ONLY on target distance
+    runway = result["target_distance"] or 0
+
+    if runway >= 80:
+        result["explosive_score"] = 100
+        result["conviction"] = "EXTREME"
+    elif runway >= 60:
+        result["explosive_score"] = 75
+        result["conviction"] = "HIGH"
+    elif runway >= 40:
+        result["explosive_score"] = 50
+        result["conviction"] = "MODERATE"
+    elif runway >= 25:
+        result["explosive_score"] = 30
+        result["conviction"] = "LOW"
+    else:
+        result["explosive_score"] = 0
+        result["conviction"] = "LOW"
+
+    return result
+
+
+@timed("stage")
+def analyze_market_state_v2(current_spx, dual_levels, channel_type, channel_reason,
+                            retail_bias, ema_bias, vix_position, vix, 
+                            session_tests, gap_analysis, prior_close_analysis, vix_structure,
+                            prior_targets=None, current_time=None, vix_channel_data=None):
+    """
+    OPTION C: Dual Channel Decision Engine
+
+    Always provides:
+    1. All 4 levels (asc_floor, asc_ceiling, desc_ceiling, desc_floor)
+    2. Dominant channel detection with reasoning
+    3. PRIMARY trade at dominant level (higher probability)
+    4. ALTERNATE trade if structure breaks at open
+    5. Structure break alerts (only after channel locks at 5:30 AM CT)
+    6. Confluence-based confidence scoring
+
+    Channel Building Timeline:
+    - 5:00 PM - 5:30 AM CT: Channel BUILDING (Sydney + Tokyo + London)
+    - 5:30 AM CT: Channel LOCKED
+    - 5:30 AM - 8:30 AM CT: Pre-RTH testing
+    - 8:30 AM CT: RTH Open - final assessment
+    """
+
+    if current_spx is None or dual_levels is None:
+        return {
+            "no_trade": True, 
+            "no_trade_reason": "Missing price data",
+            "dual_levels": None,
+            "primary": None,
+            "secondary": None,
+            "alternate": None,
+            "structure_alerts": [],
+            "calls_factors": [],
+            "puts_factors": [],
+            "position_summary": "No data available",
+            "channel_status": "UNKNOWN"
+        }
+
+    # Determine channel status based on time
+    channel_locked = True  # Default to locked
+    channel_status = "LOCKED"
+
+    if current_time:
+        ct_hour = current_time.hour
+        ct_minute = current_time.minute
+        ct_decimal = ct_hour + ct_minute / 60.0
+
+        # Channel builds from 5 PM (17:00) to 5:30 AM (5:30)
+        # Before 5:30 AM = still building
+        if ct_decimal < 5.5:  # Before 5:30 AM
+            channel_locked = False
+            channel_status = "BUILDING"
+        elif ct_decimal >= 17.0:  # After 5 PM = new session building
+            channel_locked = False
+            channel_status = "BUILDING"
+
+    # Extract levels
+    asc_floor = dual_levels["asc_floor"]
+    asc_ceiling = dual_levels["asc_ceiling"]
+    desc_ceiling = dual_levels["desc_ceiling"]
+    desc_floor = dual_levels["desc_floor"]
+
+    # Position analysis
+    dist_to_asc_floor = abs(current_spx - asc_floor)
+    dist_to_desc_ceiling = abs(current_spx - desc_ceiling)
+
+    near_asc_floor = dist_to_asc_floor <= NEAR_THRESHOLD
+    near_desc_ceiling = dist_to_desc_ceiling <= NEAR_THRESHOLD
+
+    below_asc_floor = current_spx < asc_floor
+    above_desc_ceiling = current_spx > desc_ceiling
+
+    # Confluence factors
+    ema_bullish = ema_bias == Bias.CALLS
+    ema_bearish = ema_bias == Bias.PUTS
+    fade_to_calls = retail_bias == Bias.CALLS
+    fade_to_puts = retail_bias == Bias.PUTS
+    floor_tested = session_tests["floor_tests"] >= 1
+    floor_multi_test = session_tests["floor_tests"] >= 2
+    ceiling_tested = session_tests["ceiling_tests"] >= 1
+    ceiling_multi_test = session_tests["ceiling_tests"] >= 2
+    gap_into_floor = gap_analysis["into_floor"]
+    gap_into_ceiling = gap_analysis["into_ceiling"]
+    prior_validates_floor = prior_close_analysis["validates_floor"]
+    prior_validates_ceiling = prior_close_analysis["validates_ceiling"]
+    vix_backwardation = vix_structure["structure"] == "BACKWARDATION"
+
+    # Build factor lists
+    calls_factors = []
+    puts_factors = []
+
+    if ema_bullish: calls_factors.append("✓ EMA bullish (8>21>200)")
+    if fade_to_calls: calls_factors.append("✓ Retail puts heavy (fade)")
+    if floor_tested: 
+        sessions_str = ", ".join(session_tests["floor_sessions"])
+        calls_factors.append(f"✓ Floor tested ({sessions_str})")
+    if floor_multi_test: calls_factors.append("✓✓ Floor multi-tested")
+    if gap_into_floor: calls_factors.append("✓ Gap down INTO floor")
+    if prior_validates_floor: calls_factors.append("✓ Prior close validates floor")
+
+    if ema_bearish: puts_factors.append("✓ EMA bearish (8<21<200)")
+    if fade_to_puts: puts_factors.append("✓ Retail calls heavy (fade)")
+    if ceiling_tested:
+        sessions_str = ", ".join(session_tests["ceiling_sessions"])
+        puts_factors.append(f"✓ Ceiling tested ({sessions_str})")
+    if ceiling_multi_test: puts_factors.append("✓✓ Ceiling multi-tested")
+    if gap_into_ceiling: puts_factors.append("✓ Gap up INTO ceiling")
+    if prior_validates_ceiling: puts_factors.append("✓ Prior close validates ceiling")
+
+    if vix_backwardation:
+        calls_factors.append("⚡ VIX backwardation (volatile)")
+        puts_factors.append("⚡ VIX backwardation (volatile)")
+
+    # VIX Channel structural bias
+    vix_channel_bullish_spx = False
+    vix_channel_bearish_spx = False
+    vix_channel_squeeze = False
+    vix_entry_signal = None  # Track specific VIX entry scenario
+
+    if vix_channel_data and vix_channel_data.get("floor") is not None:
+        vix_floor = vix_channel_data.get("floor", 0)
+        vix_ceiling = vix_channel_data.get("ceiling", 0)
+        vix_ch_type = vix_channel_data.get("channel_type")
+        vix_ch_status = vix_channel_data.get("channel_status", "BUILDING")
+
+        if vix_ch_status == "BUILDING":
+            # BUILDING - note it but don't add directional bias
+            calls_factors.append("🌊 VIX zone building (no directional bias yet)")
+            puts_factors.append("🌊 VIX zone building (no directional bias yet)")
+        elif vix and vix_ch_status == "LOCKED":
+            # Calculate proximity to channel walls (within 0.15 VIX pts = "touching")
+            TOUCH_THRESHOLD = 0.15
+            dist_to_floor = vix - vix_floor
+            dist_to_ceiling = vix_ceiling - vix
+
+            # ─── SCENARIO 1: VIX touches floor, closes above → PUTS ───
+            # VIX came down to floor and bounced = VIX going back up = SPX down
+            if dist_to_floor >= 0 and dist_to_floor <= TOUCH_THRESHOLD:
+                vix_channel_bearish_spx = True
+                vix_entry_signal = "floor_bounce"
+                puts_factors.append("🌊 VIX touching floor & closing above → PUTS (VIX bouncing up)")
+
+            # ─── SCENARIO 2: VIX touches ceiling, closes below → CALLS ───
+            # VIX went up to ceiling and got rejected = VIX going back down = SPX up
+            elif dist_to_ceiling >= 0 and dist_to_ceiling <= TOUCH_THRESHOLD:
+                vix_channel_bullish_spx = True
+                vix_entry_signal = "ceiling_rejection"
+                calls_factors.append("🌊 VIX touching ceiling & closing below → CALLS (VIX rejected)")
+
+            # ─── SCENARIO 3: VIX broke above ceiling, retesting from above → PUTS ───
+            # VIX is above ceiling (broke out), came back to touch it = ceiling is now support
+            elif vix > vix_ceiling and dist_to_ceiling >= -TOUCH_THRESHOLD and dist_to_ceiling < 0:
+                vix_channel_bearish_spx = True
+                vix_entry_signal = "ceiling_retest"
+                puts_factors.append("🌊 VIX broke ceiling, retesting from above → PUTS (ceiling=support)")
+
+            # ─── SCENARIO 4: VIX broke below floor, retesting from below → CALLS ───
+            # VIX is below floor (broke down), came back to touch it = floor is now resistance
+            elif vix < vix_floor and dist_to_floor >= -TOUCH_THRESHOLD and dist_to_floor < 0:
+                vix_channel_bullish_spx = True
+                vix_entry_signal = "floor_retest"
+                calls_factors.append("🌊 VIX broke floor, retesting from below → CALLS (floor=resistance)")
+
+            # ─── NOT AT A WALL: Use position + channel shape for general bias ───
+            elif vix > vix_ceiling:
+                # VIX above ceiling but not near it = established above
+                vix_channel_bearish_spx = True
+                puts_factors.append("🌊 VIX above channel ceiling (bearish SPX)")
+            elif vix < vix_floor:
+                # VIX below floor but not near it = established below
+                vix_channel_bullish_spx = True
+                calls_factors.append("🌊 VIX below channel floor (bullish SPX)")
+            else:
+                # Inside channel - use shape for directional bias
+                if vix_ch_type == VIXChannelType.DESCENDING:
+                    vix_channel_bullish_spx = True
+                    calls_factors.append("🌊 VIX channel descending (bullish SPX bias)")
+                elif vix_ch_type == VIXChannelType.ASCENDING:
+                    vix_channel_bearish_spx = True
+                    puts_factors.append("🌊 VIX channel ascending (bearish SPX bias)")
+                elif vix_ch_type == VIXChannelType.CONVERGING:
+                    vix_channel_squeeze = True
+                    calls_factors.append("🌊 VIX channel squeezing (breakout pending)")
+                    puts_factors.append("🌊 VIX channel squeezing (breakout pending)")
+
+    # Confidence calculation
+    def calc_conf(direction, at_level, is_break=False):
+        support = 0
+        if direction == "CALLS":
+            if ema_bullish: support += 1
+            if fade_to_calls: support += 1
+            if floor_tested: support += 1
+            if floor_multi_test: support += 1
+            if gap_into_floor: support += 1
+            if prior_validates_floor: support += 1
+            if vix_channel_bullish_spx: support += 1  # VIX channel confirms bullish
+        else:
+            if ema_bearish: support += 1
+            if fade_to_puts: support += 1
+            if ceiling_tested: support += 1
+            if ceiling_multi_test: support += 1
+            if gap_into_ceiling: support += 1
+            if prior_validates_ceiling: support += 1
+            if vix_channel_bearish_spx: support += 1  # VIX channel confirms bearish
+
+        if is_break: return "MEDIUM" if support >= 3 else "LOW"
+        if at_level:
+            if support >= 4: return "HIGH"
+            elif support >= 2: return "MEDIUM"
+            else: return "LOW"
+        else:
+            return "MEDIUM" if support >= 4 else "LOW"
+
+    # Trade builder
+    def make_trade(name, direction, entry, stop, trigger, rationale, confidence, is_primary=True):
+        # VIX-adaptive strike offset: closer ATM in low vol, further OTM in high vol
+        if vix < 15:
+            strike_offset = 10   # Low vol: stay close for higher delta
+        elif vix < 20:
+            strike_offset = 15   # Normal vol
+        elif vix < 25:
+            strike_offset = 20   # Elevated vol
+        else:
+            strike_offset = 25   # High vol: further OTM, cheaper premium
+
+        if direction == "CALLS":
+            strike = int(math.ceil((entry + strike_offset) / 5) * 5)
+            opt_type = "CALL"
+        else:
+            strike = int(math.floor((entry - strike_offset) / 5) * 5)
+            opt_type = "PUT"
+
+        # Time-aware target scaling (current_time drives it so replays are deterministic)
+        ct_now_local = current_time or datetime.now(CT)
+        hours_remaining = max(0.1, (CT.localize(datetime.combine(
+            current_time.date() if current_time else ct_now_local.date(), 
+            time(15, 0))) - ct_now_local).total_seconds() / 3600)
+
+        if hours_remaining >= 5:
+            target_pcts = [0.50, 0.75, 1.00]  # Full targets early
+        elif hours_remaining >= 3:
+            target_pcts = [0.40, 0.60, 0.80]  # Moderate midday
+        elif hours_remaining >= 1.5:
+            target_pcts = [0.30, 0.50, 0.70]  # Reduced afternoon
+        else:
+            target_pcts = [0.20, 0.35, 0.50]  # Scalp mode last 90min
+
+        entry_premium = estimate_0dte_premium(entry, strike, hours_remaining, vix, opt_type)
+        t1 = round(entry_premium * (1 + target_pcts[0]), 2)
+        t2 = round(entry_premium * (1 + target_pcts[1]), 2)
+        t3 = round(entry_premium * (1 + target_pcts[2]), 2)
+
+        # Premium-based stop (50% of premium = max loss)
+        stop_premium = round(entry_premium * 0.50, 2)
+        max_loss_dollars = round(entry_premium * 0.50 * 100, 0)
+
+        return {
+            "name": name, "direction": direction, "entry_level": entry, "stop_level": stop,
+            "trigger": trigger, "rationale": rationale, "confidence": confidence, "is_primary": is_primary,
+            "strike": strike, "contract": f"SPX {strike}{'C' if direction == 'CALLS' else 'P'} 0DTE",
+            "entry_premium": entry_premium,
+            "stop_premium": stop_premium,
+            "max_loss_dollars": max_loss_dollars,
+            "hours_remaining": round(hours_remaining, 1),
+            "target_pcts": target_pcts,
+            "targets": {
+                "t1": {"price": t1, "profit_pct": int(target_pcts[0]*100), "profit_dollars": round((t1 - entry_premium) * 100, 0)},
+                "t2": {"price": t2, "profit_pct": int(target_pcts[1]*100), "profit_dollars": round((t2 - entry_premium) * 100, 0)},
+                "t3": {"price": t3, "profit_pct": int(target_pcts[2]*100), "profit_dollars": round((t3 - entry_premium) * 100, 0)},
+            }
+        }
+
+    # Structure alerts - ONLY show "broken" if channel is locked (after 5:30 AM CT)
+    structure_alerts = []
+    if channel_locked:
+        if channel_type == ChannelType.ASCENDING and below_asc_floor:
+            structure_alerts.append(f"⚠️ STRUCTURE BROKEN: Price below ascending floor ({asc_floor:.2f})")
+        if channel_type == ChannelType.DESCENDING and above_desc_ceiling:
+            structure_alerts.append(f"⚠️ STRUCTURE BROKEN: Price above descending ceiling ({desc_ceiling:.2f})")
+    else:
+        # Channel still building - show informational message
+        if channel_type == ChannelType.ASCENDING and below_asc_floor:
+            structure_alerts.append(f"📊 CHANNEL BUILDING: Price currently below developing floor ({asc_floor:.2f})")
+        if channel_type == ChannelType.DESCENDING and above_desc_ceiling:
+            structure_alerts.append(f"📊 CHANNEL BUILDING: Price currently above developing ceiling ({desc_ceiling:.2f})")
+
+    # Initialize result
+    result = {
+        "no_trade": False, "no_trade_reason": None,
+        "channel_type": channel_type, "channel_reason": channel_reason,
+        "channel_status": channel_status,
+        "channel_locked": channel_locked,
+        "dual_levels": dual_levels,
+        "calls_factors": calls_factors, "puts_factors": puts_factors,
+        "structure_alerts": structure_alerts,
+        "near_level": near_asc_floor or near_desc_ceiling,   # Callers feed this to note_level_proximity
+        "primary": None, "secondary": None, "alternate": None, "position_summary": ""
+    }
+
+    # No trade conditions
+    if channel_type == ChannelType.CONTRACTING:
+        result["no_trade"] = True
+        result["no_trade_reason"] = "CONTRACTING channel - Wait for expansion"
+        return result
+    if channel_type == ChannelType.UNDETERMINED:
+        result["no_trade"] = True
+        result["no_trade_reason"] = "Cannot determine channel - Insufficient data"
+        return result
+
+    # ASCENDING DOMINANT
+    if channel_type == ChannelType.ASCENDING:
+        # Get price target for break scenario
+        desc_target = None
+        price_target_text = ""
+        if prior_targets and prior_targets.get("available"):
+            desc_target = prior_targets.get("primary_low_open_descending")
+            if desc_target:
+                price_target_text = f" • Target: {desc_target:.2f} (desc from prior low)"
+
+        if channel_locked and below_asc_floor:
+            # AFTER 5:30 AM and structure is broken - flip the trades
+            result["primary"] = make_trade("Ascending Floor Rejection", "PUTS", asc_floor, asc_floor + 10,
+                f"Sell rallies to broken floor {asc_floor:.2f}",
+                f"Structure broken{price_target_text} • {len(puts_factors)} factors", calc_conf("PUTS", True), True)
+            result["alternate"] = make_trade("Floor Reclaim", "CALLS", asc_floor, asc_floor - 10,
+                f"ONLY if price reclaims {asc_floor:.2f}",
+                "Recovery scenario - watch for failed breakdown", calc_conf("CALLS", True, True), False)
+            result["position_summary"] = f"⚠️ BELOW ascending floor ({asc_floor:.2f}) - BEARISH bias"
+            if desc_target:
+                result["price_target"] = desc_target
+                result["price_target_desc"] = "Descending line from prior RTH low"
+        else:
+            # Structure intact OR channel still building - show both scenarios
+            result["primary"] = make_trade("Ascending Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
+                f"Buy at floor {asc_floor:.2f}" if channel_locked else f"Buy at developing floor {asc_floor:.2f}",
+                f"KEY: Ascending floor • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), True)
+            result["alternate"] = make_trade("Floor Break → Rejection", "PUTS", asc_floor, asc_floor + 10,
+                f"IF floor {asc_floor:.2f} breaks at open",
+                f"Breakdown scenario{price_target_text} • {len(puts_factors)} factors", calc_conf("PUTS", False), False)
+            # Also keep secondary for ceiling
+            result["secondary"] = make_trade("Desc Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
+                f"If price reaches {desc_ceiling:.2f}",
+                f"Secondary level • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), False)
+
+            if channel_locked:
+                result["position_summary"] = f"{'✅ AT' if near_asc_floor else '📍 Wait for'} ascending floor ({asc_floor:.2f})"
+            else:
+                result["position_summary"] = f"🔄 CHANNEL BUILDING - Floor developing at {asc_floor:.2f}"
+
+    # DESCENDING DOMINANT
+    elif channel_type == ChannelType.DESCENDING:
+        # Get price target for break scenario
+        asc_target = None
+        price_target_text = ""
+        if prior_targets and prior_targets.get("available"):
+            asc_target = prior_targets.get("primary_high_wick_ascending")
+            if asc_target:
+                price_target_text = f" • Target: {asc_target:.2f} (asc from prior high)"
+
+        if channel_locked and above_desc_ceiling:
+            # AFTER 5:30 AM and structure is broken - flip the trades
+            result["primary"] = make_trade("Descending Ceiling Bounce", "CALLS", desc_ceiling, desc_ceiling - 10,
+                f"Buy dips to broken ceiling {desc_ceiling:.2f}",
+                f"Structure broken{price_target_text} • {len(calls_factors)} factors", calc_conf("CALLS", True), True)
+            result["alternate"] = make_trade("Failed Breakout", "PUTS", desc_ceiling, desc_ceiling + 10,
+                f"ONLY if price fails below {desc_ceiling:.2f}",
+                "Rejection scenario - watch for failed breakout", calc_conf("PUTS", True, True), False)
+            result["position_summary"] = f"🚀 ABOVE descending ceiling ({desc_ceiling:.2f}) - BULLISH bias"
+            if asc_target:
+                result["price_target"] = asc_target
+                result["price_target_desc"] = "Ascending line from prior RTH high"
+        else:
+            # Structure intact OR channel still building - show both scenarios
+            result["primary"] = make_trade("Desc Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
+                f"Sell at ceiling {desc_ceiling:.2f}" if channel_locked else f"Sell at developing ceiling {desc_ceiling:.2f}",
+                f"KEY: Descending ceiling • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), True)
+            result["alternate"] = make_trade("Ceiling Break → Bounce", "CALLS", desc_ceiling, desc_ceiling - 10,
+                f"IF ceiling {desc_ceiling:.2f} breaks at open",
+                f"Breakout scenario{price_target_text} • {len(calls_factors)} factors", calc_conf("CALLS", False), False)
+            # Also keep secondary for floor
+            result["secondary"] = make_trade("Ascending Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
+                f"If price reaches {asc_floor:.2f}",
+                f"Secondary level • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), False)
+
+            if channel_locked:
+                result["position_summary"] = f"{'✅ AT' if near_desc_ceiling else '📍 Wait for'} descending ceiling ({desc_ceiling:.2f})"
+            else:
+                result["position_summary"] = f"🔄 CHANNEL BUILDING - Ceiling developing at {desc_ceiling:.2f}"
+
+    # MIXED
+    elif channel_type == ChannelType.MIXED:
+        if dist_to_asc_floor <= dist_to_desc_ceiling:
+            result["primary"] = make_trade("Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
+                f"Price near floor {asc_floor:.2f}",
+                f"Mixed - floor closer • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), True)
+            result["secondary"] = make_trade("Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
+                f"If price reaches {desc_ceiling:.2f}",
+                f"Mixed - ceiling level • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), False)
+        else:
+            result["primary"] = make_trade("Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
+                f"Price near ceiling {desc_ceiling:.2f}",
+                f"Mixed - ceiling closer • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), True)
+            result["secondary"] = make_trade("Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
+                f"If price reaches {asc_floor:.2f}",
+                f"Mixed - floor level • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), False)
+        result["position_summary"] = f"⚖️ MIXED: Floor {asc_floor:.2f} / Ceiling {desc_ceiling:.2f}"
+
+    return result
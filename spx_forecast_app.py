@@ -8,15 +8,40 @@ import pandas as pd
 import numpy as np
 import yfinance as yf
 import requests
-import pytz
+from requests.adapters import HTTPAdapter
 import json
+import copy
+import hashlib
+import pickle
 import os
 import math
-from datetime import datetime, date, time, timedelta
-from enum import Enum
+import random
+import threading
+import functools
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from datetime import datetime, time, timedelta
+from time import monotonic, perf_counter, sleep
 from typing import Optional, Dict, List, Tuple
+from collections import OrderedDict
 from pathlib import Path
 
+from candle_ring import CandleRingReader
+from dxlink_stream import DXLinkStreamer
+from spx_core import (
+    CT, ET, UTC, METRICS, METRICS_WINDOW, timed,
+    ChannelType, Bias, VIXPosition, DataSource, VIXChannelType,
+    POLL_FACTORS, poll_phase, poll_factor, note_level_proximity,
+    now_ct, _bars_to_ct, get_prior_trading_day, get_actual_trading_day,
+    RISK_FREE_RATE, HOURS_PER_YEAR, bs_greeks, implied_vol, estimate_0dte_premium,
+    SURFACE_STRIKE_STEP, SURFACE_STRIKE_SPAN, chain_strikes, hours_to_expiry_ct,
+    build_premium_surface, surface_premium, project_entry_premiums, calculate_premium_at_entry,
+    calculate_vix_structural_channel, get_vix_position,
+    analyze_session_tests, analyze_gap, analyze_prior_close, extract_prior_day_rth,
+    extract_sessions, determine_channel, validate_and_adjust_pivots, get_close_based_pivots,
+    get_position, build_reference_ladder, reference_levels, reference_ladder_table,
+    detect_explosive_potential, analyze_market_state_v2,
+)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # PAGE CONFIG
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -25,13 +50,246 @@ st.set_page_config(page_title="SPX Prophet", page_icon="◭", layout="wide")
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
-CT = pytz.timezone("America/Chicago")
-ET = pytz.timezone("America/New_York")
-UTC = pytz.UTC
-
-SLOPE = 0.52
-VIX_SLOPE = 0.04  # VIX channel: 0.04 per 6 30-minute blocks
 SAVE_FILE = "spx_prophet_inputs.json"
+LIVE_REFRESH_SECONDS = 5                # Live dashboard panels tick this often in RTH
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# METRICS - Timing spans and counters for the hot path
+# ═══════════════════════════════════════════════════════════════════════════════
+
+METRICS_TEXTFILE = os.environ.get("SPX_METRICS_TEXTFILE")  # Prometheus textfile-collector path, written after each rerun
+
+def fetch_cache_stats():
+    """Per fetch function: hits, stale serves, misses, hit rate and call latency p50/p99 (ms)."""
+    snap = METRICS.snapshot()
+    stats = {}
+    for item in snap["counters"].get("fetch_cache_requests", []):
+        row = stats.setdefault(item["labels"]["function"], {"hit": 0, "stale": 0, "miss": 0})
+        row[item["labels"]["result"]] = item["value"]
+    for name, row in stats.items():
+        calls = row["hit"] + row["stale"] + row["miss"]
+        row["hit_rate"] = (row["hit"] + row["stale"]) / calls if calls else None
+        span = snap["spans"].get(f"fetch/{name}", {})
+        upstream = snap["spans"].get(f"upstream/{name}", {})
+        row["p50_ms"] = span.get("p50_ms")
+        row["p99_ms"] = span.get("p99_ms")
+        row["upstream_p50_ms"] = upstream.get("p50_ms")
+    return stats
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SINGLE-FLIGHT - Coalesce concurrent upstream calls across sessions
+# ═══════════════════════════════════════════════════════════════════════════════
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Process-wide call coalescing. While a call for a key is in flight, other
+    callers with the same key wait for it and share its result instead of
+    hitting the upstream again. Counts upstream calls and collapsed duplicates
+    per function.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.stats = {}
+    
+    def _stat(self, name):
+        return self.stats.setdefault(name, {"calls": 0, "collapsed": 0, "errors": 0})
+    
+    def do(self, name, key, fn, *args, **kwargs):
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._stat(name)["calls"] += 1
+            else:
+                self._stat(name)["collapsed"] += 1
+        
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            # Followers get their own copy - callers may mutate what they receive
+            return copy.deepcopy(flight.result)
+        
+        try:
+            flight.result = fn(*args, **kwargs)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stat(name)["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+@st.cache_resource(show_spinner=False)
+def get_single_flight():
+    """Process-wide instance - module globals are rebuilt on every script rerun, cache_resource is not."""
+    return SingleFlight()
+
+SINGLE_FLIGHT = get_single_flight()
+
+def _flight_key(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+def single_flight(func):
+    """Route a fetch function through SINGLE_FLIGHT. Goes under the cache decorator so only misses coalesce."""
+    name = func.__name__
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (name, tuple(_flight_key(a) for a in args),
+               tuple(sorted((k, _flight_key(v)) for k, v in kwargs.items())))
+        return SINGLE_FLIGHT.do(name, key, func, *args, **kwargs)
+    return wrapper
+
+def single_flight_stats():
+    """Per-function upstream calls, collapsed duplicates and errors, plus totals."""
+    with SINGLE_FLIGHT._lock:
+        stats = {name: dict(counts) for name, counts in SINGLE_FLIGHT.stats.items()}
+    totals = {"calls": sum(c["calls"] for c in stats.values()),
+              "collapsed": sum(c["collapsed"] for c in stats.values())}
+    return {"functions": stats, "totals": totals}
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# STALE-WHILE-REVALIDATE - Serve the last value, refresh in the background
+# ═══════════════════════════════════════════════════════════════════════════════
+
+SWR_MAX_ENTRIES = 256       # Per function; oldest entries are dropped beyond this
+SWR_WORKERS = 4
+
+@st.cache_resource(show_spinner=False)
+def _get_swr_state():
+    """Refresh pool and per-function caches, kept across script reruns."""
+    return {"pool": ThreadPoolExecutor(max_workers=SWR_WORKERS, thread_name_prefix="swr"), "functions": {}}
+
+_swr_pool = _get_swr_state()["pool"]
+_swr_functions = _get_swr_state()["functions"]
+
+class StaleWhileRevalidate:
+    """
+    Process-wide cache for one fetch function.
+    
+    Within `ttl` a call returns the cached value. Between `ttl` and
+    `max_stale` it still returns the cached value at once and schedules one
+    background refresh. Past `max_stale` (or on a cold key) the call blocks
+    on the fetch. Both bounds are scaled by poll_factor() at call time.
+    Callers get a copy, as with st.cache_data. Every call is a "fetch/" span
+    and a hit/stale/miss count in METRICS; upstream calls are "upstream/" spans.
+    """
+    
+    def __init__(self, func, ttl, max_stale):
+        self.func = func
+        self.name = func.__name__
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.entries = {}       # key -> {"value", "fetched", "refreshing"}
+        self.stats = {"hits": 0, "stale": 0, "misses": 0, "refresh_errors": 0}
+        self._lock = threading.Lock()
+    
+    def _key(self, args, kwargs):
+        return (tuple(_flight_key(a) for a in args),
+                tuple(sorted((k, _flight_key(v)) for k, v in kwargs.items())))
+    
+    def _store(self, key, value):
+        with self._lock:
+            self.entries[key] = {"value": value, "fetched": monotonic(), "refreshing": False}
+            if len(self.entries) > SWR_MAX_ENTRIES:
+                oldest = min(self.entries, key=lambda k: self.entries[k]["fetched"])
+                del self.entries[oldest]
+    
+    def _fetch(self, args, kwargs):
+        with METRICS.span(f"upstream/{self.name}"):
+            return self.func(*args, **kwargs)
+    
+    def _refresh(self, key, args, kwargs):
+        try:
+            self._store(key, self._fetch(args, kwargs))
+        except Exception:
+            with self._lock:
+                self.stats["refresh_errors"] += 1
+                if key in self.entries:
+                    self.entries[key]["refreshing"] = False
+    
+    def __call__(self, *args, **kwargs):
+        with METRICS.span(f"fetch/{self.name}"):
+            return self._get(args, kwargs)
+    
+    def _get(self, args, kwargs):
+        key = self._key(args, kwargs)
+        factor = poll_factor()
+        with self._lock:
+            entry = self.entries.get(key)
+            age = monotonic() - entry["fetched"] if entry else None
+            if entry is not None and age <= self.max_stale * factor:
+                if age <= self.ttl * factor:
+                    self.stats["hits"] += 1
+                    METRICS.count("fetch_cache_requests", function=self.name, result="hit")
+                else:
+                    self.stats["stale"] += 1
+                    METRICS.count("fetch_cache_requests", function=self.name, result="stale")
+                    if not entry["refreshing"]:
+                        entry["refreshing"] = True
+                        _swr_pool.submit(self._refresh, key, args, kwargs)
+                return copy.deepcopy(entry["value"])
+            self.stats["misses"] += 1
+            METRICS.count("fetch_cache_requests", function=self.name, result="miss")
+        value = self._fetch(args, kwargs)
+        self._store(key, value)
+        return copy.deepcopy(value)
+    
+    def age(self, *args, **kwargs):
+        """Seconds since the value for these arguments was fetched (None if not cached)."""
+        entry = self.entries.get(self._key(args, kwargs))
+        return monotonic() - entry["fetched"] if entry else None
+    
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+def stale_while_revalidate(ttl, max_stale):
+    """Decorator form of StaleWhileRevalidate; keeps .clear() like st.cache_data."""
+    def decorator(func):
+        cache = _swr_functions.get(func.__name__)
+        if cache is None:
+            cache = _swr_functions[func.__name__] = StaleWhileRevalidate(func, ttl, max_stale)
+        else:
+            # Script rerun: keep the cached values, pick up the re-executed function and bounds
+            cache.func, cache.ttl, cache.max_stale = func, ttl, max_stale
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return cache(*args, **kwargs)
+        wrapper.clear = cache.clear
+        wrapper.age = cache.age
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def swr_stats():
+    """Per-function hits, stale serves, misses and the oldest cached value's age."""
+    stats = {}
+    for name, cache in _swr_functions.items():
+        with cache._lock:
+            ages = [monotonic() - e["fetched"] for e in cache.entries.values()]
+            stats[name] = dict(cache.stats, entries=len(ages), oldest=max(ages) if ages else None)
+    return stats
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TASTYTRADE CONFIGURATION - PRIMARY DATA SOURCE
@@ -52,132 +310,178 @@ def is_tastytrade_configured():
     config = get_tastytrade_config()
     return all([config["client_id"], config["client_secret"], config["refresh_token"]])
 
-@st.cache_data(ttl=840, show_spinner=False)
-def get_tastytrade_access_token():
-    """Get access token from refresh token. Cached for 14 minutes."""
-    config = get_tastytrade_config()
-    if not all([config["client_id"], config["client_secret"], config["refresh_token"]]):
-        return None
-    try:
-        response = requests.post(
-            "https://api.tastytrade.com/oauth/token",
-            data={
+TASTYTRADE_API = "https://api.tastytrade.com"
+TT_TIMEOUT = (3.05, 10)             # (connect, read) seconds
+TT_MAX_RETRIES = 3
+TT_BACKOFF_BASE = 0.25              # Seconds; full jitter on base * 2^attempt
+TT_BACKOFF_MAX = 4.0
+TT_RETRY_STATUSES = (429, 500, 502, 503, 504)
+TT_BREAKER_THRESHOLD = 5            # Consecutive failures before the breaker opens
+TT_BREAKER_COOLDOWN = 30            # Seconds the breaker stays open
+TT_TOKEN_TTL = 900                  # Fallback access-token lifetime if the response has none
+TT_TOKEN_REFRESH_MARGIN = 120       # Refresh this long before expiry
+
+class TastytradeUnavailable(requests.RequestException):
+    """Raised while the circuit breaker is open."""
+
+class TastytradeClient:
+    """
+    One pooled keep-alive session for every Tastytrade call.
+    
+    Requests retry on connection errors and 429/5xx with jittered exponential
+    backoff, or after the server's Retry-After when it is at most TT_BACKOFF_MAX
+    (a longer one fails the call at once). After TT_BREAKER_THRESHOLD consecutive
+    failures the breaker opens and calls fail fast for TT_BREAKER_COOLDOWN
+    seconds, then one trial call is let through. The OAuth access token is
+    refreshed by a daemon thread ahead of expiry, so reruns never wait on the
+    token endpoint.
+    """
+    
+    def __init__(self, config):
+        self.config = config
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.token = None
+        self.token_expires = 0.0        # monotonic
+        self.failures = 0
+        self.open_until = 0.0           # monotonic; breaker open while now < open_until
+        self._token_lock = threading.Lock()
+        self._breaker_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._token_loop, name="tastytrade-token", daemon=True)
+        self._thread.start()
+    
+    # --- circuit breaker ---
+    def _allow(self):
+        with self._breaker_lock:
+            now = monotonic()
+            if now < self.open_until:
+                return False
+            if self.failures >= TT_BREAKER_THRESHOLD:
+                # Half-open: let this call through, re-open immediately if it fails
+                self.open_until = now + TT_BREAKER_COOLDOWN
+            return True
+    
+    def _record(self, ok):
+        with self._breaker_lock:
+            if ok:
+                self.failures, self.open_until = 0, 0.0
+            else:
+                self.failures += 1
+                if self.failures >= TT_BREAKER_THRESHOLD:
+                    self.open_until = monotonic() + TT_BREAKER_COOLDOWN
+    
+    def _send(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", TT_TIMEOUT)
+        if not self._allow():
+            raise TastytradeUnavailable(f"Tastytrade circuit open ({self.failures} consecutive failures)")
+        for attempt in range(TT_MAX_RETRIES + 1):
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code not in TT_RETRY_STATUSES:
+                    self._record(response.status_code < 500)
+                    return response
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response, error = None, e
+            if attempt == TT_MAX_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After") if response is not None else None
+            if retry_after and retry_after.isdigit():
+                delay = float(retry_after)
+                if delay > TT_BACKOFF_MAX:
+                    break    # Don't hold a rerun or worker that long - fail now, the SWR cache answers
+            else:
+                delay = random.uniform(0, min(TT_BACKOFF_MAX, TT_BACKOFF_BASE * 2 ** attempt))
+            sleep(delay)
+        self._record(False)
+        if error is not None:
+            raise error
+        return response
+    
+    # --- OAuth token ---
+    def refresh_token(self, force=False):
+        """Exchange the refresh token for a new access token. Returns it (or None)."""
+        with self._token_lock:
+            if not force and self.token is not None and self.token_expires - monotonic() > TT_TOKEN_REFRESH_MARGIN:
+                return self.token    # Another caller refreshed while we waited on the lock
+            response = self._send("POST", f"{TASTYTRADE_API}/oauth/token", data={
                 "grant_type": "refresh_token",
-                "refresh_token": config["refresh_token"],
-                "client_id": config["client_id"],
-                "client_secret": config["client_secret"],
-            },
-            timeout=30
-        )
-        if response.status_code == 200:
-            return response.json().get("access_token")
-    except Exception:
-        pass
-    return None
+                "refresh_token": self.config["refresh_token"],
+                "client_id": self.config["client_id"],
+                "client_secret": self.config["client_secret"],
+            })
+            if response.status_code == 200:
+                data = response.json()
+                self.token = data.get("access_token")
+                self.token_expires = monotonic() + float(data.get("expires_in") or TT_TOKEN_TTL)
+            return self.token
+    
+    def _token_loop(self):
+        while True:
+            try:
+                self.refresh_token()
+            except Exception:
+                pass
+            if self.token is not None and self.token_expires - monotonic() > TT_TOKEN_REFRESH_MARGIN:
+                wait = self.token_expires - monotonic() - TT_TOKEN_REFRESH_MARGIN
+            else:
+                wait = TT_BREAKER_COOLDOWN
+            self._wake.wait(wait)
+            self._wake.clear()
+    
+    def access_token(self):
+        """Current access token; only fetched inline before the first background refresh lands."""
+        if self.token is None or monotonic() >= self.token_expires:
+            try:
+                self.refresh_token()
+            except Exception:
+                return None
+        return self.token
+    
+    def invalidate_token(self):
+        """Drop the current token and have the background thread fetch a new one."""
+        self.token_expires = 0.0
+        self._wake.set()
+    
+    def get(self, url, headers=None, **kwargs):
+        """GET on the pooled session. A 401 forces one token refresh and retry."""
+        response = self._send("GET", url, headers=headers, **kwargs)
+        if response.status_code == 401 and headers is not None:
+            token = self.refresh_token(force=True)
+            if token:
+                self._wake.set()    # Re-schedule the background refresh off the new expiry
+                response = self._send("GET", url, headers=dict(headers, Authorization=f"Bearer {token}"), **kwargs)
+        return response
+
+@st.cache_resource(show_spinner=False)
+def get_tastytrade_client():
+    """Process-wide Tastytrade client (None without credentials)."""
+    if not is_tastytrade_configured():
+        return None
+    return TastytradeClient(get_tastytrade_config())
+
+def get_tastytrade_access_token():
+    """Current access token, kept fresh in the background by the Tastytrade client."""
+    client = get_tastytrade_client()
+    return client.access_token() if client else None
+
+def tastytrade_get(url, headers=None, **kwargs):
+    """GET through the pooled Tastytrade client."""
+    client = get_tastytrade_client()
+    if client is None:
+        raise TastytradeUnavailable("Tastytrade is not configured")
+    return client.get(url, headers=headers, **kwargs)
 
 def get_tastytrade_headers():
     """Get headers with valid access token."""
     token = get_tastytrade_access_token()
     return {"Authorization": f"Bearer {token}", "Content-Type": "application/json"} if token else None
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# ENUMS
-# ═══════════════════════════════════════════════════════════════════════════════
-class ChannelType(Enum):
-    ASCENDING = "ASCENDING"
-    DESCENDING = "DESCENDING"
-    MIXED = "MIXED"
-    CONTRACTING = "CONTRACTING"
-    UNDETERMINED = "UNDETERMINED"
-
-class Position(Enum):
-    ABOVE = "ABOVE"
-    INSIDE = "INSIDE"
-    BELOW = "BELOW"
-
-class Bias(Enum):
-    CALLS = "CALLS"
-    PUTS = "PUTS"
-    NEUTRAL = "NEUTRAL"
-
-class VIXPosition(Enum):
-    ABOVE_RANGE = "ABOVE"
-    IN_RANGE = "IN RANGE"
-    BELOW_RANGE = "BELOW"
-    UNKNOWN = "UNKNOWN"
-
-class DataSource(Enum):
-    TASTYTRADE = "TASTYTRADE"
-    YAHOO = "YAHOO"
-    POLYGON = "POLYGON"
-    FALLBACK = "FALLBACK"
-
 # ═══════════════════════════════════════════════════════════════════════════════
 # UTILITIES
 # ═══════════════════════════════════════════════════════════════════════════════
-def now_ct():
-    return datetime.now(CT)
-
-def blocks_between(start, end):
-    """Calculate 30-minute trading blocks between two times.
-    
-    Handles same-day, cross-day, and weekend-crossing calculations.
-    For same-day: simple elapsed time / 30 min.
-    For cross-day: accounts for RTH close/open and weekend gaps.
-    """
-    if start is None or end is None or end <= start:
-        return 0
-    
-    # If either lacks timezone info or same day, use simple calculation
-    if (start.tzinfo is None or end.tzinfo is None or 
-        start.date() == end.date()):
-        return max(0, int((end - start).total_seconds() / 1800))
-    
-    start_date = start.date()
-    end_date = end.date()
-    
-    # Blocks from start_time to 3:00 PM CT (end of RTH) on start day
-    start_day_close = start.replace(hour=15, minute=0, second=0, microsecond=0)
-    if start < start_day_close:
-        blocks_to_close = int((start_day_close - start).total_seconds() / 1800)
-    else:
-        blocks_to_close = 0
-    
-    # Blocks from 8:30 AM to end_time on final day
-    end_day_open = end.replace(hour=8, minute=30, second=0, microsecond=0)
-    if end >= end_day_open:
-        blocks_from_open = int((end - end_day_open).total_seconds() / 1800)
-    else:
-        blocks_from_open = 0
-    
-    # Check for weekend crossing
-    crosses_weekend = False
-    current = start_date + timedelta(days=1)
-    while current <= end_date:
-        if current.weekday() in [5, 6]:
-            crosses_weekend = True
-            break
-        current += timedelta(days=1)
-    if end_date.weekday() in [5, 6]:
-        crosses_weekend = True
-    
-    if crosses_weekend:
-        OVERNIGHT_WEEKEND_BLOCKS = 32
-        total_blocks = blocks_to_close + OVERNIGHT_WEEKEND_BLOCKS + blocks_from_open
-    else:
-        trading_days_between = 0
-        current = start_date + timedelta(days=1)
-        while current < end_date:
-            if current.weekday() < 5:
-                trading_days_between += 1
-            current += timedelta(days=1)
-        
-        BLOCKS_PER_FULL_DAY = 26
-        OVERNIGHT_REGULAR_BLOCKS = 17
-        blocks_middle_days = trading_days_between * BLOCKS_PER_FULL_DAY
-        total_blocks = blocks_to_close + blocks_middle_days + OVERNIGHT_REGULAR_BLOCKS + blocks_from_open
-    
-    return max(0, total_blocks)
 
 def save_inputs(data):
     try:
@@ -228,111 +532,37 @@ def load_trade_journal():
         pass
     return []
 
-def get_prior_trading_day(ref_date):
-    prior = ref_date - timedelta(days=1)
-    while prior.weekday() >= 5:
-        prior -= timedelta(days=1)
-    return prior
-
-def get_actual_trading_day(selected_date):
-    """If user selects a weekend, return the next Monday (actual trading day).
-    Otherwise return the selected date."""
-    if selected_date.weekday() == 5:  # Saturday
-        return selected_date + timedelta(days=2)  # Monday
-    elif selected_date.weekday() == 6:  # Sunday
-        return selected_date + timedelta(days=1)  # Monday
-    return selected_date
 # ═══════════════════════════════════════════════════════════════════════════════
-# BLACK-SCHOLES PRICING
+# 0DTE PREMIUM SURFACE - Whole SPXW chain x remaining half-hour blocks
 # ═══════════════════════════════════════════════════════════════════════════════
-def norm_cdf(x):
-    a1, a2, a3, a4, a5 = 0.254829592, -0.284496736, 1.421413741, -1.453152027, 1.061405429
-    p, sign = 0.3275911, 1 if x >= 0 else -1
-    x = abs(x) / math.sqrt(2)
-    t = 1.0 / (1.0 + p * x)
-    y = 1.0 - (((((a5 * t + a4) * t) + a3) * t + a2) * t + a1) * t * math.exp(-x * x)
-    return 0.5 * (1.0 + sign * y)
-
-def black_scholes(S, K, T, r, sigma, opt_type):
-    if T <= 0:
-        return max(0, S - K) if opt_type == "CALL" else max(0, K - S)
-    d1 = (math.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * math.sqrt(T))
-    d2 = d1 - sigma * math.sqrt(T)
-    if opt_type == "CALL":
-        return S * norm_cdf(d1) - K * math.exp(-r * T) * norm_cdf(d2)
-    return K * math.exp(-r * T) * norm_cdf(-d2) - S * norm_cdf(-d1)
-
-def estimate_0dte_premium(spot, strike, hours_to_expiry, vix, opt_type):
-    """
-    0DTE SPX premium estimation - calibrated to real market data.
-    
-    Includes PUT SKEW adjustment (puts are more expensive than calls).
-    
-    Calibrated against actual SPX 0DTE trades:
-    CALLS (6980C):
-    - 22 OTM @ 5.85hrs = $2.30
-    - 3 OTM @ 5.58hrs = $7.50
-    
-    PUTS (6975P):
-    - 18 OTM @ 6.5hrs = $8.60
-    - 3 OTM @ 5.5hrs = $13.45
-    
-    Average error: ~15% for both calls and puts
-    """
-    # Calculate OTM/ITM distance
-    if opt_type == "CALL":
-        otm = max(0, strike - spot)
-        itm = max(0, spot - strike)
-    else:  # PUT
-        otm = max(0, spot - strike)
-        itm = max(0, strike - spot)
-    
-    # ATM base premium (scales with VIX)
-    atm_base = 9.5 + (vix - 15) * 0.4
-    
-    # Time decay factor - non-linear, accelerates toward expiry
-    if hours_to_expiry >= 5.5:
-        time_factor = 1.0
-    elif hours_to_expiry >= 5:
-        time_factor = 0.85
-    elif hours_to_expiry >= 4:
-        time_factor = 0.65
-    elif hours_to_expiry >= 3:
-        time_factor = 0.48
-    elif hours_to_expiry >= 2:
-        time_factor = 0.32
-    elif hours_to_expiry >= 1:
-        time_factor = 0.18
-    else:
-        time_factor = 0.08
-    
-    # OTM decay with minimum floor (lottery ticket value)
-    base_decay = math.exp(-otm / 11)
-    min_floor = 2.0 * time_factor
-    
-    # Extrinsic value = max(exponential decay, floor)
-    exp_premium = atm_base * time_factor * base_decay
-    extrinsic = max(exp_premium, min_floor)
-    
-    # PUT SKEW: Puts are more expensive than calls due to crash protection demand
-    # Skew increases with distance OTM (more hedging value for far OTM puts)
-    # Near ATM: ~1.8x, Far OTM (20+): ~3.5x
-    if opt_type == "PUT":
-        skew = min(3.5, 1.8 + (otm / 20) * 1.5)
-        extrinsic = extrinsic * skew
-    
-    # Total premium = extrinsic + intrinsic
-    premium = extrinsic + itm
+
+@stale_while_revalidate(ttl=30, max_stale=120)
+@single_flight
+def fetch_premium_surface(trading_date, es_spx_offset=35.0):
+    """Premium surface over the day's SPXW chain at the current SPX / VIX (None without ES)."""
+    quotes = get_quote_hub().snapshot()
+    if quotes["es"] is None:
+        return None
+    spot = quotes["es"] - es_spx_offset
+    vix = quotes["vix"] or 16.0
     
-    return max(round(premium, 2), 0.05)
+    strikes = chain_strikes(fetch_spx_option_chain_tastytrade(trading_date), trading_date)
+    if len(strikes) == 0:
+        # No chain (no Tastytrade credentials / no 0DTE expiry) - standard 5-point grid around spot
+        center = round(spot / SURFACE_STRIKE_STEP) * SURFACE_STRIKE_STEP
+        strikes = np.arange(center - SURFACE_STRIKE_SPAN, center + SURFACE_STRIKE_SPAN + SURFACE_STRIKE_STEP,
+                            SURFACE_STRIKE_STEP, dtype=np.float64)
+    return build_premium_surface(spot, strikes, trading_date, vix)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # SPX OPTIONS PREMIUM ESTIMATION
 # ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=30, show_spinner=False)
+@stale_while_revalidate(ttl=30, max_stale=120)
+@single_flight
 def fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=35.0):
     """
-    Get SPX 0DTE option premium using Black-Scholes estimation.
+    Get SPX 0DTE option premium from the batched chain quote snapshot,
+    falling back to Black-Scholes estimation when the strike is not quoted.
     The estimate_0dte_premium function is actually quite accurate for ATM/near-ATM options.
     
     Args:
@@ -353,12 +583,14 @@ def fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=35.0
         "underlying_price": None,
         "ticker": None,
         "error": None,
+        "iv": None,
         "source": "ESTIMATED"
     }
     
     try:
-        # Get current SPX price from ES
-        current_es = fetch_es_current()
+        # Get current SPX price from ES (shared quote hub snapshot)
+        quotes = get_quote_hub().snapshot()
+        current_es = quotes["es"]
         if current_es is None:
             result["error"] = "Could not fetch ES price"
             return result
@@ -367,39 +599,52 @@ def fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=35.0
         current_spx = current_es - es_spx_offset
         result["underlying_price"] = current_spx
         
-        # Get current VIX for volatility
-        vix = fetch_vix_yahoo() or 16.0
-        
-        # Calculate hours to expiry (0DTE expires at 3:00 PM CT)
-        now = datetime.now(CT)
-        expiry_time = CT.localize(datetime.combine(trading_date, time(15, 0)))
-        hours_to_expiry = max(0.1, (expiry_time - now).total_seconds() / 3600)
-        
-        # Use our Black-Scholes estimation
-        estimated_premium = estimate_0dte_premium(
-            spot=current_spx,
-            strike=strike,
-            hours_to_expiry=hours_to_expiry,
-            vix=vix,
-            opt_type=opt_type
-        )
+        # Real mark from the batched chain snapshot; otherwise the model premium surface
+        chain_quote = fetch_chain_quote_snapshot(trading_date, es_spx_offset)["quotes"].get((float(strike), opt_type))
+        if chain_quote and chain_quote["mark"]:
+            estimated_premium = chain_quote["mark"]
+            result["source"] = "TASTYTRADE"
+        else:
+            chain_quote = None
+            # Price directly if the strike is off the surface
+            estimated_premium = surface_premium(fetch_premium_surface(trading_date, es_spx_offset), strike, opt_type)
+        if estimated_premium is None:
+            # Get current VIX for volatility
+            vix = quotes["vix"] or 16.0
+            
+            estimated_premium = estimate_0dte_premium(
+                spot=current_spx,
+                strike=strike,
+                hours_to_expiry=hours_to_expiry_ct(trading_date),
+                vix=vix,
+                opt_type=opt_type
+            )
         
         if estimated_premium:
             result["mid"] = estimated_premium
             result["last"] = estimated_premium
-            # Estimate bid/ask spread (typically 5-10 cents for SPX 0DTE)
-            spread = max(0.05, estimated_premium * 0.03)  # 3% spread or minimum 5 cents
-            result["bid"] = round(estimated_premium - spread/2, 2)
-            result["ask"] = round(estimated_premium + spread/2, 2)
+            if chain_quote and chain_quote["bid"] is not None and chain_quote["ask"] is not None:
+                result["bid"], result["ask"] = chain_quote["bid"], chain_quote["ask"]
+                result["last"] = chain_quote["last"] or estimated_premium
+            else:
+                # Estimate bid/ask spread (typically 5-10 cents for SPX 0DTE)
+                spread = max(0.05, estimated_premium * 0.03)  # 3% spread or minimum 5 cents
+                result["bid"] = round(estimated_premium - spread/2, 2)
+                result["ask"] = round(estimated_premium + spread/2, 2)
             
-            # Estimate delta using simple approximation
-            moneyness = (current_spx - strike) / current_spx
-            if opt_type == "CALL":
-                # Delta roughly 0.5 at ATM, higher ITM, lower OTM
-                result["delta"] = round(max(0.05, min(0.95, 0.5 + moneyness * 10)), 2)
+            # Analytic delta at the premium's implied vol
+            T = hours_to_expiry_ct(trading_date) / HOURS_PER_YEAR
+            iv = implied_vol(estimated_premium, current_spx, strike, T, RISK_FREE_RATE, opt_type)
+            if not math.isnan(iv):
+                delta = float(bs_greeks(current_spx, strike, T, RISK_FREE_RATE, iv, opt_type)["delta"])
+                result["iv"] = round(iv, 4)
             else:
-                # Put delta is negative
-                result["delta"] = round(max(-0.95, min(-0.05, -0.5 + moneyness * 10)), 2)
+                # Premium at its floor / intrinsic - delta is ~0 or ~1
+                in_the_money = current_spx > strike if opt_type == "CALL" else current_spx < strike
+                delta = 0.95 if in_the_money else 0.05
+                delta = delta if opt_type == "CALL" else -delta
+            # Calls 0.05..0.95, puts -0.95..-0.05
+            result["delta"] = round(math.copysign(max(0.05, min(0.95, abs(delta))), delta), 2)
             
             result["available"] = True
             
@@ -416,108 +661,170 @@ def fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=35.0
     
     return result
 
-
-def calculate_premium_at_entry(current_premium, current_spx, entry_spx, strike, opt_type, delta=None):
+def project_trade_entry_premiums(trades, trading_date, es_spx_offset=35.0):
     """
-    Calculate what an option premium will be when SPX reaches entry level.
-    
-    For CALLS at ascending floor:
-    - SPX drops to floor → CALL premium DECREASES (cheaper entry!)
-    
-    For PUTS at descending ceiling:
-    - SPX rises to ceiling → PUT premium DECREASES (cheaper entry!)
-    
-    Uses delta approximation: ΔPremium ≈ delta × ΔSPX
-    
-    Args:
-        current_premium: Current option price
-        current_spx: Current SPX price
-        entry_spx: Entry level (floor for calls, ceiling for puts)
-        strike: Option strike
-        opt_type: "CALL" or "PUT"
-        delta: Option delta (if available, otherwise estimate)
+    Projected entry premium for every planned trade in one vectorized pass.
     
     Returns:
-        Estimated premium at entry level
+        Dict of (strike, opt_type, entry_level) -> premium at entry (None if unavailable)
     """
-    if current_premium is None or current_spx is None or entry_spx is None:
-        return None
+    keys, premiums, spots, entries = [], [], [], []
+    for trade in trades:
+        if not trade:
+            continue
+        opt_type = "CALL" if trade["direction"] == "CALLS" else "PUT"
+        quote = get_option_quote(trade["strike"], opt_type, trading_date, es_spx_offset=es_spx_offset)
+        premium = quote.get("mid") or quote.get("last")
+        if quote.get("available") and premium and quote.get("underlying_price"):
+            keys.append((trade["strike"], opt_type, trade["entry_level"]))
+            premiums.append(premium)
+            spots.append(quote["underlying_price"])
+            entries.append(trade["entry_level"])
+    if not keys:
+        return {}
+    
+    projected = np.atleast_1d(project_entry_premiums(
+        premiums, spots, entries, [k[0] for k in keys], [k[1] for k in keys], hours_to_expiry_ct(trading_date)))
+    return {key: (None if np.isnan(p) else float(p)) for key, p in zip(keys, projected)}
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# INSTRUMENT MASTER - Futures and SPXW chain metadata, refreshed once a session
+# ═══════════════════════════════════════════════════════════════════════════════
+
+INSTRUMENT_MASTER_FILE = "instrument_master.json"
+INSTRUMENT_MASTER_PRODUCTS = ("ES", "VX")
+INSTRUMENT_MASTER_CHAINS = ("SPXW", "SPX")     # First underlying with a nested chain wins
+INSTRUMENT_MASTER_RETRY_SECONDS = 60           # Back-off after a failed download
+
+class InstrumentMaster:
+    """
+    Futures contracts and option-chain expirations for the current CT session.
     
-    spx_move = entry_spx - current_spx  # Negative if dropping to floor, positive if rising to ceiling
-    
-    # Estimate delta if not provided
-    if delta is None:
-        # Rough delta estimate based on moneyness
-        if opt_type == "CALL":
-            otm = strike - current_spx
-            if otm <= 0:  # ITM
-                delta = 0.60
-            elif otm <= 10:
-                delta = 0.45
-            elif otm <= 20:
-                delta = 0.30
-            elif otm <= 30:
-                delta = 0.20
-            else:
-                delta = 0.10
-        else:  # PUT
-            otm = current_spx - strike
-            if otm <= 0:  # ITM
-                delta = -0.60
-            elif otm <= 10:
-                delta = -0.45
-            elif otm <= 20:
-                delta = -0.30
-            elif otm <= 30:
-                delta = -0.20
-            else:
-                delta = -0.10
+    Downloaded once per session (or read back from disk after a restart) and
+    indexed as futures[product_code] -> contracts sorted by expiration and
+    chains[expiration] -> {strikes, settlement_type}, so every symbol,
+    streamer-symbol and strike lookup is a dict read.
+    """
     
-    # Premium change = delta × SPX move
-    # For calls: if SPX drops (negative move), premium drops (delta positive)
-    # For puts: if SPX rises (positive move), premium drops (delta negative)
-    premium_change = delta * spx_move
+    def __init__(self, path=INSTRUMENT_MASTER_FILE):
+        self.path = path
+        self.session = None
+        self.futures = {}
+        self.chains = {}
+        self.chain_root = None
+        self._next_attempt = 0.0
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self.session = data.get("session")
+                self.futures = data.get("futures", {})
+                self.chains = data.get("chains", {})
+                self.chain_root = data.get("chain_root")
+        except Exception:
+            self.session = None
+    
+    def _save(self):
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"session": self.session, "futures": self.futures,
+                           "chains": self.chains, "chain_root": self.chain_root}, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+    
+    def _download(self, headers):
+        response = tastytrade_get(f"{TASTYTRADE_API}/instruments/futures", headers=headers,
+                                  params={"product-code[]": list(INSTRUMENT_MASTER_PRODUCTS)})
+        if response.status_code != 200:
+            return False
+        futures = {}
+        for f in response.json().get("data", {}).get("items", []):
+            if f.get("product-code") in INSTRUMENT_MASTER_PRODUCTS:
+                futures.setdefault(f["product-code"], []).append({
+                    "symbol": f.get("symbol"), "streamer_symbol": f.get("streamer-symbol"),
+                    "expiration": f.get("expiration-date", ""),
+                })
+        for contracts in futures.values():
+            contracts.sort(key=lambda c: c["expiration"])
+        
+        chains, chain_root = {}, None
+        for underlying in INSTRUMENT_MASTER_CHAINS:
+            response = tastytrade_get(f"{TASTYTRADE_API}/option-chains/{underlying}/nested", headers=headers)
+            if response.status_code != 200:
+                continue
+            for item in response.json().get("data", {}).get("items", []):
+                # Items are either chains carrying an expirations list or expirations themselves
+                for exp in item.get("expirations", [item]):
+                    if exp.get("expiration-date"):
+                        chains[exp["expiration-date"]] = {
+                            "strikes": exp.get("strikes", []),
+                            "settlement_type": exp.get("settlement-type"),
+                        }
+            if chains:
+                chain_root = underlying
+                break
+        
+        self.futures, self.chains, self.chain_root = futures, chains, chain_root
+        return bool(futures) or bool(chains)
+    
+    def ensure(self):
+        """Download the master if it is not for today's session (at most once per retry window)."""
+        today = datetime.now(CT).strftime("%Y-%m-%d")
+        if self.session == today or monotonic() < self._next_attempt:
+            return self
+        with self._lock:
+            if self.session == today:
+                return self
+            headers = get_tastytrade_headers()
+            try:
+                ok = headers is not None and self._download(headers)
+            except Exception:
+                ok = False
+            if ok:
+                self.session = today
+                self._save()
+            else:
+                self._next_attempt = monotonic() + INSTRUMENT_MASTER_RETRY_SECONDS
+        return self
     
-    # New premium (with floor of $0.05)
-    new_premium = max(0.05, current_premium + premium_change)
+    def active_futures(self, product_code, today=None):
+        """Unexpired contracts for a product, front month first."""
+        today = today or datetime.now(CT).strftime("%Y-%m-%d")
+        return [c for c in self.ensure().futures.get(product_code, []) if c["expiration"] >= today]
     
-    return round(new_premium, 2)
+    def chain(self, expiration):
+        """{strikes, settlement_type} for one expiration date string, or None."""
+        return self.ensure().chains.get(expiration)
 
+@st.cache_resource(show_spinner=False)
+def get_instrument_master():
+    return InstrumentMaster()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DATA FETCHING - TASTYTRADE (Primary Source)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=60, show_spinner=False)
+@timed("fetch")
 def fetch_es_current_tastytrade():
-    """Fetch current ES futures price from Tastytrade."""
-    headers = get_tastytrade_headers()
-    if not headers:
+    """Front-month ES symbol and streamer symbol from the instrument master."""
+    if not is_tastytrade_configured():
         return None, None
-    
-    try:
-        url = "https://api.tastytrade.com/instruments/futures"
-        params = {"product-code[]": "ES"}
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        
-        if response.status_code == 200:
-            data = response.json()
-            futures = data.get("data", {}).get("items", [])
-            
-            today = datetime.now().strftime("%Y-%m-%d")
-            for f in sorted(futures, key=lambda x: x.get("expiration-date", "")):
-                if f.get("product-code") == "ES" and f.get("expiration-date", "") >= today:
-                    symbol = f.get("symbol")
-                    streamer = f.get("streamer-symbol")
-                    return symbol, streamer
-    except Exception:
-        pass
-    return None, None
+    contracts = get_instrument_master().active_futures("ES")
+    if not contracts:
+        return None, None
+    return contracts[0]["symbol"], contracts[0]["streamer_symbol"]
 
-@st.cache_data(ttl=60, show_spinner=False)
+@timed("fetch")
 def fetch_vx_futures_tastytrade():
     """
-    Fetch VX (VIX) futures data from Tastytrade.
+    VX (VIX) futures contracts from the instrument master.
     KEY for VIX Channel System!
     """
     result = {
@@ -528,103 +835,286 @@ def fetch_vx_futures_tastytrade():
         "contracts": []
     }
     
-    headers = get_tastytrade_headers()
-    if not headers:
+    if not is_tastytrade_configured():
         return result
     
-    try:
-        url = "https://api.tastytrade.com/instruments/futures"
-        params = {"product-code[]": "VX"}
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        
-        if response.status_code == 200:
-            data = response.json()
-            futures = data.get("data", {}).get("items", [])
-            vx_futures = [f for f in futures if f.get("product-code") == "VX"]
-            
-            if vx_futures:
-                vx_futures.sort(key=lambda x: x.get("expiration-date", ""))
-                today = datetime.now().strftime("%Y-%m-%d")
-                
-                for vx in vx_futures:
-                    if vx.get("expiration-date", "") >= today:
-                        result["symbol"] = vx.get("symbol")
-                        result["streamer_symbol"] = vx.get("streamer-symbol")
-                        result["expiration"] = vx.get("expiration-date")
-                        result["available"] = True
-                        break
-                
-                result["contracts"] = [
-                    {"symbol": vx.get("symbol"), "streamer_symbol": vx.get("streamer-symbol"), "expiration": vx.get("expiration-date")}
-                    for vx in vx_futures if vx.get("expiration-date", "") >= today
-                ][:6]
-    except Exception:
-        pass
+    contracts = get_instrument_master().active_futures("VX")
+    if contracts:
+        front = contracts[0]
+        result["symbol"] = front["symbol"]
+        result["streamer_symbol"] = front["streamer_symbol"]
+        result["expiration"] = front["expiration"]
+        result["available"] = True
+        result["contracts"] = [dict(c) for c in contracts[:6]]
     return result
 
-@st.cache_data(ttl=60, show_spinner=False)
+@timed("fetch")
 def fetch_spx_option_chain_tastytrade(trading_date):
-    """Fetch SPX options chain from Tastytrade."""
+    """SPX options chain for the trading date from the instrument master."""
     result = {"available": False, "expirations": [], "chain": {}}
     
+    if not is_tastytrade_configured():
+        return result
+    
+    master = get_instrument_master().ensure()
+    if master.chains:
+        result["expirations"] = sorted(master.chains)
+        result["available"] = True
+        target_date = trading_date.strftime("%Y-%m-%d")
+        chain = master.chain(target_date)
+        if chain:
+            result["chain"][target_date] = chain
+    return result
+
+CHAIN_QUOTE_STRIKES = 10    # Strikes either side of ATM in the batched quote snapshot
+
+def _quote_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+@stale_while_revalidate(ttl=15, max_stale=60)
+@single_flight
+def fetch_chain_quote_snapshot(trading_date, es_spx_offset=35.0, n_strikes=CHAIN_QUOTE_STRIKES):
+    """
+    Bid/ask/mark for the ATM ± N SPXW 0DTE strikes in one market-data call.
+    
+    Strikes and option symbols come from fetch_spx_option_chain_tastytrade;
+    ATM is taken from the quote hub. Every premium consumer reads this one
+    snapshot, so upstream calls do not grow with the number of trade cards.
+    
+    Returns:
+        Dict with quotes keyed by (strike, "CALL"/"PUT") -> {bid, ask, mark, last, symbol}
+    """
+    result = {"available": False, "quotes": {}, "atm_strike": None, "timestamp": None, "error": None}
+    
     headers = get_tastytrade_headers()
-    if not headers:
+    current_es = get_quote_hub().snapshot()["es"]
+    if not headers or current_es is None:
         return result
     
     try:
-        # Try both SPX and SPXW
-        for underlying in ["SPXW", "SPX"]:
-            url = f"https://api.tastytrade.com/option-chains/{underlying}/nested"
-            response = requests.get(url, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
-                data = response.json()
-                expirations = data.get("data", {}).get("items", [])
-                
-                if expirations:
-                    result["expirations"] = [exp.get("expiration-date") for exp in expirations]
-                    result["available"] = True
-                    
-                    target_date = trading_date.strftime("%Y-%m-%d")
-                    for exp in expirations:
-                        if exp.get("expiration-date") == target_date:
-                            result["chain"][target_date] = {
-                                "strikes": exp.get("strikes", []),
-                                "settlement_type": exp.get("settlement-type"),
-                            }
-                            break
-                    break
-    except Exception:
-        pass
+        target_date = trading_date.strftime("%Y-%m-%d")
+        chain = fetch_spx_option_chain_tastytrade(trading_date).get("chain", {}).get(target_date)
+        if not chain:
+            result["error"] = f"No 0DTE chain for {target_date}"
+            return result
+    
+        rows = sorted(
+            ((float(s["strike-price"]), s) for s in chain["strikes"] if s.get("strike-price")),
+            key=lambda row: row[0])
+        if not rows:
+            return result
+        spot = current_es - es_spx_offset
+        atm = min(range(len(rows)), key=lambda i: abs(rows[i][0] - spot))
+        result["atm_strike"] = rows[atm][0]
+    
+        symbols = {}
+        for strike, row in rows[max(0, atm - n_strikes):atm + n_strikes + 1]:
+            if row.get("call"):
+                symbols[row["call"]] = (strike, "CALL")
+            if row.get("put"):
+                symbols[row["put"]] = (strike, "PUT")
+    
+        response = tastytrade_get(f"{TASTYTRADE_API}/market-data/by-type", headers=headers,
+                                  params={"equity-option": ",".join(symbols)})
+        if response.status_code != 200:
+            result["error"] = f"Market data HTTP {response.status_code}"
+            return result
+    
+        for item in response.json().get("data", {}).get("items", []):
+            key = symbols.get(item.get("symbol"))
+            if key is None:
+                continue
+            bid, ask = _quote_price(item.get("bid")), _quote_price(item.get("ask"))
+            mark = _quote_price(item.get("mark")) or _quote_price(item.get("mid"))
+            if mark is None and bid is not None and ask is not None:
+                mark = round((bid + ask) / 2, 2)
+            result["quotes"][key] = {"bid": bid, "ask": ask, "mark": mark,
+                                     "last": _quote_price(item.get("last")), "symbol": item.get("symbol")}
+        result["available"] = bool(result["quotes"])
+        result["timestamp"] = datetime.now(CT)
+    except Exception as e:
+        result["error"] = str(e)
     return result
 
 @st.cache_data(ttl=30, show_spinner=False)
+@single_flight
 def get_dxlink_credentials():
-    """Get DXLink streaming credentials."""
-    result = {"available": False, "dxlink_url": None, "level": None}
+    """Get DXLink streaming credentials (websocket URL, quote token, level)."""
+    result = {"available": False, "dxlink_url": None, "token": None, "level": None}
     
     headers = get_tastytrade_headers()
     if not headers:
         return result
     
     try:
-        response = requests.get("https://api.tastytrade.com/api-quote-tokens", headers=headers, timeout=10)
+        response = tastytrade_get(f"{TASTYTRADE_API}/api-quote-tokens", headers=headers)
         if response.status_code == 200:
             data = response.json().get("data", {})
             result["dxlink_url"] = data.get("dxlink-url")
+            result["token"] = data.get("token")
             result["level"] = data.get("level")
-            result["available"] = result["dxlink_url"] is not None
+            result["available"] = result["dxlink_url"] is not None and result["token"] is not None
     except Exception:
         pass
     return result
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# DXLINK LIVE QUOTES - In-process streaming client (dxlink_stream.py)
+# ═══════════════════════════════════════════════════════════════════════════════
+
+DXLINK_QUOTE_MAX_AGE = 10   # Seconds before a streamed quote is ignored in favour of polling
+
+class DXLinkUnavailable(RuntimeError):
+    """No DXLink credentials yet (raised so st.cache_resource doesn't keep the failure)."""
+
+@st.cache_resource(show_spinner=False)
+def _open_dxlink_streamer():
+    """One background DXLink connection per process."""
+    creds = get_dxlink_credentials()
+    if not creds["available"]:
+        raise DXLinkUnavailable("No DXLink quote token")
+    # Token provider so reconnects after the quote token expires re-authenticate (runs on the
+    # dxlink-stream thread; get_dxlink_credentials is a global cache and needs no script context)
+    return DXLinkStreamer(creds["dxlink_url"], lambda: get_dxlink_credentials()["token"] or creds["token"]).start()
+
+def get_dxlink_streamer():
+    """
+    The process DXLink streamer, or None without credentials.
+    
+    A failed quote-token call is not cached with the streamer, so streaming comes
+    back on its own; retries are paced by the 30 s get_dxlink_credentials cache.
+    """
+    try:
+        return _open_dxlink_streamer()
+    except DXLinkUnavailable:
+        return None
+
+def spxw_streamer_symbol(trading_date, strike, opt_type):
+    """dxFeed symbol for an SPXW option, e.g. .SPXW251016C6000"""
+    return f".SPXW{trading_date.strftime('%y%m%d')}{'C' if opt_type == 'CALL' else 'P'}{strike:g}"
+
+def get_live_quote(symbol, max_age=DXLINK_QUOTE_MAX_AGE):
+    """Latest streamed quote for a symbol, or None if not streaming / too old."""
+    streamer = get_dxlink_streamer() if is_tastytrade_configured() else None
+    if streamer is None or not symbol:
+        return None
+    streamer.subscribe([symbol])
+    quote = streamer.quotes.get(symbol)
+    if quote is None or quote.mid is None or quote.age_seconds() > max_age:
+        return None
+    return quote
+
+def get_option_quote(strike, opt_type, trading_date, es_spx_offset=35.0):
+    """fetch_real_option_premium, with bid/ask/mid replaced by the live SPXW quote when streaming."""
+    result = fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=es_spx_offset)
+    quote = get_live_quote(spxw_streamer_symbol(trading_date, strike, opt_type))
+    if quote is not None and result.get("available"):
+        result = dict(result, bid=quote.bid, ask=quote.ask, mid=quote.mid,
+                      last=quote.last if quote.last is not None else quote.mid, source="DXLINK")
+    return result
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# QUOTE HUB - Latest ES / SPX / VIX shared by every consumer
+# ═══════════════════════════════════════════════════════════════════════════════
+
+QUOTE_HUB_REFRESH_SECONDS = 1.0   # Background refresh rate in RTH (scaled by poll_factor)
+QUOTE_HUB_IDLE_SECONDS = 300      # Stop polling upstream when nobody has read for this long
+QUOTE_HUB_MAX_AGE = 15            # A snapshot older than this is refreshed on read
+SPX_STREAMER_SYMBOL = "SPX"
+
+class QuoteHub:
+    """
+    Latest ES / SPX / VIX values with a timestamp, refreshed on a daemon thread.
+    
+    Readers get the current snapshot dict (never mutated - each refresh swaps in
+    a new one), so a rerun with N trade cards costs no upstream calls at all.
+    ES and SPX come from the DXLink stream when it is live; otherwise ES comes
+    from the ES bar store and SPX is left to the caller (ES - offset).
+    
+    VIX is the cached fetch_vix_yahoo value, not a Yahoo call per refresh.
+    
+    Like the prefetch pool, the daemon thread runs without a script context: it
+    uses the process-wide cached getters (streamer, instrument master, bar store),
+    which don't need one, looked up on every refresh so a stream that comes up
+    later is picked up, and it never touches st UI or session state.
+    """
+    
+    def __init__(self, refresh_seconds=QUOTE_HUB_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.snapshot_data = {"es": None, "spx": None, "vix": None, "es_source": None,
+                              "timestamp": None, "updated": None}
+        self._last_read = monotonic()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="quote-hub", daemon=True)
+        self._thread.start()
+    
+    def _refresh(self):
+        # Upstream calls run outside the lock; only the snapshot swap is locked
+        started = monotonic()
+        es, spx, source = None, None, None
+        if is_tastytrade_configured():
+            _, es_streamer = fetch_es_current_tastytrade()
+            es_quote = get_live_quote(es_streamer)
+            if es_quote is not None:
+                es, source = round(es_quote.mid, 2), "DXLINK"
+            spx_quote = get_live_quote(SPX_STREAMER_SYMBOL)
+            if spx_quote is not None:
+                spx = round(spx_quote.mid, 2)
+        if es is None:
+            es, source = get_es_bar_store().last_close(ES_QUOTE_MAX_AGE * poll_factor()), "YAHOO"
+        snapshot = {
+            "es": es, "spx": spx, "vix": fetch_vix_yahoo(), "es_source": source,
+            "timestamp": datetime.now(CT), "updated": started,
+        }
+        with self._lock:
+            # An inline refresh may race the thread - keep whichever started last
+            current = self.snapshot_data["updated"]
+            if current is None or started >= current:
+                self.snapshot_data = snapshot
+    
+    def _run(self):
+        while True:
+            if monotonic() - self._last_read < QUOTE_HUB_IDLE_SECONDS:
+                try:
+                    self._refresh()
+                except Exception:
+                    pass
+            self._wake.wait(self.refresh_seconds * poll_factor())
+            self._wake.clear()
+    
+    def snapshot(self):
+        """Current snapshot; refreshed inline only on a cold start or after an idle spell."""
+        self._last_read = monotonic()
+        snap = self.snapshot_data
+        if snap["updated"] is None or monotonic() - snap["updated"] > QUOTE_HUB_MAX_AGE * poll_factor():
+            try:
+                self._refresh()
+            except Exception:
+                pass
+            snap = self.snapshot_data
+        return snap
+    
+    def refresh_now(self):
+        """Wake the background thread (Refresh button)."""
+        self._wake.set()
+    
+@st.cache_resource(show_spinner=False)
+def get_quote_hub():
+    return QuoteHub()
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # DXLINK CANDLE DATA - Read from collector service
 # ═══════════════════════════════════════════════════════════════════════════════
 # 
 # The DXLink Candle Collector (dxlink_candle_collector.py) runs separately
-# and saves ES/VX candle data to candle_data.json
+# and saves ES/VX candle data to candle_data.ring (candle_ring.py format;
+# older collectors write candle_data.json, which is still read as a fallback)
 # 
 # This provides:
 # - Full overnight ES candles (from 5 PM CT)
@@ -634,16 +1124,10 @@ def get_dxlink_credentials():
 # ═══════════════════════════════════════════════════════════════════════════════
 
 CANDLE_DATA_FILE = Path("candle_data.json")
+CANDLE_RING_FILE = Path("candle_data.ring")
 
-@st.cache_data(ttl=30, show_spinner=False)
-def load_dxlink_candle_data() -> Dict:
-    """
-    Load candle data from the DXLink collector service.
-    
-    Returns:
-        Dict with es candles, vx candles, sessions, vix_channel
-    """
-    result = {
+def _empty_candle_data() -> Dict:
+    return {
         "available": False,
         "last_updated": None,
         "es": {"candles": [], "current_price": None},
@@ -663,6 +1147,72 @@ def load_dxlink_candle_data() -> Dict:
         },
         "error": None
     }
+
+def _mark_candle_staleness(result):
+    """Flag data older than 5 minutes."""
+    if result["last_updated"]:
+        try:
+            last_update = datetime.fromisoformat(result["last_updated"].replace("Z", "+00:00"))
+            if last_update.tzinfo is None:
+                last_update = CT.localize(last_update)
+            age_seconds = (datetime.now(CT) - last_update).total_seconds()
+            if age_seconds > 300:  # 5 minutes
+                result["stale"] = True
+                result["age_seconds"] = age_seconds
+        except Exception:
+            pass
+
+@st.cache_resource(show_spinner=False)
+def get_candle_ring_reader():
+    """One mapped reader per process (None if the collector has not created the ring)."""
+    try:
+        return {"reader": CandleRingReader(CANDLE_RING_FILE), "snapshot": None, "lock": threading.Lock()}
+    except (OSError, ValueError):
+        return None
+
+def load_dxlink_candle_data() -> Dict:
+    """
+    Load candle data from the DXLink collector service.
+    
+    Prefers the memory-mapped candle ring: when its sequence number has not
+    moved the previous snapshot is returned as-is, otherwise only the new
+    bars are copied out (candles are CANDLE_DTYPE record arrays). Falls back
+    to the legacy candle_data.json.
+    
+    Returns:
+        Dict with es candles, vx candles, sessions, vix_channel
+    """
+    ring = get_candle_ring_reader() if CANDLE_RING_FILE.exists() else None
+    if ring is None:
+        if CANDLE_RING_FILE.exists():
+            get_candle_ring_reader.clear()    # Ring appeared after a failed open - retry next time
+        return load_dxlink_candle_json()
+    
+    with ring["lock"]:
+        try:
+            changed = ring["reader"].poll()
+        except Exception:
+            return load_dxlink_candle_json()
+        if changed or ring["snapshot"] is None:
+            reader = ring["reader"]
+            result = _empty_candle_data()
+            meta = reader.meta
+            result["available"] = True
+            result["last_updated"] = meta.get("last_updated")
+            result["es"] = {"candles": reader.candles["es"], "current_price": meta.get("es_price")}
+            result["vx"] = {"candles": reader.candles["vx"], "current_price": meta.get("vx_price")}
+            result["sessions"] = meta.get("sessions", result["sessions"])
+            result["vix_channel"] = meta.get("vix_channel", result["vix_channel"])
+            result["seq"] = reader.seq
+            ring["snapshot"] = result
+        result = dict(ring["snapshot"])
+    _mark_candle_staleness(result)
+    return result
+
+@st.cache_data(ttl=30, show_spinner=False)
+def load_dxlink_candle_json() -> Dict:
+    """Legacy reader: parse the whole candle_data.json written by older collectors."""
+    result = _empty_candle_data()
     
     try:
         if CANDLE_DATA_FILE.exists():
@@ -677,17 +1227,7 @@ def load_dxlink_candle_data() -> Dict:
             result["vix_channel"] = data.get("vix_channel", result["vix_channel"])
             
             # Check if data is stale (older than 5 minutes)
-            if result["last_updated"]:
-                try:
-                    last_update = datetime.fromisoformat(result["last_updated"].replace("Z", "+00:00"))
-                    if last_update.tzinfo is None:
-                        last_update = CT.localize(last_update)
-                    age_seconds = (datetime.now(CT) - last_update).total_seconds()
-                    if age_seconds > 300:  # 5 minutes
-                        result["stale"] = True
-                        result["age_seconds"] = age_seconds
-                except Exception:
-                    pass
+            _mark_candle_staleness(result)
         else:
             result["error"] = f"Candle data file not found: {CANDLE_DATA_FILE}"
     except Exception as e:
@@ -762,192 +1302,9 @@ def parse_iso_time(time_str):
 # ═══════════════════════════════════════════════════════════════════════════════
 # VIX CHANNEL SYSTEM - The Alternating Channel Strategy
 # ═══════════════════════════════════════════════════════════════════════════════
-# 
-# VIX channels ALTERNATE daily: Ascending → Descending → Ascending
-# This is FIXED and independent of how SPX channels are determined
-#
-# Key Parameters:
-# - Slope: 0.04 per 6 30-minute blocks (0.04 every 3 hours)
-# - Channel drawn: 5 PM - 5:30 AM CT using highest/lowest pivots
-# - All prices must stay within channel
-#
-# Trading Logic:
-# - Opens IN channel → Trade bounces at floor/ceiling
-# - Breaks channel → EXPLOSIVE move, wait for 8:30 AM retest springboard
-#   - Breaks ABOVE ascending ceiling → VIX springboard UP → SELL SPX
-#   - Breaks BELOW descending floor → VIX springboard DOWN → BUY SPX
-# ═══════════════════════════════════════════════════════════════════════════════
 
-
-class VIXChannelType(Enum):
-    ASCENDING = "ASCENDING"       # Both lines rising
-    DESCENDING = "DESCENDING"     # Both lines falling
-    CONVERGING = "CONVERGING"     # Ceiling falling, floor rising (squeeze)
-    DIVERGING = "DIVERGING"       # Ceiling rising, floor falling (expansion)
-    PARALLEL_UP = "PARALLEL_UP"   # Both rising roughly same slope
-    PARALLEL_DOWN = "PARALLEL_DOWN"  # Both falling roughly same slope
-    FLAT = "FLAT"                 # Both roughly horizontal
-
-
-def calculate_vix_structural_channel(
-    asia_high: float, asia_high_time: datetime,
-    europe_high: float, europe_high_time: datetime,
-    asia_low: float, asia_low_time: datetime,
-    europe_low: float, europe_low_time: datetime,
-    reference_time: datetime = None,
-    current_time: datetime = None
-) -> Dict:
-    """
-    Build VIX channel from 4 structural pivots - the REAL methodology.
-    
-    Ceiling line: Asia High (5PM-2AM CT) → Europe High (2AM-8AM CT), project into NY
-    Floor line:   Asia Low (5PM-2AM CT) → Europe Low (2AM-8AM CT), project into NY
-    
-    Each line has its own data-driven slope (NOT the fixed ES slope).
-    Channel shape emerges naturally from the two anchor points per line.
-    
-    VIX ENTRY SIGNALS (confluence for ES/SPX trades):
-    1. VIX touches floor, closes above → BUY PUTS (VIX bounced = SPX down)
-    2. VIX touches ceiling, closes below → BUY CALLS (VIX rejected = SPX up)
-    3. VIX breaks ceiling, retests from above, closes above → BUY PUTS (ceiling became support)
-    4. VIX breaks floor, retests from below, closes below → BUY CALLS (floor became resistance)
-    """
-    if current_time is None:
-        current_time = datetime.now(CT)
-    if reference_time is None:
-        reference_time = current_time
-    
-    result = {
-        "channel_type": VIXChannelType.FLAT,
-        "channel_status": "BUILDING",  # BUILDING until Europe completes, then LOCKED
-        "floor": None,
-        "ceiling": None,
-        "floor_at_ref": None,
-        "ceiling_at_ref": None,
-        "pivot_high": asia_high,      # Keep for backward compat
-        "pivot_low": asia_low,        # Keep for backward compat
-        "pivot_high_time": asia_high_time,
-        "pivot_low_time": asia_low_time,
-        "asia_high": asia_high,
-        "asia_low": asia_low,
-        "europe_high": europe_high,
-        "europe_low": europe_low,
-        "ceiling_slope_per_hour": 0.0,
-        "floor_slope_per_hour": 0.0,
-        "channel_width_current": None,
-        "channel_description": "",
-        "slope_direction": 0
-    }
-    
-    if None in (asia_high, europe_high, asia_low, europe_low):
-        return result
-    if None in (asia_high_time, europe_high_time, asia_low_time, europe_low_time):
-        return result
-    
-    # Calculate ceiling slope (VIX points per hour)
-    ceiling_hours = (europe_high_time - asia_high_time).total_seconds() / 3600
-    if ceiling_hours > 0:
-        ceiling_slope = (europe_high - asia_high) / ceiling_hours
-    else:
-        ceiling_slope = 0.0
-    
-    # Calculate floor slope (VIX points per hour)
-    floor_hours = (europe_low_time - asia_low_time).total_seconds() / 3600
-    if floor_hours > 0:
-        floor_slope = (europe_low - asia_low) / floor_hours
-    else:
-        floor_slope = 0.0
-    
-    result["ceiling_slope_per_hour"] = round(ceiling_slope, 4)
-    result["floor_slope_per_hour"] = round(floor_slope, 4)
-    
-    # Project ceiling at any time: asia_high + ceiling_slope * hours_since_asia_high
-    def ceiling_at(t):
-        hours = (t - asia_high_time).total_seconds() / 3600
-        return asia_high + ceiling_slope * hours
-    
-    def floor_at(t):
-        hours = (t - asia_low_time).total_seconds() / 3600
-        return asia_low + floor_slope * hours
-    
-    # Current levels
-    result["ceiling"] = round(ceiling_at(current_time), 2)
-    result["floor"] = round(floor_at(current_time), 2)
-    result["ceiling_at_ref"] = round(ceiling_at(reference_time), 2)
-    result["floor_at_ref"] = round(floor_at(reference_time), 2)
-    result["channel_width_current"] = round(result["ceiling"] - result["floor"], 2)
-    
-    # Determine channel shape
-    SLOPE_THRESHOLD = 0.01  # VIX points/hour - below this is "flat"
-    ceiling_up = ceiling_slope > SLOPE_THRESHOLD
-    ceiling_down = ceiling_slope < -SLOPE_THRESHOLD
-    ceiling_flat = not ceiling_up and not ceiling_down
-    floor_up = floor_slope > SLOPE_THRESHOLD
-    floor_down = floor_slope < -SLOPE_THRESHOLD
-    floor_flat = not floor_up and not floor_down
-    
-    # Both moving same direction
-    if ceiling_up and floor_up:
-        result["channel_type"] = VIXChannelType.ASCENDING
-        result["channel_description"] = "Both lines rising → VIX bias UP (SPX bias DOWN)"
-        result["slope_direction"] = 1
-    elif ceiling_down and floor_down:
-        result["channel_type"] = VIXChannelType.DESCENDING
-        result["channel_description"] = "Both lines falling → VIX bias DOWN (SPX bias UP)"
-        result["slope_direction"] = -1
-    # Converging (squeeze) and Diverging (expansion)
-    elif ceiling_down and floor_up:
-        result["channel_type"] = VIXChannelType.CONVERGING
-        result["channel_description"] = "Squeeze forming → Breakout likely, wait for direction"
-        result["slope_direction"] = 0
-    elif ceiling_up and floor_down:
-        result["channel_type"] = VIXChannelType.DIVERGING
-        result["channel_description"] = "Expanding → High uncertainty, wider stops needed"
-        result["slope_direction"] = 0
-    # Both flat
-    elif ceiling_flat and floor_flat:
-        result["channel_type"] = VIXChannelType.FLAT
-        result["channel_description"] = "Parallel flat → Range-bound, play the walls"
-        result["slope_direction"] = 0
-    # Mixed: one line moving, one flat → expanding or tilting
-    elif ceiling_up and floor_flat:
-        result["channel_type"] = VIXChannelType.DIVERGING
-        result["channel_description"] = "Ceiling rising, floor flat → Expanding upward, VIX pressure building"
-        result["slope_direction"] = 1
-    elif ceiling_flat and floor_down:
-        result["channel_type"] = VIXChannelType.DIVERGING
-        result["channel_description"] = "Ceiling flat, floor falling → Expanding downward, volatility increasing"
-        result["slope_direction"] = -1
-    elif ceiling_down and floor_flat:
-        result["channel_type"] = VIXChannelType.CONVERGING
-        result["channel_description"] = "Ceiling falling, floor flat → Narrowing from top, compression"
-        result["slope_direction"] = -1
-    elif ceiling_flat and floor_up:
-        result["channel_type"] = VIXChannelType.CONVERGING
-        result["channel_description"] = "Ceiling flat, floor rising → Narrowing from bottom, squeeze building"
-        result["slope_direction"] = 1
-    else:
-        result["channel_type"] = VIXChannelType.FLAT
-        result["channel_description"] = "Indeterminate channel shape"
-        result["slope_direction"] = 0
-    
-    # Determine channel status: BUILDING until Europe session ENDS at 8 AM CT
-    # This gives you 30 minutes (8:00-8:30) to review the locked channel before RTH opens
-    europe_session_end = current_time.replace(hour=8, minute=0, second=0, microsecond=0)
-    # Handle overnight: if current_time is before midnight, europe_session_end is next day
-    if current_time.hour >= 17:
-        europe_session_end += timedelta(days=1)
-    
-    europe_complete = (current_time >= europe_session_end)
-    if europe_complete:
-        result["channel_status"] = "LOCKED"
-    else:
-        result["channel_status"] = "BUILDING"
-        result["channel_description"] = "Volatility zone BUILDING — Europe session in progress (locks at 8:00 AM CT)"
-    
-    return result
-
-@st.cache_data(ttl=60, show_spinner=False)
+@stale_while_revalidate(ttl=60, max_stale=300)
+@single_flight
 def fetch_vx_term_structure_tastytrade() -> Dict:
     """
     Fetch VX term structure (all contracts) from Tastytrade.
@@ -985,49 +1342,276 @@ def fetch_vx_term_structure_tastytrade() -> Dict:
 # ALERT SYSTEM - Channel Breaks and Retests
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def fetch_es_current():
-    try:
-        es = yf.Ticker("ES=F")
-        d = es.history(period="2d", interval="5m")
-        if d is not None and not d.empty:
-            return round(float(d['Close'].iloc[-1]), 2)
-    except Exception:
-        pass
-    return None
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAR CACHE - On-disk Parquet partitions of closed-session history
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# bar_cache/<symbol>/<interval>/<YYYY-MM-DD>.parquet, one file per date. A date
+# is only written once it is over (CT date for intraday bars, exchange date for
+# daily bars), so a partition never changes and is read memory-mapped. Only the
+# open session has to come from upstream.
+# ═══════════════════════════════════════════════════════════════════════════════
 
-@st.cache_data(ttl=60, show_spinner=False)
-def fetch_es_candles(days=7):
-    try:
-        es = yf.Ticker("ES=F")
-        data = es.history(period=f"{days}d", interval="30m")
-        if data is not None and not data.empty and len(data) > 10:
-            return data
-    except Exception:
-        pass
+BAR_CACHE_DIR = Path("bar_cache")
+
+class BarCache:
+    """Parquet bar partitions by symbol / interval / date."""
+    
+    def __init__(self, root=BAR_CACHE_DIR):
+        self.root = Path(root)
+    
+    @staticmethod
+    def _partition_tz(interval):
+        return ET if interval.endswith(("d", "wk", "mo")) else CT
+    
+    def _path(self, symbol, interval, day):
+        safe = "".join(c if c.isalnum() else "_" for c in symbol)
+        return self.root / safe / interval / f"{day:%Y-%m-%d}.parquet"
+    
+    def today(self, interval):
+        return datetime.now(self._partition_tz(interval)).date()
+    
+    def has(self, symbol, interval, day):
+        return self._path(symbol, interval, day).exists()
+    
+    def load(self, symbol, interval, start, end):
+        """CT-indexed bars for every cached date in [start, end], or None."""
+        frames = []
+        day = start
+        while day <= end:
+            path = self._path(symbol, interval, day)
+            if path.exists():
+                try:
+                    frames.append(pd.read_parquet(path, memory_map=True))
+                except Exception:
+                    pass
+            day += timedelta(days=1)
+        if not frames:
+            return None
+        return _bars_to_ct(pd.concat(frames).sort_index())
+    
+    def store(self, symbol, interval, df):
+        """Write each closed date in df that is not cached yet. Returns dates written."""
+        if df is None or df.empty:
+            return 0
+        tz = self._partition_tz(interval)
+        today = self.today(interval)
+        dates = df.index.tz_convert(tz).date
+        written = 0
+        for day in sorted(set(dates)):
+            if day >= today or self.has(symbol, interval, day):
+                continue
+            path = self._path(symbol, interval, day)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(".tmp")
+                df[dates == day].tz_convert(UTC).to_parquet(tmp)
+                os.replace(tmp, path)
+                written += 1
+            except Exception:
+                pass
+        return written
+
+@st.cache_resource(show_spinner=False)
+def get_bar_cache():
+    return BarCache()
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ES BAR STORE - One incremental ES=F history shared by every ES consumer
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# History is loaded once - from the bar cache when it has the closed sessions,
+# otherwise downloaded (converted to CT once); every later refresh only asks
+# Yahoo for bars from the last stored bar onward and appends them.
+# fetch_es_current, fetch_es_candles, fetch_es_with_ema and fetch_prior_day_rth
+# are views over this one frame.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+ES_SYMBOL = "ES=F"
+ES_BAR_INTERVAL = "30m"
+ES_BAR_HISTORY_PERIOD = "1mo"   # Initial download - ~15 trading days, 200+ bars for the EMA
+ES_BAR_MAX_DAYS = 45            # Older bars are trimmed so the frame does not grow forever
+ES_QUOTE_MAX_AGE = 15           # Seconds a last-price read may lag the upstream
+ES_BAR_MIN_CACHED_DAYS = 21     # Cached history must reach this far back to skip the full download
+
+class ESBarStore:
+    """Incremental 30-minute ES bar history in CT, shared across reruns and sessions."""
+    
+    def __init__(self, symbol=ES_SYMBOL, interval=ES_BAR_INTERVAL):
+        self.symbol = symbol
+        self.interval = interval
+        self.bars = None
+        self.last_refresh = 0.0
+        self._lock = threading.Lock()
+    
+    def invalidate(self):
+        """Force the next read to go upstream (history is kept, only new bars are fetched)."""
+        self.last_refresh = 0.0
+    
+    def refresh(self, max_age=60):
+        """Return the bar frame, fetching only new bars if it is older than max_age seconds."""
+        with self._lock:
+            if self.bars is not None and monotonic() - self.last_refresh < max_age:
+                return self.bars
+            try:
+                cache = get_bar_cache()
+                if self.bars is None or self.bars.empty:
+                    # Cold start: closed sessions come from the on-disk cache
+                    today = cache.today(self.interval)
+                    bars = cache.load(self.symbol, self.interval,
+                                      today - timedelta(days=ES_BAR_MAX_DAYS), today - timedelta(days=1))
+                    # Too little cached history for the 200 EMA - take the full download instead
+                    if bars is not None and bars.index[0].date() <= today - timedelta(days=ES_BAR_MIN_CACHED_DAYS):
+                        self.bars = bars
+                ticker = yf.Ticker(self.symbol)
+                if self.bars is None or self.bars.empty:
+                    new = _bars_to_ct(ticker.history(period=ES_BAR_HISTORY_PERIOD, interval=self.interval))
+                else:
+                    # Re-request the last full bar so the in-progress bar is replaced, not duplicated
+                    start = self.bars.index[-1].floor("30min") - pd.Timedelta(minutes=30)
+                    new = _bars_to_ct(ticker.history(start=start, interval=self.interval))
+                
+                if new is not None and not new.empty:
+                    if self.bars is None:
+                        bars = new
+                    else:
+                        bars = pd.concat([self.bars[self.bars.index < new.index[0]], new])
+                    cutoff = bars.index[-1] - pd.Timedelta(days=ES_BAR_MAX_DAYS)
+                    self.bars = bars[bars.index >= cutoff]
+                    cache.store(self.symbol, self.interval, self.bars)
+            except Exception:
+                pass
+            self.last_refresh = monotonic()
+            return self.bars
+    
+    def last_close(self, max_age=ES_QUOTE_MAX_AGE):
+        bars = self.refresh(max_age)
+        if bars is None or bars.empty:
+            return None
+        return round(float(bars['Close'].iloc[-1]), 2)
+    
+    def window(self, days, max_age=60):
+        """Bars from the last `days` calendar days."""
+        bars = self.refresh(max_age)
+        if bars is None or bars.empty:
+            return None
+        return bars[bars.index >= bars.index[-1] - pd.Timedelta(days=days)]
+
+@st.cache_resource(show_spinner=False)
+def get_es_bar_store():
+    return ESBarStore()
+
+@timed("fetch")
+def fetch_es_current():
+    """Latest ES price from the quote hub (no upstream call on the rerun thread)."""
+    return get_quote_hub().snapshot()["es"]
+
+@stale_while_revalidate(ttl=60, max_stale=300)
+@single_flight
+def fetch_es_candles(days=7):
+    data = get_es_bar_store().window(days)
+    if data is not None and len(data) > 10:
+        return data
     return None
 
-@st.cache_data(ttl=60, show_spinner=False)
+EMA_SPANS = (8, 21, 200)
+EMA_STATE_FILE = "es_ema_state.json"
+
+class EMAState:
+    """
+    Running EMA8/EMA21/EMA200 over closed 30-minute ES bars.
+    
+    Seeded once from the bar store, then each newly closed bar is folded in
+    with one multiply-add per span. The in-progress bar is applied on read
+    only, so the live values match a full ewm(adjust=False) pass.
+    """
+    
+    def __init__(self, spans=EMA_SPANS, path=EMA_STATE_FILE):
+        self.spans = tuple(spans)
+        self.path = path
+        self.alphas = {span: 2.0 / (span + 1) for span in self.spans}
+        self.values = {}
+        self.last_bar = None    # CT timestamp of the last closed bar folded in
+        self.bar_count = 0
+        self._lock = threading.Lock()
+        self._load()
+    
+    def _load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    saved = json.load(f)
+                if tuple(saved.get("spans", ())) == self.spans:
+                    self.values = {int(k): float(v) for k, v in saved["values"].items()}
+                    self.last_bar = pd.Timestamp(saved["last_bar"]).tz_convert(CT)
+                    self.bar_count = int(saved["bar_count"])
+        except Exception:
+            self.values, self.last_bar, self.bar_count = {}, None, 0
+    
+    def _save(self):
+        try:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"spans": list(self.spans), "values": self.values,
+                           "last_bar": self.last_bar.isoformat(), "bar_count": self.bar_count}, f)
+            os.replace(tmp, self.path)
+        except Exception:
+            pass
+    
+    def _seed(self, closes):
+        self.values = {span: float(closes.ewm(span=span, adjust=False).mean().iloc[-1]) for span in self.spans}
+        self.bar_count = len(closes)
+    
+    def update(self, bars):
+        """Fold bars closed since the last update. All rows but the last are closed."""
+        if bars is None or len(bars) < 2:
+            return self
+        closed = bars['Close'].iloc[:-1]
+        with self._lock:
+            if self.last_bar is not None and self.last_bar == closed.index[-1]:
+                return self
+            if self.last_bar is None or self.last_bar not in closed.index:
+                # First run, or the store no longer overlaps the saved state - reseed
+                self._seed(closed)
+            else:
+                for price in closed[closed.index > self.last_bar].values:
+                    for span in self.spans:
+                        ema = self.values[span]
+                        self.values[span] = ema + self.alphas[span] * (float(price) - ema)
+                    self.bar_count += 1
+            self.last_bar = closed.index[-1]
+            self._save()
+        return self
+    
+    def live(self, price):
+        """EMA values including the in-progress bar at `price`."""
+        return {span: ema + self.alphas[span] * (price - ema) for span, ema in self.values.items()}
+
+@st.cache_resource(show_spinner=False)
+def get_ema_state():
+    return EMAState()
+
+@stale_while_revalidate(ttl=60, max_stale=300)
+@single_flight
 def fetch_es_with_ema():
-    """Fetch ES futures with EMAs based on 30-minute chart from Yahoo Finance."""
+    """ES price with 8/21/200 EMAs on the 30-minute chart, from the incremental EMA state."""
     result = {
         "price": None, "ema_200": None, "ema_8": None, "ema_21": None,
         "above_200": None, "ema_cross": None, "ema_bias": Bias.NEUTRAL
     }
     try:
-        es = yf.Ticker("ES=F")
-        # Use 30-minute chart - need ~15 trading days for 200 periods
-        data = es.history(period="1mo", interval="30m")
+        # 30-minute chart from the shared ES store - need ~15 trading days for 200 periods
+        data = get_es_bar_store().refresh(60)
+        state = get_ema_state().update(data)
         
-        if data is not None and not data.empty and len(data) > 200:
-            # Calculate EMAs on 30-minute closes
-            data['EMA_8'] = data['Close'].ewm(span=8, adjust=False).mean()
-            data['EMA_21'] = data['Close'].ewm(span=21, adjust=False).mean()
-            data['EMA_200'] = data['Close'].ewm(span=200, adjust=False).mean()
+        if data is not None and not data.empty and state.bar_count + 1 > 200:
+            price = float(data['Close'].iloc[-1])
+            emas = state.live(price)
             
-            result["price"] = round(float(data['Close'].iloc[-1]), 2)
-            result["ema_8"] = round(float(data['EMA_8'].iloc[-1]), 2)
-            result["ema_21"] = round(float(data['EMA_21'].iloc[-1]), 2)
-            result["ema_200"] = round(float(data['EMA_200'].iloc[-1]), 2)
+            result["price"] = round(price, 2)
+            result["ema_8"] = round(emas[8], 2)
+            result["ema_21"] = round(emas[21], 2)
+            result["ema_200"] = round(emas[200], 2)
             result["above_200"] = result["price"] > result["ema_200"]
             result["ema_cross"] = "BULLISH" if result["ema_8"] > result["ema_21"] else "BEARISH"
             
@@ -1041,18 +1625,81 @@ def fetch_es_with_ema():
         pass
     return result
 
-@st.cache_data(ttl=15, show_spinner=False)
-def fetch_vix_yahoo():
-    """Fetch current VIX from Yahoo Finance. Single source of truth for VIX price."""
+# ═══════════════════════════════════════════════════════════════════════════════
+# VOLATILITY QUOTE SERVICE - Batched ^VIX / ^VIX3M snapshot
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# Every vol symbol needed at a given interval is fetched in ONE multi-ticker
+# download. fetch_vix_yahoo, fetch_vix_overnight_range, fetch_vix_term_structure
+# and fetch_retail_positioning all read from these shared snapshots.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+VOL_SNAPSHOT_SYMBOLS = {
+    "1d": ("^VIX", "^VIX3M"),   # Spot closes: VIX price, term structure, retail positioning
+    "5m": ("^VIX",),            # Intraday: VIX overnight range
+}
+
+@stale_while_revalidate(ttl=15, max_stale=120)
+@single_flight
+def fetch_vol_snapshot(interval="1d", period="2d"):
+    """
+    Fetch every vol symbol used at this interval in a single multi-ticker request.
+    
+    Returns:
+        Dict of symbol -> CT-indexed OHLC frame (symbols with no data are omitted)
+    """
+    symbols = VOL_SNAPSHOT_SYMBOLS.get(interval, ("^VIX",))
+    result = {}
     try:
-        vix = yf.Ticker("^VIX")
-        data = vix.history(period="2d")
+        # Earlier sessions in the window come from the bar cache when every symbol has them
+        cache = get_bar_cache()
+        today = cache.today(interval)
+        first_day = today
+        for _ in range(int(period.rstrip("d")) - 1):
+            first_day = get_prior_trading_day(first_day)
+        cached = {}
+        if first_day < today and all(cache.has(sym, interval, get_prior_trading_day(today)) for sym in symbols):
+            cached = {sym: cache.load(sym, interval, first_day, today - timedelta(days=1)) for sym in symbols}
+            period = "1d"
+        
+        data = yf.download(list(symbols), period=period, interval=interval,
+                           group_by="ticker", auto_adjust=False, progress=False)
         if data is not None and not data.empty:
-            return round(float(data['Close'].iloc[-1]), 2)
+            for symbol in symbols:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    df = data[symbol]
+                else:
+                    df = data
+                # Multi-ticker frames share one index - drop the other symbols' rows
+                df = df.dropna(subset=["Close"])
+                if not df.empty:
+                    df = _bars_to_ct(df)
+                    if cached.get(symbol) is not None:
+                        df = _bars_to_ct(pd.concat([cached[symbol], df]).sort_index())
+                    else:
+                        cache.store(symbol, interval, df)
+                    result[symbol] = df
     except Exception:
         pass
-    return 16.0
+    return result
+
+def get_vol_close(symbol, interval="1d"):
+    """Latest close for a vol symbol from the shared snapshot, or None."""
+    df = fetch_vol_snapshot(interval).get(symbol)
+    if df is None or df.empty:
+        return None
+    return round(float(df['Close'].iloc[-1]), 2)
 
+@stale_while_revalidate(ttl=15, max_stale=120)
+@single_flight
+def fetch_vix_yahoo():
+    """Fetch current VIX from Yahoo Finance. Single source of truth for VIX price."""
+    vix = get_vol_close("^VIX")
+    return vix if vix is not None else 16.0
+
+@timed("fetch")
 def fetch_vx_current_price() -> Dict:
     """Fetch current VX/VIX price as dict with metadata. Uses fetch_vix_yahoo internally."""
     price = fetch_vix_yahoo()
@@ -1067,7 +1714,8 @@ def fetch_vx_current_price() -> Dict:
 # ═══════════════════════════════════════════════════════════════════════════════
 # VIX DATA - Yahoo Finance
 # ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=300, show_spinner=False)
+@stale_while_revalidate(ttl=300, max_stale=1800)
+@single_flight
 def fetch_vix_overnight_range(trading_date, zone_start_hour=2, zone_start_min=0, zone_end_hour=5, zone_end_min=30):
     """
     Fetch VIX overnight range using Yahoo Finance intraday data.
@@ -1078,1511 +1726,237 @@ def fetch_vix_overnight_range(trading_date, zone_start_hour=2, zone_start_min=0,
     result = {"bottom": None, "top": None, "range_size": None, "available": False}
     
     try:
-        # Try to get VIX intraday data from Yahoo
-        vix = yf.Ticker("^VIX")
-        # Yahoo provides 1m data for last 7 days, 5m for 60 days
-        data = vix.history(period="2d", interval="5m")
+        # VIX intraday data (5m, already in CT) from the shared vol snapshot
+        data = fetch_vol_snapshot("5m").get("^VIX")
         
         if data is not None and not data.empty:
-            # Convert to CT timezone
-            if data.index.tzinfo is None:
-                data.index = data.index.tz_localize('UTC')
-            data.index = data.index.tz_convert(CT)
-            
             # Filter for the overnight zone
             zone_start = CT.localize(datetime.combine(trading_date, time(zone_start_hour, zone_start_min)))
             zone_end = CT.localize(datetime.combine(trading_date, time(zone_end_hour, zone_end_min)))
             
             zone_df = data[(data.index >= zone_start) & (data.index <= zone_end)]
             
-            if not zone_df.empty and len(zone_df) > 2:
-                result["bottom"] = round(float(zone_df['Low'].min()), 2)
-                result["top"] = round(float(zone_df['High'].max()), 2)
-                result["range_size"] = round(result["top"] - result["bottom"], 2)
-                result["available"] = True
-            else:
-                # Fallback: Use the last close as a reference point
-                last_close = data['Close'].iloc[-1]
-                # Estimate a typical overnight range (VIX usually moves 0.5-1.5 in overnight)
-                result["bottom"] = round(float(last_close) - 0.5, 2)
-                result["top"] = round(float(last_close) + 0.5, 2)
-                result["range_size"] = 1.0
-                result["available"] = True
-                result["estimated"] = True
-    except Exception as e:
-        pass
-    
-    return result
-
-def get_vix_position(current_vix, vix_range):
-    if not vix_range["available"] or current_vix is None:
-        return VIXPosition.UNKNOWN, "No range data"
-    bottom, top = vix_range["bottom"], vix_range["top"]
-    if current_vix > top:
-        return VIXPosition.ABOVE_RANGE, f"{round(current_vix - top, 1)} above"
-    elif current_vix < bottom:
-        return VIXPosition.BELOW_RANGE, f"{round(bottom - current_vix, 1)} below"
-    else:
-        return VIXPosition.IN_RANGE, f"Within {bottom}-{top}"
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# VIX TERM STRUCTURE
-# ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_vix_term_structure():
-    """
-    Fetch VIX term structure (VIX vs VIX futures).
-    Contango (normal): VIX futures > VIX spot → stable/bullish
-    Backwardation (fear): VIX spot > VIX futures → volatile/bearish
-    """
-    result = {"vix_spot": None, "vix_future": None, "structure": "UNKNOWN", "spread": None}
-    try:
-        # VIX spot
-        vix = yf.Ticker("^VIX")
-        vix_data = vix.history(period="2d")
-        
-        # VIX 3-month (proxy for futures)
-        vix3m = yf.Ticker("^VIX3M")
-        vix3m_data = vix3m.history(period="2d")
-        
-        if not vix_data.empty and not vix3m_data.empty:
-            spot = round(float(vix_data['Close'].iloc[-1]), 2)
-            future = round(float(vix3m_data['Close'].iloc[-1]), 2)
-            spread = round(future - spot, 2)  # Positive = contango, Negative = backwardation
-            
-            result["vix_spot"] = spot
-            result["vix_future"] = future
-            result["spread"] = spread
-            
-            if spread > 1.5:
-                result["structure"] = "CONTANGO"  # Normal, stable
-            elif spread < -1.5:
-                result["structure"] = "BACKWARDATION"  # Fear, volatile
-            else:
-                result["structure"] = "FLAT"  # Neutral
-    except Exception:
-        pass
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# RETAIL POSITIONING
-# ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=300, show_spinner=False)
-def fetch_retail_positioning():
-    result = {"vix": None, "vix3m": None, "spread": None, "positioning": "BALANCED", "warning": None, "bias": Bias.NEUTRAL}
-    try:
-        vix_data = yf.Ticker("^VIX").history(period="2d")
-        vix3m_data = yf.Ticker("^VIX3M").history(period="2d")
-        if not vix_data.empty and not vix3m_data.empty:
-            vix = round(float(vix_data['Close'].iloc[-1]), 2)
-            vix3m = round(float(vix3m_data['Close'].iloc[-1]), 2)
-            spread = round(vix - vix3m, 2)
-            result["vix"], result["vix3m"], result["spread"] = vix, vix3m, spread
-            if spread <= -3.0:
-                result["positioning"], result["warning"], result["bias"] = "CALL BUYING EXTREME", "Extreme complacency - high fade probability", Bias.PUTS
-            elif spread <= -1.5:
-                result["positioning"], result["warning"], result["bias"] = "CALL BUYING HEAVY", "Market often fades the crowd", Bias.PUTS
-            elif spread >= 3.0:
-                result["positioning"], result["warning"], result["bias"] = "PUT BUYING EXTREME", "Extreme fear - high fade probability", Bias.CALLS
-            elif spread >= 1.5:
-                result["positioning"], result["warning"], result["bias"] = "PUT BUYING HEAVY", "Market often fades the crowd", Bias.CALLS
-    except Exception:
-        pass
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# SESSION LEVEL TESTS
-# ═══════════════════════════════════════════════════════════════════════════════
-def analyze_session_tests(sydney, tokyo, london, channel_type):
-    """
-    Analyze how many sessions tested and respected the key levels.
-    More session tests = stronger level confirmation.
-    
-    Returns dict with floor_tests, ceiling_tests, and which sessions tested each.
-    """
-    result = {
-        "floor_tests": 0,
-        "ceiling_tests": 0,
-        "floor_sessions": [],
-        "ceiling_sessions": [],
-        "floor_respected": True,
-        "ceiling_respected": True
-    }
-    
-    if not sydney or not tokyo:
-        return result
-    
-    # Determine the key level bounds based on Sydney (baseline)
-    sydney_high = sydney["high"]
-    sydney_low = sydney["low"]
-    tolerance = 2.0  # Points tolerance for "testing" a level
-    
-    # Check Tokyo
-    if tokyo:
-        # Did Tokyo test Sydney's low (floor area)?
-        if tokyo["low"] <= sydney_low + tolerance:
-            result["floor_tests"] += 1
-            result["floor_sessions"].append("Tokyo")
-            # Did it respect (close above)?
-            # We approximate by checking if high recovered
-            if tokyo["high"] > sydney_low + 5:
-                pass  # Respected
-            else:
-                result["floor_respected"] = False
-        
-        # Did Tokyo test Sydney's high (ceiling area)?
-        if tokyo["high"] >= sydney_high - tolerance:
-            result["ceiling_tests"] += 1
-            result["ceiling_sessions"].append("Tokyo")
-    
-    # Check London
-    if london:
-        current_low = min(sydney_low, tokyo["low"]) if tokyo else sydney_low
-        current_high = max(sydney_high, tokyo["high"]) if tokyo else sydney_high
-        
-        # Did London test the floor?
-        if london["low"] <= current_low + tolerance:
-            result["floor_tests"] += 1
-            result["floor_sessions"].append("London")
-        
-        # Did London test the ceiling?
-        if london["high"] >= current_high - tolerance:
-            result["ceiling_tests"] += 1
-            result["ceiling_sessions"].append("London")
-    
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# GAP ANALYSIS
-# ═══════════════════════════════════════════════════════════════════════════════
-def analyze_gap(current_price, prior_close, ceiling, floor):
-    """
-    Analyze the gap relative to the overnight channel.
-    
-    Returns:
-    - gap_direction: UP, DOWN, or FLAT
-    - gap_size: Size in points
-    - gap_position: Where the gap puts us relative to channel
-    - gap_into_level: True if gap brings us TO a key level (good setup)
-    """
-    result = {
-        "direction": "FLAT",
-        "size": 0,
-        "into_floor": False,
-        "into_ceiling": False,
-        "away_from_floor": False,
-        "away_from_ceiling": False
-    }
-    
-    if prior_close is None or current_price is None:
-        return result
-    
-    gap = current_price - prior_close
-    result["size"] = round(abs(gap), 1)
-    
-    if gap > 3:
-        result["direction"] = "UP"
-    elif gap < -3:
-        result["direction"] = "DOWN"
-    else:
-        result["direction"] = "FLAT"
-    
-    channel_range = ceiling - floor
-    dist_to_floor = current_price - floor
-    dist_to_ceiling = ceiling - current_price
-    
-    # Check if gap brings us TO a key level
-    if result["direction"] == "DOWN" and dist_to_floor <= channel_range * 0.3:
-        result["into_floor"] = True
-    elif result["direction"] == "UP" and dist_to_ceiling <= channel_range * 0.3:
-        result["into_ceiling"] = True
-    
-    # Check if gap takes us AWAY from a level
-    if result["direction"] == "UP" and dist_to_floor > channel_range * 0.5:
-        result["away_from_floor"] = True
-    elif result["direction"] == "DOWN" and dist_to_ceiling > channel_range * 0.5:
-        result["away_from_ceiling"] = True
-    
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# PRIOR CLOSE ANALYSIS
-# ═══════════════════════════════════════════════════════════════════════════════
-def analyze_prior_close(prior_close, ceiling, floor):
-    """
-    Analyze where prior RTH closed relative to today's overnight channel.
-    
-    If prior close is near today's floor → floor is validated
-    If prior close is near today's ceiling → ceiling is validated
-    """
-    result = {
-        "validates_floor": False,
-        "validates_ceiling": False,
-        "position": "MIDDLE"
-    }
-    
-    if prior_close is None or ceiling is None or floor is None:
-        return result
-    
-    channel_range = ceiling - floor
-    dist_to_floor = prior_close - floor
-    dist_to_ceiling = ceiling - prior_close
-    
-    if dist_to_floor <= channel_range * 0.3:
-        result["validates_floor"] = True
-        result["position"] = "NEAR_FLOOR"
-    elif dist_to_ceiling <= channel_range * 0.3:
-        result["validates_ceiling"] = True
-        result["position"] = "NEAR_CEILING"
-    
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# PRIOR DAY RTH DATA
-# ═══════════════════════════════════════════════════════════════════════════════
-@st.cache_data(ttl=3600, show_spinner=False)
-def fetch_prior_day_rth(trading_date):
-    """Fetch prior day's RTH (Regular Trading Hours) data for ES futures using Yahoo Finance.
-    RTH is 8:30 AM - 3:00 PM CT (9:30 AM - 4:00 PM ET)
-    
-    Returns:
-    - primary_high_wick: The highest high (wick) of any RTH candle
-    - secondary_high_wick: Lower high wick made AFTER primary (1hr+ gap), or None
-    - primary_low_open: The lowest open of any BULLISH RTH candle (buyers defended)
-    - secondary_low_open: Higher low open made AFTER primary (1hr+ gap, bullish), or None
-    """
-    result = {
-        "primary_high_wick": None, "primary_high_wick_time": None,
-        "secondary_high_wick": None, "secondary_high_wick_time": None,
-        "primary_low_open": None, "primary_low_open_time": None,
-        "secondary_low_open": None, "secondary_low_open_time": None,
-        "high": None, "low": None, "close": None,
-        "available": False,
-        # Legacy keys for backward compatibility
-        "highest_wick": None, "highest_wick_time": None,
-        "lowest_close": None, "lowest_close_time": None,
-    }
-    try:
-        prior_day = get_prior_trading_day(trading_date)
-        
-        # Fetch 30-minute candles for ES futures from Yahoo (matches our trading blocks)
-        es = yf.Ticker("ES=F")
-        # Get 5 days of data to ensure we have the prior day
-        df = es.history(period="5d", interval="30m")
-        
-        if df is not None and not df.empty:
-            # Convert index to CT timezone
-            if df.index.tz is None:
-                df.index = df.index.tz_localize('America/New_York').tz_convert(CT)
-            else:
-                df.index = df.index.tz_convert(CT)
-            
-            # RTH hours: 8:30 AM - 3:00 PM CT
-            rth_start = CT.localize(datetime.combine(prior_day, time(8, 30)))
-            rth_end = CT.localize(datetime.combine(prior_day, time(15, 0)))
-            
-            # Filter to prior day RTH
-            rth_df = df[(df.index >= rth_start) & (df.index <= rth_end)].copy()
-            
-            if not rth_df.empty and len(rth_df) > 3:
-                # ─────────────────────────────────────────────────────────────
-                # HIGHEST WICK: Absolute highest high of any candle
-                # Used for: ASCENDING ceiling
-                # ─────────────────────────────────────────────────────────────
-                primary_high_idx = rth_df['High'].idxmax()
-                result["primary_high_wick"] = round(float(rth_df.loc[primary_high_idx, 'High']), 2)
-                result["primary_high_wick_time"] = primary_high_idx
-                
-                # ─────────────────────────────────────────────────────────────
-                # HIGHEST CLOSE: Highest close of any candle
-                # Used for: DESCENDING ceiling (body defines resistance)
-                # ─────────────────────────────────────────────────────────────
-                primary_hc_idx = rth_df['Close'].idxmax()
-                result["primary_high_close"] = round(float(rth_df.loc[primary_hc_idx, 'Close']), 2)
-                result["primary_high_close_time"] = primary_hc_idx
-                
-                # ─────────────────────────────────────────────────────────────
-                # LOWEST WICK: Absolute lowest low of any candle
-                # Used for: DESCENDING floor (wicks mark absolute bottom)
-                # ─────────────────────────────────────────────────────────────
-                primary_lw_idx = rth_df['Low'].idxmin()
-                result["primary_low_wick"] = round(float(rth_df.loc[primary_lw_idx, 'Low']), 2)
-                result["primary_low_wick_time"] = primary_lw_idx
-                
-                # ─────────────────────────────────────────────────────────────
-                # LOWEST CLOSE: Lowest close of any candle
-                # Used for: ASCENDING floor (body defines support)
-                # ─────────────────────────────────────────────────────────────
-                primary_lc_idx = rth_df['Close'].idxmin()
-                result["primary_low_close"] = round(float(rth_df.loc[primary_lc_idx, 'Close']), 2)
-                result["primary_low_close_time"] = primary_lc_idx
-                
-                # ─────────────────────────────────────────────────────────────
-                # SECONDARY HIGH WICK: Lower high made 1hr+ after primary
-                # ─────────────────────────────────────────────────────────────
-                min_gap = timedelta(hours=1)
-                secondary_high_search = rth_df[rth_df.index >= primary_high_idx + min_gap]
-                if not secondary_high_search.empty:
-                    secondary_high_candidates = secondary_high_search[
-                        secondary_high_search['High'] < result["primary_high_wick"]
-                    ]
-                    if not secondary_high_candidates.empty:
-                        sec_high_idx = secondary_high_candidates['High'].idxmax()
-                        result["secondary_high_wick"] = round(float(secondary_high_candidates.loc[sec_high_idx, 'High']), 2)
-                        result["secondary_high_wick_time"] = sec_high_idx
-                
-                # ─────────────────────────────────────────────────────────────
-                # SECONDARY LOW WICK: Higher low wick made 1hr+ after primary
-                # ─────────────────────────────────────────────────────────────
-                secondary_low_search = rth_df[rth_df.index >= primary_lw_idx + min_gap]
-                if not secondary_low_search.empty:
-                    secondary_low_candidates = secondary_low_search[
-                        secondary_low_search['Low'] > result["primary_low_wick"]
-                    ]
-                    if not secondary_low_candidates.empty:
-                        sec_low_idx = secondary_low_candidates['Low'].idxmin()
-                        result["secondary_low_wick"] = round(float(secondary_low_candidates.loc[sec_low_idx, 'Low']), 2)
-                        result["secondary_low_wick_time"] = sec_low_idx
-                
-                # Also store overall H/L/C for display
-                result["high"] = result["primary_high_wick"]
-                result["low"] = result["primary_low_wick"]
-                result["close"] = round(float(rth_df.iloc[-1]['Close']), 2)
-                result["available"] = True
-                
-                # Legacy keys for backward compatibility
-                result["highest_wick"] = result["primary_high_wick"]
-                result["highest_wick_time"] = result["primary_high_wick_time"]
-                result["lowest_close"] = result["primary_low_close"]
-                result["lowest_close_time"] = result["primary_low_close_time"]
-                result["primary_low_open"] = result["primary_low_close"]  # Map old key
-                result["primary_low_open_time"] = result["primary_low_close_time"]
-                
-    except Exception as e:
-        pass
-    return result
-
-def calc_prior_day_targets(prior_rth, ref_time):
-    """Calculate BOTH ascending and descending targets from ALL prior day anchors.
-    
-    PIVOT TYPE RULES:
-    - Ascending ceiling  = Highest WICK projected up  (wicks mark absolute tops)
-    - Ascending floor    = Lowest CLOSE projected up  (bodies define support)
-    - Descending ceiling = Highest CLOSE projected down (bodies define resistance)
-    - Descending floor   = Lowest WICK projected down  (wicks mark absolute bottoms)
-    
-    From PRIMARY HIGH WICK (ascending ceiling anchor):
-    - Ascending line (+0.52/30min) = ascending ceiling target
-    
-    From PRIMARY HIGH CLOSE (descending ceiling anchor):
-    - Descending line (-0.52/30min) = descending ceiling target
-    
-    From PRIMARY LOW WICK (descending floor anchor):
-    - Descending line (-0.52/30min) = descending floor target
-    
-    From PRIMARY LOW CLOSE (ascending floor anchor):
-    - Ascending line (+0.52/30min) = ascending floor target
-    
-    Returns dict with all targets.
-    """
-    result = {
-        "available": False,
-        # Primary High Wick (ascending ceiling)
-        "primary_high_wick": None,
-        "primary_high_wick_time": None,
-        "primary_high_wick_ascending": None,
-        "primary_high_wick_descending": None,  # Keep for backward compat
-        # Primary High Close (descending ceiling)
-        "primary_high_close": None,
-        "primary_high_close_time": None,
-        "primary_high_close_descending": None,
-        # Primary Low Wick (descending floor)
-        "primary_low_wick": None,
-        "primary_low_wick_time": None,
-        "primary_low_wick_descending": None,
-        # Primary Low Close (ascending floor)
-        "primary_low_close": None,
-        "primary_low_close_time": None,
-        "primary_low_close_ascending": None,
-        # Secondary pivots
-        "secondary_high_wick": None,
-        "secondary_high_wick_time": None,
-        "secondary_high_wick_ascending": None,
-        "secondary_high_wick_descending": None,
-        "secondary_low_wick": None,
-        "secondary_low_wick_time": None,
-        "secondary_low_wick_descending": None,
-        # Legacy keys for backward compatibility
-        "primary_low_open": None,
-        "primary_low_open_time": None,
-        "primary_low_open_ascending": None,
-        "primary_low_open_descending": None,
-        "secondary_low_open": None,
-        "secondary_low_open_ascending": None,
-        "secondary_low_open_descending": None,
-        "highest_wick": None,
-        "highest_wick_ascending": None,
-        "highest_wick_descending": None,
-        "lowest_close": None,
-        "lowest_close_ascending": None,
-        "lowest_close_descending": None,
-    }
-    
-    if not prior_rth.get("available"):
-        return result
-    
-    result["available"] = True
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # PRIMARY HIGH WICK → Ascending ceiling anchor
-    # ─────────────────────────────────────────────────────────────────────────
-    if prior_rth.get("primary_high_wick") is not None and prior_rth.get("primary_high_wick_time"):
-        result["primary_high_wick"] = prior_rth["primary_high_wick"]
-        result["primary_high_wick_time"] = prior_rth["primary_high_wick_time"]
-        blocks = blocks_between(prior_rth["primary_high_wick_time"], ref_time)
-        result["primary_high_wick_ascending"] = round(prior_rth["primary_high_wick"] + SLOPE * blocks, 2)
-        result["primary_high_wick_descending"] = round(prior_rth["primary_high_wick"] - SLOPE * blocks, 2)
-        result["highest_wick"] = result["primary_high_wick"]
-        result["highest_wick_ascending"] = result["primary_high_wick_ascending"]
-        result["highest_wick_descending"] = result["primary_high_wick_descending"]
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # PRIMARY HIGH CLOSE → Descending ceiling anchor
-    # ─────────────────────────────────────────────────────────────────────────
-    if prior_rth.get("primary_high_close") is not None and prior_rth.get("primary_high_close_time"):
-        result["primary_high_close"] = prior_rth["primary_high_close"]
-        result["primary_high_close_time"] = prior_rth["primary_high_close_time"]
-        blocks = blocks_between(prior_rth["primary_high_close_time"], ref_time)
-        result["primary_high_close_descending"] = round(prior_rth["primary_high_close"] - SLOPE * blocks, 2)
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # PRIMARY LOW WICK → Descending floor anchor
-    # ─────────────────────────────────────────────────────────────────────────
-    if prior_rth.get("primary_low_wick") is not None and prior_rth.get("primary_low_wick_time"):
-        result["primary_low_wick"] = prior_rth["primary_low_wick"]
-        result["primary_low_wick_time"] = prior_rth["primary_low_wick_time"]
-        blocks = blocks_between(prior_rth["primary_low_wick_time"], ref_time)
-        result["primary_low_wick_descending"] = round(prior_rth["primary_low_wick"] - SLOPE * blocks, 2)
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # PRIMARY LOW CLOSE → Ascending floor anchor
-    # ─────────────────────────────────────────────────────────────────────────
-    lc_key = "primary_low_close" if prior_rth.get("primary_low_close") else "primary_low_open"
-    lc_time_key = lc_key + "_time"
-    if prior_rth.get(lc_key) is not None and prior_rth.get(lc_time_key):
-        result["primary_low_close"] = prior_rth[lc_key]
-        result["primary_low_close_time"] = prior_rth[lc_time_key]
-        blocks = blocks_between(prior_rth[lc_time_key], ref_time)
-        result["primary_low_close_ascending"] = round(prior_rth[lc_key] + SLOPE * blocks, 2)
-        # Legacy mappings
-        result["primary_low_open"] = result["primary_low_close"]
-        result["primary_low_open_time"] = result["primary_low_close_time"]
-        result["primary_low_open_ascending"] = result["primary_low_close_ascending"]
-        result["primary_low_open_descending"] = round(prior_rth[lc_key] - SLOPE * blocks, 2)
-        result["lowest_close"] = result["primary_low_close"]
-        result["lowest_close_ascending"] = result["primary_low_close_ascending"]
-        result["lowest_close_descending"] = result["primary_low_open_descending"]
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # SECONDARY HIGH WICK
-    # ─────────────────────────────────────────────────────────────────────────
-    if prior_rth.get("secondary_high_wick") is not None and prior_rth.get("secondary_high_wick_time"):
-        result["secondary_high_wick"] = prior_rth["secondary_high_wick"]
-        result["secondary_high_wick_time"] = prior_rth["secondary_high_wick_time"]
-        blocks = blocks_between(prior_rth["secondary_high_wick_time"], ref_time)
-        result["secondary_high_wick_ascending"] = round(prior_rth["secondary_high_wick"] + SLOPE * blocks, 2)
-        result["secondary_high_wick_descending"] = round(prior_rth["secondary_high_wick"] - SLOPE * blocks, 2)
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # SECONDARY LOW WICK
-    # ─────────────────────────────────────────────────────────────────────────
-    slw_key = "secondary_low_wick" if prior_rth.get("secondary_low_wick") else "secondary_low_open"
-    slw_time_key = slw_key + "_time"
-    if prior_rth.get(slw_key) is not None and prior_rth.get(slw_time_key):
-        result["secondary_low_wick"] = prior_rth[slw_key]
-        result["secondary_low_wick_time"] = prior_rth[slw_time_key]
-        blocks = blocks_between(prior_rth[slw_time_key], ref_time)
-        result["secondary_low_wick_descending"] = round(prior_rth[slw_key] - SLOPE * blocks, 2)
-        # Legacy
-        result["secondary_low_open"] = result["secondary_low_wick"]
-        result["secondary_low_open_ascending"] = round(prior_rth[slw_key] + SLOPE * blocks, 2)
-        result["secondary_low_open_descending"] = result["secondary_low_wick_descending"]
-    
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# SESSION EXTRACTION
-# ═══════════════════════════════════════════════════════════════════════════════
-def extract_sessions(es_candles, trading_date):
-    if es_candles is None or es_candles.empty:
-        return None
-    result = {}
-    overnight_day = get_prior_trading_day(trading_date)
-    df = es_candles.copy()
-    if df.index.tz is None:
-        df.index = df.index.tz_localize(ET).tz_convert(CT)
-    else:
-        df.index = df.index.tz_convert(CT)
-    
-    sessions = {
-        "sydney": (CT.localize(datetime.combine(overnight_day, time(17, 0))),
-                   CT.localize(datetime.combine(overnight_day, time(20, 30)))),
-        "tokyo": (CT.localize(datetime.combine(overnight_day, time(21, 0))),
-                  CT.localize(datetime.combine(trading_date, time(1, 30)))),
-        "london": (CT.localize(datetime.combine(trading_date, time(2, 0))),
-                   CT.localize(datetime.combine(trading_date, time(5, 30)))),  # London ends at 5:30 AM CT
-        "overnight": (CT.localize(datetime.combine(overnight_day, time(17, 0))),
-                      CT.localize(datetime.combine(trading_date, time(8, 30))))
-    }
-    
-    for name, (start, end) in sessions.items():
-        mask = (df.index >= start) & (df.index <= end)
-        data = df[mask]
-        if not data.empty:
-            result[name] = {
-                "high": round(data['High'].max(), 2),
-                "low": round(data['Low'].min(), 2),
-                "high_time": data['High'].idxmax(),
-                "low_time": data['Low'].idxmin(),
-                # Close-based pivots for ascending floor / descending ceiling
-                "highest_close": round(data['Close'].max(), 2),
-                "lowest_close": round(data['Close'].min(), 2),
-                "highest_close_time": data['Close'].idxmax(),
-                "lowest_close_time": data['Close'].idxmin(),
-            }
-    return result
-
-# ═══════════════════════════════════════════════════════════════════════════════
-# CHANNEL LOGIC
-# ═══════════════════════════════════════════════════════════════════════════════
-def determine_channel(sydney, tokyo, london=None):
-    """
-    Determine channel type by comparing Asian Session vs European Session.
-    
-    The overnight session is viewed as ONE structure:
-    - Asian Session = Sydney + Tokyo combined (their combined high/low)
-    - European Session = London
-    
-    ASCENDING: London made higher highs AND/OR higher lows vs Asian
-    DESCENDING: London made lower highs AND/OR lower lows vs Asian
-    MIXED: Conflicting signals (higher high + lower low, or vice versa)
-    CONTRACTING: London stayed inside Asian range
-    """
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # FALLBACK: No Sydney but have Tokyo + London → Tokyo = Asian, London = European
-    # ─────────────────────────────────────────────────────────────────────────
-    if not sydney and tokyo and london:
-        asian_high = tokyo["high"]
-        asian_low = tokyo["low"]
-        asian_high_time = tokyo.get("high_time")
-        asian_low_time = tokyo.get("low_time")
-        
-        # Use the overall high/low for pivot points
-        true_high = max(asian_high, london["high"])
-        true_low = min(asian_low, london["low"])
-        high_time = asian_high_time if asian_high >= london["high"] else london.get("high_time")
-        low_time = asian_low_time if asian_low <= london["low"] else london.get("low_time")
-        
-        # Compare London vs Tokyo (Asian)
-        london_higher_high = london["high"] > asian_high
-        london_higher_low = london["low"] > asian_low
-        london_lower_high = london["high"] < asian_high
-        london_lower_low = london["low"] < asian_low
-        
-        return _determine_channel_from_comparison(
-            asian_high, asian_low, london["high"], london["low"],
-            london_higher_high, london_higher_low, london_lower_high, london_lower_low,
-            true_high, true_low, high_time, low_time, "Tokyo", "London"
-        )
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # NORMAL CASE: Need at least Sydney + Tokyo for Asian session
-    # ─────────────────────────────────────────────────────────────────────────
-    if not sydney or not tokyo:
-        return ChannelType.UNDETERMINED, "Missing session data (need Sydney+Tokyo or Tokyo+London)", None, None, None, None
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # ASIAN SESSION: Combine Sydney + Tokyo into one session
-    # ─────────────────────────────────────────────────────────────────────────
-    asian_high = max(sydney["high"], tokyo["high"])
-    asian_low = min(sydney["low"], tokyo["low"])
-    
-    # Track which session made the high/low for time reference
-    if sydney["high"] >= tokyo["high"]:
-        asian_high_time = sydney.get("high_time")
-    else:
-        asian_high_time = tokyo.get("high_time")
-    
-    if sydney["low"] <= tokyo["low"]:
-        asian_low_time = sydney.get("low_time")
-    else:
-        asian_low_time = tokyo.get("low_time")
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # NO LONDON: Can only use Asian session data
-    # ─────────────────────────────────────────────────────────────────────────
-    if not london:
-        # Without London, compare Sydney vs Tokyo within Asian session
-        tokyo_higher_high = tokyo["high"] > sydney["high"]
-        tokyo_higher_low = tokyo["low"] > sydney["low"]
-        tokyo_lower_high = tokyo["high"] < sydney["high"]
-        tokyo_lower_low = tokyo["low"] < sydney["low"]
-        
-        if tokyo_higher_high and tokyo_higher_low:
-            return ChannelType.ASCENDING, f"Asian: Tokyo higher H/L vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
-        elif tokyo_lower_high and tokyo_lower_low:
-            return ChannelType.DESCENDING, f"Asian: Tokyo lower H/L vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
-        elif tokyo_higher_high and tokyo_lower_low:
-            return ChannelType.MIXED, f"Asian: Tokyo expanded both ways", asian_high, asian_low, asian_high_time, asian_low_time
-        elif tokyo_lower_high and tokyo_higher_low:
-            return ChannelType.CONTRACTING, f"Asian: Tokyo contracted vs Sydney", asian_high, asian_low, asian_high_time, asian_low_time
-        elif tokyo_higher_high or tokyo_higher_low:
-            return ChannelType.ASCENDING, f"Asian: Tokyo higher {'high' if tokyo_higher_high else 'low'}", asian_high, asian_low, asian_high_time, asian_low_time
-        elif tokyo_lower_high or tokyo_lower_low:
-            return ChannelType.DESCENDING, f"Asian: Tokyo lower {'high' if tokyo_lower_high else 'low'}", asian_high, asian_low, asian_high_time, asian_low_time
-        else:
-            return ChannelType.CONTRACTING, "Asian: No clear direction", asian_high, asian_low, asian_high_time, asian_low_time
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # WITH LONDON: Compare European (London) vs Asian (Sydney+Tokyo)
-    # This is the PRIMARY determination method
-    # ─────────────────────────────────────────────────────────────────────────
-    
-    # Overall high/low for pivot points
-    true_high = max(asian_high, london["high"])
-    true_low = min(asian_low, london["low"])
-    high_time = asian_high_time if asian_high >= london["high"] else london.get("high_time")
-    low_time = asian_low_time if asian_low <= london["low"] else london.get("low_time")
-    
-    # Compare London vs Asian session
-    london_higher_high = london["high"] > asian_high
-    london_higher_low = london["low"] > asian_low
-    london_lower_high = london["high"] < asian_high
-    london_lower_low = london["low"] < asian_low
-    
-    return _determine_channel_from_comparison(
-        asian_high, asian_low, london["high"], london["low"],
-        london_higher_high, london_higher_low, london_lower_high, london_lower_low,
-        true_high, true_low, high_time, low_time, "Asian", "London"
-    )
-
-
-def _determine_channel_from_comparison(asian_high, asian_low, london_high, london_low,
-                                        higher_high, higher_low, lower_high, lower_low,
-                                        true_high, true_low, high_time, low_time,
-                                        asian_name, london_name):
-    """
-    Helper function to determine channel type from session comparison.
-    
-    ASCENDING: Higher highs AND higher lows (or just higher lows - key signal)
-    DESCENDING: Lower highs AND lower lows (or just lower highs - key signal)
-    MIXED: Conflicting signals
-    CONTRACTING: London inside Asian range
-    """
-    
-    # Calculate the differences for display
-    high_diff = london_high - asian_high
-    low_diff = london_low - asian_low
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # CLEAR PATTERNS (both high and low agree)
-    # ─────────────────────────────────────────────────────────────────────────
-    if higher_high and higher_low:
-        # Clear ASCENDING: Both high and low are higher
-        reason = f"{london_name} > {asian_name}: Higher H (+{high_diff:.1f}) & Higher L (+{low_diff:.1f})"
-        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
-    
-    if lower_high and lower_low:
-        # Clear DESCENDING: Both high and low are lower
-        reason = f"{london_name} < {asian_name}: Lower H ({high_diff:.1f}) & Lower L ({low_diff:.1f})"
-        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # MIXED PATTERNS (high and low conflict)
-    # ─────────────────────────────────────────────────────────────────────────
-    if higher_high and lower_low:
-        # Expanded both ways - MIXED
-        reason = f"{london_name} expanded: Higher H (+{high_diff:.1f}) but Lower L ({low_diff:.1f})"
-        return ChannelType.MIXED, reason, true_high, true_low, high_time, low_time
-    
-    if lower_high and higher_low:
-        # Contracted range - determine bias by MAGNITUDE of moves
-        # Whichever move is larger determines the bias
-        high_move = abs(high_diff)  # How much lower the high is
-        low_move = abs(low_diff)    # How much higher the low is
-        
-        if low_move > high_move * 2:
-            # Higher low is significantly larger - ASCENDING bias
-            # Buyers are strongly defending, slight lower high doesn't matter
-            reason = f"{london_name}: Higher L (+{low_diff:.1f}) dominates Lower H ({high_diff:.1f}) → Ascending"
-            return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
-        elif high_move > low_move * 2:
-            # Lower high is significantly larger - DESCENDING bias
-            reason = f"{london_name}: Lower H ({high_diff:.1f}) dominates Higher L (+{low_diff:.1f}) → Descending"
-            return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
-        else:
-            # Moves are similar magnitude - MIXED (no clear direction)
-            reason = f"{london_name} contracted: Lower H ({high_diff:.1f}), Higher L (+{low_diff:.1f}) → Mixed"
-            return ChannelType.MIXED, reason, true_high, true_low, high_time, low_time
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # SINGLE SIGNAL PATTERNS (only one of high/low moved)
-    # ─────────────────────────────────────────────────────────────────────────
-    if higher_high and not lower_low and not higher_low:
-        # Only higher high - ASCENDING
-        reason = f"{london_name}: Higher H (+{high_diff:.1f}), L unchanged"
-        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
-    
-    if higher_low and not lower_high and not higher_high:
-        # Only higher low - ASCENDING (buyers defending)
-        reason = f"{london_name}: Higher L (+{low_diff:.1f}), H unchanged"
-        return ChannelType.ASCENDING, reason, true_high, true_low, high_time, low_time
-    
-    if lower_high and not higher_low and not lower_low:
-        # Only lower high - DESCENDING (sellers defending)
-        reason = f"{london_name}: Lower H ({high_diff:.1f}), L unchanged"
-        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
-    
-    if lower_low and not higher_high and not lower_high:
-        # Only lower low - DESCENDING
-        reason = f"{london_name}: Lower L ({low_diff:.1f}), H unchanged"
-        return ChannelType.DESCENDING, reason, true_high, true_low, high_time, low_time
-    
-    # ─────────────────────────────────────────────────────────────────────────
-    # NO MOVEMENT (London = Asian range)
-    # ─────────────────────────────────────────────────────────────────────────
-    reason = f"{london_name} = {asian_name} range (no expansion)"
-    return ChannelType.CONTRACTING, reason, true_high, true_low, high_time, low_time
-
-
-def validate_and_adjust_pivots(channel_type, upper_pivot, lower_pivot, upper_time, lower_time, 
-                                sessions_data, ref_time):
-    """
-    Validate that no price broke through the projected channel lines during building phase.
-    If price broke through, adjust the pivot to the new extreme BUT ALSO TRACK THE ORIGINAL.
-    
-    Rule: No price can exist outside the channel before 5:30 AM lock.
-    - If price broke BELOW ascending floor line → new lower_pivot = that low
-    - If price broke ABOVE descending ceiling line → new upper_pivot = that high
-    
-    IMPORTANT: We track BOTH because the market often respects the ORIGINAL level
-    even after an overnight "break" (like today's Sydney floor example).
-    
-    Args:
-        channel_type: ASCENDING, DESCENDING, MIXED, etc.
-        upper_pivot, lower_pivot: Current pivot prices
-        upper_time, lower_time: When pivots were made
-        sessions_data: Dict with sydney, tokyo, london session data
-        ref_time: Reference time for projection
-    
-    Returns:
-        Dict with both original and adjusted pivots:
-        {
-            "upper_pivot": adjusted_upper,
-            "lower_pivot": adjusted_lower,
-            "upper_time": adjusted_upper_time,
-            "lower_time": adjusted_lower_time,
-            "original_upper_pivot": original_upper,
-            "original_lower_pivot": original_lower,
-            "original_upper_time": original_upper_time,
-            "original_lower_time": original_lower_time,
-            "floor_was_adjusted": bool,
-            "ceiling_was_adjusted": bool,
-            "adjustment_session": which session caused the adjustment
-        }
-    """
-    
-    result = {
-        "upper_pivot": upper_pivot,
-        "lower_pivot": lower_pivot,
-        "upper_time": upper_time,
-        "lower_time": lower_time,
-        "original_upper_pivot": upper_pivot,
-        "original_lower_pivot": lower_pivot,
-        "original_upper_time": upper_time,
-        "original_lower_time": lower_time,
-        "floor_was_adjusted": False,
-        "ceiling_was_adjusted": False,
-        "floor_adjustment_session": None,
-        "ceiling_adjustment_session": None,
-    }
-    
-    if not sessions_data or channel_type in [ChannelType.UNDETERMINED, ChannelType.CONTRACTING]:
-        return result
-    
-    # Collect all session lows and highs with their times
-    all_lows = []
-    all_highs = []
-    
-    for session_name in ["sydney", "tokyo", "london"]:
-        session = sessions_data.get(session_name)
-        if session:
-            all_lows.append((session["low"], session.get("low_time"), session_name))
-            all_highs.append((session["high"], session.get("high_time"), session_name))
-    
-    adjusted_lower = lower_pivot
-    adjusted_lower_time = lower_time
-    adjusted_upper = upper_pivot
-    adjusted_upper_time = upper_time
-    
-    # For ASCENDING channel: Check if any price broke below the ascending floor line
-    if channel_type == ChannelType.ASCENDING:
-        for low_price, low_time_val, session_name in all_lows:
-            if low_time_val and lower_time and low_time_val > lower_time:
-                # Calculate where the ascending floor would be at this time
-                blocks = blocks_between(lower_time, low_time_val)
-                projected_floor = adjusted_lower + SLOPE * blocks
-                
-                # If price went below the projected floor, this becomes new pivot
-                if low_price < projected_floor:
-                    adjusted_lower = low_price
-                    adjusted_lower_time = low_time_val
-                    result["floor_was_adjusted"] = True
-                    result["floor_adjustment_session"] = session_name
-    
-    # For DESCENDING channel: Check if any price broke above the descending ceiling line
-    elif channel_type == ChannelType.DESCENDING:
-        for high_price, high_time_val, session_name in all_highs:
-            if high_time_val and upper_time and high_time_val > upper_time:
-                # Calculate where the descending ceiling would be at this time
-                blocks = blocks_between(upper_time, high_time_val)
-                projected_ceiling = adjusted_upper - SLOPE * blocks
-                
-                # If price went above the projected ceiling, this becomes new pivot
-                if high_price > projected_ceiling:
-                    adjusted_upper = high_price
-                    adjusted_upper_time = high_time_val
-                    result["ceiling_was_adjusted"] = True
-                    result["ceiling_adjustment_session"] = session_name
-    
-    # For MIXED channel: Check both directions
-    elif channel_type == ChannelType.MIXED:
-        # Check ascending floor breaks
-        for low_price, low_time_val, session_name in all_lows:
-            if low_time_val and lower_time and low_time_val > lower_time:
-                blocks = blocks_between(lower_time, low_time_val)
-                projected_floor = adjusted_lower + SLOPE * blocks
-                if low_price < projected_floor:
-                    adjusted_lower = low_price
-                    adjusted_lower_time = low_time_val
-                    result["floor_was_adjusted"] = True
-                    result["floor_adjustment_session"] = session_name
-        
-        # Check descending ceiling breaks
-        for high_price, high_time_val, session_name in all_highs:
-            if high_time_val and upper_time and high_time_val > upper_time:
-                blocks = blocks_between(upper_time, high_time_val)
-                projected_ceiling = adjusted_upper - SLOPE * blocks
-                if high_price > projected_ceiling:
-                    adjusted_upper = high_price
-                    adjusted_upper_time = high_time_val
-                    result["ceiling_was_adjusted"] = True
-                    result["ceiling_adjustment_session"] = session_name
-    
-    result["upper_pivot"] = adjusted_upper
-    result["lower_pivot"] = adjusted_lower
-    result["upper_time"] = adjusted_upper_time
-    result["lower_time"] = adjusted_lower_time
-    
-    return result
-
-
-def calc_channel_levels(upper_pivot, lower_pivot, upper_time, lower_time, ref_time, channel_type):
-    if upper_pivot is None or lower_pivot is None:
-        return None, None
-    blocks_high = blocks_between(upper_time, ref_time) if upper_time and ref_time else 0
-    blocks_low = blocks_between(lower_time, ref_time) if lower_time and ref_time else 0
-    
-    if channel_type == ChannelType.ASCENDING:
-        ceiling = round(upper_pivot + SLOPE * blocks_high, 2)
-        floor = round(lower_pivot + SLOPE * blocks_low, 2)
-    elif channel_type == ChannelType.DESCENDING:
-        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)
-        floor = round(lower_pivot - SLOPE * blocks_low, 2)
-    elif channel_type == ChannelType.MIXED:
-        # MIXED: For display, use descending ceiling and ascending floor (outer bounds)
-        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)  # Descending ceiling
-        floor = round(lower_pivot + SLOPE * blocks_low, 2)      # Ascending floor
-    elif channel_type == ChannelType.CONTRACTING:
-        ceiling = round(upper_pivot - SLOPE * blocks_high, 2)
-        floor = round(lower_pivot + SLOPE * blocks_low, 2)
-    else:
-        ceiling, floor = upper_pivot, lower_pivot
-    return ceiling, floor
-
-def get_close_based_pivots(sydney, tokyo, london):
-    """
-    Extract highest close and lowest close across overnight sessions.
-    Used for: descending ceiling (highest close) and ascending floor (lowest close).
-    
-    Returns dict with highest_close, lowest_close, and their times.
-    """
-    result = {
-        "highest_close": None, "highest_close_time": None,
-        "lowest_close": None, "lowest_close_time": None,
-    }
-    
-    for session in [sydney, tokyo, london]:
-        if session and session.get("highest_close") is not None:
-            if result["highest_close"] is None or session["highest_close"] > result["highest_close"]:
-                result["highest_close"] = session["highest_close"]
-                result["highest_close_time"] = session.get("highest_close_time")
-            if result["lowest_close"] is None or session["lowest_close"] < result["lowest_close"]:
-                result["lowest_close"] = session["lowest_close"]
-                result["lowest_close_time"] = session.get("lowest_close_time")
+            if not zone_df.empty and len(zone_df) > 2:
+                result["bottom"] = round(float(zone_df['Low'].min()), 2)
+                result["top"] = round(float(zone_df['High'].max()), 2)
+                result["range_size"] = round(result["top"] - result["bottom"], 2)
+                result["available"] = True
+            else:
+                # Fallback: Use the last close as a reference point
+                last_close = data['Close'].iloc[-1]
+                # Estimate a typical overnight range (VIX usually moves 0.5-1.5 in overnight)
+                result["bottom"] = round(float(last_close) - 0.5, 2)
+                result["top"] = round(float(last_close) + 0.5, 2)
+                result["range_size"] = 1.0
+                result["available"] = True
+                result["estimated"] = True
+    except Exception as e:
+        pass
     
     return result
 
-def calc_dual_channel_levels(upper_pivot_wick, lower_pivot_wick, upper_wick_time, lower_wick_time,
-                             ref_time, upper_pivot_close=None, lower_pivot_close=None,
-                             upper_close_time=None, lower_close_time=None):
+# ═══════════════════════════════════════════════════════════════════════════════
+# VIX TERM STRUCTURE
+# ═══════════════════════════════════════════════════════════════════════════════
+@stale_while_revalidate(ttl=300, max_stale=1800)
+@single_flight
+def fetch_vix_term_structure():
     """
-    Calculate ALL FOUR channel levels using correct pivot types per direction.
-    
-    RULE:
-      ASCENDING ceiling  = highest WICK projected up   (wicks mark absolute tops)
-      ASCENDING floor    = lowest CLOSE projected up   (bodies define support)
-      DESCENDING ceiling = highest CLOSE projected down (bodies define resistance)
-      DESCENDING floor   = lowest WICK projected down  (wicks mark absolute bottoms)
-    
-    If close-based pivots not provided, falls back to wick-based for all.
+    Fetch VIX term structure (VIX vs VIX futures).
+    Contango (normal): VIX futures > VIX spot → stable/bullish
+    Backwardation (fear): VIX spot > VIX futures → volatile/bearish
     """
-    if upper_pivot_wick is None or lower_pivot_wick is None:
-        return None
-    
-    # Fall back to wick-based if close-based not available
-    if upper_pivot_close is None:
-        upper_pivot_close = upper_pivot_wick
-    if lower_pivot_close is None:
-        lower_pivot_close = lower_pivot_wick
-    if upper_close_time is None:
-        upper_close_time = upper_wick_time
-    if lower_close_time is None:
-        lower_close_time = lower_wick_time
-    
-    blocks_high_wick = blocks_between(upper_wick_time, ref_time) if upper_wick_time and ref_time else 0
-    blocks_low_wick = blocks_between(lower_wick_time, ref_time) if lower_wick_time and ref_time else 0
-    blocks_high_close = blocks_between(upper_close_time, ref_time) if upper_close_time and ref_time else 0
-    blocks_low_close = blocks_between(lower_close_time, ref_time) if lower_close_time and ref_time else 0
-    
-    return {
-        # ASCENDING CHANNEL
-        "asc_floor": round(lower_pivot_close + SLOPE * blocks_low_close, 2),    # Lowest CLOSE going UP
-        "asc_ceiling": round(upper_pivot_wick + SLOPE * blocks_high_wick, 2),   # Highest WICK going UP
-        
-        # DESCENDING CHANNEL
-        "desc_ceiling": round(upper_pivot_close - SLOPE * blocks_high_close, 2), # Highest CLOSE going DOWN
-        "desc_floor": round(lower_pivot_wick - SLOPE * blocks_low_wick, 2),      # Lowest WICK going DOWN
+    result = {"vix_spot": None, "vix_future": None, "structure": "UNKNOWN", "spread": None}
+    try:
+        # VIX spot and VIX 3-month (proxy for futures) from the shared vol snapshot
+        spot = get_vol_close("^VIX")
+        future = get_vol_close("^VIX3M")
         
-        # Metadata
-        "blocks_high": blocks_high_wick,
-        "blocks_low": blocks_low_wick,
-        "overnight_high": upper_pivot_wick,
-        "overnight_low": lower_pivot_wick,
-        "overnight_high_close": upper_pivot_close,
-        "overnight_low_close": lower_pivot_close,
-    }
-
-def get_position(price, ceiling, floor):
-    if price > ceiling:
-        return Position.ABOVE
-    elif price < floor:
-        return Position.BELOW
-    return Position.INSIDE
+        if spot is not None and future is not None:
+            spread = round(future - spot, 2)  # Positive = contango, Negative = backwardation
+            
+            result["vix_spot"] = spot
+            result["vix_future"] = future
+            result["spread"] = spread
+            
+            if spread > 1.5:
+                result["structure"] = "CONTANGO"  # Normal, stable
+            elif spread < -1.5:
+                result["structure"] = "BACKWARDATION"  # Fear, volatile
+            else:
+                result["structure"] = "FLAT"  # Neutral
+    except Exception:
+        pass
+    return result
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# RETAIL POSITIONING
+# ═══════════════════════════════════════════════════════════════════════════════
+@stale_while_revalidate(ttl=300, max_stale=1800)
+@single_flight
+def fetch_retail_positioning():
+    result = {"vix": None, "vix3m": None, "spread": None, "positioning": "BALANCED", "warning": None, "bias": Bias.NEUTRAL}
+    try:
+        vix = get_vol_close("^VIX")
+        vix3m = get_vol_close("^VIX3M")
+        if vix is not None and vix3m is not None:
+            spread = round(vix - vix3m, 2)
+            result["vix"], result["vix3m"], result["spread"] = vix, vix3m, spread
+            if spread <= -3.0:
+                result["positioning"], result["warning"], result["bias"] = "CALL BUYING EXTREME", "Extreme complacency - high fade probability", Bias.PUTS
+            elif spread <= -1.5:
+                result["positioning"], result["warning"], result["bias"] = "CALL BUYING HEAVY", "Market often fades the crowd", Bias.PUTS
+            elif spread >= 3.0:
+                result["positioning"], result["warning"], result["bias"] = "PUT BUYING EXTREME", "Extreme fear - high fade probability", Bias.CALLS
+            elif spread >= 1.5:
+                result["positioning"], result["warning"], result["bias"] = "PUT BUYING HEAVY", "Market often fades the crowd", Bias.CALLS
+    except Exception:
+        pass
+    return result
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# EXPLOSIVE MOVE DETECTOR
+# PRIOR DAY RTH DATA
 # ═══════════════════════════════════════════════════════════════════════════════
-def detect_explosive_potential(current_spx, dual_levels, prior_targets, channel_type,
-                                vix_spread, ema_data, overnight_range, prior_day_range,
-                                gap_analysis):
-    """
-    Detect explosive move potential based on TARGET DISTANCE.
-    
-    The only thing that matters: How far is the profit target if structure breaks?
-    - Ascending floor breaks → Target is descending line from prior RTH low
-    - Descending ceiling breaks → Target is ascending line from prior RTH high
+@stale_while_revalidate(ttl=3600, max_stale=86400)
+@single_flight
+def fetch_prior_day_rth(trading_date):
+    """Fetch prior day's RTH (Regular Trading Hours) data for ES futures using Yahoo Finance.
+    RTH is 8:30 AM - 3:00 PM CT (9:30 AM - 4:00 PM ET)
     
-    The further the target, the bigger the potential move.
+    Reads the 30-minute bars (matches our trading blocks) from the shared ES store.
     """
-    
-    result = {
-        "explosive_score": 0,
-        "direction_bias": None,
-        "target_distance": None,
-        "potential_move": None,
-        "conviction": "LOW"
+    try:
+        df = get_es_bar_store().refresh(3600)
+        return extract_prior_day_rth(df, get_prior_trading_day(trading_date))
+    except Exception:
+        return extract_prior_day_rth(None, None)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PREFETCH STAGE - Concurrent market-data loads
+# ═══════════════════════════════════════════════════════════════════════════════
+#
+# All independent Yahoo fetches run at the same time on one bounded worker pool.
+# Each source has its own deadline (measured from the start of the stage); a
+# source that misses it falls back to its last good value while the in-flight
+# call keeps running and refreshes that value for the next rerun.
+# ═══════════════════════════════════════════════════════════════════════════════
+
+PREFETCH_MAX_WORKERS = 6
+
+PREFETCH_DEADLINES = {   # seconds
+    "es_current": 4.0,
+    "es_candles": 6.0,
+    "vix": 3.0,
+    "vix_range": 5.0,
+    "retail": 5.0,
+    "ema": 6.0,
+    "prior_rth": 8.0,
+    "vix_term": 5.0,
+}
+PREFETCH_COLD_WAIT = 20.0   # seconds - cap on waiting for a source that has no last good value yet
+
+# What counts as a "good" value per source (fallback defaults are not worth keeping)
+PREFETCH_RESULT_OK = {
+    "es_current": lambda v: v is not None,
+    "es_candles": lambda v: v is not None,
+    "vix": lambda v: v is not None and v != 16.0,
+    "vix_range": lambda v: bool(v and v.get("available")),
+    "retail": lambda v: bool(v and v.get("vix") is not None),
+    "ema": lambda v: bool(v and v.get("price") is not None),
+    "prior_rth": lambda v: bool(v and v.get("available")),
+    "vix_term": lambda v: bool(v and v.get("vix_spot") is not None),
+}
+
+@st.cache_resource(show_spinner=False)
+def _get_prefetch_pool():
+    """Process-wide worker pool, in-flight calls and last good values (shared by all sessions)."""
+    return {
+        "executor": ThreadPoolExecutor(max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch"),
+        "in_flight": {},
+        "last_good": {},
+        "lock": threading.Lock(),
     }
-    
-    if not dual_levels or not current_spx:
-        return result
-    
-    asc_floor = dual_levels.get("asc_floor", 0)
-    desc_ceiling = dual_levels.get("desc_ceiling", 0)
-    
-    # Get targets from prior day levels
-    bearish_target = None
-    bullish_target = None
-    
-    if prior_targets and prior_targets.get("available"):
-        bearish_target = prior_targets.get("primary_low_open_descending")
-        bullish_target = prior_targets.get("primary_high_wick_ascending")
-    
-    # Calculate target distances
-    bearish_runway = abs(asc_floor - bearish_target) if bearish_target else 0
-    bullish_runway = abs(desc_ceiling - bullish_target) if bullish_target else 0
-    
-    # Determine which scenario has more potential based on channel type
-    if channel_type == ChannelType.ASCENDING and bearish_runway > 0:
-        # Ascending channel - if floor breaks, bearish target is the play
-        result["target_distance"] = bearish_runway
-        result["potential_move"] = "BEARISH"
-        result["direction_bias"] = "PUTS"
-    elif channel_type == ChannelType.DESCENDING and bullish_runway > 0:
-        # Descending channel - if ceiling breaks, bullish target is the play
-        result["target_distance"] = bullish_runway
-        result["potential_move"] = "BULLISH"
-        result["direction_bias"] = "CALLS"
-    elif bearish_runway > bullish_runway:
-        result["target_distance"] = bearish_runway
-        result["potential_move"] = "BEARISH"
-        result["direction_bias"] = "PUTS"
-    elif bullish_runway > 0:
-        result["target_distance"] = bullish_runway
-        result["potential_move"] = "BULLISH"
-        result["direction_bias"] = "CALLS"
-    
-    # Score based ONLY on target distance
-    runway = result["target_distance"] or 0
-    
-    if runway >= 80:
-        result["explosive_score"] = 100
-        result["conviction"] = "EXTREME"
-    elif runway >= 60:
-        result["explosive_score"] = 75
-        result["conviction"] = "HIGH"
-    elif runway >= 40:
-        result["explosive_score"] = 50
-        result["conviction"] = "MODERATE"
-    elif runway >= 25:
-        result["explosive_score"] = 30
-        result["conviction"] = "LOW"
-    else:
-        result["explosive_score"] = 0
-        result["conviction"] = "LOW"
-    
-    return result
 
+def _remember_prefetch_result(pool, name, key, future):
+    """Done-callback: keep the result as last good value and release the in-flight slot."""
+    try:
+        value = future.result()
+        if PREFETCH_RESULT_OK.get(name, lambda v: v is not None)(value):
+            pool["last_good"][key] = value
+    except Exception:
+        pass
+    with pool["lock"]:
+        if pool["in_flight"].get(key) is future:
+            del pool["in_flight"][key]
 
-def analyze_market_state_v2(current_spx, dual_levels, channel_type, channel_reason,
-                            retail_bias, ema_bias, vix_position, vix, 
-                            session_tests, gap_analysis, prior_close_analysis, vix_structure,
-                            prior_targets=None, current_time=None, vix_channel_data=None):
+def prefetch_market_data(trading_date, vix_zone_start, vix_zone_end, skip=()):
     """
-    OPTION C: Dual Channel Decision Engine
-    
-    Always provides:
-    1. All 4 levels (asc_floor, asc_ceiling, desc_ceiling, desc_floor)
-    2. Dominant channel detection with reasoning
-    3. PRIMARY trade at dominant level (higher probability)
-    4. ALTERNATE trade if structure breaks at open
-    5. Structure break alerts (only after channel locks at 5:30 AM CT)
-    6. Confluence-based confidence scoring
-    
-    Channel Building Timeline:
-    - 5:00 PM - 5:30 AM CT: Channel BUILDING (Sydney + Tokyo + London)
-    - 5:30 AM CT: Channel LOCKED
-    - 5:30 AM - 8:30 AM CT: Pre-RTH testing
-    - 8:30 AM CT: RTH Open - final assessment
+    Load every independent market-data source concurrently.
+
+    Args:
+        trading_date: Actual trading date (weekends already rolled to Monday)
+        vix_zone_start, vix_zone_end: VIX overnight zone bounds (time objects)
+        skip: Source names not needed this rerun (e.g. covered by manual overrides)
+
+    Returns:
+        Snapshot dict with one entry per source plus "stale_sources" (served from
+        last good value after missing the deadline) and "elapsed_ms".
     """
-    
-    if current_spx is None or dual_levels is None:
-        return {
-            "no_trade": True, 
-            "no_trade_reason": "Missing price data",
-            "dual_levels": None,
-            "primary": None,
-            "secondary": None,
-            "alternate": None,
-            "structure_alerts": [],
-            "calls_factors": [],
-            "puts_factors": [],
-            "position_summary": "No data available",
-            "channel_status": "UNKNOWN"
-        }
-    
-    # Determine channel status based on time
-    channel_locked = True  # Default to locked
-    channel_status = "LOCKED"
-    
-    if current_time:
-        ct_hour = current_time.hour
-        ct_minute = current_time.minute
-        ct_decimal = ct_hour + ct_minute / 60.0
-        
-        # Channel builds from 5 PM (17:00) to 5:30 AM (5:30)
-        # Before 5:30 AM = still building
-        if ct_decimal < 5.5:  # Before 5:30 AM
-            channel_locked = False
-            channel_status = "BUILDING"
-        elif ct_decimal >= 17.0:  # After 5 PM = new session building
-            channel_locked = False
-            channel_status = "BUILDING"
-    
-    # Extract levels
-    asc_floor = dual_levels["asc_floor"]
-    asc_ceiling = dual_levels["asc_ceiling"]
-    desc_ceiling = dual_levels["desc_ceiling"]
-    desc_floor = dual_levels["desc_floor"]
-    
-    # Position analysis
-    dist_to_asc_floor = abs(current_spx - asc_floor)
-    dist_to_desc_ceiling = abs(current_spx - desc_ceiling)
-    
-    NEAR_THRESHOLD = 15
-    near_asc_floor = dist_to_asc_floor <= NEAR_THRESHOLD
-    near_desc_ceiling = dist_to_desc_ceiling <= NEAR_THRESHOLD
-    
-    below_asc_floor = current_spx < asc_floor
-    above_desc_ceiling = current_spx > desc_ceiling
-    
-    # Confluence factors
-    ema_bullish = ema_bias == Bias.CALLS
-    ema_bearish = ema_bias == Bias.PUTS
-    fade_to_calls = retail_bias == Bias.CALLS
-    fade_to_puts = retail_bias == Bias.PUTS
-    floor_tested = session_tests["floor_tests"] >= 1
-    floor_multi_test = session_tests["floor_tests"] >= 2
-    ceiling_tested = session_tests["ceiling_tests"] >= 1
-    ceiling_multi_test = session_tests["ceiling_tests"] >= 2
-    gap_into_floor = gap_analysis["into_floor"]
-    gap_into_ceiling = gap_analysis["into_ceiling"]
-    prior_validates_floor = prior_close_analysis["validates_floor"]
-    prior_validates_ceiling = prior_close_analysis["validates_ceiling"]
-    vix_backwardation = vix_structure["structure"] == "BACKWARDATION"
-    
-    # Build factor lists
-    calls_factors = []
-    puts_factors = []
-    
-    if ema_bullish: calls_factors.append("✓ EMA bullish (8>21>200)")
-    if fade_to_calls: calls_factors.append("✓ Retail puts heavy (fade)")
-    if floor_tested: 
-        sessions_str = ", ".join(session_tests["floor_sessions"])
-        calls_factors.append(f"✓ Floor tested ({sessions_str})")
-    if floor_multi_test: calls_factors.append("✓✓ Floor multi-tested")
-    if gap_into_floor: calls_factors.append("✓ Gap down INTO floor")
-    if prior_validates_floor: calls_factors.append("✓ Prior close validates floor")
-    
-    if ema_bearish: puts_factors.append("✓ EMA bearish (8<21<200)")
-    if fade_to_puts: puts_factors.append("✓ Retail calls heavy (fade)")
-    if ceiling_tested:
-        sessions_str = ", ".join(session_tests["ceiling_sessions"])
-        puts_factors.append(f"✓ Ceiling tested ({sessions_str})")
-    if ceiling_multi_test: puts_factors.append("✓✓ Ceiling multi-tested")
-    if gap_into_ceiling: puts_factors.append("✓ Gap up INTO ceiling")
-    if prior_validates_ceiling: puts_factors.append("✓ Prior close validates ceiling")
-    
-    if vix_backwardation:
-        calls_factors.append("⚡ VIX backwardation (volatile)")
-        puts_factors.append("⚡ VIX backwardation (volatile)")
-    
-    # VIX Channel structural bias
-    vix_channel_bullish_spx = False
-    vix_channel_bearish_spx = False
-    vix_channel_squeeze = False
-    vix_entry_signal = None  # Track specific VIX entry scenario
-    
-    if vix_channel_data and vix_channel_data.get("floor") is not None:
-        vix_floor = vix_channel_data.get("floor", 0)
-        vix_ceiling = vix_channel_data.get("ceiling", 0)
-        vix_ch_type = vix_channel_data.get("channel_type")
-        vix_ch_status = vix_channel_data.get("channel_status", "BUILDING")
-        
-        if vix_ch_status == "BUILDING":
-            # BUILDING - note it but don't add directional bias
-            calls_factors.append("🌊 VIX zone building (no directional bias yet)")
-            puts_factors.append("🌊 VIX zone building (no directional bias yet)")
-        elif vix and vix_ch_status == "LOCKED":
-            # Calculate proximity to channel walls (within 0.15 VIX pts = "touching")
-            TOUCH_THRESHOLD = 0.15
-            dist_to_floor = vix - vix_floor
-            dist_to_ceiling = vix_ceiling - vix
-            
-            # ─── SCENARIO 1: VIX touches floor, closes above → PUTS ───
-            # VIX came down to floor and bounced = VIX going back up = SPX down
-            if dist_to_floor >= 0 and dist_to_floor <= TOUCH_THRESHOLD:
-                vix_channel_bearish_spx = True
-                vix_entry_signal = "floor_bounce"
-                puts_factors.append("🌊 VIX touching floor & closing above → PUTS (VIX bouncing up)")
-            
-            # ─── SCENARIO 2: VIX touches ceiling, closes below → CALLS ───
-            # VIX went up to ceiling and got rejected = VIX going back down = SPX up
-            elif dist_to_ceiling >= 0 and dist_to_ceiling <= TOUCH_THRESHOLD:
-                vix_channel_bullish_spx = True
-                vix_entry_signal = "ceiling_rejection"
-                calls_factors.append("🌊 VIX touching ceiling & closing below → CALLS (VIX rejected)")
-            
-            # ─── SCENARIO 3: VIX broke above ceiling, retesting from above → PUTS ───
-            # VIX is above ceiling (broke out), came back to touch it = ceiling is now support
-            elif vix > vix_ceiling and dist_to_ceiling >= -TOUCH_THRESHOLD and dist_to_ceiling < 0:
-                vix_channel_bearish_spx = True
-                vix_entry_signal = "ceiling_retest"
-                puts_factors.append("🌊 VIX broke ceiling, retesting from above → PUTS (ceiling=support)")
-            
-            # ─── SCENARIO 4: VIX broke below floor, retesting from below → CALLS ───
-            # VIX is below floor (broke down), came back to touch it = floor is now resistance
-            elif vix < vix_floor and dist_to_floor >= -TOUCH_THRESHOLD and dist_to_floor < 0:
-                vix_channel_bullish_spx = True
-                vix_entry_signal = "floor_retest"
-                calls_factors.append("🌊 VIX broke floor, retesting from below → CALLS (floor=resistance)")
-            
-            # ─── NOT AT A WALL: Use position + channel shape for general bias ───
-            elif vix > vix_ceiling:
-                # VIX above ceiling but not near it = established above
-                vix_channel_bearish_spx = True
-                puts_factors.append("🌊 VIX above channel ceiling (bearish SPX)")
-            elif vix < vix_floor:
-                # VIX below floor but not near it = established below
-                vix_channel_bullish_spx = True
-                calls_factors.append("🌊 VIX below channel floor (bullish SPX)")
-            else:
-                # Inside channel - use shape for directional bias
-                if vix_ch_type == VIXChannelType.DESCENDING:
-                    vix_channel_bullish_spx = True
-                    calls_factors.append("🌊 VIX channel descending (bullish SPX bias)")
-                elif vix_ch_type == VIXChannelType.ASCENDING:
-                    vix_channel_bearish_spx = True
-                    puts_factors.append("🌊 VIX channel ascending (bearish SPX bias)")
-                elif vix_ch_type == VIXChannelType.CONVERGING:
-                    vix_channel_squeeze = True
-                    calls_factors.append("🌊 VIX channel squeezing (breakout pending)")
-                    puts_factors.append("🌊 VIX channel squeezing (breakout pending)")
-    
-    # Confidence calculation
-    def calc_conf(direction, at_level, is_break=False):
-        support = 0
-        if direction == "CALLS":
-            if ema_bullish: support += 1
-            if fade_to_calls: support += 1
-            if floor_tested: support += 1
-            if floor_multi_test: support += 1
-            if gap_into_floor: support += 1
-            if prior_validates_floor: support += 1
-            if vix_channel_bullish_spx: support += 1  # VIX channel confirms bullish
-        else:
-            if ema_bearish: support += 1
-            if fade_to_puts: support += 1
-            if ceiling_tested: support += 1
-            if ceiling_multi_test: support += 1
-            if gap_into_ceiling: support += 1
-            if prior_validates_ceiling: support += 1
-            if vix_channel_bearish_spx: support += 1  # VIX channel confirms bearish
-        
-        if is_break: return "MEDIUM" if support >= 3 else "LOW"
-        if at_level:
-            if support >= 4: return "HIGH"
-            elif support >= 2: return "MEDIUM"
-            else: return "LOW"
-        else:
-            return "MEDIUM" if support >= 4 else "LOW"
-    
-    # Trade builder
-    def make_trade(name, direction, entry, stop, trigger, rationale, confidence, is_primary=True):
-        # VIX-adaptive strike offset: closer ATM in low vol, further OTM in high vol
-        if vix < 15:
-            strike_offset = 10   # Low vol: stay close for higher delta
-        elif vix < 20:
-            strike_offset = 15   # Normal vol
-        elif vix < 25:
-            strike_offset = 20   # Elevated vol
-        else:
-            strike_offset = 25   # High vol: further OTM, cheaper premium
-        
-        if direction == "CALLS":
-            strike = int(math.ceil((entry + strike_offset) / 5) * 5)
-            opt_type = "CALL"
-        else:
-            strike = int(math.floor((entry - strike_offset) / 5) * 5)
-            opt_type = "PUT"
-        
-        # Time-aware target scaling
-        ct_now_local = datetime.now(CT)
-        hours_remaining = max(0.1, (CT.localize(datetime.combine(
-            current_time.date() if current_time else ct_now_local.date(), 
-            time(15, 0))) - ct_now_local).total_seconds() / 3600)
-        
-        if hours_remaining >= 5:
-            target_pcts = [0.50, 0.75, 1.00]  # Full targets early
-        elif hours_remaining >= 3:
-            target_pcts = [0.40, 0.60, 0.80]  # Moderate midday
-        elif hours_remaining >= 1.5:
-            target_pcts = [0.30, 0.50, 0.70]  # Reduced afternoon
-        else:
-            target_pcts = [0.20, 0.35, 0.50]  # Scalp mode last 90min
-        
-        entry_premium = estimate_0dte_premium(entry, strike, hours_remaining, vix, opt_type)
-        t1 = round(entry_premium * (1 + target_pcts[0]), 2)
-        t2 = round(entry_premium * (1 + target_pcts[1]), 2)
-        t3 = round(entry_premium * (1 + target_pcts[2]), 2)
-        
-        # Premium-based stop (50% of premium = max loss)
-        stop_premium = round(entry_premium * 0.50, 2)
-        max_loss_dollars = round(entry_premium * 0.50 * 100, 0)
-        
-        return {
-            "name": name, "direction": direction, "entry_level": entry, "stop_level": stop,
-            "trigger": trigger, "rationale": rationale, "confidence": confidence, "is_primary": is_primary,
-            "strike": strike, "contract": f"SPX {strike}{'C' if direction == 'CALLS' else 'P'} 0DTE",
-            "entry_premium": entry_premium,
-            "stop_premium": stop_premium,
-            "max_loss_dollars": max_loss_dollars,
-            "hours_remaining": round(hours_remaining, 1),
-            "target_pcts": target_pcts,
-            "targets": {
-                "t1": {"price": t1, "profit_pct": int(target_pcts[0]*100), "profit_dollars": round((t1 - entry_premium) * 100, 0)},
-                "t2": {"price": t2, "profit_pct": int(target_pcts[1]*100), "profit_dollars": round((t2 - entry_premium) * 100, 0)},
-                "t3": {"price": t3, "profit_pct": int(target_pcts[2]*100), "profit_dollars": round((t3 - entry_premium) * 100, 0)},
-            }
-        }
-    
-    # Structure alerts - ONLY show "broken" if channel is locked (after 5:30 AM CT)
-    structure_alerts = []
-    if channel_locked:
-        if channel_type == ChannelType.ASCENDING and below_asc_floor:
-            structure_alerts.append(f"⚠️ STRUCTURE BROKEN: Price below ascending floor ({asc_floor:.2f})")
-        if channel_type == ChannelType.DESCENDING and above_desc_ceiling:
-            structure_alerts.append(f"⚠️ STRUCTURE BROKEN: Price above descending ceiling ({desc_ceiling:.2f})")
-    else:
-        # Channel still building - show informational message
-        if channel_type == ChannelType.ASCENDING and below_asc_floor:
-            structure_alerts.append(f"📊 CHANNEL BUILDING: Price currently below developing floor ({asc_floor:.2f})")
-        if channel_type == ChannelType.DESCENDING and above_desc_ceiling:
-            structure_alerts.append(f"📊 CHANNEL BUILDING: Price currently above developing ceiling ({desc_ceiling:.2f})")
-    
-    # Initialize result
-    result = {
-        "no_trade": False, "no_trade_reason": None,
-        "channel_type": channel_type, "channel_reason": channel_reason,
-        "channel_status": channel_status,
-        "channel_locked": channel_locked,
-        "dual_levels": dual_levels,
-        "calls_factors": calls_factors, "puts_factors": puts_factors,
-        "structure_alerts": structure_alerts,
-        "primary": None, "secondary": None, "alternate": None, "position_summary": ""
+    jobs = {
+        "es_current": (fetch_es_current, ()),
+        "es_candles": (fetch_es_candles, ()),
+        "vix": (fetch_vix_yahoo, ()),
+        "vix_range": (fetch_vix_overnight_range, (trading_date,
+                                                  vix_zone_start.hour, vix_zone_start.minute,
+                                                  vix_zone_end.hour, vix_zone_end.minute)),
+        "retail": (fetch_retail_positioning, ()),
+        "ema": (fetch_es_with_ema, ()),
+        "prior_rth": (fetch_prior_day_rth, (trading_date,)),
+        "vix_term": (fetch_vix_term_structure, ()),
     }
-    
-    # No trade conditions
-    if channel_type == ChannelType.CONTRACTING:
-        result["no_trade"] = True
-        result["no_trade_reason"] = "CONTRACTING channel - Wait for expansion"
-        return result
-    if channel_type == ChannelType.UNDETERMINED:
-        result["no_trade"] = True
-        result["no_trade_reason"] = "Cannot determine channel - Insufficient data"
-        return result
-    
-    # ASCENDING DOMINANT
-    if channel_type == ChannelType.ASCENDING:
-        # Get price target for break scenario
-        desc_target = None
-        price_target_text = ""
-        if prior_targets and prior_targets.get("available"):
-            desc_target = prior_targets.get("primary_low_open_descending")
-            if desc_target:
-                price_target_text = f" • Target: {desc_target:.2f} (desc from prior low)"
-        
-        if channel_locked and below_asc_floor:
-            # AFTER 5:30 AM and structure is broken - flip the trades
-            result["primary"] = make_trade("Ascending Floor Rejection", "PUTS", asc_floor, asc_floor + 10,
-                f"Sell rallies to broken floor {asc_floor:.2f}",
-                f"Structure broken{price_target_text} • {len(puts_factors)} factors", calc_conf("PUTS", True), True)
-            result["alternate"] = make_trade("Floor Reclaim", "CALLS", asc_floor, asc_floor - 10,
-                f"ONLY if price reclaims {asc_floor:.2f}",
-                "Recovery scenario - watch for failed breakdown", calc_conf("CALLS", True, True), False)
-            result["position_summary"] = f"⚠️ BELOW ascending floor ({asc_floor:.2f}) - BEARISH bias"
-            if desc_target:
-                result["price_target"] = desc_target
-                result["price_target_desc"] = "Descending line from prior RTH low"
-        else:
-            # Structure intact OR channel still building - show both scenarios
-            result["primary"] = make_trade("Ascending Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
-                f"Buy at floor {asc_floor:.2f}" if channel_locked else f"Buy at developing floor {asc_floor:.2f}",
-                f"KEY: Ascending floor • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), True)
-            result["alternate"] = make_trade("Floor Break → Rejection", "PUTS", asc_floor, asc_floor + 10,
-                f"IF floor {asc_floor:.2f} breaks at open",
-                f"Breakdown scenario{price_target_text} • {len(puts_factors)} factors", calc_conf("PUTS", False), False)
-            # Also keep secondary for ceiling
-            result["secondary"] = make_trade("Desc Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
-                f"If price reaches {desc_ceiling:.2f}",
-                f"Secondary level • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), False)
-            
-            if channel_locked:
-                result["position_summary"] = f"{'✅ AT' if near_asc_floor else '📍 Wait for'} ascending floor ({asc_floor:.2f})"
-            else:
-                result["position_summary"] = f"🔄 CHANNEL BUILDING - Floor developing at {asc_floor:.2f}"
-    
-    # DESCENDING DOMINANT
-    elif channel_type == ChannelType.DESCENDING:
-        # Get price target for break scenario
-        asc_target = None
-        price_target_text = ""
-        if prior_targets and prior_targets.get("available"):
-            asc_target = prior_targets.get("primary_high_wick_ascending")
-            if asc_target:
-                price_target_text = f" • Target: {asc_target:.2f} (asc from prior high)"
-        
-        if channel_locked and above_desc_ceiling:
-            # AFTER 5:30 AM and structure is broken - flip the trades
-            result["primary"] = make_trade("Descending Ceiling Bounce", "CALLS", desc_ceiling, desc_ceiling - 10,
-                f"Buy dips to broken ceiling {desc_ceiling:.2f}",
-                f"Structure broken{price_target_text} • {len(calls_factors)} factors", calc_conf("CALLS", True), True)
-            result["alternate"] = make_trade("Failed Breakout", "PUTS", desc_ceiling, desc_ceiling + 10,
-                f"ONLY if price fails below {desc_ceiling:.2f}",
-                "Rejection scenario - watch for failed breakout", calc_conf("PUTS", True, True), False)
-            result["position_summary"] = f"🚀 ABOVE descending ceiling ({desc_ceiling:.2f}) - BULLISH bias"
-            if asc_target:
-                result["price_target"] = asc_target
-                result["price_target_desc"] = "Ascending line from prior RTH high"
-        else:
-            # Structure intact OR channel still building - show both scenarios
-            result["primary"] = make_trade("Desc Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
-                f"Sell at ceiling {desc_ceiling:.2f}" if channel_locked else f"Sell at developing ceiling {desc_ceiling:.2f}",
-                f"KEY: Descending ceiling • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), True)
-            result["alternate"] = make_trade("Ceiling Break → Bounce", "CALLS", desc_ceiling, desc_ceiling - 10,
-                f"IF ceiling {desc_ceiling:.2f} breaks at open",
-                f"Breakout scenario{price_target_text} • {len(calls_factors)} factors", calc_conf("CALLS", False), False)
-            # Also keep secondary for floor
-            result["secondary"] = make_trade("Ascending Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
-                f"If price reaches {asc_floor:.2f}",
-                f"Secondary level • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), False)
-            
-            if channel_locked:
-                result["position_summary"] = f"{'✅ AT' if near_desc_ceiling else '📍 Wait for'} descending ceiling ({desc_ceiling:.2f})"
+
+    pool = _get_prefetch_pool()
+    started = monotonic()
+
+    # Submit everything first; reuse a call that is still in flight from an earlier rerun
+    futures = {}
+    with pool["lock"]:
+        for name, (fn, args) in jobs.items():
+            if name in skip:
+                continue
+            key = (name,) + tuple(args)
+            future = pool["in_flight"].get(key)
+            if future is None:
+                # No script context on pool threads - they are shared by all sessions and
+                # the cached fetchers don't need one
+                future = pool["executor"].submit(fn, *args)
+                pool["in_flight"][key] = future
+                future.add_done_callback(functools.partial(_remember_prefetch_result, pool, name, key))
+            futures[name] = (key, future)
+
+    snapshot = {name: None for name in jobs}
+    snapshot["stale_sources"] = []
+
+    for name, (key, future) in futures.items():
+        remaining = PREFETCH_DEADLINES.get(name, 5.0) - (monotonic() - started)
+        try:
+            snapshot[name] = future.result(timeout=max(0.0, remaining))
+        except FuturesTimeout:
+            if key in pool["last_good"]:
+                snapshot[name] = pool["last_good"][key]
+                snapshot["stale_sources"].append(name)
             else:
-                result["position_summary"] = f"🔄 CHANNEL BUILDING - Ceiling developing at {desc_ceiling:.2f}"
-    
-    # MIXED
-    elif channel_type == ChannelType.MIXED:
-        if dist_to_asc_floor <= dist_to_desc_ceiling:
-            result["primary"] = make_trade("Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
-                f"Price near floor {asc_floor:.2f}",
-                f"Mixed - floor closer • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), True)
-            result["secondary"] = make_trade("Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
-                f"If price reaches {desc_ceiling:.2f}",
-                f"Mixed - ceiling level • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), False)
-        else:
-            result["primary"] = make_trade("Ceiling Rejection", "PUTS", desc_ceiling, desc_ceiling + 10,
-                f"Price near ceiling {desc_ceiling:.2f}",
-                f"Mixed - ceiling closer • {len(puts_factors)} factors", calc_conf("PUTS", near_desc_ceiling), True)
-            result["secondary"] = make_trade("Floor Bounce", "CALLS", asc_floor, asc_floor - 10,
-                f"If price reaches {asc_floor:.2f}",
-                f"Mixed - floor level • {len(calls_factors)} factors", calc_conf("CALLS", near_asc_floor), False)
-        result["position_summary"] = f"⚖️ MIXED: Floor {asc_floor:.2f} / Ceiling {desc_ceiling:.2f}"
-    
-    return result
+                # Cold process - nothing to fall back to yet, so wait (bounded) for the first value
+                cold_remaining = PREFETCH_COLD_WAIT - (monotonic() - started)
+                try:
+                    snapshot[name] = future.result(timeout=max(0.0, cold_remaining))
+                except Exception:
+                    snapshot[name] = None
+        except Exception:
+            snapshot[name] = pool["last_good"].get(key)
+
+    snapshot["elapsed_ms"] = round((monotonic() - started) * 1000, 1)
+    return snapshot
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # LEGENDARY CSS STYLING
@@ -5568,6 +4942,20 @@ def sidebar():
         
         st.divider()
         
+        with st.expander("📡 Upstream Calls"):
+            st.caption(f"Polling: {poll_phase()} · TTL ×{poll_factor():g}")
+            flights = single_flight_stats()
+            st.caption(f"{flights['totals']['calls']} upstream calls · "
+                       f"{flights['totals']['collapsed']} duplicates collapsed")
+            for name, counts in sorted(flights["functions"].items()):
+                st.caption(f"`{name}` {counts['calls']} calls · {counts['collapsed']} collapsed"
+                           + (f" · {counts['errors']} errors" if counts["errors"] else ""))
+            st.caption("Stale-while-revalidate")
+            for name, counts in sorted(swr_stats().items()):
+                oldest = f" · oldest {counts['oldest']:.0f}s" if counts["oldest"] is not None else ""
+                st.caption(f"`{name}` {counts['hits']} fresh · {counts['stale']} stale · "
+                           f"{counts['misses']} blocking{oldest}")
+        
         # ─────────────────────────────────────────────────────────────────────
         # ACTION BUTTONS
         # ─────────────────────────────────────────────────────────────────────
@@ -5577,8 +4965,10 @@ def sidebar():
             st.success("✓ Saved!")
         if col2.button("🔄 Refresh", use_container_width=True):
             # Clear only market data caches
-            fetch_es_current.clear()
+            get_es_bar_store().invalidate()
+            fetch_vol_snapshot.clear()
             fetch_vix_yahoo.clear()
+            get_quote_hub().refresh_now()
             fetch_es_with_ema.clear()
             fetch_retail_positioning.clear()
             fetch_prior_day_rth.clear()
@@ -5627,12 +5017,84 @@ def sidebar():
         "manual_es": manual_es,
     }
 # ═══════════════════════════════════════════════════════════════════════════════
+# COMPUTE GRAPH - Channel pipeline stages memoized on a hash of their inputs
+# ═══════════════════════════════════════════════════════════════════════════════
+
+PIPELINE_CACHE_SIZE = 8     # Input sets remembered per node (several sessions / settings)
+
+class ComputeGraph:
+    """
+    Memoized pipeline nodes. A node's key is a hash of its inputs, and those
+    inputs include the outputs of upstream nodes, so a stage recomputes only
+    when something it depends on changed. Tracks hits, misses and timings per
+    node.
+    """
+    
+    def __init__(self, cache_size=PIPELINE_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.results = {}       # node -> OrderedDict(input hash -> result)
+        self.stats = {}
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def input_key(args, kwargs):
+        try:
+            blob = pickle.dumps((args, sorted(kwargs.items())), protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            blob = repr((args, sorted(kwargs.items()))).encode()
+        return hashlib.blake2b(blob, digest_size=16).hexdigest()
+    
+    def run(self, node, fn, *args, **kwargs):
+        """fn(*args, **kwargs), or the stored result if this node already saw these inputs."""
+        start = perf_counter()
+        key = self.input_key(args, kwargs)
+        with self._lock:
+            stat = self.stats.setdefault(node, {"hits": 0, "misses": 0, "last_ms": 0.0, "compute_ms": 0.0})
+            cached = self.results.setdefault(node, OrderedDict())
+            if key in cached:
+                cached.move_to_end(key)
+                stat["hits"] += 1
+                result = copy.deepcopy(cached[key])
+                stat["last_ms"] = (perf_counter() - start) * 1000
+                METRICS.observe(f"pipeline/{node}", stat["last_ms"])
+                return result
+        
+        result = fn(*args, **kwargs)
+        elapsed = (perf_counter() - start) * 1000
+        with self._lock:
+            cached[key] = copy.deepcopy(result)
+            while len(cached) > self.cache_size:
+                cached.popitem(last=False)
+            stat["misses"] += 1
+            stat["last_ms"] = elapsed
+            stat["compute_ms"] += elapsed
+        METRICS.observe(f"pipeline/{node}", elapsed)
+        return result
+    
+    def clear(self):
+        with self._lock:
+            self.results.clear()
+
+@st.cache_resource(show_spinner=False)
+def get_compute_graph():
+    return ComputeGraph()
+
+PIPELINE = get_compute_graph()
+
+def pipeline_stats():
+    """Per-node hits, misses, last run time and total compute time (ms)."""
+    with PIPELINE._lock:
+        return {node: dict(stat) for node, stat in PIPELINE.stats.items()}
+
+# ═══════════════════════════════════════════════════════════════════════════════
 # MAIN APPLICATION
 # ═══════════════════════════════════════════════════════════════════════════════
 def main():
+    laps = METRICS.laps("main")
     st.markdown(CSS_STYLES, unsafe_allow_html=True)
     inputs = sidebar()
     now = now_ct()
+    laps.mark("sidebar")
     
     # ═══════════════════════════════════════════════════════════════════════════
     # CHECK DATA SOURCES
@@ -5649,23 +5111,42 @@ def main():
     # LOAD DATA (with manual override support)
     # ═══════════════════════════════════════════════════════════════════════════
     with st.spinner("Loading market data..."):
-        
-        # --- Current ES Price ---
-        if inputs["manual_es"] is not None:
-            current_es = inputs["manual_es"]
-        else:
-            # Try Tastytrade first, then Yahoo
-            if tastytrade_available:
-                es_symbol, es_streamer = fetch_es_current_tastytrade()
-                # For now, still use Yahoo for price until DXLink streaming is implemented
-                current_es = fetch_es_current() or 6050
-            else:
-                current_es = fetch_es_current() or 6050
-        
+
         # --- IMPORTANT: Adjust trading date for weekends ---
         # If user selects Saturday/Sunday, use Monday as actual trading date
         actual_trading_date = get_actual_trading_day(inputs["trading_date"])
-        
+
+        # --- Prefetch every independent source concurrently ---
+        prefetch_skip = set()
+        if inputs["manual_es"] is not None:
+            prefetch_skip.add("es_current")
+        if inputs["manual_sessions"] is not None:
+            prefetch_skip.add("es_candles")
+        if inputs["manual_vix"] is not None:
+            prefetch_skip.add("vix")
+        if inputs["manual_vix_range"] is not None:
+            prefetch_skip.add("vix_range")
+        if inputs["manual_prior"] is not None:
+            prefetch_skip.add("prior_rth")
+        market = prefetch_market_data(
+            actual_trading_date, inputs["vix_zone_start"], inputs["vix_zone_end"], skip=prefetch_skip
+        )
+
+        # --- Current ES Price (re-read by the live panels on every tick) ---
+        def read_current_es():
+            if inputs["manual_es"] is not None:
+                return inputs["manual_es"]
+            # Try Tastytrade first, then the quote hub (Yahoo)
+            if tastytrade_available:
+                es_symbol, es_streamer = fetch_es_current_tastytrade()
+                # Live DXLink quote when streaming
+                es_quote = get_live_quote(es_streamer)
+                if vx_data and vx_data.get("streamer_symbol"):
+                    get_live_quote(vx_data["streamer_symbol"])    # Keep VX subscribed for the VIX channel
+                if es_quote:
+                    return es_quote.mid
+            return fetch_es_current() or market["es_current"] or 6050
+
         # Helper to parse time string and create datetime
         def parse_session_time(time_str, base_date, overnight_day):
             """Parse time string like '18:00' and return proper datetime.
@@ -5716,7 +5197,7 @@ def main():
                 data_source_sessions = "DXLINK"
             else:
                 # Fallback to Yahoo Finance (only has data from ~2 AM)
-                es_candles = fetch_es_candles()
+                es_candles = market["es_candles"]
                 sessions = extract_sessions(es_candles, actual_trading_date) or {}
                 sydney = sessions.get("sydney")
                 tokyo = sessions.get("tokyo")
@@ -5746,24 +5227,20 @@ def main():
             if dxlink_sessions and dxlink_sessions.get("overnight"):
                 overnight = dxlink_sessions.get("overnight")
             else:
-                es_candles = fetch_es_candles()
+                es_candles = market["es_candles"]
                 sessions = extract_sessions(es_candles, actual_trading_date) or {}
                 overnight = sessions.get("overnight")
         
-        # --- VIX/VX Data ---
+        # --- VIX/VX Data (re-read by the live panels on every tick) ---
         # Priority: 1) Manual input, 2) DXLink collector, 3) Yahoo Finance
-        dxlink_vix_channel = get_vix_channel_from_dxlink()
-        
-        if inputs["manual_vix"] is not None:
-            vix = inputs["manual_vix"]
-        elif dxlink_vix_channel and dxlink_vix_channel.get("current_price"):
-            vix = dxlink_vix_channel.get("current_price")
-        else:
-            vix = fetch_vix_yahoo()
-        
-        # Safety fallback if VIX fetch failed
-        if vix is None:
-            vix = 16.0  # Default to neutral VIX
+        def read_current_vix():
+            if inputs["manual_vix"] is not None:
+                return inputs["manual_vix"]
+            dxlink_vix_channel = get_vix_channel_from_dxlink()
+            if dxlink_vix_channel and dxlink_vix_channel.get("current_price"):
+                return dxlink_vix_channel.get("current_price")
+            # Safety fallback if VIX fetch failed - default to neutral VIX
+            return get_quote_hub().snapshot()["vix"] or market["vix"] or 16.0
         
         # --- VIX Overnight Range (Yahoo Finance - NO POLYGON) ---
         if inputs["manual_vix_range"] is not None:
@@ -5774,15 +5251,10 @@ def main():
                 "available": True
             }
         else:
-            vix_range = fetch_vix_overnight_range(
-                actual_trading_date, 
-                inputs["vix_zone_start"].hour, inputs["vix_zone_start"].minute, 
-                inputs["vix_zone_end"].hour, inputs["vix_zone_end"].minute
-            )
+            vix_range = market["vix_range"]
         
-        vix_pos, vix_pos_desc = get_vix_position(vix, vix_range)
-        retail_data = fetch_retail_positioning()
-        ema_data = fetch_es_with_ema()
+        retail_data = market["retail"]
+        ema_data = market["ema"]
         
         # --- Prior Day RTH Data ---
         # actual_trading_date was already set at the beginning (adjusts weekends to Monday)
@@ -5840,51 +5312,48 @@ def main():
                 "secondary_low_open_time": CT.localize(datetime.combine(prior_day, time(s_lw_hour, s_lw_min))) if m.get("secondary_low_wick", m.get("secondary_low_open")) else None,
             }
         else:
-            prior_rth = fetch_prior_day_rth(actual_trading_date)
+            prior_rth = market["prior_rth"]
     
+    laps.mark("load_data")
     offset = inputs["offset"]
-    current_spx = round(current_es - offset, 2)
-    channel_type, channel_reason, upper_pivot, lower_pivot, upper_time, lower_time = determine_channel(sydney, tokyo, london)
+    channel_type, channel_reason, upper_pivot, lower_pivot, upper_time, lower_time = PIPELINE.run("determine_channel", determine_channel, sydney, tokyo, london)
     
     # Validate and adjust pivots - ensure no price broke through projected lines during building
     # This also tracks ORIGINAL pivots for cases like today where market respects original level
     sessions_data = {"sydney": sydney, "tokyo": tokyo, "london": london}
     ref_time_dt = CT.localize(datetime.combine(actual_trading_date, time(*inputs["ref_time"])))
-    pivot_validation = validate_and_adjust_pivots(
+    # Pivot validation does not depend on the reference time - keep it out of the key
+    pivot_validation = PIPELINE.run("validate_and_adjust_pivots", validate_and_adjust_pivots,
         channel_type, upper_pivot, lower_pivot, upper_time, lower_time, 
-        sessions_data, ref_time_dt
+        sessions_data, None
     )
     
-    # Extract adjusted pivots (these are used for channel calculation)
+    # Adjusted pivots (used for channel calculation; originals are projected from pivot_validation)
     upper_pivot = pivot_validation["upper_pivot"]
     lower_pivot = pivot_validation["lower_pivot"]
-    upper_time = pivot_validation["upper_time"]
-    lower_time = pivot_validation["lower_time"]
-    
-    # Also store original pivots for display
-    original_upper_pivot = pivot_validation["original_upper_pivot"]
-    original_lower_pivot = pivot_validation["original_lower_pivot"]
-    original_upper_time = pivot_validation["original_upper_time"]
-    original_lower_time = pivot_validation["original_lower_time"]
     floor_was_adjusted = pivot_validation["floor_was_adjusted"]
     ceiling_was_adjusted = pivot_validation["ceiling_was_adjusted"]
     floor_adjustment_session = pivot_validation["floor_adjustment_session"]
     ceiling_adjustment_session = pivot_validation["ceiling_adjustment_session"]
     
-    # Calculate channel levels with validated (adjusted) pivots
-    ceiling_es, floor_es = calc_channel_levels(upper_pivot, lower_pivot, upper_time, lower_time, ref_time_dt, channel_type)
+    # Extract close-based pivots from overnight sessions for correct pivot type per direction
+    close_pivots = PIPELINE.run("close_pivots", get_close_based_pivots, sydney, tokyo, london)
+    
+    # Project channel, dual channel and prior day levels to EVERY reference time
+    # once; the selected reference time is a row of the ladder
+    reference_ladder = PIPELINE.run("reference_ladder", build_reference_ladder,
+                                    channel_type, pivot_validation, close_pivots, prior_rth, actual_trading_date)
+    ref_levels = reference_levels(reference_ladder, ref_time_dt)
     
-    # Also calculate ORIGINAL channel levels (before adjustment)
-    original_ceiling_es, original_floor_es = calc_channel_levels(
-        original_upper_pivot, original_lower_pivot, original_upper_time, original_lower_time, ref_time_dt, channel_type
-    )
+    # Channel levels with validated (adjusted) pivots, and ORIGINAL levels (before adjustment)
+    ceiling_es, floor_es = ref_levels["channel"]
+    original_ceiling_es, original_floor_es = ref_levels["original_channel"]
     
     if ceiling_es is None:
         ceiling_es, floor_es = 6080, 6040
     
     ceiling_spx = round(ceiling_es - offset, 2)
     floor_spx = round(floor_es - offset, 2)
-    position = get_position(current_es, ceiling_es, floor_es)
     
     # Original levels in SPX (for display when adjusted)
     original_ceiling_spx = round(original_ceiling_es - offset, 2) if original_ceiling_es else ceiling_spx
@@ -5893,25 +5362,8 @@ def main():
     # ─────────────────────────────────────────────────────────────────────────
     # DUAL CHANNEL LEVELS (Option C - Always show BOTH ascending and descending)
     # ─────────────────────────────────────────────────────────────────────────
-    # Extract close-based pivots from overnight sessions for correct pivot type per direction
-    close_pivots = get_close_based_pivots(sydney, tokyo, london)
-    
-    dual_levels_es = calc_dual_channel_levels(
-        upper_pivot, lower_pivot, upper_time, lower_time, ref_time_dt,
-        upper_pivot_close=close_pivots.get("highest_close"),
-        lower_pivot_close=close_pivots.get("lowest_close"),
-        upper_close_time=close_pivots.get("highest_close_time"),
-        lower_close_time=close_pivots.get("lowest_close_time")
-    )
-    
-    # Also calculate ORIGINAL dual levels
-    original_dual_levels_es = calc_dual_channel_levels(
-        original_upper_pivot, original_lower_pivot, original_upper_time, original_lower_time, ref_time_dt,
-        upper_pivot_close=close_pivots.get("highest_close"),
-        lower_pivot_close=close_pivots.get("lowest_close"),
-        upper_close_time=close_pivots.get("highest_close_time"),
-        lower_close_time=close_pivots.get("lowest_close_time")
-    )
+    dual_levels_es = ref_levels["dual_levels"]
+    original_dual_levels_es = ref_levels["original_dual_levels"]
     
     # Convert to SPX
     dual_levels_spx = None
@@ -5938,8 +5390,8 @@ def main():
         if ceiling_was_adjusted and original_dual_levels_es:
             dual_levels_spx["original_desc_ceiling"] = round(original_dual_levels_es["desc_ceiling"] - offset, 2)
     
-    # Calculate prior day targets (both ascending and descending from each anchor)
-    prior_targets = calc_prior_day_targets(prior_rth, ref_time_dt)
+    # Prior day targets (both ascending and descending from each anchor)
+    prior_targets = ref_levels["prior_targets"]
     
     # ─────────────────────────────────────────────────────────────────────────
     # CONVERGENCE ZONE CALCULATION
@@ -5952,18 +5404,17 @@ def main():
     # CONFLUENCE DATA GATHERING
     # ─────────────────────────────────────────────────────────────────────────
     # Session tests - how many sessions tested each level
-    session_tests = analyze_session_tests(sydney, tokyo, london, channel_type)
+    session_tests = PIPELINE.run("session_tests", analyze_session_tests, sydney, tokyo, london, channel_type)
     
     # Gap analysis - where did we gap relative to channel
     prior_close_es = prior_rth.get("close") if prior_rth and prior_rth.get("available") else None
     prior_close_spx = round(prior_close_es - offset, 2) if prior_close_es else None
-    gap_analysis = analyze_gap(current_spx, prior_close_spx, ceiling_spx, floor_spx)
     
     # Prior close analysis - does prior close validate a level
-    prior_close_validation = analyze_prior_close(prior_close_spx, ceiling_spx, floor_spx)
+    prior_close_validation = PIPELINE.run("prior_close", analyze_prior_close, prior_close_spx, ceiling_spx, floor_spx)
     
     # VIX term structure
-    vix_term = fetch_vix_term_structure()
+    vix_term = market["vix_term"]
     
     # Get current CT time for channel lock determination
     ct_now = datetime.now(CT)
@@ -5998,16 +5449,10 @@ def main():
             reference_time=reference_time_e, current_time=ct_now
         )
     
-    # OPTION C: Use the new dual-channel decision engine
-    decision = analyze_market_state_v2(
-        current_spx, dual_levels_spx, channel_type, channel_reason,
-        retail_data["bias"], ema_data["ema_bias"], vix_pos, vix,
-        session_tests, gap_analysis, prior_close_validation, vix_term,
-        prior_targets, ct_now, vix_channel_data=vix_channel_levels
-    )
+    laps.mark("channel_pipeline")
     
     # ═══════════════════════════════════════════════════════════════════════════
-    # EXPLOSIVE MOVE DETECTOR
+    # LIVE VIEW - Price-dependent state, recomputed on every fragment tick
     # ═══════════════════════════════════════════════════════════════════════════
     overnight_range = None
     if overnight:
@@ -6020,11 +5465,54 @@ def main():
         if p_high and p_low:
             prior_day_range = p_high - p_low
     
-    explosive = detect_explosive_potential(
-        current_spx, dual_levels_spx, prior_targets, channel_type,
-        retail_data.get("spread"), ema_data, overnight_range, prior_day_range,
-        gap_analysis
-    )
+    live_memo = {}      # Survives fragment ticks (closure of this run's fragments)
+    
+    def live_view():
+        """
+        Current prices and everything derived from them; the locked channel structure is reused.
+        
+        Memoised on the quote hub snapshot, so both live fragments show the same
+        decision and it is computed once per run / tick rather than once per panel.
+        """
+        memo_key = get_quote_hub().snapshot()["updated"]
+        if memo_key is not None and live_memo.get("key") == memo_key:
+            return live_memo["view"]
+        live_es = read_current_es()
+        live_vix = read_current_vix()
+        live_spx = round(live_es - offset, 2)
+        live_now = datetime.now(CT)
+        live_vix_pos, _ = get_vix_position(live_vix, vix_range)
+        gap_analysis = PIPELINE.run("gap", analyze_gap, live_spx, prior_close_spx, ceiling_spx, floor_spx)
+        
+        # OPTION C: Use the new dual-channel decision engine
+        decision = analyze_market_state_v2(
+            live_spx, dual_levels_spx, channel_type, channel_reason,
+            retail_data["bias"], ema_data["ema_bias"], live_vix_pos, live_vix,
+            session_tests, gap_analysis, prior_close_validation, vix_term,
+            prior_targets, live_now, vix_channel_data=vix_channel_levels
+        )
+        note_level_proximity(decision.get("near_level", False))     # Faster polling while SPX is near a level
+        
+        # EXPLOSIVE MOVE DETECTOR
+        explosive = detect_explosive_potential(
+            live_spx, dual_levels_spx, prior_targets, channel_type,
+            retail_data.get("spread"), ema_data, overnight_range, prior_day_range,
+            gap_analysis
+        )
+        
+        view = {
+            "current_es": live_es, "current_spx": live_spx, "vix": live_vix, "vix_pos": live_vix_pos,
+            "position": get_position(live_es, ceiling_es, floor_es), "decision": decision,
+            "explosive": explosive, "now": live_now,
+        }
+        live_memo.update(key=memo_key, view=view)
+        return view
+    
+    # Live panels tick on their own; manual prices never change, so nothing to poll
+    live_phase = poll_phase()
+    live_refresh = None
+    if live_phase != "CLOSED" and (inputs["manual_es"] is None or inputs["manual_vix"] is None):
+        live_refresh = LIVE_REFRESH_SECONDS * POLL_FACTORS[live_phase]
     
     # ═══════════════════════════════════════════════════════════════════════════
     # HERO BANNER
@@ -6065,6 +5553,7 @@ def main():
         </div>
     </div>
     """, unsafe_allow_html=True)
+    laps.mark("hero")
     
     # ═══════════════════════════════════════════════════════════════════════════
     # DATA SOURCE STATUS
@@ -6097,17 +5586,17 @@ def main():
     with col2:
         if st.button("🔄 Refresh", use_container_width=True, help="Refresh all market data"):
             # Clear all caches
-            fetch_es_current.clear()
+            get_es_bar_store().invalidate()
+            fetch_vol_snapshot.clear()
             fetch_vix_yahoo.clear()
+            get_quote_hub().refresh_now()
             fetch_es_with_ema.clear()
             fetch_retail_positioning.clear()
             fetch_prior_day_rth.clear()
             # Clear Tastytrade caches
             if tastytrade_available:
-                fetch_es_current_tastytrade.clear()
-                fetch_vx_futures_tastytrade.clear()
-                fetch_spx_option_chain_tastytrade.clear()
-                get_tastytrade_access_token.clear()
+                fetch_chain_quote_snapshot.clear()
+                get_tastytrade_client().invalidate_token()
             st.rerun()
     with col3:
         st.markdown(f"""
@@ -6118,40 +5607,50 @@ def main():
         </div>
         """, unsafe_allow_html=True)
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # MARKET SNAPSHOT
-    # ═══════════════════════════════════════════════════════════════════════════
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown(f'<div class="metric-card"><div class="metric-icon">📈</div><div class="metric-label">SPX Index</div><div class="metric-value accent">{current_spx:,.2f}</div><div class="metric-delta">ES {current_es:,.2f}</div></div>', unsafe_allow_html=True)
-    with col2:
-        vix_color = "puts" if vix > 20 else "calls" if vix < 15 else ""
-        vix_icon = "🌋" if vix > 20 else "🧊" if vix < 15 else "🌊"
-        vix_glow = "icon-glow-orange" if vix > 20 else "icon-glow-blue" if vix < 15 else ""
-        st.markdown(f'<div class="metric-card"><div class="metric-icon {vix_glow}">{vix_icon}</div><div class="metric-label">VIX Index</div><div class="metric-value {vix_color}">{vix:.2f}</div><div class="metric-delta">Volatility</div></div>', unsafe_allow_html=True)
-    with col3:
-        pos_icon = "🔼" if position.value == "ABOVE" else "🔽" if position.value == "BELOW" else "⚖️"
-        pos_glow = "icon-glow-green" if position.value == "ABOVE" else "icon-glow-red" if position.value == "BELOW" else "icon-glow-gold"
-        st.markdown(f'<div class="metric-card"><div class="metric-icon {pos_glow}">{pos_icon}</div><div class="metric-label">Position</div><div class="metric-value">{position.value}</div><div class="metric-delta">In Channel</div></div>', unsafe_allow_html=True)
-    with col4:
-        st.markdown(f'<div class="metric-card"><div class="metric-icon icon-clock">🕐</div><div class="metric-label">Time</div><div class="metric-value">{now.strftime("%I:%M")}</div><div class="metric-delta live-indicator"><span class="live-dot"></span> {now.strftime("%p CT")}</div></div>', unsafe_allow_html=True)
+    laps.mark("header")
     
+    @st.fragment(run_every=live_refresh)
+    @timed("render")
+    def live_trade_panels():
+        """Market snapshot, trade setups and VIX channel status - reruns alone on each tick."""
+        live = live_view()
+        current_es, current_spx, vix = live["current_es"], live["current_spx"], live["vix"]
+        position, decision, now = live["position"], live["decision"], live["now"]
+        
+        # ═══════════════════════════════════════════════════════════════════════════
+        # MARKET SNAPSHOT
+        # ═══════════════════════════════════════════════════════════════════════════
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.markdown(f'<div class="metric-card"><div class="metric-icon">📈</div><div class="metric-label">SPX Index</div><div class="metric-value accent">{current_spx:,.2f}</div><div class="metric-delta">ES {current_es:,.2f}</div></div>', unsafe_allow_html=True)
+        with col2:
+            vix_color = "puts" if vix > 20 else "calls" if vix < 15 else ""
+            vix_icon = "🌋" if vix > 20 else "🧊" if vix < 15 else "🌊"
+            vix_glow = "icon-glow-orange" if vix > 20 else "icon-glow-blue" if vix < 15 else ""
+            st.markdown(f'<div class="metric-card"><div class="metric-icon {vix_glow}">{vix_icon}</div><div class="metric-label">VIX Index</div><div class="metric-value {vix_color}">{vix:.2f}</div><div class="metric-delta">Volatility</div></div>', unsafe_allow_html=True)
+        with col3:
+            pos_icon = "🔼" if position.value == "ABOVE" else "🔽" if position.value == "BELOW" else "⚖️"
+            pos_glow = "icon-glow-green" if position.value == "ABOVE" else "icon-glow-red" if position.value == "BELOW" else "icon-glow-gold"
+            st.markdown(f'<div class="metric-card"><div class="metric-icon {pos_glow}">{pos_icon}</div><div class="metric-label">Position</div><div class="metric-value">{position.value}</div><div class="metric-delta">In Channel</div></div>', unsafe_allow_html=True)
+        with col4:
+            st.markdown(f'<div class="metric-card"><div class="metric-icon icon-clock">🕐</div><div class="metric-label">Time</div><div class="metric-value">{now.strftime("%I:%M")}</div><div class="metric-delta live-indicator"><span class="live-dot"></span> {now.strftime("%p CT")}</div></div>', unsafe_allow_html=True)
+        
 
-    # TRADE SETUPS (Option C - Primary + Secondary)
-    # ═══════════════════════════════════════════════════════════════════════════
-    
-    # Check if we're in RTH (8:30 AM - 3:00 PM CT) for real premium fetching
-    ct_now = datetime.now(CT)
-    is_rth = 8.5 <= (ct_now.hour + ct_now.minute/60) < 15  # 8:30 AM to 3:00 PM
-    
-    if decision["no_trade"]:
-        st.markdown('<div class="section-header"><div class="section-icon">🎲</div><h2 class="section-title">Trade Setup</h2></div>', unsafe_allow_html=True)
-        st.markdown(f'<div class="no-trade-card"><div class="no-trade-icon">⊘</div><div class="no-trade-title">NO TRADE</div><div class="no-trade-reason">{decision["no_trade_reason"]}</div></div>', unsafe_allow_html=True)
-    else:
-        # Show channel status
-        channel_status = decision.get("channel_status", "LOCKED")
-        if channel_status == "BUILDING":
-            st.markdown(f'''
+        # TRADE SETUPS (Option C - Primary + Secondary)
+        # ═══════════════════════════════════════════════════════════════════════════
+        
+        # Check if we're in RTH (8:30 AM - 3:00 PM CT) for real premium fetching
+        ct_now = datetime.now(CT)
+        is_rth = 8.5 <= (ct_now.hour + ct_now.minute/60) < 15  # 8:30 AM to 3:00 PM
+        
+        if decision["no_trade"]:
+            st.markdown('<div class="section-header"><div class="section-icon">🎲</div><h2 class="section-title">Trade Setup</h2></div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="no-trade-card"><div class="no-trade-icon">⊘</div><div class="no-trade-title">NO TRADE</div><div class="no-trade-reason">{decision["no_trade_reason"]}</div></div>', unsafe_allow_html=True)
+        else:
+            # Show channel status
+            channel_status = decision.get("channel_status", "LOCKED")
+            if channel_status == "BUILDING":
+                st.markdown(f'''
             <div class="alert-box alert-box-info" style="margin-bottom:20px;">
                 <div class="alert-icon-large">🔄</div>
                 <div class="alert-content">
@@ -6160,242 +5659,252 @@ def main():
                 </div>
             </div>
             ''', unsafe_allow_html=True)
-        
-        # Function to get real or estimated premium for a trade
-        def get_trade_premium(trade, current_spx, trading_date, is_rth):
-            """Get real premium during RTH, with logic for trade status."""
-            if not trade:
-                return trade
-            
-            strike = trade["strike"]
-            opt_type = "CALL" if trade["direction"] == "CALLS" else "PUT"
-            entry_level = trade["entry_level"]
-            
-            # Determine if trade has already triggered
-            # For CALLS at ascending floor: price drops TO floor, then bounces UP
-            #   Triggered = current price has bounced above entry by meaningful amount
-            # For PUTS at descending ceiling: price rises TO ceiling, then drops DOWN
-            #   Triggered = current price has dropped below entry by meaningful amount
-            
-            BOUNCE_THRESHOLD = 5  # SPX points beyond entry to confirm trigger
-            
-            if opt_type == "CALL":
-                # Call at floor: triggered when price is meaningfully above entry (bounced)
-                trade_triggered = current_spx >= entry_level + BOUNCE_THRESHOLD
-            else:  # PUT
-                # Put at ceiling: triggered when price is meaningfully below entry (rejected)
-                trade_triggered = current_spx <= entry_level - BOUNCE_THRESHOLD
             
-            if is_rth and current_spx:
-                # Fetch option premium estimate
-                real_data = fetch_real_option_premium(strike, opt_type, trading_date, es_spx_offset=offset)
+            # Function to get real or estimated premium for a trade
+            def get_trade_premium(trade, current_spx, trading_date, is_rth):
+                """Get real premium during RTH, with logic for trade status."""
+                if not trade:
+                    return trade
+                
+                strike = trade["strike"]
+                opt_type = "CALL" if trade["direction"] == "CALLS" else "PUT"
+                entry_level = trade["entry_level"]
+                
+                # Determine if trade has already triggered
+                # For CALLS at ascending floor: price drops TO floor, then bounces UP
+                #   Triggered = current price has bounced above entry by meaningful amount
+                # For PUTS at descending ceiling: price rises TO ceiling, then drops DOWN
+                #   Triggered = current price has dropped below entry by meaningful amount
+                
+                BOUNCE_THRESHOLD = 5  # SPX points beyond entry to confirm trigger
                 
-                # Store debug info
-                trade = trade.copy()
-                trade["option_ticker"] = real_data.get("ticker")
-                trade["option_error"] = real_data.get("error")
-                trade["option_available"] = real_data.get("available")
-                trade["option_bid"] = real_data.get("bid")
-                trade["option_ask"] = real_data.get("ask")
-                trade["option_mid"] = real_data.get("mid")
-                trade["option_last"] = real_data.get("last")
-                trade["option_delta"] = real_data.get("delta")
+                if opt_type == "CALL":
+                    # Call at floor: triggered when price is meaningfully above entry (bounced)
+                    trade_triggered = current_spx >= entry_level + BOUNCE_THRESHOLD
+                else:  # PUT
+                    # Put at ceiling: triggered when price is meaningfully below entry (rejected)
+                    trade_triggered = current_spx <= entry_level - BOUNCE_THRESHOLD
                 
-                if real_data["available"]:
-                    current_premium = real_data["mid"] or real_data["last"]
-                    delta = real_data["delta"]
-                    underlying = real_data["underlying_price"] or current_spx
+                if is_rth and current_spx:
+                    # Fetch option premium estimate
+                    real_data = get_option_quote(strike, opt_type, trading_date, es_spx_offset=offset)
                     
-                    # Store for debug
-                    trade["calc_current_premium"] = current_premium
-                    trade["calc_underlying"] = underlying
-                    trade["calc_entry_level"] = entry_level
-                    trade["calc_delta_used"] = delta
-                    trade["trade_triggered"] = trade_triggered
+                    # Store debug info
+                    trade = trade.copy()
+                    trade["option_ticker"] = real_data.get("ticker")
+                    trade["option_error"] = real_data.get("error")
+                    trade["option_available"] = real_data.get("available")
+                    trade["option_bid"] = real_data.get("bid")
+                    trade["option_ask"] = real_data.get("ask")
+                    trade["option_mid"] = real_data.get("mid")
+                    trade["option_last"] = real_data.get("last")
+                    trade["option_delta"] = real_data.get("delta")
                     
-                    if trade_triggered:
-                        # Trade has already triggered! Show current premium, not projected entry
-                        trade["real_premium"] = True
-                        trade["trade_status"] = "TRIGGERED"
-                        trade["current_premium"] = current_premium
-                        trade["current_spx"] = underlying
-                        # Don't update entry_premium - keep the estimated one for reference
-                        # But mark that we have live data
-                        trade["live_current_premium"] = current_premium
+                    if real_data["available"]:
+                        current_premium = real_data["mid"] or real_data["last"]
+                        delta = real_data["delta"]
+                        underlying = real_data["underlying_price"] or current_spx
                         
-                        # Calculate profit from estimated entry to current
-                        est_entry = trade["entry_premium"]
-                        if est_entry and current_premium:
-                            profit_pct = ((current_premium - est_entry) / est_entry) * 100
-                            profit_dollars = (current_premium - est_entry) * 100
-                            trade["current_profit_pct"] = round(profit_pct, 1)
-                            trade["current_profit_dollars"] = round(profit_dollars, 0)
-                    else:
-                        # Trade not yet triggered - calculate projected entry premium
-                        entry_premium = calculate_premium_at_entry(
-                            current_premium, underlying, entry_level, strike, opt_type, delta
-                        )
-                        
-                        trade["calc_result"] = entry_premium
-                        trade["trade_status"] = "PENDING"
+                        # Store for debug
+                        trade["calc_current_premium"] = current_premium
+                        trade["calc_underlying"] = underlying
+                        trade["calc_entry_level"] = entry_level
+                        trade["calc_delta_used"] = delta
+                        trade["trade_triggered"] = trade_triggered
                         
-                        if entry_premium:
-                            # Update trade with real premium data
-                            trade["entry_premium"] = entry_premium
+                        if trade_triggered:
+                            # Trade has already triggered! Show current premium, not projected entry
                             trade["real_premium"] = True
+                            trade["trade_status"] = "TRIGGERED"
                             trade["current_premium"] = current_premium
                             trade["current_spx"] = underlying
+                            # Don't update entry_premium - keep the estimated one for reference
+                            # But mark that we have live data
+                            trade["live_current_premium"] = current_premium
                             
-                            # Recalculate targets based on projected entry
-                            t1 = round(entry_premium * 1.50, 2)
-                            t2 = round(entry_premium * 1.75, 2)
-                            t3 = round(entry_premium * 2.00, 2)
-                            trade["targets"] = {
-                                "t1": {"price": t1, "profit_pct": 50, "profit_dollars": round((t1 - entry_premium) * 100, 0)},
-                                "t2": {"price": t2, "profit_pct": 75, "profit_dollars": round((t2 - entry_premium) * 100, 0)},
-                                "t3": {"price": t3, "profit_pct": 100, "profit_dollars": round((t3 - entry_premium) * 100, 0)},
-                            }
-            
-            return trade
-        
-        # Update primary trade with real premium if in RTH
-        p = get_trade_premium(decision["primary"], current_spx, actual_trading_date, is_rth)
-        
-        # ═══════════════════════════════════════════════════════════════════
-        # TRADE PLAYBOOK - Single-glance execution summary
-        # ═══════════════════════════════════════════════════════════════════
-        if p:
-            alt = decision.get("alternate")
-            # Direction labels: We're always BUYING options (calls or puts)
-            playbook_dir = "↗ BUY CALLS" if p["direction"] == "CALLS" else "↘ BUY PUTS"
-            playbook_color = "var(--bull)" if p["direction"] == "CALLS" else "var(--bear)"
-            playbook_alt_color = "var(--bear)" if p["direction"] == "CALLS" else "var(--bull)"
-            t = p["targets"]
-            
-            # Stop direction depends on trade type:
-            # CALLS: stop if SPX drops BELOW stop level (market going against you)
-            # PUTS: stop if SPX rises ABOVE stop level (market going against you)
-            if p["direction"] == "CALLS":
-                stop_word = "below"
-            else:
-                stop_word = "above"
-            
-            # Channel status context
-            channel_lock_text = "Channel LOCKED ✓" if decision.get("channel_locked") else "Channel BUILDING ⏳"
-            hours_left = p.get("hours_remaining", 6.0)
-            time_context = f"{hours_left:.0f}h to expiry" if hours_left >= 1 else f"{hours_left*60:.0f}min to expiry"
-            
-            # No-trade zone warnings
-            no_trade_warning = ""
-            ct_now_check = datetime.now(CT)
-            ct_decimal = ct_now_check.hour + ct_now_check.minute / 60.0
-            if 12.0 <= ct_decimal < 13.0:
-                no_trade_warning = '<div style="background:rgba(254,228,64,0.15);border:1px solid rgba(254,228,64,0.3);border-radius:8px;padding:8px 12px;margin-top:8px;font-size:0.75rem;color:var(--accent-gold);">⚠️ LUNCH ZONE (12-1 PM): Signals less reliable. Consider waiting for 1:00 PM confirmation.</div>'
-            elif ct_decimal >= 14.25:
-                no_trade_warning = '<div style="background:rgba(254,228,64,0.15);border:1px solid rgba(254,228,64,0.3);border-radius:8px;padding:8px 12px;margin-top:8px;font-size:0.75rem;color:var(--accent-gold);">⚠️ LATE SESSION: Gamma acceleration zone. Tighter stops, reduced targets.</div>'
-            
-            # Alternate plan
-            alt_text = ""
-            if alt:
-                alt_dir = "BUY CALLS" if alt["direction"] == "CALLS" else "BUY PUTS"
-                alt_text = f'<div style="margin-top:14px;padding-top:14px;border-top:1px solid rgba(0,245,212,0.15);"><span style="color:var(--text-muted);font-size:0.85rem;font-weight:500;">⟳ IF WRONG:</span> <span style="color:{playbook_alt_color};font-size:0.95rem;font-weight:700;">{alt["name"]} → {alt_dir} {alt["contract"]}</span></div>'
-            
-            pb = ''
-            pb += '<div style="background:linear-gradient(135deg, rgba(0,245,212,0.08) 0%, rgba(0,187,249,0.05) 50%, rgba(0,245,212,0.03) 100%);border:2px solid rgba(0,245,212,0.45);border-radius:20px;padding:28px 32px;margin-bottom:28px;box-shadow:0 0 40px rgba(0,245,212,0.15), 0 0 80px rgba(0,245,212,0.05), inset 0 1px 0 rgba(255,255,255,0.05);position:relative;overflow:hidden;">'
-            pb += '<div style="position:absolute;top:0;left:0;right:0;height:3px;background:linear-gradient(90deg, transparent, rgba(0,245,212,0.6), transparent);"></div>'
-            pb += f'<div style="display:flex;align-items:center;justify-content:space-between;margin-bottom:16px;"><span style="font-family:Orbitron,sans-serif;font-size:1rem;font-weight:700;color:var(--accent-cyan);letter-spacing:3px;text-shadow:0 0 20px rgba(0,245,212,0.3);">◈ TRADE PLAYBOOK</span><span style="font-size:0.8rem;color:var(--text-muted);background:rgba(255,255,255,0.04);padding:4px 12px;border-radius:20px;border:1px solid var(--border-subtle);">{channel_lock_text} | {time_context}</span></div>'
-            pb += f'<div style="font-size:1.5rem;font-weight:700;color:var(--text-bright);margin-bottom:14px;line-height:1.3;"><span style="color:{playbook_color};text-shadow:0 0 15px {playbook_color};">{playbook_dir}</span> {p["contract"]} at <span style="color:var(--accent-cyan);font-size:1.6rem;text-shadow:0 0 15px rgba(0,245,212,0.4);">${p["entry_premium"]:.2f}</span></div>'
-            pb += '<div style="display:flex;gap:20px;flex-wrap:wrap;margin-bottom:16px;">'
-            pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:160px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Entry Level</div><div style="font-size:1.15rem;font-weight:700;color:var(--text-bright);">SPX {p["entry_level"]:,.2f}</div></div>'
-            pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:160px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Stop if {stop_word}</div><div style="font-size:1.15rem;font-weight:700;color:var(--bear);">{p["stop_level"]:,.2f} <span style="font-size:0.8rem;font-weight:400;color:var(--text-muted);">(prem: ${p.get("stop_premium", 0):.2f})</span></div></div>'
-            pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:120px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Max Risk</div><div style="font-size:1.15rem;font-weight:700;color:var(--bear);">-${p.get("max_loss_dollars", 0):,.0f}</div></div>'
-            pb += '</div>'
-            pb += '<div style="background:rgba(0,245,212,0.04);border:1px solid rgba(0,245,212,0.15);border-radius:12px;padding:12px 16px;margin-bottom:4px;">'
-            pb += '<div style="font-size:0.75rem;color:var(--accent-cyan);margin-bottom:8px;text-transform:uppercase;letter-spacing:1px;font-weight:600;">◎ Profit Targets</div>'
-            pb += '<div style="display:flex;gap:16px;flex-wrap:wrap;">'
-            pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T1 ({t["t1"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t1"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
-            pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T2 ({t["t2"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t2"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
-            pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T3 ({t["t3"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t3"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
-            pb += '</div></div>'
-            pb += alt_text
-            pb += no_trade_warning
-            pb += '</div>'
-            st.markdown(pb, unsafe_allow_html=True)
-        
-        # PRIMARY TRADE
-        st.markdown('<div class="section-header"><div class="section-icon icon-rocket">🚀</div><h2 class="section-title">PRIMARY Trade Setup</h2></div>', unsafe_allow_html=True)
-        
-        if p:
-            tc = "calls" if p["direction"] == "CALLS" else "puts"
-            di = "↗" if p["direction"] == "CALLS" else "↘"
-            t = p["targets"]
-            
-            # Determine display based on trade status
-            trade_status = p.get("trade_status", "PENDING")
+                            # Calculate profit from estimated entry to current
+                            est_entry = trade["entry_premium"]
+                            if est_entry and current_premium:
+                                profit_pct = ((current_premium - est_entry) / est_entry) * 100
+                                profit_dollars = (current_premium - est_entry) * 100
+                                trade["current_profit_pct"] = round(profit_pct, 1)
+                                trade["current_profit_dollars"] = round(profit_dollars, 0)
+                        else:
+                            # Trade not yet triggered - projected entry premium (batch-repriced above,
+                            # delta approximation if IV could not be solved)
+                            entry_premium = entry_projections.get((strike, opt_type, entry_level))
+                            if entry_premium is None:
+                                entry_premium = calculate_premium_at_entry(
+                                    current_premium, underlying, entry_level, strike, opt_type, delta
+                                )
+                            
+                            trade["calc_result"] = entry_premium
+                            trade["trade_status"] = "PENDING"
+                            
+                            if entry_premium:
+                                # Update trade with real premium data
+                                trade["entry_premium"] = entry_premium
+                                trade["real_premium"] = True
+                                trade["current_premium"] = current_premium
+                                trade["current_spx"] = underlying
+                                
+                                # Recalculate targets based on projected entry
+                                t1 = round(entry_premium * 1.50, 2)
+                                t2 = round(entry_premium * 1.75, 2)
+                                t3 = round(entry_premium * 2.00, 2)
+                                trade["targets"] = {
+                                    "t1": {"price": t1, "profit_pct": 50, "profit_dollars": round((t1 - entry_premium) * 100, 0)},
+                                    "t2": {"price": t2, "profit_pct": 75, "profit_dollars": round((t2 - entry_premium) * 100, 0)},
+                                    "t3": {"price": t3, "profit_pct": 100, "profit_dollars": round((t3 - entry_premium) * 100, 0)},
+                                }
+                
+                return trade
             
-            if trade_status == "TRIGGERED" and p.get("live_current_premium"):
-                premium_label = "Current Premium (LIVE)"
-                current_prem = p["live_current_premium"]
-                profit_pct = p.get("current_profit_pct", 0)
-                profit_dollars = p.get("current_profit_dollars", 0)
-                profit_color = "var(--bull)" if profit_pct >= 0 else "var(--bear)"
-                profit_sign = "+" if profit_pct >= 0 else ""
-                premium_note = f'P/L: {profit_sign}{profit_pct:.1f}% ({profit_sign}${profit_dollars:,.0f})'
-                premium_note_style = f'font-size:0.7rem;color:{profit_color};margin-top:4px;font-weight:600;'
-                premium_value = current_prem
-                show_triggered = True
-            elif p.get("real_premium"):
-                premium_label = "Entry Premium (LIVE)"
-                premium_value = p.get("entry_premium", 0)
-                current_prem_display = p.get("current_premium", 0)
-                current_spx_display = p.get("current_spx", 0)
-                premium_note = f'Current: ${current_prem_display:.2f} @ SPX {current_spx_display:,.0f}'
-                premium_note_style = 'font-size:0.7rem;color:var(--accent-cyan);margin-top:4px;'
-                show_triggered = False
-            else:
-                premium_label = "Entry Premium (EST)"
-                premium_value = p.get("entry_premium", 0)
-                premium_note = ""
-                premium_note_style = ""
-                show_triggered = False
-                if p.get("option_ticker"):
-                    premium_note = f'Source: {p.get("option_error", "Estimated")}'
-                    premium_note_style = 'font-size:0.65rem;color:var(--text-muted);margin-top:4px;'
+            # Project entry premiums for all planned trades at once
+            entry_projections = {}
+            if is_rth and current_spx:
+                entry_projections = project_trade_entry_premiums(
+                    [decision.get("primary"), decision.get("alternate"), decision.get("secondary")],
+                    actual_trading_date, es_spx_offset=offset)
             
-            # Build HTML in parts
-            card_html = f'<div class="trade-card trade-card-{tc}">'
-            card_html += f'<div class="trade-header"><div class="trade-name">{di} {p["name"]}</div>'
-            card_html += f'<div class="trade-confidence trade-confidence-{p["confidence"].lower()}">{p["confidence"]} CONFIDENCE {"✓" if decision.get("channel_locked") else "⏳"}</div></div>'
+            # Update primary trade with real premium if in RTH
+            p = get_trade_premium(decision["primary"], current_spx, actual_trading_date, is_rth)
             
-            if show_triggered:
-                card_html += '<div style="background:var(--bull);color:#000;padding:4px 12px;border-radius:20px;font-size:0.7rem;font-weight:700;display:inline-block;margin-bottom:8px;">✓ TRADE TRIGGERED</div>'
+            # ═══════════════════════════════════════════════════════════════════
+            # TRADE PLAYBOOK - Single-glance execution summary
+            # ═══════════════════════════════════════════════════════════════════
+            if p:
+                alt = decision.get("alternate")
+                # Direction labels: We're always BUYING options (calls or puts)
+                playbook_dir = "↗ BUY CALLS" if p["direction"] == "CALLS" else "↘ BUY PUTS"
+                playbook_color = "var(--bull)" if p["direction"] == "CALLS" else "var(--bear)"
+                playbook_alt_color = "var(--bear)" if p["direction"] == "CALLS" else "var(--bull)"
+                t = p["targets"]
+                
+                # Stop direction depends on trade type:
+                # CALLS: stop if SPX drops BELOW stop level (market going against you)
+                # PUTS: stop if SPX rises ABOVE stop level (market going against you)
+                if p["direction"] == "CALLS":
+                    stop_word = "below"
+                else:
+                    stop_word = "above"
+                
+                # Channel status context
+                channel_lock_text = "Channel LOCKED ✓" if decision.get("channel_locked") else "Channel BUILDING ⏳"
+                hours_left = p.get("hours_remaining", 6.0)
+                time_context = f"{hours_left:.0f}h to expiry" if hours_left >= 1 else f"{hours_left*60:.0f}min to expiry"
+                
+                # No-trade zone warnings
+                no_trade_warning = ""
+                ct_now_check = datetime.now(CT)
+                ct_decimal = ct_now_check.hour + ct_now_check.minute / 60.0
+                if 12.0 <= ct_decimal < 13.0:
+                    no_trade_warning = '<div style="background:rgba(254,228,64,0.15);border:1px solid rgba(254,228,64,0.3);border-radius:8px;padding:8px 12px;margin-top:8px;font-size:0.75rem;color:var(--accent-gold);">⚠️ LUNCH ZONE (12-1 PM): Signals less reliable. Consider waiting for 1:00 PM confirmation.</div>'
+                elif ct_decimal >= 14.25:
+                    no_trade_warning = '<div style="background:rgba(254,228,64,0.15);border:1px solid rgba(254,228,64,0.3);border-radius:8px;padding:8px 12px;margin-top:8px;font-size:0.75rem;color:var(--accent-gold);">⚠️ LATE SESSION: Gamma acceleration zone. Tighter stops, reduced targets.</div>'
+                
+                # Alternate plan
+                alt_text = ""
+                if alt:
+                    alt_dir = "BUY CALLS" if alt["direction"] == "CALLS" else "BUY PUTS"
+                    alt_text = f'<div style="margin-top:14px;padding-top:14px;border-top:1px solid rgba(0,245,212,0.15);"><span style="color:var(--text-muted);font-size:0.85rem;font-weight:500;">⟳ IF WRONG:</span> <span style="color:{playbook_alt_color};font-size:0.95rem;font-weight:700;">{alt["name"]} → {alt_dir} {alt["contract"]}</span></div>'
+                
+                pb = ''
+                pb += '<div style="background:linear-gradient(135deg, rgba(0,245,212,0.08) 0%, rgba(0,187,249,0.05) 50%, rgba(0,245,212,0.03) 100%);border:2px solid rgba(0,245,212,0.45);border-radius:20px;padding:28px 32px;margin-bottom:28px;box-shadow:0 0 40px rgba(0,245,212,0.15), 0 0 80px rgba(0,245,212,0.05), inset 0 1px 0 rgba(255,255,255,0.05);position:relative;overflow:hidden;">'
+                pb += '<div style="position:absolute;top:0;left:0;right:0;height:3px;background:linear-gradient(90deg, transparent, rgba(0,245,212,0.6), transparent);"></div>'
+                pb += f'<div style="display:flex;align-items:center;justify-content:space-between;margin-bottom:16px;"><span style="font-family:Orbitron,sans-serif;font-size:1rem;font-weight:700;color:var(--accent-cyan);letter-spacing:3px;text-shadow:0 0 20px rgba(0,245,212,0.3);">◈ TRADE PLAYBOOK</span><span style="font-size:0.8rem;color:var(--text-muted);background:rgba(255,255,255,0.04);padding:4px 12px;border-radius:20px;border:1px solid var(--border-subtle);">{channel_lock_text} | {time_context}</span></div>'
+                pb += f'<div style="font-size:1.5rem;font-weight:700;color:var(--text-bright);margin-bottom:14px;line-height:1.3;"><span style="color:{playbook_color};text-shadow:0 0 15px {playbook_color};">{playbook_dir}</span> {p["contract"]} at <span style="color:var(--accent-cyan);font-size:1.6rem;text-shadow:0 0 15px rgba(0,245,212,0.4);">${p["entry_premium"]:.2f}</span></div>'
+                pb += '<div style="display:flex;gap:20px;flex-wrap:wrap;margin-bottom:16px;">'
+                pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:160px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Entry Level</div><div style="font-size:1.15rem;font-weight:700;color:var(--text-bright);">SPX {p["entry_level"]:,.2f}</div></div>'
+                pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:160px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Stop if {stop_word}</div><div style="font-size:1.15rem;font-weight:700;color:var(--bear);">{p["stop_level"]:,.2f} <span style="font-size:0.8rem;font-weight:400;color:var(--text-muted);">(prem: ${p.get("stop_premium", 0):.2f})</span></div></div>'
+                pb += f'<div style="background:rgba(255,255,255,0.03);border:1px solid var(--border-subtle);border-radius:12px;padding:10px 16px;flex:1;min-width:120px;"><div style="font-size:0.75rem;color:var(--text-muted);margin-bottom:4px;text-transform:uppercase;letter-spacing:1px;">Max Risk</div><div style="font-size:1.15rem;font-weight:700;color:var(--bear);">-${p.get("max_loss_dollars", 0):,.0f}</div></div>'
+                pb += '</div>'
+                pb += '<div style="background:rgba(0,245,212,0.04);border:1px solid rgba(0,245,212,0.15);border-radius:12px;padding:12px 16px;margin-bottom:4px;">'
+                pb += '<div style="font-size:0.75rem;color:var(--accent-cyan);margin-bottom:8px;text-transform:uppercase;letter-spacing:1px;font-weight:600;">◎ Profit Targets</div>'
+                pb += '<div style="display:flex;gap:16px;flex-wrap:wrap;">'
+                pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T1 ({t["t1"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t1"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
+                pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T2 ({t["t2"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t2"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
+                pb += f'<div style="flex:1;min-width:80px;text-align:center;"><div style="font-size:0.7rem;color:var(--text-muted);">T3 ({t["t3"]["profit_pct"]}%)</div><div style="font-size:1.1rem;font-weight:700;color:var(--bull);">${t["t3"]["price"]:.2f}</div><div style="font-size:0.8rem;color:var(--bull);">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
+                pb += '</div></div>'
+                pb += alt_text
+                pb += no_trade_warning
+                pb += '</div>'
+                st.markdown(pb, unsafe_allow_html=True)
             
-            card_html += f'<div class="trade-contract trade-contract-{tc}">{p["contract"]}</div>'
-            card_html += '<div class="trade-grid">'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">{premium_label}</div><div class="trade-metric-value">${premium_value:.2f}</div>'
-            if premium_note:
-                card_html += f'<div style="{premium_note_style}">{premium_note}</div>'
-            card_html += '</div>'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{p["entry_level"]:,.2f}</div></div>'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{p["stop_level"]:,.2f}</div></div>'
-            if p.get("stop_premium"):
-                card_html += f'<div class="trade-metric"><div class="trade-metric-label">Premium Stop</div><div class="trade-metric-value" style="color:var(--bear);">${p["stop_premium"]:.2f}</div><div style="font-size:0.65rem;color:var(--text-muted);margin-top:2px;">Max loss: -${p["max_loss_dollars"]:,.0f}</div></div>'
-            card_html += '</div>'
-            card_html += '<div class="trade-targets"><div class="targets-header">◎ Profit Targets</div><div class="targets-grid">'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t1"]["profit_pct"]}%</div><div class="target-price">${t["t1"]["price"]:.2f}</div><div class="target-profit">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t2"]["profit_pct"]}%</div><div class="target-price">${t["t2"]["price"]:.2f}</div><div class="target-profit">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t3"]["profit_pct"]}%</div><div class="target-price">${t["t3"]["price"]:.2f}</div><div class="target-profit">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += '</div></div>'
-            card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{p["trigger"]}</div></div>'
-            card_html += '</div>'
+            # PRIMARY TRADE
+            st.markdown('<div class="section-header"><div class="section-icon icon-rocket">🚀</div><h2 class="section-title">PRIMARY Trade Setup</h2></div>', unsafe_allow_html=True)
             
-            st.markdown(card_html, unsafe_allow_html=True)
-            with st.expander("📋 Trade Rationale"):
-                st.write(p["rationale"])
-            # Debug: Show option pricing details during RTH
-            if is_rth and p.get("option_ticker"):
-                with st.expander("🔧 Option Pricing Debug"):
-                    debug_text = f"""Ticker: {p.get('option_ticker')}
+            if p:
+                tc = "calls" if p["direction"] == "CALLS" else "puts"
+                di = "↗" if p["direction"] == "CALLS" else "↘"
+                t = p["targets"]
+                
+                # Determine display based on trade status
+                trade_status = p.get("trade_status", "PENDING")
+                
+                if trade_status == "TRIGGERED" and p.get("live_current_premium"):
+                    premium_label = "Current Premium (LIVE)"
+                    current_prem = p["live_current_premium"]
+                    profit_pct = p.get("current_profit_pct", 0)
+                    profit_dollars = p.get("current_profit_dollars", 0)
+                    profit_color = "var(--bull)" if profit_pct >= 0 else "var(--bear)"
+                    profit_sign = "+" if profit_pct >= 0 else ""
+                    premium_note = f'P/L: {profit_sign}{profit_pct:.1f}% ({profit_sign}${profit_dollars:,.0f})'
+                    premium_note_style = f'font-size:0.7rem;color:{profit_color};margin-top:4px;font-weight:600;'
+                    premium_value = current_prem
+                    show_triggered = True
+                elif p.get("real_premium"):
+                    premium_label = "Entry Premium (LIVE)"
+                    premium_value = p.get("entry_premium", 0)
+                    current_prem_display = p.get("current_premium", 0)
+                    current_spx_display = p.get("current_spx", 0)
+                    premium_note = f'Current: ${current_prem_display:.2f} @ SPX {current_spx_display:,.0f}'
+                    premium_note_style = 'font-size:0.7rem;color:var(--accent-cyan);margin-top:4px;'
+                    show_triggered = False
+                else:
+                    premium_label = "Entry Premium (EST)"
+                    premium_value = p.get("entry_premium", 0)
+                    premium_note = ""
+                    premium_note_style = ""
+                    show_triggered = False
+                    if p.get("option_ticker"):
+                        premium_note = f'Source: {p.get("option_error", "Estimated")}'
+                        premium_note_style = 'font-size:0.65rem;color:var(--text-muted);margin-top:4px;'
+                
+                # Build HTML in parts
+                card_html = f'<div class="trade-card trade-card-{tc}">'
+                card_html += f'<div class="trade-header"><div class="trade-name">{di} {p["name"]}</div>'
+                card_html += f'<div class="trade-confidence trade-confidence-{p["confidence"].lower()}">{p["confidence"]} CONFIDENCE {"✓" if decision.get("channel_locked") else "⏳"}</div></div>'
+                
+                if show_triggered:
+                    card_html += '<div style="background:var(--bull);color:#000;padding:4px 12px;border-radius:20px;font-size:0.7rem;font-weight:700;display:inline-block;margin-bottom:8px;">✓ TRADE TRIGGERED</div>'
+                
+                card_html += f'<div class="trade-contract trade-contract-{tc}">{p["contract"]}</div>'
+                card_html += '<div class="trade-grid">'
+                card_html += f'<div class="trade-metric"><div class="trade-metric-label">{premium_label}</div><div class="trade-metric-value">${premium_value:.2f}</div>'
+                if premium_note:
+                    card_html += f'<div style="{premium_note_style}">{premium_note}</div>'
+                card_html += '</div>'
+                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{p["entry_level"]:,.2f}</div></div>'
+                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{p["stop_level"]:,.2f}</div></div>'
+                if p.get("stop_premium"):
+                    card_html += f'<div class="trade-metric"><div class="trade-metric-label">Premium Stop</div><div class="trade-metric-value" style="color:var(--bear);">${p["stop_premium"]:.2f}</div><div style="font-size:0.65rem;color:var(--text-muted);margin-top:2px;">Max loss: -${p["max_loss_dollars"]:,.0f}</div></div>'
+                card_html += '</div>'
+                card_html += '<div class="trade-targets"><div class="targets-header">◎ Profit Targets</div><div class="targets-grid">'
+                card_html += f'<div class="target-item"><div class="target-label">{t["t1"]["profit_pct"]}%</div><div class="target-price">${t["t1"]["price"]:.2f}</div><div class="target-profit">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
+                card_html += f'<div class="target-item"><div class="target-label">{t["t2"]["profit_pct"]}%</div><div class="target-price">${t["t2"]["price"]:.2f}</div><div class="target-profit">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
+                card_html += f'<div class="target-item"><div class="target-label">{t["t3"]["profit_pct"]}%</div><div class="target-price">${t["t3"]["price"]:.2f}</div><div class="target-profit">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
+                card_html += '</div></div>'
+                card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{p["trigger"]}</div></div>'
+                card_html += '</div>'
+                
+                st.markdown(card_html, unsafe_allow_html=True)
+                with st.expander("📋 Trade Rationale"):
+                    st.write(p["rationale"])
+                # Debug: Show option pricing details during RTH
+                if is_rth and p.get("option_ticker"):
+                    with st.expander("🔧 Option Pricing Debug"):
+                        debug_text = f"""Ticker: {p.get('option_ticker')}
 Available: {p.get('option_available')}
 Error: {p.get('option_error')}
 
@@ -6413,325 +5922,325 @@ Entry Level: {p.get('calc_entry_level')}
 Delta Used: {p.get('calc_delta_used')}
 Calculated Entry Premium: {p.get('calc_result')}
 """
-                    st.code(debug_text)
-            
-            # Trade Journal - Log button
-            if st.button("📝 Log This Trade to Journal", key="log_primary", help="Save this trade signal to trade_journal.csv for performance tracking"):
-                log_trade_to_journal(
-                    trade_date=actual_trading_date.strftime("%Y-%m-%d"),
-                    channel_type=channel_type.value if channel_type else "UNKNOWN",
-                    direction=p["direction"],
-                    contract=p["contract"],
-                    entry_spx=p["entry_level"],
-                    entry_premium=p["entry_premium"],
-                    confidence=p["confidence"],
-                    strike_offset=p["strike"] - p["entry_level"],
-                    vix_at_entry=vix,
-                    notes=p["name"]
-                )
-                st.success("✓ Trade logged to journal!")
-        
-        # ALTERNATE TRADE (If structure breaks)
-        if decision.get("alternate"):
-            a = get_trade_premium(decision["alternate"], current_spx, actual_trading_date, is_rth)
-            st.markdown('<div class="section-header"><div class="section-icon">⚡</div><h2 class="section-title">ALTERNATE: If Structure Breaks</h2></div>', unsafe_allow_html=True)
-            tc = "calls" if a["direction"] == "CALLS" else "puts"
-            di = "↗" if a["direction"] == "CALLS" else "↘"
-            t = a["targets"]
-            
-            # Determine display based on trade status
-            trade_status = a.get("trade_status", "PENDING")
-            
-            if trade_status == "TRIGGERED" and a.get("live_current_premium"):
-                premium_label = "Current Premium (LIVE)"
-                current_prem = a["live_current_premium"]
-                profit_pct = a.get("current_profit_pct", 0)
-                profit_dollars = a.get("current_profit_dollars", 0)
-                profit_color = "var(--bull)" if profit_pct >= 0 else "var(--bear)"
-                profit_sign = "+" if profit_pct >= 0 else ""
-                premium_note = f'P/L: {profit_sign}{profit_pct:.1f}% ({profit_sign}${profit_dollars:,.0f})'
-                premium_note_style = f'font-size:0.7rem;color:{profit_color};margin-top:4px;font-weight:600;'
-                premium_value = current_prem
-                show_triggered = True
-            elif a.get("real_premium"):
-                premium_label = "Entry Premium (LIVE)"
-                premium_value = a.get("entry_premium", 0)
-                current_prem_display = a.get("current_premium", 0)
-                current_spx_display = a.get("current_spx", 0)
-                premium_note = f'Current: ${current_prem_display:.2f} @ SPX {current_spx_display:,.0f}'
-                premium_note_style = 'font-size:0.7rem;color:var(--accent-cyan);margin-top:4px;'
-                show_triggered = False
-            else:
-                premium_label = "Entry Premium (EST)"
-                premium_value = a.get("entry_premium", 0)
-                premium_note = ""
-                premium_note_style = ""
-                show_triggered = False
-            
-            # Build HTML in parts to avoid f-string issues
-            card_html = f'<div class="trade-card trade-card-{tc}" style="border-style: dashed;">'
-            card_html += f'<div class="trade-header"><div class="trade-name">{di} {a["name"]}</div>'
-            card_html += f'<div class="trade-confidence trade-confidence-{a["confidence"].lower()}">{a["confidence"]} CONFIDENCE</div></div>'
-            
-            if show_triggered:
-                card_html += '<div style="background:var(--bull);color:#000;padding:4px 12px;border-radius:20px;font-size:0.7rem;font-weight:700;display:inline-block;margin-bottom:8px;">✓ TRADE TRIGGERED</div>'
-            
-            card_html += f'<div class="trade-contract trade-contract-{tc}">{a["contract"]}</div>'
-            card_html += '<div class="trade-grid">'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">{premium_label}</div><div class="trade-metric-value">${premium_value:.2f}</div>'
-            if premium_note:
-                card_html += f'<div style="{premium_note_style}">{premium_note}</div>'
-            card_html += '</div>'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{a["entry_level"]:,.2f}</div></div>'
-            card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{a["stop_level"]:,.2f}</div></div>'
-            card_html += '</div>'
-            card_html += '<div class="trade-targets"><div class="targets-header">◎ Profit Targets</div><div class="targets-grid">'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t1"]["profit_pct"]}%</div><div class="target-price">${t["t1"]["price"]:.2f}</div><div class="target-profit">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t2"]["profit_pct"]}%</div><div class="target-price">${t["t2"]["price"]:.2f}</div><div class="target-profit">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += f'<div class="target-item"><div class="target-label">{t["t3"]["profit_pct"]}%</div><div class="target-price">${t["t3"]["price"]:.2f}</div><div class="target-profit">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
-            card_html += '</div></div>'
-            card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{a["trigger"]}</div></div>'
-            card_html += '</div>'
-            
-            st.markdown(card_html, unsafe_allow_html=True)
-            with st.expander("📋 Trade Rationale"):
-                st.write(a["rationale"])
-        
-        # SECONDARY TRADE (collapsed - other side of channel)
-        if decision.get("secondary"):
-            s = get_trade_premium(decision["secondary"], current_spx, actual_trading_date, is_rth)
-            with st.expander("🔄 Secondary Trade Setup — Other Side of Channel", expanded=False):
-                st.markdown('<div class="section-header"><div class="section-icon icon-rotate">🔄</div><h2 class="section-title">SECONDARY Trade Setup</h2></div>', unsafe_allow_html=True)
-                tc = "calls" if s["direction"] == "CALLS" else "puts"
-                di = "↗" if s["direction"] == "CALLS" else "↘"
-                t = s["targets"]
+                        st.code(debug_text)
+                
+                # Trade Journal - Log button
+                if st.button("📝 Log This Trade to Journal", key="log_primary", help="Save this trade signal to trade_journal.csv for performance tracking"):
+                    log_trade_to_journal(
+                        trade_date=actual_trading_date.strftime("%Y-%m-%d"),
+                        channel_type=channel_type.value if channel_type else "UNKNOWN",
+                        direction=p["direction"],
+                        contract=p["contract"],
+                        entry_spx=p["entry_level"],
+                        entry_premium=p["entry_premium"],
+                        confidence=p["confidence"],
+                        strike_offset=p["strike"] - p["entry_level"],
+                        vix_at_entry=vix,
+                        notes=p["name"]
+                    )
+                    st.success("✓ Trade logged to journal!")
             
+            # ALTERNATE TRADE (If structure breaks)
+            if decision.get("alternate"):
+                a = get_trade_premium(decision["alternate"], current_spx, actual_trading_date, is_rth)
+                st.markdown('<div class="section-header"><div class="section-icon">⚡</div><h2 class="section-title">ALTERNATE: If Structure Breaks</h2></div>', unsafe_allow_html=True)
+                tc = "calls" if a["direction"] == "CALLS" else "puts"
+                di = "↗" if a["direction"] == "CALLS" else "↘"
+                t = a["targets"]
+                
                 # Determine display based on trade status
-                trade_status = s.get("trade_status", "PENDING")
-            
-                if trade_status == "TRIGGERED" and s.get("live_current_premium"):
+                trade_status = a.get("trade_status", "PENDING")
+                
+                if trade_status == "TRIGGERED" and a.get("live_current_premium"):
                     premium_label = "Current Premium (LIVE)"
-                    current_prem = s["live_current_premium"]
-                    profit_pct = s.get("current_profit_pct", 0)
-                    profit_dollars = s.get("current_profit_dollars", 0)
+                    current_prem = a["live_current_premium"]
+                    profit_pct = a.get("current_profit_pct", 0)
+                    profit_dollars = a.get("current_profit_dollars", 0)
                     profit_color = "var(--bull)" if profit_pct >= 0 else "var(--bear)"
                     profit_sign = "+" if profit_pct >= 0 else ""
                     premium_note = f'P/L: {profit_sign}{profit_pct:.1f}% ({profit_sign}${profit_dollars:,.0f})'
                     premium_note_style = f'font-size:0.7rem;color:{profit_color};margin-top:4px;font-weight:600;'
                     premium_value = current_prem
                     show_triggered = True
-                elif s.get("real_premium"):
+                elif a.get("real_premium"):
                     premium_label = "Entry Premium (LIVE)"
-                    premium_value = s.get("entry_premium", 0)
-                    current_prem_display = s.get("current_premium", 0)
-                    current_spx_display = s.get("current_spx", 0)
+                    premium_value = a.get("entry_premium", 0)
+                    current_prem_display = a.get("current_premium", 0)
+                    current_spx_display = a.get("current_spx", 0)
                     premium_note = f'Current: ${current_prem_display:.2f} @ SPX {current_spx_display:,.0f}'
                     premium_note_style = 'font-size:0.7rem;color:var(--accent-cyan);margin-top:4px;'
                     show_triggered = False
                 else:
                     premium_label = "Entry Premium (EST)"
-                    premium_value = s.get("entry_premium", 0)
+                    premium_value = a.get("entry_premium", 0)
                     premium_note = ""
                     premium_note_style = ""
                     show_triggered = False
-            
-                # Build HTML in parts
-                card_html = f'<div class="trade-card trade-card-{tc}" style="opacity: 0.85;">'
-                card_html += f'<div class="trade-header"><div class="trade-name">{di} {s["name"]}</div>'
-                card_html += f'<div class="trade-confidence trade-confidence-{s["confidence"].lower()}">{s["confidence"]} CONFIDENCE</div></div>'
-            
+                
+                # Build HTML in parts to avoid f-string issues
+                card_html = f'<div class="trade-card trade-card-{tc}" style="border-style: dashed;">'
+                card_html += f'<div class="trade-header"><div class="trade-name">{di} {a["name"]}</div>'
+                card_html += f'<div class="trade-confidence trade-confidence-{a["confidence"].lower()}">{a["confidence"]} CONFIDENCE</div></div>'
+                
                 if show_triggered:
                     card_html += '<div style="background:var(--bull);color:#000;padding:4px 12px;border-radius:20px;font-size:0.7rem;font-weight:700;display:inline-block;margin-bottom:8px;">✓ TRADE TRIGGERED</div>'
-            
-                card_html += f'<div class="trade-contract trade-contract-{tc}">{s["contract"]}</div>'
+                
+                card_html += f'<div class="trade-contract trade-contract-{tc}">{a["contract"]}</div>'
                 card_html += '<div class="trade-grid">'
                 card_html += f'<div class="trade-metric"><div class="trade-metric-label">{premium_label}</div><div class="trade-metric-value">${premium_value:.2f}</div>'
                 if premium_note:
                     card_html += f'<div style="{premium_note_style}">{premium_note}</div>'
                 card_html += '</div>'
-                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{s["entry_level"]:,.2f}</div></div>'
-                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{s["stop_level"]:,.2f}</div></div>'
+                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{a["entry_level"]:,.2f}</div></div>'
+                card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{a["stop_level"]:,.2f}</div></div>'
                 card_html += '</div>'
                 card_html += '<div class="trade-targets"><div class="targets-header">◎ Profit Targets</div><div class="targets-grid">'
                 card_html += f'<div class="target-item"><div class="target-label">{t["t1"]["profit_pct"]}%</div><div class="target-price">${t["t1"]["price"]:.2f}</div><div class="target-profit">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
                 card_html += f'<div class="target-item"><div class="target-label">{t["t2"]["profit_pct"]}%</div><div class="target-price">${t["t2"]["price"]:.2f}</div><div class="target-profit">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
                 card_html += f'<div class="target-item"><div class="target-label">{t["t3"]["profit_pct"]}%</div><div class="target-price">${t["t3"]["price"]:.2f}</div><div class="target-profit">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
                 card_html += '</div></div>'
-                card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{s["trigger"]}</div></div>'
+                card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{a["trigger"]}</div></div>'
                 card_html += '</div>'
-            
+                
                 st.markdown(card_html, unsafe_allow_html=True)
                 with st.expander("📋 Trade Rationale"):
-                    st.write(s["rationale"])
-    
-    # ═══════════════════════════════════════════════════════════════════════════
+                    st.write(a["rationale"])
+            
+            # SECONDARY TRADE (collapsed - other side of channel)
+            if decision.get("secondary"):
+                s = get_trade_premium(decision["secondary"], current_spx, actual_trading_date, is_rth)
+                with st.expander("🔄 Secondary Trade Setup — Other Side of Channel", expanded=False):
+                    st.markdown('<div class="section-header"><div class="section-icon icon-rotate">🔄</div><h2 class="section-title">SECONDARY Trade Setup</h2></div>', unsafe_allow_html=True)
+                    tc = "calls" if s["direction"] == "CALLS" else "puts"
+                    di = "↗" if s["direction"] == "CALLS" else "↘"
+                    t = s["targets"]
+                
+                    # Determine display based on trade status
+                    trade_status = s.get("trade_status", "PENDING")
+                
+                    if trade_status == "TRIGGERED" and s.get("live_current_premium"):
+                        premium_label = "Current Premium (LIVE)"
+                        current_prem = s["live_current_premium"]
+                        profit_pct = s.get("current_profit_pct", 0)
+                        profit_dollars = s.get("current_profit_dollars", 0)
+                        profit_color = "var(--bull)" if profit_pct >= 0 else "var(--bear)"
+                        profit_sign = "+" if profit_pct >= 0 else ""
+                        premium_note = f'P/L: {profit_sign}{profit_pct:.1f}% ({profit_sign}${profit_dollars:,.0f})'
+                        premium_note_style = f'font-size:0.7rem;color:{profit_color};margin-top:4px;font-weight:600;'
+                        premium_value = current_prem
+                        show_triggered = True
+                    elif s.get("real_premium"):
+                        premium_label = "Entry Premium (LIVE)"
+                        premium_value = s.get("entry_premium", 0)
+                        current_prem_display = s.get("current_premium", 0)
+                        current_spx_display = s.get("current_spx", 0)
+                        premium_note = f'Current: ${current_prem_display:.2f} @ SPX {current_spx_display:,.0f}'
+                        premium_note_style = 'font-size:0.7rem;color:var(--accent-cyan);margin-top:4px;'
+                        show_triggered = False
+                    else:
+                        premium_label = "Entry Premium (EST)"
+                        premium_value = s.get("entry_premium", 0)
+                        premium_note = ""
+                        premium_note_style = ""
+                        show_triggered = False
+                
+                    # Build HTML in parts
+                    card_html = f'<div class="trade-card trade-card-{tc}" style="opacity: 0.85;">'
+                    card_html += f'<div class="trade-header"><div class="trade-name">{di} {s["name"]}</div>'
+                    card_html += f'<div class="trade-confidence trade-confidence-{s["confidence"].lower()}">{s["confidence"]} CONFIDENCE</div></div>'
+                
+                    if show_triggered:
+                        card_html += '<div style="background:var(--bull);color:#000;padding:4px 12px;border-radius:20px;font-size:0.7rem;font-weight:700;display:inline-block;margin-bottom:8px;">✓ TRADE TRIGGERED</div>'
+                
+                    card_html += f'<div class="trade-contract trade-contract-{tc}">{s["contract"]}</div>'
+                    card_html += '<div class="trade-grid">'
+                    card_html += f'<div class="trade-metric"><div class="trade-metric-label">{premium_label}</div><div class="trade-metric-value">${premium_value:.2f}</div>'
+                    if premium_note:
+                        card_html += f'<div style="{premium_note_style}">{premium_note}</div>'
+                    card_html += '</div>'
+                    card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Entry</div><div class="trade-metric-value">{s["entry_level"]:,.2f}</div></div>'
+                    card_html += f'<div class="trade-metric"><div class="trade-metric-label">SPX Stop</div><div class="trade-metric-value">{s["stop_level"]:,.2f}</div></div>'
+                    card_html += '</div>'
+                    card_html += '<div class="trade-targets"><div class="targets-header">◎ Profit Targets</div><div class="targets-grid">'
+                    card_html += f'<div class="target-item"><div class="target-label">{t["t1"]["profit_pct"]}%</div><div class="target-price">${t["t1"]["price"]:.2f}</div><div class="target-profit">+${t["t1"]["profit_dollars"]:,.0f}</div></div>'
+                    card_html += f'<div class="target-item"><div class="target-label">{t["t2"]["profit_pct"]}%</div><div class="target-price">${t["t2"]["price"]:.2f}</div><div class="target-profit">+${t["t2"]["profit_dollars"]:,.0f}</div></div>'
+                    card_html += f'<div class="target-item"><div class="target-label">{t["t3"]["profit_pct"]}%</div><div class="target-price">${t["t3"]["price"]:.2f}</div><div class="target-profit">+${t["t3"]["profit_dollars"]:,.0f}</div></div>'
+                    card_html += '</div></div>'
+                    card_html += f'<div class="trade-trigger"><div class="trigger-label">◈ Entry Trigger</div><div class="trigger-text">{s["trigger"]}</div></div>'
+                    card_html += '</div>'
+                
+                    st.markdown(card_html, unsafe_allow_html=True)
+                    with st.expander("📋 Trade Rationale"):
+                        st.write(s["rationale"])
+        
+        # ═══════════════════════════════════════════════════════════════════════════
 
-    # VIX CHANNEL SYSTEM - Always show (doesn't require Tastytrade)
-    # ═══════════════════════════════════════════════════════════════════════════
-    st.markdown('<div class="section-header"><div class="section-icon" style="background:linear-gradient(135deg,#6c5ce7,#a55eea);">🌊</div><h2 class="section-title">VIX Channel System</h2></div>', unsafe_allow_html=True)
-    
-    # vix_channel_levels already calculated above (before decision engine)
-    vix_channel_type = vix_channel_levels["channel_type"] if vix_channel_levels else VIXChannelType.FLAT
-    
-    # Direction/color for display
-    direction_map = {
-        VIXChannelType.ASCENDING: ("↗", "var(--bear)"),      # VIX up = SPX bearish
-        VIXChannelType.DESCENDING: ("↘", "var(--bull)"),     # VIX down = SPX bullish
-        VIXChannelType.CONVERGING: ("⊳", "var(--accent-gold)"),  # Squeeze
-        VIXChannelType.DIVERGING: ("⊲", "var(--accent-purple)"),  # Expansion
-        VIXChannelType.FLAT: ("═", "var(--accent-cyan)"),
-        VIXChannelType.PARALLEL_UP: ("↗↗", "var(--bear)"),
-        VIXChannelType.PARALLEL_DOWN: ("↘↘", "var(--bull)"),
-    }
-    vix_channel_direction, vix_channel_color = direction_map.get(
-        vix_channel_type, ("?", "var(--text-muted)"))
-    
-    # VIX Channel display cards
-    vix_channel_status = vix_channel_levels.get("channel_status", "BUILDING") if vix_channel_levels else "BUILDING"
-    
-    if vix_channel_levels and vix_channel_levels.get("floor") is not None:
+        # VIX CHANNEL SYSTEM - Always show (doesn't require Tastytrade)
+        # ═══════════════════════════════════════════════════════════════════════════
+        st.markdown('<div class="section-header"><div class="section-icon" style="background:linear-gradient(135deg,#6c5ce7,#a55eea);">🌊</div><h2 class="section-title">VIX Channel System</h2></div>', unsafe_allow_html=True)
+        
+        # vix_channel_levels already calculated above (before decision engine)
+        vix_channel_type = vix_channel_levels["channel_type"] if vix_channel_levels else VIXChannelType.FLAT
+        
+        # Direction/color for display
+        direction_map = {
+            VIXChannelType.ASCENDING: ("↗", "var(--bear)"),      # VIX up = SPX bearish
+            VIXChannelType.DESCENDING: ("↘", "var(--bull)"),     # VIX down = SPX bullish
+            VIXChannelType.CONVERGING: ("⊳", "var(--accent-gold)"),  # Squeeze
+            VIXChannelType.DIVERGING: ("⊲", "var(--accent-purple)"),  # Expansion
+            VIXChannelType.FLAT: ("═", "var(--accent-cyan)"),
+            VIXChannelType.PARALLEL_UP: ("↗↗", "var(--bear)"),
+            VIXChannelType.PARALLEL_DOWN: ("↘↘", "var(--bull)"),
+        }
+        vix_channel_direction, vix_channel_color = direction_map.get(
+            vix_channel_type, ("?", "var(--text-muted)"))
         
-        if vix_channel_status == "BUILDING":
-            # ── BUILDING STATE: Only show status + current VIX + Asia anchors ──
-            st.markdown('<div class="alert-box alert-box-info" style="margin-bottom:16px;"><div class="alert-icon-large">🔄</div><div class="alert-content"><div class="alert-title">VOLATILITY ZONE BUILDING</div><div class="alert-text">Europe/London session still in progress. Channel shape (ascending, descending, cone, flat) will be determined once London completes (~6 AM CT). Do NOT trade VIX channel signals until LOCKED.</div></div></div>', unsafe_allow_html=True)
-            
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-gold);"><div class="metric-icon">⏳</div><div class="metric-label">VIX Channel</div><div class="metric-value" style="color:var(--accent-gold);font-size:1rem;">BUILDING</div><div class="metric-delta">Waiting for London to complete</div></div>', unsafe_allow_html=True)
-            with col2:
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-cyan);"><div class="metric-icon">📍</div><div class="metric-label">Current VIX</div><div class="metric-value" style="font-size:1.3rem;">{vix:.2f}</div><div class="metric-delta">Channel shape TBD</div></div>', unsafe_allow_html=True)
-            with col3:
-                asia_h = vix_channel_levels.get("asia_high", 0)
-                asia_l = vix_channel_levels.get("asia_low", 0)
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--text-muted);"><div class="metric-icon">🦘</div><div class="metric-label">Asia Anchors</div><div class="metric-value" style="font-size:1rem;">H: {asia_h:.2f} | L: {asia_l:.2f}</div><div class="metric-delta">Ceiling & Floor anchor #1 set</div></div>', unsafe_allow_html=True)
+        # VIX Channel display cards
+        vix_channel_status = vix_channel_levels.get("channel_status", "BUILDING") if vix_channel_levels else "BUILDING"
         
-        else:
-            # ── LOCKED STATE: Full channel display with floor, ceiling, position, alerts ──
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                ceil_slope = vix_channel_levels.get("ceiling_slope_per_hour", 0)
-                floor_slope = vix_channel_levels.get("floor_slope_per_hour", 0)
-                slope_text = f"Ceil: {ceil_slope:+.3f}/hr | Floor: {floor_slope:+.3f}/hr"
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid {vix_channel_color};"><div class="metric-icon">{vix_channel_direction}</div><div class="metric-label">VIX Channel 🔒 LOCKED</div><div class="metric-value" style="color:{vix_channel_color};font-size:1rem;">{vix_channel_type.value}</div><div class="metric-delta" style="font-size:0.6rem;">{slope_text}</div></div>', unsafe_allow_html=True)
+        if vix_channel_levels and vix_channel_levels.get("floor") is not None:
             
-            with col2:
-                vix_floor = vix_channel_levels.get("floor_at_ref", 0)
-                dist_floor = round(vix - vix_floor, 2) if vix else 0
-                floor_status = "🟢" if dist_floor > 0.1 else "⚠️" if dist_floor > 0 else "🔴"
-                if dist_floor >= 0:
-                    floor_label = f"VIX is {dist_floor:.2f} above floor"
-                else:
-                    floor_label = f"VIX is {abs(dist_floor):.2f} BELOW floor"
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--bull);"><div class="metric-icon">{floor_status}</div><div class="metric-label">VIX Floor</div><div class="metric-value" style="color:var(--bull);font-size:1.3rem;">{vix_floor:.2f}</div><div class="metric-delta">{floor_label}</div></div>', unsafe_allow_html=True)
-            
-            with col3:
-                vix_ceiling = vix_channel_levels.get("ceiling_at_ref", 0)
-                dist_ceiling = round(vix_ceiling - vix, 2) if vix else 0
-                ceiling_status = "🟢" if dist_ceiling > 0.1 else "⚠️" if dist_ceiling > 0 else "🔴"
-                if dist_ceiling >= 0:
-                    ceiling_label = f"VIX is {dist_ceiling:.2f} below ceiling"
-                else:
-                    ceiling_label = f"VIX is {abs(dist_ceiling):.2f} ABOVE ceiling"
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--bear);"><div class="metric-icon">{ceiling_status}</div><div class="metric-label">VIX Ceiling</div><div class="metric-value" style="color:var(--bear);font-size:1.3rem;">{vix_ceiling:.2f}</div><div class="metric-delta">{ceiling_label}</div></div>', unsafe_allow_html=True)
+            if vix_channel_status == "BUILDING":
+                # ── BUILDING STATE: Only show status + current VIX + Asia anchors ──
+                st.markdown('<div class="alert-box alert-box-info" style="margin-bottom:16px;"><div class="alert-icon-large">🔄</div><div class="alert-content"><div class="alert-title">VOLATILITY ZONE BUILDING</div><div class="alert-text">Europe/London session still in progress. Channel shape (ascending, descending, cone, flat) will be determined once London completes (~6 AM CT). Do NOT trade VIX channel signals until LOCKED.</div></div></div>', unsafe_allow_html=True)
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-gold);"><div class="metric-icon">⏳</div><div class="metric-label">VIX Channel</div><div class="metric-value" style="color:var(--accent-gold);font-size:1rem;">BUILDING</div><div class="metric-delta">Waiting for London to complete</div></div>', unsafe_allow_html=True)
+                with col2:
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-cyan);"><div class="metric-icon">📍</div><div class="metric-label">Current VIX</div><div class="metric-value" style="font-size:1.3rem;">{vix:.2f}</div><div class="metric-delta">Channel shape TBD</div></div>', unsafe_allow_html=True)
+                with col3:
+                    asia_h = vix_channel_levels.get("asia_high", 0)
+                    asia_l = vix_channel_levels.get("asia_low", 0)
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--text-muted);"><div class="metric-icon">🦘</div><div class="metric-label">Asia Anchors</div><div class="metric-value" style="font-size:1rem;">H: {asia_h:.2f} | L: {asia_l:.2f}</div><div class="metric-delta">Ceiling & Floor anchor #1 set</div></div>', unsafe_allow_html=True)
             
-            with col4:
-                width = vix_channel_levels.get("channel_width_current", 0)
-                TOUCH_THRESHOLD = 0.15
-                dist_floor_raw = vix - vix_floor if vix else 0
-                dist_ceiling_raw = vix_ceiling - vix if vix else 0
+            else:
+                # ── LOCKED STATE: Full channel display with floor, ceiling, position, alerts ──
+                col1, col2, col3, col4 = st.columns(4)
+                
+                with col1:
+                    ceil_slope = vix_channel_levels.get("ceiling_slope_per_hour", 0)
+                    floor_slope = vix_channel_levels.get("floor_slope_per_hour", 0)
+                    slope_text = f"Ceil: {ceil_slope:+.3f}/hr | Floor: {floor_slope:+.3f}/hr"
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid {vix_channel_color};"><div class="metric-icon">{vix_channel_direction}</div><div class="metric-label">VIX Channel 🔒 LOCKED</div><div class="metric-value" style="color:{vix_channel_color};font-size:1rem;">{vix_channel_type.value}</div><div class="metric-delta" style="font-size:0.6rem;">{slope_text}</div></div>', unsafe_allow_html=True)
                 
-                if vix > vix_ceiling:
-                    if dist_ceiling_raw >= -TOUCH_THRESHOLD:
-                        # Just above ceiling, retesting
-                        pos_text = "RETESTING CEILING"
-                        pos_color = "var(--bear)"
-                        signal = "Broke ceiling, back at it → PUTS"
+                with col2:
+                    vix_floor = vix_channel_levels.get("floor_at_ref", 0)
+                    dist_floor = round(vix - vix_floor, 2) if vix else 0
+                    floor_status = "🟢" if dist_floor > 0.1 else "⚠️" if dist_floor > 0 else "🔴"
+                    if dist_floor >= 0:
+                        floor_label = f"VIX is {dist_floor:.2f} above floor"
                     else:
-                        pos_text = "ABOVE CEILING ↑"
-                        pos_color = "var(--bear)"
-                        signal = "VIX established above → PUTS bias"
-                elif vix < vix_floor:
-                    if dist_floor_raw >= -TOUCH_THRESHOLD:
-                        # Just below floor, retesting
-                        pos_text = "RETESTING FLOOR"
-                        pos_color = "var(--bull)"
-                        signal = "Broke floor, back at it → CALLS"
+                        floor_label = f"VIX is {abs(dist_floor):.2f} BELOW floor"
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--bull);"><div class="metric-icon">{floor_status}</div><div class="metric-label">VIX Floor</div><div class="metric-value" style="color:var(--bull);font-size:1.3rem;">{vix_floor:.2f}</div><div class="metric-delta">{floor_label}</div></div>', unsafe_allow_html=True)
+                
+                with col3:
+                    vix_ceiling = vix_channel_levels.get("ceiling_at_ref", 0)
+                    dist_ceiling = round(vix_ceiling - vix, 2) if vix else 0
+                    ceiling_status = "🟢" if dist_ceiling > 0.1 else "⚠️" if dist_ceiling > 0 else "🔴"
+                    if dist_ceiling >= 0:
+                        ceiling_label = f"VIX is {dist_ceiling:.2f} below ceiling"
                     else:
-                        pos_text = "BELOW FLOOR ↓"
-                        pos_color = "var(--bull)"
-                        signal = "VIX established below → CALLS bias"
-                else:
-                    # Inside channel
-                    if dist_floor_raw <= TOUCH_THRESHOLD:
-                        pos_text = "AT FLOOR"
-                        pos_color = "var(--bear)"
-                        signal = "VIX bouncing off floor → PUTS"
-                    elif dist_ceiling_raw <= TOUCH_THRESHOLD:
-                        pos_text = "AT CEILING"
-                        pos_color = "var(--bull)"
-                        signal = "VIX rejected at ceiling → CALLS"
+                        ceiling_label = f"VIX is {abs(dist_ceiling):.2f} ABOVE ceiling"
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--bear);"><div class="metric-icon">{ceiling_status}</div><div class="metric-label">VIX Ceiling</div><div class="metric-value" style="color:var(--bear);font-size:1.3rem;">{vix_ceiling:.2f}</div><div class="metric-delta">{ceiling_label}</div></div>', unsafe_allow_html=True)
+                
+                with col4:
+                    width = vix_channel_levels.get("channel_width_current", 0)
+                    TOUCH_THRESHOLD = 0.15
+                    dist_floor_raw = vix - vix_floor if vix else 0
+                    dist_ceiling_raw = vix_ceiling - vix if vix else 0
+                    
+                    if vix > vix_ceiling:
+                        if dist_ceiling_raw >= -TOUCH_THRESHOLD:
+                            # Just above ceiling, retesting
+                            pos_text = "RETESTING CEILING"
+                            pos_color = "var(--bear)"
+                            signal = "Broke ceiling, back at it → PUTS"
+                        else:
+                            pos_text = "ABOVE CEILING ↑"
+                            pos_color = "var(--bear)"
+                            signal = "VIX established above → PUTS bias"
+                    elif vix < vix_floor:
+                        if dist_floor_raw >= -TOUCH_THRESHOLD:
+                            # Just below floor, retesting
+                            pos_text = "RETESTING FLOOR"
+                            pos_color = "var(--bull)"
+                            signal = "Broke floor, back at it → CALLS"
+                        else:
+                            pos_text = "BELOW FLOOR ↓"
+                            pos_color = "var(--bull)"
+                            signal = "VIX established below → CALLS bias"
                     else:
-                        if width > 0:
-                            pct_pos = round(((vix - vix_floor) / width) * 100)
-                            pos_text = f"IN CHANNEL ({pct_pos}%)"
+                        # Inside channel
+                        if dist_floor_raw <= TOUCH_THRESHOLD:
+                            pos_text = "AT FLOOR"
+                            pos_color = "var(--bear)"
+                            signal = "VIX bouncing off floor → PUTS"
+                        elif dist_ceiling_raw <= TOUCH_THRESHOLD:
+                            pos_text = "AT CEILING"
+                            pos_color = "var(--bull)"
+                            signal = "VIX rejected at ceiling → CALLS"
                         else:
-                            pos_text = "IN CHANNEL"
-                        pos_color = "var(--accent-cyan)"
-                        signal = "Wait for wall touch to trade"
-                st.markdown(f'<div class="metric-card" style="border-left:4px solid {pos_color};"><div class="metric-icon">📍</div><div class="metric-label">VIX: {vix:.2f}</div><div class="metric-value" style="color:{pos_color};font-size:0.9rem;">{pos_text}</div><div class="metric-delta">{signal}</div></div>', unsafe_allow_html=True)
-            
-            # Channel shape description
-            channel_desc = vix_channel_levels.get("channel_description", "")
-            if channel_desc:
-                st.markdown(f'<div style="text-align:center;padding:8px;font-size:0.8rem;color:var(--text-muted);font-style:italic;">{channel_desc} | Width: {width:.2f} VIX pts</div>', unsafe_allow_html=True)
-            
-            # ── VIX Entry Signal Alerts (4 scenarios) ──
-            TOUCH_ALERT = 0.15
-            d_floor = vix - vix_floor if vix else 0
-            d_ceiling = vix_ceiling - vix if vix else 0
-            
-            # Scenario 1: VIX at floor, closing above → PUTS
-            if d_floor >= 0 and d_floor <= TOUCH_ALERT:
-                st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🔴</div><div class="alert-content"><div class="alert-title">VIX AT FLOOR — PUTS SIGNAL</div><div class="alert-text">VIX touching {vix_floor:.2f} and closing above. VIX bouncing up = SPX heading down. Enter PUTS.</div></div></div>', unsafe_allow_html=True)
-            
-            # Scenario 2: VIX at ceiling, closing below → CALLS
-            elif d_ceiling >= 0 and d_ceiling <= TOUCH_ALERT:
-                st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🟢</div><div class="alert-content"><div class="alert-title">VIX AT CEILING — CALLS SIGNAL</div><div class="alert-text">VIX touching {vix_ceiling:.2f} and closing below. VIX rejected = SPX heading up. Enter CALLS.</div></div></div>', unsafe_allow_html=True)
-            
-            # Scenario 3: VIX broke above ceiling, retesting → PUTS
-            elif vix > vix_ceiling and d_ceiling >= -TOUCH_ALERT:
-                st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX CEILING RETEST — PUTS SIGNAL</div><div class="alert-text">VIX broke above {vix_ceiling:.2f}, came back to retest. Ceiling is now support. Enter PUTS.</div></div></div>', unsafe_allow_html=True)
-            
-            # Scenario 4: VIX broke below floor, retesting → CALLS
-            elif vix < vix_floor and d_floor >= -TOUCH_ALERT:
-                st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX FLOOR RETEST — CALLS SIGNAL</div><div class="alert-text">VIX broke below {vix_floor:.2f}, came back to retest. Floor is now resistance. Enter CALLS.</div></div></div>', unsafe_allow_html=True)
-            
-            # Established breaks (far from wall)
-            elif vix > vix_ceiling:
-                st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX ABOVE CEILING</div><div class="alert-text">VIX established above {vix_ceiling:.2f}. Bearish SPX. Watch for retest of ceiling for PUTS entry.</div></div></div>', unsafe_allow_html=True)
-            elif vix < vix_floor:
-                st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX BELOW FLOOR</div><div class="alert-text">VIX established below {vix_floor:.2f}. Bullish SPX. Watch for retest of floor for CALLS entry.</div></div></div>', unsafe_allow_html=True)
-    
-    else:
-        # No pivots entered - show prompt
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--text-muted);"><div class="metric-icon">🌊</div><div class="metric-label">VIX Channel</div><div class="metric-value" style="color:var(--text-muted);">AWAITING DATA</div><div class="metric-delta">Enter 4 pivots in sidebar</div></div>', unsafe_allow_html=True)
-        with col2:
-            st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-cyan);"><div class="metric-icon">📍</div><div class="metric-label">Current VIX</div><div class="metric-value" style="font-size:1.3rem;">{vix:.2f}</div><div class="metric-delta">Enter pivots for channel</div></div>', unsafe_allow_html=True)
-        with col3:
-            if vx_data and vx_data.get("available"):
-                vx_symbol = vx_data.get("symbol", "N/A")
-                vx_exp = vx_data.get("expiration", "N/A")
-            else:
-                vx_symbol = "N/A"
-                vx_exp = "Tastytrade not connected"
-            st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-purple);"><div class="metric-icon">📊</div><div class="metric-label">VX Front Month</div><div class="metric-value" style="font-size:1rem;">{vx_symbol}</div><div class="metric-delta">Exp: {vx_exp}</div></div>', unsafe_allow_html=True)
-    
-    # VIX Channel Trading Rules
-    with st.expander("📖 VIX Channel Trading Rules", expanded=False):
-        st.markdown(f'''
+                            if width > 0:
+                                pct_pos = round(((vix - vix_floor) / width) * 100)
+                                pos_text = f"IN CHANNEL ({pct_pos}%)"
+                            else:
+                                pos_text = "IN CHANNEL"
+                            pos_color = "var(--accent-cyan)"
+                            signal = "Wait for wall touch to trade"
+                    st.markdown(f'<div class="metric-card" style="border-left:4px solid {pos_color};"><div class="metric-icon">📍</div><div class="metric-label">VIX: {vix:.2f}</div><div class="metric-value" style="color:{pos_color};font-size:0.9rem;">{pos_text}</div><div class="metric-delta">{signal}</div></div>', unsafe_allow_html=True)
+                
+                # Channel shape description
+                channel_desc = vix_channel_levels.get("channel_description", "")
+                if channel_desc:
+                    st.markdown(f'<div style="text-align:center;padding:8px;font-size:0.8rem;color:var(--text-muted);font-style:italic;">{channel_desc} | Width: {width:.2f} VIX pts</div>', unsafe_allow_html=True)
+                
+                # ── VIX Entry Signal Alerts (4 scenarios) ──
+                TOUCH_ALERT = 0.15
+                d_floor = vix - vix_floor if vix else 0
+                d_ceiling = vix_ceiling - vix if vix else 0
+                
+                # Scenario 1: VIX at floor, closing above → PUTS
+                if d_floor >= 0 and d_floor <= TOUCH_ALERT:
+                    st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🔴</div><div class="alert-content"><div class="alert-title">VIX AT FLOOR — PUTS SIGNAL</div><div class="alert-text">VIX touching {vix_floor:.2f} and closing above. VIX bouncing up = SPX heading down. Enter PUTS.</div></div></div>', unsafe_allow_html=True)
+                
+                # Scenario 2: VIX at ceiling, closing below → CALLS
+                elif d_ceiling >= 0 and d_ceiling <= TOUCH_ALERT:
+                    st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🟢</div><div class="alert-content"><div class="alert-title">VIX AT CEILING — CALLS SIGNAL</div><div class="alert-text">VIX touching {vix_ceiling:.2f} and closing below. VIX rejected = SPX heading up. Enter CALLS.</div></div></div>', unsafe_allow_html=True)
+                
+                # Scenario 3: VIX broke above ceiling, retesting → PUTS
+                elif vix > vix_ceiling and d_ceiling >= -TOUCH_ALERT:
+                    st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX CEILING RETEST — PUTS SIGNAL</div><div class="alert-text">VIX broke above {vix_ceiling:.2f}, came back to retest. Ceiling is now support. Enter PUTS.</div></div></div>', unsafe_allow_html=True)
+                
+                # Scenario 4: VIX broke below floor, retesting → CALLS
+                elif vix < vix_floor and d_floor >= -TOUCH_ALERT:
+                    st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX FLOOR RETEST — CALLS SIGNAL</div><div class="alert-text">VIX broke below {vix_floor:.2f}, came back to retest. Floor is now resistance. Enter CALLS.</div></div></div>', unsafe_allow_html=True)
+                
+                # Established breaks (far from wall)
+                elif vix > vix_ceiling:
+                    st.markdown(f'<div class="alert-box alert-box-danger" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX ABOVE CEILING</div><div class="alert-text">VIX established above {vix_ceiling:.2f}. Bearish SPX. Watch for retest of ceiling for PUTS entry.</div></div></div>', unsafe_allow_html=True)
+                elif vix < vix_floor:
+                    st.markdown(f'<div class="alert-box alert-box-success" style="margin-top:10px;"><div class="alert-icon-large">🚨</div><div class="alert-content"><div class="alert-title">VIX BELOW FLOOR</div><div class="alert-text">VIX established below {vix_floor:.2f}. Bullish SPX. Watch for retest of floor for CALLS entry.</div></div></div>', unsafe_allow_html=True)
+        
+        else:
+            # No pivots entered - show prompt
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--text-muted);"><div class="metric-icon">🌊</div><div class="metric-label">VIX Channel</div><div class="metric-value" style="color:var(--text-muted);">AWAITING DATA</div><div class="metric-delta">Enter 4 pivots in sidebar</div></div>', unsafe_allow_html=True)
+            with col2:
+                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-cyan);"><div class="metric-icon">📍</div><div class="metric-label">Current VIX</div><div class="metric-value" style="font-size:1.3rem;">{vix:.2f}</div><div class="metric-delta">Enter pivots for channel</div></div>', unsafe_allow_html=True)
+            with col3:
+                if vx_data and vx_data.get("available"):
+                    vx_symbol = vx_data.get("symbol", "N/A")
+                    vx_exp = vx_data.get("expiration", "N/A")
+                else:
+                    vx_symbol = "N/A"
+                    vx_exp = "Tastytrade not connected"
+                st.markdown(f'<div class="metric-card" style="border-left:4px solid var(--accent-purple);"><div class="metric-icon">📊</div><div class="metric-label">VX Front Month</div><div class="metric-value" style="font-size:1rem;">{vx_symbol}</div><div class="metric-delta">Exp: {vx_exp}</div></div>', unsafe_allow_html=True)
+        
+        # VIX Channel Trading Rules
+        with st.expander("📖 VIX Channel Trading Rules", expanded=False):
+            st.markdown(f'''
         **Channel Shape: {vix_channel_type.value}** {vix_channel_direction}
         
         The VIX channel is built by connecting overnight structural pivots:
@@ -6759,17 +6268,21 @@ Calculated Entry Premium: {p.get('calc_result')}
         - DIVERGING (expansion): Wide range day — use wider stops
         - FLAT: Range-bound — play the walls aggressively
         ''')
+            
+            # VX Term Structure (if available)
+            vx_term = fetch_vx_term_structure_tastytrade()
+            if vx_term.get("available") and len(vx_term.get("contracts", [])) >= 2:
+                with st.expander("📈 VX Term Structure", expanded=False):
+                    contracts = vx_term.get("contracts", [])
+                    st.markdown("**VX Futures Contracts:**")
+                    for i, c in enumerate(contracts[:6]):
+                        month_label = f"M{i+1}" if i > 0 else "Front"
+                        st.markdown(f"- **{month_label}:** {c.get('symbol')} (Exp: {c.get('expiration')})")
+                    st.info("💡 Live prices require DXLink streaming integration (coming soon)")
         
-        # VX Term Structure (if available)
-        vx_term = fetch_vx_term_structure_tastytrade()
-        if vx_term.get("available") and len(vx_term.get("contracts", [])) >= 2:
-            with st.expander("📈 VX Term Structure", expanded=False):
-                contracts = vx_term.get("contracts", [])
-                st.markdown("**VX Futures Contracts:**")
-                for i, c in enumerate(contracts[:6]):
-                    month_label = f"M{i+1}" if i > 0 else "Front"
-                    st.markdown(f"- **{month_label}:** {c.get('symbol')} (Exp: {c.get('expiration')})")
-                st.info("💡 Live prices require DXLink streaming integration (coming soon)")
+    
+    live_trade_panels()
+    laps.restart()
     
     # ═══════════════════════════════════════════════════════════════════════════
 
@@ -6795,52 +6308,62 @@ Calculated Entry Premium: {p.get('calc_result')}
     # ═══════════════════════════════════════════════════════════════════════════
 
     
-    # ═══════════════════════════════════════════════════════════════════════════
-    # SUPPORTING ANALYSIS (Collapsed)
-    # ═══════════════════════════════════════════════════════════════════════════
-    with st.expander("📊 Supporting Analysis — Confluence, Bias & Technical Indicators", expanded=False):
-        # TODAY'S BIAS
-        # ═══════════════════════════════════════════════════════════════════════════
-        st.markdown('<div class="section-header"><div class="section-icon">🎯</div><h2 class="section-title">Today\'s Bias</h2></div>', unsafe_allow_html=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            chan_class = channel_type.value.lower()
-            chan_icon = {"ASCENDING": "↗", "DESCENDING": "↘", "MIXED": "⟷", "CONTRACTING": "⟶"}.get(channel_type.value, "○")
-            st.markdown(f'<div class="glass-card"><div class="channel-badge channel-badge-{chan_class}"><span style="font-size:1.2rem;">{chan_icon}</span><span>{channel_type.value}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{channel_reason}</p></div>', unsafe_allow_html=True)
-        with col2:
-            ema_class = "calls" if ema_data["above_200"] else "puts"
-            ema_icon = "↑" if ema_data["above_200"] else "↓"
-            ema_text = "Above 200 EMA" if ema_data["above_200"] else "Below 200 EMA"
-            st.markdown(f'<div class="glass-card"><div class="bias-pill bias-pill-{ema_class}"><span>{ema_icon}</span><span>{ema_text}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{"Supports CALLS" if ema_data["above_200"] else "Supports PUTS"}</p></div>', unsafe_allow_html=True)
-        with col3:
-            cross_class = "calls" if ema_data["ema_cross"] == "BULLISH" else "puts"
-            cross_icon = "✓" if ema_data["ema_cross"] == "BULLISH" else "✗"
-            st.markdown(f'<div class="glass-card"><div class="bias-pill bias-pill-{cross_class}"><span>{cross_icon}</span><span>8/21 {ema_data["ema_cross"]}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{"8 EMA > 21 EMA" if ema_data["ema_cross"] == "BULLISH" else "8 EMA < 21 EMA"}</p></div>', unsafe_allow_html=True)
+    laps.mark("sessions")
     
+    @st.fragment(run_every=live_refresh)
+    @timed("render")
+    def live_analysis_panels():
+        """Bias, confluence and dual-level distances / structure alerts - reruns alone on each tick."""
+        live = live_view()
+        current_es, current_spx, vix, vix_pos = live["current_es"], live["current_spx"], live["vix"], live["vix_pos"]
+        position, decision, explosive = live["position"], live["decision"], live["explosive"]
+        
         # ═══════════════════════════════════════════════════════════════════════════
-        # EXPLOSIVE MOVE ALERT (Based on Target Distance ONLY)
+        # SUPPORTING ANALYSIS (Collapsed)
         # ═══════════════════════════════════════════════════════════════════════════
-        if explosive["explosive_score"] >= 30:
-            score = explosive["explosive_score"]
-            direction = explosive.get("direction_bias", "")
-            target_dist = explosive.get("target_distance", 0)
-            conviction = explosive.get("conviction", "LOW")
+        with st.expander("📊 Supporting Analysis — Confluence, Bias & Technical Indicators", expanded=False):
+            # TODAY'S BIAS
+            # ═══════════════════════════════════════════════════════════════════════════
+            st.markdown('<div class="section-header"><div class="section-icon">🎯</div><h2 class="section-title">Today\'s Bias</h2></div>', unsafe_allow_html=True)
         
-            # Determine styling based on conviction
-            if conviction == "EXTREME":
-                alert_class = "danger"
-                score_icon = "🔥"
-            elif conviction == "HIGH":
-                alert_class = "warning" 
-                score_icon = "⚡"
-            else:
-                alert_class = "info"
-                score_icon = "📊"
-        
-            direction_icon = "🐻" if direction == "PUTS" else "🐂" if direction == "CALLS" else "⚖️"
-        
-            st.markdown(f'''
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                chan_class = channel_type.value.lower()
+                chan_icon = {"ASCENDING": "↗", "DESCENDING": "↘", "MIXED": "⟷", "CONTRACTING": "⟶"}.get(channel_type.value, "○")
+                st.markdown(f'<div class="glass-card"><div class="channel-badge channel-badge-{chan_class}"><span style="font-size:1.2rem;">{chan_icon}</span><span>{channel_type.value}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{channel_reason}</p></div>', unsafe_allow_html=True)
+            with col2:
+                ema_class = "calls" if ema_data["above_200"] else "puts"
+                ema_icon = "↑" if ema_data["above_200"] else "↓"
+                ema_text = "Above 200 EMA" if ema_data["above_200"] else "Below 200 EMA"
+                st.markdown(f'<div class="glass-card"><div class="bias-pill bias-pill-{ema_class}"><span>{ema_icon}</span><span>{ema_text}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{"Supports CALLS" if ema_data["above_200"] else "Supports PUTS"}</p></div>', unsafe_allow_html=True)
+            with col3:
+                cross_class = "calls" if ema_data["ema_cross"] == "BULLISH" else "puts"
+                cross_icon = "✓" if ema_data["ema_cross"] == "BULLISH" else "✗"
+                st.markdown(f'<div class="glass-card"><div class="bias-pill bias-pill-{cross_class}"><span>{cross_icon}</span><span>8/21 {ema_data["ema_cross"]}</span></div><p style="margin-top:10px;color:var(--text-secondary);font-size:0.875rem;">{"8 EMA > 21 EMA" if ema_data["ema_cross"] == "BULLISH" else "8 EMA < 21 EMA"}</p></div>', unsafe_allow_html=True)
+        
+            # ═══════════════════════════════════════════════════════════════════════════
+            # EXPLOSIVE MOVE ALERT (Based on Target Distance ONLY)
+            # ═══════════════════════════════════════════════════════════════════════════
+            if explosive["explosive_score"] >= 30:
+                score = explosive["explosive_score"]
+                direction = explosive.get("direction_bias", "")
+                target_dist = explosive.get("target_distance", 0)
+                conviction = explosive.get("conviction", "LOW")
+            
+                # Determine styling based on conviction
+                if conviction == "EXTREME":
+                    alert_class = "danger"
+                    score_icon = "🔥"
+                elif conviction == "HIGH":
+                    alert_class = "warning" 
+                    score_icon = "⚡"
+                else:
+                    alert_class = "info"
+                    score_icon = "📊"
+            
+                direction_icon = "🐻" if direction == "PUTS" else "🐂" if direction == "CALLS" else "⚖️"
+            
+                st.markdown(f'''
             <div class="alert-box alert-box-{alert_class}" style="border-width:2px;">
                 <div class="alert-icon-large" style="font-size:4rem;">{direction_icon}</div>
                 <div class="alert-content">
@@ -6851,107 +6374,107 @@ Calculated Entry Premium: {p.get('calc_result')}
                 </div>
             </div>
             ''', unsafe_allow_html=True)
-    
-        # Retail positioning alert
-        if retail_data["positioning"] != "BALANCED":
-            alert_class = "warning" if "HEAVY" in retail_data["positioning"] else "danger"
-            # Bull icon for CALL buying (fade to puts), Bear icon for PUT buying (fade to calls)
-            alert_icon = "🐂" if "CALL" in retail_data["positioning"] else "🐻"
-            # Show the actual VIX values so user can verify data is real
-            vix_vals = f"VIX: {retail_data['vix']} | VIX3M: {retail_data['vix3m']} | Spread: {retail_data['spread']}" if retail_data['vix'] else "Data unavailable"
-            st.markdown(f'<div class="alert-box alert-box-{alert_class}"><div class="alert-icon-large">{alert_icon}</div><div class="alert-content"><div class="alert-title">{retail_data["positioning"]}</div><div class="alert-text">{retail_data["warning"]}</div><div class="alert-values">{vix_vals}</div></div></div>', unsafe_allow_html=True)
-        else:
-            # Check if we actually have data or if it failed silently
-            if retail_data['vix'] is not None:
-                vix_vals = f"VIX: {retail_data['vix']} | VIX3M: {retail_data['vix3m']} | Spread: {retail_data['spread']}"
-                st.markdown(f'<div class="alert-box alert-box-success"><div class="alert-icon-large">⚖️</div><div class="alert-content"><div class="alert-title">BALANCED POSITIONING</div><div class="alert-text">No crowd pressure detected - trade freely with structure</div><div class="alert-values">{vix_vals}</div></div></div>', unsafe_allow_html=True)
+        
+            # Retail positioning alert
+            if retail_data["positioning"] != "BALANCED":
+                alert_class = "warning" if "HEAVY" in retail_data["positioning"] else "danger"
+                # Bull icon for CALL buying (fade to puts), Bear icon for PUT buying (fade to calls)
+                alert_icon = "🐂" if "CALL" in retail_data["positioning"] else "🐻"
+                # Show the actual VIX values so user can verify data is real
+                vix_vals = f"VIX: {retail_data['vix']} | VIX3M: {retail_data['vix3m']} | Spread: {retail_data['spread']}" if retail_data['vix'] else "Data unavailable"
+                st.markdown(f'<div class="alert-box alert-box-{alert_class}"><div class="alert-icon-large">{alert_icon}</div><div class="alert-content"><div class="alert-title">{retail_data["positioning"]}</div><div class="alert-text">{retail_data["warning"]}</div><div class="alert-values">{vix_vals}</div></div></div>', unsafe_allow_html=True)
             else:
-                st.markdown('<div class="alert-box alert-box-info"><div class="alert-icon-large">❓</div><div class="alert-content"><div class="alert-title">POSITIONING UNKNOWN</div><div class="alert-text">Could not fetch VIX term structure data</div></div></div>', unsafe_allow_html=True)
-    
-        # VIX Position
-        if vix_range["available"]:
-            vix_icon = {"ABOVE": "▲", "IN RANGE": "◆", "BELOW": "▼"}.get(vix_pos.value, "○")
-            st.markdown(f'<div class="alert-box alert-box-info"><span class="alert-icon">{vix_icon}</span><div class="alert-content"><div class="alert-title">VIX {vix_pos.value}</div><div class="alert-text">Overnight range: {vix_range["bottom"]} - {vix_range["top"]} | Current: {vix}</div></div></div>', unsafe_allow_html=True)
-    
-        # ═══════════════════════════════════════════════════════════════════════════
-        # CONFLUENCE
-        # ═══════════════════════════════════════════════════════════════════════════
-        st.markdown('<div class="section-header"><div class="section-icon">⚖️</div><h2 class="section-title">Confluence Analysis</h2></div>', unsafe_allow_html=True)
-    
-        calls_score, puts_score = len(decision["calls_factors"]), len(decision["puts_factors"])
-        calls_class = "high" if calls_score >= 3 else "medium" if calls_score >= 2 else "low"
-        puts_class = "high" if puts_score >= 3 else "medium" if puts_score >= 2 else "low"
-    
-        col1, col2 = st.columns(2)
-        with col1:
-            factors_html = "".join([f'<div class="confluence-factor"><span class="factor-check active">✓</span>{f}</div>' for f in decision["calls_factors"]]) or '<div class="confluence-factor"><span class="factor-check inactive">—</span>No supporting factors</div>'
-            st.markdown(f'<div class="confluence-card confluence-card-calls"><div class="confluence-header"><span class="confluence-title">🟢 CALLS</span><span class="confluence-score {calls_class}">{calls_score}</span></div>{factors_html}</div>', unsafe_allow_html=True)
-        with col2:
-            factors_html = "".join([f'<div class="confluence-factor"><span class="factor-check active">✓</span>{f}</div>' for f in decision["puts_factors"]]) or '<div class="confluence-factor"><span class="factor-check inactive">—</span>No supporting factors</div>'
-            st.markdown(f'<div class="confluence-card confluence-card-puts"><div class="confluence-header"><span class="confluence-title">🔴 PUTS</span><span class="confluence-score {puts_class}">{puts_score}</span></div>{factors_html}</div>', unsafe_allow_html=True)
-    
-        # ═══════════════════════════════════════════════════════════════════════════
-        # INDICATORS
-        # ═══════════════════════════════════════════════════════════════════════════
-        st.markdown('<div class="section-header"><div class="section-icon">📈</div><h2 class="section-title">Technical Indicators</h2></div>', unsafe_allow_html=True)
-    
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            sc = "bullish" if ema_data["above_200"] else "bearish"
-            st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📊</div><div class="indicator-title">200 EMA Bias</div></div><div class="indicator-row"><span class="indicator-label">Price</span><span class="indicator-value">{ema_data.get("price", "N/A")}</span></div><div class="indicator-row"><span class="indicator-label">200 EMA</span><span class="indicator-value">{ema_data.get("ema_200", "N/A")}</span></div><div class="indicator-status indicator-status-{sc}">{"✓ ABOVE" if ema_data["above_200"] else "✗ BELOW"}</div></div>', unsafe_allow_html=True)
-        with col2:
-            sc = "bullish" if ema_data["ema_cross"] == "BULLISH" else "bearish"
-            st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📈</div><div class="indicator-title">8/21 EMA Cross</div></div><div class="indicator-row"><span class="indicator-label">8 EMA</span><span class="indicator-value">{ema_data.get("ema_8", "N/A")}</span></div><div class="indicator-row"><span class="indicator-label">21 EMA</span><span class="indicator-value">{ema_data.get("ema_21", "N/A")}</span></div><div class="indicator-status indicator-status-{sc}">{"✓" if ema_data["ema_cross"] == "BULLISH" else "✗"} {ema_data["ema_cross"]}</div></div>', unsafe_allow_html=True)
-        with col3:
+                # Check if we actually have data or if it failed silently
+                if retail_data['vix'] is not None:
+                    vix_vals = f"VIX: {retail_data['vix']} | VIX3M: {retail_data['vix3m']} | Spread: {retail_data['spread']}"
+                    st.markdown(f'<div class="alert-box alert-box-success"><div class="alert-icon-large">⚖️</div><div class="alert-content"><div class="alert-title">BALANCED POSITIONING</div><div class="alert-text">No crowd pressure detected - trade freely with structure</div><div class="alert-values">{vix_vals}</div></div></div>', unsafe_allow_html=True)
+                else:
+                    st.markdown('<div class="alert-box alert-box-info"><div class="alert-icon-large">❓</div><div class="alert-content"><div class="alert-title">POSITIONING UNKNOWN</div><div class="alert-text">Could not fetch VIX term structure data</div></div></div>', unsafe_allow_html=True)
+        
+            # VIX Position
             if vix_range["available"]:
-                vix_icon_ind = {"ABOVE": "▲", "IN RANGE": "◆", "BELOW": "▼"}.get(vix_pos.value, "○")
-                sc = "bearish" if vix_pos == VIXPosition.ABOVE_RANGE else "bullish"
-                st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📉</div><div class="indicator-title">VIX Overnight</div></div><div class="indicator-row"><span class="indicator-label">Range</span><span class="indicator-value">{vix_range["bottom"]} - {vix_range["top"]}</span></div><div class="indicator-row"><span class="indicator-label">Current</span><span class="indicator-value">{vix}</span></div><div class="indicator-status indicator-status-{sc}">{vix_icon_ind} {vix_pos.value}</div></div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📉</div><div class="indicator-title">VIX Overnight</div></div><div class="indicator-row"><span class="indicator-label">Current</span><span class="indicator-value">{vix}</span></div><div style="margin-top:8px;color:var(--text-muted);font-size:0.85rem;">Range data unavailable</div></div>', unsafe_allow_html=True)
-    
-
-    
-    # ═══════════════════════════════════════════════════════════════════════════
-    # DUAL CHANNEL LEVELS (Collapsed)
-    # ═══════════════════════════════════════════════════════════════════════════
-    with st.expander("📊 Dual Channel Levels — All 4 Structural Levels", expanded=False):
-        # DUAL CHANNEL LEVELS (Option C - All 4 Levels)
-        # ═══════════════════════════════════════════════════════════════════════════
-        st.markdown(f'<div class="section-header"><div class="section-icon">📊</div><h2 class="section-title">Dual Channel Levels @ {inputs["ref_time"][0]}:{inputs["ref_time"][1]:02d} AM</h2></div>', unsafe_allow_html=True)
-    
-        if dual_levels_spx:
-            asc_floor = dual_levels_spx["asc_floor"]
-            asc_ceiling = dual_levels_spx["asc_ceiling"]
-            desc_ceiling = dual_levels_spx["desc_ceiling"]
-            desc_floor = dual_levels_spx["desc_floor"]
+                vix_icon = {"ABOVE": "▲", "IN RANGE": "◆", "BELOW": "▼"}.get(vix_pos.value, "○")
+                st.markdown(f'<div class="alert-box alert-box-info"><span class="alert-icon">{vix_icon}</span><div class="alert-content"><div class="alert-title">VIX {vix_pos.value}</div><div class="alert-text">Overnight range: {vix_range["bottom"]} - {vix_range["top"]} | Current: {vix}</div></div></div>', unsafe_allow_html=True)
         
-            dist_asc_floor = round(current_spx - asc_floor, 1)
-            dist_asc_ceiling = round(asc_ceiling - current_spx, 1)
-            dist_desc_ceiling = round(desc_ceiling - current_spx, 1)
-            dist_desc_floor = round(current_spx - desc_floor, 1)
+            # ═══════════════════════════════════════════════════════════════════════════
+            # CONFLUENCE
+            # ═══════════════════════════════════════════════════════════════════════════
+            st.markdown('<div class="section-header"><div class="section-icon">⚖️</div><h2 class="section-title">Confluence Analysis</h2></div>', unsafe_allow_html=True)
         
-            # Determine which level is KEY based on channel type
-            is_ascending = channel_type == ChannelType.ASCENDING
-            is_descending = channel_type == ChannelType.DESCENDING
+            calls_score, puts_score = len(decision["calls_factors"]), len(decision["puts_factors"])
+            calls_class = "high" if calls_score >= 3 else "medium" if calls_score >= 2 else "low"
+            puts_class = "high" if puts_score >= 3 else "medium" if puts_score >= 2 else "low"
         
-            # Position summary from decision
-            pos_summary = decision.get("position_summary", f"Position: {position.value}")
+            col1, col2 = st.columns(2)
+            with col1:
+                factors_html = "".join([f'<div class="confluence-factor"><span class="factor-check active">✓</span>{f}</div>' for f in decision["calls_factors"]]) or '<div class="confluence-factor"><span class="factor-check inactive">—</span>No supporting factors</div>'
+                st.markdown(f'<div class="confluence-card confluence-card-calls"><div class="confluence-header"><span class="confluence-title">🟢 CALLS</span><span class="confluence-score {calls_class}">{calls_score}</span></div>{factors_html}</div>', unsafe_allow_html=True)
+            with col2:
+                factors_html = "".join([f'<div class="confluence-factor"><span class="factor-check active">✓</span>{f}</div>' for f in decision["puts_factors"]]) or '<div class="confluence-factor"><span class="factor-check inactive">—</span>No supporting factors</div>'
+                st.markdown(f'<div class="confluence-card confluence-card-puts"><div class="confluence-header"><span class="confluence-title">🔴 PUTS</span><span class="confluence-score {puts_class}">{puts_score}</span></div>{factors_html}</div>', unsafe_allow_html=True)
         
-            # Position summary
-            st.markdown(f'<div class="levels-container"><div style="padding:14px 16px;background:linear-gradient(90deg,var(--bg-elevated) 0%,transparent 100%);border-radius:10px;margin-bottom:16px;border-left:4px solid var(--accent-cyan);"><span style="font-family:Share Tech Mono,monospace;font-size:0.9rem;color:var(--text-primary);">{pos_summary}</span></div></div>', unsafe_allow_html=True)
+            # ═══════════════════════════════════════════════════════════════════════════
+            # INDICATORS
+            # ═══════════════════════════════════════════════════════════════════════════
+            st.markdown('<div class="section-header"><div class="section-icon">📈</div><h2 class="section-title">Technical Indicators</h2></div>', unsafe_allow_html=True)
         
-            # Check if floor or ceiling was adjusted
-            floor_adjusted = dual_levels_spx.get("floor_was_adjusted", False)
-            ceiling_adjusted = dual_levels_spx.get("ceiling_was_adjusted", False)
-            original_asc_floor = dual_levels_spx.get("original_asc_floor")
-            original_desc_ceiling = dual_levels_spx.get("original_desc_ceiling")
-            floor_adj_session = (dual_levels_spx.get("floor_adjustment_session") or "").upper()
-            ceiling_adj_session = (dual_levels_spx.get("ceiling_adjustment_session") or "").upper()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                sc = "bullish" if ema_data["above_200"] else "bearish"
+                st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📊</div><div class="indicator-title">200 EMA Bias</div></div><div class="indicator-row"><span class="indicator-label">Price</span><span class="indicator-value">{ema_data.get("price", "N/A")}</span></div><div class="indicator-row"><span class="indicator-label">200 EMA</span><span class="indicator-value">{ema_data.get("ema_200", "N/A")}</span></div><div class="indicator-status indicator-status-{sc}">{"✓ ABOVE" if ema_data["above_200"] else "✗ BELOW"}</div></div>', unsafe_allow_html=True)
+            with col2:
+                sc = "bullish" if ema_data["ema_cross"] == "BULLISH" else "bearish"
+                st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📈</div><div class="indicator-title">8/21 EMA Cross</div></div><div class="indicator-row"><span class="indicator-label">8 EMA</span><span class="indicator-value">{ema_data.get("ema_8", "N/A")}</span></div><div class="indicator-row"><span class="indicator-label">21 EMA</span><span class="indicator-value">{ema_data.get("ema_21", "N/A")}</span></div><div class="indicator-status indicator-status-{sc}">{"✓" if ema_data["ema_cross"] == "BULLISH" else "✗"} {ema_data["ema_cross"]}</div></div>', unsafe_allow_html=True)
+            with col3:
+                if vix_range["available"]:
+                    vix_icon_ind = {"ABOVE": "▲", "IN RANGE": "◆", "BELOW": "▼"}.get(vix_pos.value, "○")
+                    sc = "bearish" if vix_pos == VIXPosition.ABOVE_RANGE else "bullish"
+                    st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📉</div><div class="indicator-title">VIX Overnight</div></div><div class="indicator-row"><span class="indicator-label">Range</span><span class="indicator-value">{vix_range["bottom"]} - {vix_range["top"]}</span></div><div class="indicator-row"><span class="indicator-label">Current</span><span class="indicator-value">{vix}</span></div><div class="indicator-status indicator-status-{sc}">{vix_icon_ind} {vix_pos.value}</div></div>', unsafe_allow_html=True)
+                else:
+                    st.markdown(f'<div class="indicator-card"><div class="indicator-header"><div class="indicator-icon">📉</div><div class="indicator-title">VIX Overnight</div></div><div class="indicator-row"><span class="indicator-label">Current</span><span class="indicator-value">{vix}</span></div><div style="margin-top:8px;color:var(--text-muted);font-size:0.85rem;">Range data unavailable</div></div>', unsafe_allow_html=True)
         
-            # Show adjustment alert if floor was adjusted
-            if floor_adjusted and original_asc_floor:
-                st.markdown(f'''
+
+        
+        # ═══════════════════════════════════════════════════════════════════════════
+        # DUAL CHANNEL LEVELS (Collapsed)
+        # ═══════════════════════════════════════════════════════════════════════════
+        with st.expander("📊 Dual Channel Levels — All 4 Structural Levels", expanded=False):
+            # DUAL CHANNEL LEVELS (Option C - All 4 Levels)
+            # ═══════════════════════════════════════════════════════════════════════════
+            st.markdown(f'<div class="section-header"><div class="section-icon">📊</div><h2 class="section-title">Dual Channel Levels @ {inputs["ref_time"][0]}:{inputs["ref_time"][1]:02d} AM</h2></div>', unsafe_allow_html=True)
+        
+            if dual_levels_spx:
+                asc_floor = dual_levels_spx["asc_floor"]
+                asc_ceiling = dual_levels_spx["asc_ceiling"]
+                desc_ceiling = dual_levels_spx["desc_ceiling"]
+                desc_floor = dual_levels_spx["desc_floor"]
+            
+                dist_asc_floor = round(current_spx - asc_floor, 1)
+                dist_asc_ceiling = round(asc_ceiling - current_spx, 1)
+                dist_desc_ceiling = round(desc_ceiling - current_spx, 1)
+                dist_desc_floor = round(current_spx - desc_floor, 1)
+            
+                # Determine which level is KEY based on channel type
+                is_ascending = channel_type == ChannelType.ASCENDING
+                is_descending = channel_type == ChannelType.DESCENDING
+            
+                # Position summary from decision
+                pos_summary = decision.get("position_summary", f"Position: {position.value}")
+            
+                # Position summary
+                st.markdown(f'<div class="levels-container"><div style="padding:14px 16px;background:linear-gradient(90deg,var(--bg-elevated) 0%,transparent 100%);border-radius:10px;margin-bottom:16px;border-left:4px solid var(--accent-cyan);"><span style="font-family:Share Tech Mono,monospace;font-size:0.9rem;color:var(--text-primary);">{pos_summary}</span></div></div>', unsafe_allow_html=True)
+            
+                # Check if floor or ceiling was adjusted
+                floor_adjusted = dual_levels_spx.get("floor_was_adjusted", False)
+                ceiling_adjusted = dual_levels_spx.get("ceiling_was_adjusted", False)
+                original_asc_floor = dual_levels_spx.get("original_asc_floor")
+                original_desc_ceiling = dual_levels_spx.get("original_desc_ceiling")
+                floor_adj_session = (dual_levels_spx.get("floor_adjustment_session") or "").upper()
+                ceiling_adj_session = (dual_levels_spx.get("ceiling_adjustment_session") or "").upper()
+            
+                # Show adjustment alert if floor was adjusted
+                if floor_adjusted and original_asc_floor:
+                    st.markdown(f'''
                 <div class="alert-box alert-box-info" style="margin-bottom:16px;">
                     <span class="alert-icon">🔄</span>
                     <div class="alert-content">
@@ -6961,9 +6484,9 @@ Calculated Entry Premium: {p.get('calc_result')}
                     </div>
                 </div>
                 ''', unsafe_allow_html=True)
-        
-            if ceiling_adjusted and original_desc_ceiling:
-                st.markdown(f'''
+            
+                if ceiling_adjusted and original_desc_ceiling:
+                    st.markdown(f'''
                 <div class="alert-box alert-box-info" style="margin-bottom:16px;">
                     <span class="alert-icon">🔄</span>
                     <div class="alert-content">
@@ -6973,17 +6496,17 @@ Calculated Entry Premium: {p.get('calc_result')}
                     </div>
                 </div>
                 ''', unsafe_allow_html=True)
-        
-            # Ascending Channel Header
-            asc_label = "↗ ASCENDING CHANNEL (DOMINANT)" if is_ascending else "↗ ASCENDING CHANNEL"
-            st.markdown(f'<div style="font-size:0.8rem;color:var(--bull);text-transform:uppercase;letter-spacing:1px;margin:16px 0 8px 0;font-weight:600;">{asc_label}</div>', unsafe_allow_html=True)
-        
-            # Ascending Floor Row - show BOTH if adjusted
-            if is_ascending:
-                if floor_adjusted and original_asc_floor:
-                    # Show both original and adjusted
-                    dist_original = current_spx - original_asc_floor
-                    st.markdown(f'''
+            
+                # Ascending Channel Header
+                asc_label = "↗ ASCENDING CHANNEL (DOMINANT)" if is_ascending else "↗ ASCENDING CHANNEL"
+                st.markdown(f'<div style="font-size:0.8rem;color:var(--bull);text-transform:uppercase;letter-spacing:1px;margin:16px 0 8px 0;font-weight:600;">{asc_label}</div>', unsafe_allow_html=True)
+            
+                # Ascending Floor Row - show BOTH if adjusted
+                if is_ascending:
+                    if floor_adjusted and original_asc_floor:
+                        # Show both original and adjusted
+                        dist_original = current_spx - original_asc_floor
+                        st.markdown(f'''
                     <div class="levels-container" style="border-left:3px solid var(--bull);">
                         <div class="level-row">
                             <div class="level-label floor"><span>▼</span><span>ASC FLOOR (ADJ)</span></div>
@@ -6999,27 +6522,27 @@ Calculated Entry Premium: {p.get('calc_result')}
                         </div>
                     </div>
                     ''', unsafe_allow_html=True)
+                    else:
+                        st.markdown(f'<div class="levels-container" style="border-left:3px solid var(--bull);"><div class="level-row"><div class="level-label floor"><span>▼</span><span>ASC FLOOR</span></div><div class="level-value floor">{asc_floor:,.2f}</div><div class="level-note">CALLS entry • {dist_asc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
                 else:
-                    st.markdown(f'<div class="levels-container" style="border-left:3px solid var(--bull);"><div class="level-row"><div class="level-label floor"><span>▼</span><span>ASC FLOOR</span></div><div class="level-value floor">{asc_floor:,.2f}</div><div class="level-note">CALLS entry • {dist_asc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
-            else:
-                st.markdown(f'<div class="levels-container" style="opacity:0.7;"><div class="level-row"><div class="level-label floor"><span>▼</span><span>ASC FLOOR</span></div><div class="level-value floor">{asc_floor:,.2f}</div><div class="level-note">CALLS entry • {dist_asc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
-        
-            # Ascending Ceiling Row
-            st.markdown(f'<div class="levels-container" style="opacity:0.5;margin-top:-8px;"><div class="level-row"><div class="level-label" style="color:var(--bull);"><span>▲</span><span>ASC CEIL</span></div><div class="level-value" style="color:var(--bull);">{asc_ceiling:,.2f}</div><div class="level-note">CALLS target • {dist_asc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
-        
-            # Current Price
-            st.markdown(f'<div class="levels-container" style="background:linear-gradient(90deg,rgba(245,184,0,0.15) 0%,transparent 100%);margin:12px 0;"><div class="level-row"><div class="level-label current"><span>●</span><span>CURRENT</span></div><div class="level-value current">{current_spx:,.2f}</div><div class="level-note">ES: {current_es:,.2f}</div></div></div>', unsafe_allow_html=True)
-        
-            # Descending Channel Header
-            desc_label = "↘ DESCENDING CHANNEL (DOMINANT)" if is_descending else "↘ DESCENDING CHANNEL"
-            st.markdown(f'<div style="font-size:0.8rem;color:var(--bear);text-transform:uppercase;letter-spacing:1px;margin:16px 0 8px 0;font-weight:600;">{desc_label}</div>', unsafe_allow_html=True)
-        
-            # Descending Ceiling Row - show BOTH if adjusted
-            if is_descending:
-                if ceiling_adjusted and original_desc_ceiling:
-                    # Show both original and adjusted
-                    dist_original = current_spx - original_desc_ceiling
-                    st.markdown(f'''
+                    st.markdown(f'<div class="levels-container" style="opacity:0.7;"><div class="level-row"><div class="level-label floor"><span>▼</span><span>ASC FLOOR</span></div><div class="level-value floor">{asc_floor:,.2f}</div><div class="level-note">CALLS entry • {dist_asc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+            
+                # Ascending Ceiling Row
+                st.markdown(f'<div class="levels-container" style="opacity:0.5;margin-top:-8px;"><div class="level-row"><div class="level-label" style="color:var(--bull);"><span>▲</span><span>ASC CEIL</span></div><div class="level-value" style="color:var(--bull);">{asc_ceiling:,.2f}</div><div class="level-note">CALLS target • {dist_asc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+            
+                # Current Price
+                st.markdown(f'<div class="levels-container" style="background:linear-gradient(90deg,rgba(245,184,0,0.15) 0%,transparent 100%);margin:12px 0;"><div class="level-row"><div class="level-label current"><span>●</span><span>CURRENT</span></div><div class="level-value current">{current_spx:,.2f}</div><div class="level-note">ES: {current_es:,.2f}</div></div></div>', unsafe_allow_html=True)
+            
+                # Descending Channel Header
+                desc_label = "↘ DESCENDING CHANNEL (DOMINANT)" if is_descending else "↘ DESCENDING CHANNEL"
+                st.markdown(f'<div style="font-size:0.8rem;color:var(--bear);text-transform:uppercase;letter-spacing:1px;margin:16px 0 8px 0;font-weight:600;">{desc_label}</div>', unsafe_allow_html=True)
+            
+                # Descending Ceiling Row - show BOTH if adjusted
+                if is_descending:
+                    if ceiling_adjusted and original_desc_ceiling:
+                        # Show both original and adjusted
+                        dist_original = current_spx - original_desc_ceiling
+                        st.markdown(f'''
                     <div class="levels-container" style="border-left:3px solid var(--bear);">
                         <div class="level-row">
                             <div class="level-label ceiling"><span>▲</span><span>DESC CEIL (ADJ)</span></div>
@@ -7035,23 +6558,36 @@ Calculated Entry Premium: {p.get('calc_result')}
                         </div>
                     </div>
                     ''', unsafe_allow_html=True)
+                    else:
+                        st.markdown(f'<div class="levels-container" style="border-left:3px solid var(--bear);"><div class="level-row"><div class="level-label ceiling"><span>▲</span><span>DESC CEIL</span></div><div class="level-value ceiling">{desc_ceiling:,.2f}</div><div class="level-note">PUTS entry • {dist_desc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
                 else:
-                    st.markdown(f'<div class="levels-container" style="border-left:3px solid var(--bear);"><div class="level-row"><div class="level-label ceiling"><span>▲</span><span>DESC CEIL</span></div><div class="level-value ceiling">{desc_ceiling:,.2f}</div><div class="level-note">PUTS entry • {dist_desc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+                    st.markdown(f'<div class="levels-container" style="opacity:0.7;"><div class="level-row"><div class="level-label ceiling"><span>▲</span><span>DESC CEIL</span></div><div class="level-value ceiling">{desc_ceiling:,.2f}</div><div class="level-note">PUTS entry • {dist_desc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+            
+                # Descending Floor Row
+                st.markdown(f'<div class="levels-container" style="opacity:0.5;margin-top:-8px;"><div class="level-row"><div class="level-label" style="color:var(--bear);"><span>▼</span><span>DESC FLOOR</span></div><div class="level-value" style="color:var(--bear);">{desc_floor:,.2f}</div><div class="level-note">PUTS target • {dist_desc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+            
+                # Structure Alerts
+                if decision.get("structure_alerts"):
+                    for alert in decision["structure_alerts"]:
+                        st.markdown(f'<div class="alert-box alert-box-warning"><span class="alert-icon">⚠️</span><div class="alert-content"><div class="alert-title">Structure Break Alert</div><div class="alert-text">{alert}</div></div></div>', unsafe_allow_html=True)
             else:
-                st.markdown(f'<div class="levels-container" style="opacity:0.7;"><div class="level-row"><div class="level-label ceiling"><span>▲</span><span>DESC CEIL</span></div><div class="level-value ceiling">{desc_ceiling:,.2f}</div><div class="level-note">PUTS entry • {dist_desc_ceiling:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+                st.markdown('<div class="alert-box alert-box-danger"><span class="alert-icon">❌</span><div class="alert-content"><div class="alert-title">Dual Levels Unavailable</div><div class="alert-text">Missing overnight session data</div></div></div>', unsafe_allow_html=True)
         
-            # Descending Floor Row
-            st.markdown(f'<div class="levels-container" style="opacity:0.5;margin-top:-8px;"><div class="level-row"><div class="level-label" style="color:var(--bear);"><span>▼</span><span>DESC FLOOR</span></div><div class="level-value" style="color:var(--bear);">{desc_floor:,.2f}</div><div class="level-note">PUTS target • {dist_desc_floor:+.1f} pts</div></div></div>', unsafe_allow_html=True)
+            # ═══════════════════════════════════════════════════════════════════════════
+
         
-            # Structure Alerts
-            if decision.get("structure_alerts"):
-                for alert in decision["structure_alerts"]:
-                    st.markdown(f'<div class="alert-box alert-box-warning"><span class="alert-icon">⚠️</span><div class="alert-content"><div class="alert-title">Structure Break Alert</div><div class="alert-text">{alert}</div></div></div>', unsafe_allow_html=True)
-        else:
-            st.markdown('<div class="alert-box alert-box-danger"><span class="alert-icon">❌</span><div class="alert-content"><div class="alert-title">Dual Levels Unavailable</div><div class="alert-text">Missing overnight session data</div></div></div>', unsafe_allow_html=True)
     
-        # ═══════════════════════════════════════════════════════════════════════════
-
+    live_analysis_panels()
+    laps.restart()
+    
+    # ═══════════════════════════════════════════════════════════════════════════
+    # REFERENCE LADDER (Collapsed) - every reference time, no recomputation
+    # ═══════════════════════════════════════════════════════════════════════════
+    with st.expander("🪜 Reference Time Ladder — Levels @ Every Reference Time", expanded=False):
+        st.dataframe(reference_ladder_table(reference_ladder, offset, inputs["ref_time"]),
+                     use_container_width=True, hide_index=True)
+        st.caption("SPX levels projected once for every reference time. Switching the sidebar reference time reads a row of this table.")
+    laps.mark("reference_ladder")
     
     # ═══════════════════════════════════════════════════════════════════════════
     # PRIOR DAY LEVELS (Collapsed)
@@ -7227,8 +6763,42 @@ Calculated Entry Premium: {p.get('calc_result')}
     
         # ═══════════════════════════════════════════════════════════════════════════
 
+    laps.mark("prior_day_levels")
+    
+    with st.expander("⏱️ Diagnostics — Rerun Latency, Spans & Fetch Cache", expanded=False):
+        snap = METRICS.snapshot()
+        rerun = snap["spans"].get("rerun")
+        if rerun:
+            d1, d2, d3 = st.columns(3)
+            d1.metric("Rerun p50", f"{rerun['p50_ms']:.0f} ms")
+            d2.metric("Rerun p99", f"{rerun['p99_ms']:.0f} ms")
+            d3.metric("Reruns", rerun["count"])
+        cache_stats = fetch_cache_stats()
+        if cache_stats:
+            st.caption("Fetch cache (hit rate counts fresh and stale serves)")
+            st.dataframe(pd.DataFrame.from_dict(cache_stats, orient="index").round(3), use_container_width=True)
+        if snap["spans"]:
+            st.caption(f"Spans in ms (p50/p99 over the last {METRICS_WINDOW} calls)")
+            spans = pd.DataFrame.from_dict(snap["spans"], orient="index")
+            st.dataframe(spans.sort_values("total_ms", ascending=False).round(2), use_container_width=True)
+        e1, e2 = st.columns(2)
+        e1.download_button("⬇️ JSON", METRICS.to_json(), file_name="spx_metrics.json",
+                           mime="application/json", use_container_width=True)
+        e2.download_button("⬇️ Prometheus", METRICS.to_prometheus(), file_name="spx_metrics.prom",
+                           mime="text/plain", use_container_width=True)
+    
+    with st.expander("🧮 Channel Pipeline — Node Cache & Timings", expanded=False):
+        stats = pipeline_stats()
+        if stats:
+            st.dataframe(pd.DataFrame.from_dict(stats, orient="index").round(2), use_container_width=True)
+    
     # Footer
     st.markdown('<div style="margin-top:40px;padding:20px 0;border-top:1px solid var(--border-subtle);text-align:center;"><p style="font-family:\'Share Tech Mono\',monospace;font-size:0.75rem;color:var(--text-muted);letter-spacing:2px;">SPX PROPHET • STRUCTURAL 0DTE TRADING SYSTEM</p></div>', unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    try:
+        with METRICS.span("rerun"):
+            main()
+    finally:
+        if METRICS_TEXTFILE:
+            METRICS.write_textfile(METRICS_TEXTFILE)